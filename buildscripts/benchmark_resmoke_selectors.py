@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Benchmark the selection of tests for every resmoke.py suite.
+
+Each suite in buildscripts/resmokeconfig/suites is constructed the same way 'resmoke.py run',
+'resmoke.py find-suites', and the Evergreen task generators construct it. The time spent reading the
+tags of test files is reported separately from the total so that the overhead of evaluating the
+selectors themselves can be seen.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Get relative imports to work when the package is not installed on the PYTHONPATH.
+if __name__ == "__main__" and __package__ is None:
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from buildscripts.resmokelib import config as _config
+from buildscripts.resmokelib import parser as _parser
+from buildscripts.resmokelib import selector as _selector
+from buildscripts.resmokelib import suitesconfig
+
+# pylint: enable=wrong-import-position
+
+
+class _TagReadTimer(object):
+    """Accumulate the time spent reading the tags of JavaScript tests."""
+
+    def __init__(self):
+        self.secs = 0.0
+
+    def wrap(self, func):
+        """Return 'func' with the time spent in it added to the total."""
+
+        def _timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.secs += time.perf_counter() - start
+
+        return staticmethod(_timed)
+
+
+def _select_all_suites(suite_names):
+    """Select the tests of each suite and return a list of (suite name, seconds, number of tests)."""
+    timings = []
+    for suite_name in suite_names:
+        start = time.perf_counter()
+        try:
+            suite = suitesconfig.get_suite(suite_name)
+        except IOError as err:
+            # Some suites select tests from a file that is only generated by the build.
+            if err.filename in _config.EXTERNAL_SUITE_SELECTORS:
+                continue
+            raise
+        timings.append((suite_name, time.perf_counter() - start, len(suite.tests)))
+    return timings
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of times to select the tests of every suite.")
+    parser.add_argument("--top", type=int, default=10,
+                        help="Number of the slowest suites to list from the last repetition.")
+    parser.add_argument(
+        "--jstestTagsCacheFile", dest="jstest_tags_cache_file", default="off", metavar="PATH",
+        help="The cache of the tags of JavaScript tests to use. Defaults to 'off' so that every"
+        " repetition reads the test files.")
+    options = parser.parse_args()
+
+    _parser.set_run_options("--jstestTagsCacheFile={}".format(options.jstest_tags_cache_file))
+    suite_names = suitesconfig.get_named_suites()
+
+    tag_read_timer = _TagReadTimer()
+    explorer = _selector.TestFileExplorer
+    explorer.jstest_tags = tag_read_timer.wrap(explorer.jstest_tags)
+    explorer.jstest_tags_for_files = tag_read_timer.wrap(explorer.jstest_tags_for_files)
+
+    for repetition in range(options.repeat):
+        tag_read_timer.secs = 0.0
+        start = time.perf_counter()
+        timings = _select_all_suites(suite_names)
+        total_secs = time.perf_counter() - start
+
+        print("Repetition {}: selected {} tests for {} suites in {:0.3f} seconds, {:0.3f} seconds"
+              " of which were spent reading tags.".format(repetition + 1,
+                                                          sum(num for (_, _, num) in timings),
+                                                          len(timings), total_secs,
+                                                          tag_read_timer.secs))
+
+    print("Slowest suites:")
+    for (suite_name, secs, num_tests) in sorted(timings, key=lambda t: -t[1])[:options.top]:
+        print("    {:<60} {:>8.3f}s {:>6} tests".format(suite_name, secs, num_tests))
+
+
+if __name__ == "__main__":
+    main()
@@ -38,6 +38,7 @@ import buildscripts.resmokelib.suitesconfig as suitesconfig
 from buildscripts.util.fileops import write_file_to_dir, read_yaml_file
 import buildscripts.util.read_config as read_config
 import buildscripts.util.taskname as taskname
+from buildscripts.util.runtime_history import RuntimeHistory
 from buildscripts.util.teststats import HistoricTaskData, TestRuntime, normalize_test_name
 from buildscripts.patch_builds.task_generation import TimeoutInfo, resmoke_commands
 # pylint: enable=wrong-import-position
@@ -871,9 +872,7 @@ class GenerateSubSuites(object):
         :return: List of sub suites to be generated.
         """
         try:
-            evg_stats = HistoricTaskData.from_evg(self.evergreen_api, self.config_options.project,
-                                                  start_date, end_date, self.config_options.task,
-                                                  self.config_options.variant)
+            evg_stats = self.get_historic_task_data(start_date, end_date)
             if not evg_stats:
                 LOGGER.debug("No test history, using fallback suites")
                 # This is probably a new suite, since there is no test history, just use the
@@ -891,6 +890,26 @@ class GenerateSubSuites(object):
             else:
                 raise
 
+    def get_historic_task_data(self, start_date: datetime, end_date: datetime) -> HistoricTaskData:
+        """
+        Get the test runtimes to divide the tests by.
+
+        The runtimes are read from the local runtime history file if one is configured, and
+        queried from Evergreen otherwise.
+
+        :param start_date: Time to start historical analysis.
+        :param end_date: Time to end historical analysis.
+        :return: Historic runtimes of the tests in the suite.
+        """
+        if self.config_options.runtime_history_file:
+            history = RuntimeHistory(self.config_options.runtime_history_file)
+            return history.to_historic_task_data(self.config_options.suite,
+                                                 self.config_options.variant)
+
+        return HistoricTaskData.from_evg(self.evergreen_api, self.config_options.project,
+                                         start_date, end_date, self.config_options.task,
+                                         self.config_options.variant)
+
     def calculate_suites_from_evg_stats(self, test_stats: HistoricTaskData,
                                         execution_time_secs: int) -> List[Suite]:
         """
@@ -35,7 +35,7 @@ import logging
 import os
 import sys
 from tempfile import TemporaryDirectory
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 
 from pymongo import MongoClient
 
@@ -49,6 +49,7 @@ from buildscripts.resmokelib.testing.fixtures import interface
 from buildscripts.resmokelib.testing.fixtures.shardedcluster import ShardedClusterFixture
 from buildscripts.resmokelib.testing.fixtures.standalone import MongoDFixture
 from idl import parser, syntax
+from idl.cache import ParsedSpecCache
 from idl.compiler import CompilerImportResolver
 
 LOGGER_NAME = 'check-idl-definitions'
@@ -64,9 +65,12 @@ def list_idls(directory: str) -> Set[str]:
     }
 
 
-def parse_idl(idl_path: str, import_directories: List[str]) -> syntax.IDLParsedSpec:
+def parse_idl(idl_path: str, import_directories: List[str],
+              parse_cache: Optional[ParsedSpecCache] = None) -> syntax.IDLParsedSpec:
     """Parse an IDL file or throw an error."""
-    parsed_doc = parser.parse(open(idl_path), idl_path, CompilerImportResolver(import_directories))
+    parsed_doc = parser.parse(
+        open(idl_path), idl_path, CompilerImportResolver(import_directories),
+        parse_cache=parse_cache)
 
     if parsed_doc.errors:
         parsed_doc.errors.dump_errors()
@@ -75,20 +79,24 @@ def parse_idl(idl_path: str, import_directories: List[str]) -> syntax.IDLParsedS
     return parsed_doc
 
 
-def get_command_definitions(api_version: str, directory: str,
-                            import_directories: List[str]) -> Dict[str, syntax.Command]:
+def get_command_definitions(
+        api_version: str, directory: str, import_directories: List[str],
+        parse_cache: Optional[ParsedSpecCache] = None) -> Dict[str, syntax.Command]:
     """Get parsed IDL definitions of commands in a given API version."""
 
     LOGGER.info("Searching for command definitions in %s", directory)
 
     def gen():
         for idl_path in sorted(list_idls(directory)):
-            for command in parse_idl(idl_path, import_directories).spec.symbols.commands:
+            for command in parse_idl(idl_path, import_directories,
+                                     parse_cache).spec.symbols.commands:
                 if command.api_version == api_version:
                     yield command.name, command
 
     idl_commands = dict(gen())
     LOGGER.debug("Found %s IDL commands in API Version %s", len(idl_commands), api_version)
+    if parse_cache:
+        LOGGER.debug(parse_cache.format_stats())
     return idl_commands
 
 
@@ -159,6 +167,8 @@ def main():
                             help="Directory to search for IDL import files")
     arg_parser.add_argument("--installDir", dest="install_dir", metavar="INSTALL_DIR",
                             help="Directory to search for MongoDB binaries")
+    arg_parser.add_argument("--parse-cache-dir", dest="parse_cache_dir",
+                            help="Directory of an on-disk cache of parsed IDL files")
     arg_parser.add_argument("-v", "--verbose", action="count", help="Enable verbose logging")
     arg_parser.add_argument("api_version", metavar="API_VERSION", help="API Version to check")
     args = arg_parser.parse_args()
@@ -176,7 +186,9 @@ def main():
     command_sets = {}
     command_sets["mongod"] = list_commands_for_api(args.api_version, "mongod", args.install_dir)
     command_sets["mongos"] = list_commands_for_api(args.api_version, "mongos", args.install_dir)
-    command_sets["idl"] = set(get_command_definitions(args.api_version, os.getcwd(), args.include))
+    parse_cache = ParsedSpecCache(args.parse_cache_dir) if args.parse_cache_dir else None
+    command_sets["idl"] = set(
+        get_command_definitions(args.api_version, os.getcwd(), args.include, parse_cache))
     assert_command_sets_equal(args.api_version, command_sets)
 
 
@@ -36,6 +36,7 @@ from typing import Type, TypeVar, cast, List, Set, Union
 from . import ast
 from . import bson
 from . import common
+from . import cpp_types
 from . import enum_types
 from . import errors
 from . import syntax
@@ -270,6 +271,7 @@ def _bind_struct_common(ctxt, parsed_spec, struct, ast_struct):
     ast_struct.qualified_cpp_name = _get_struct_qualified_cpp_name(struct)
     ast_struct.allow_global_collection_name = struct.allow_global_collection_name
     ast_struct.non_const_getter = struct.non_const_getter
+    ast_struct.view = struct.view
 
     # Validate naming restrictions
     if ast_struct.name.startswith("array<"):
@@ -342,6 +344,20 @@ def _bind_struct(ctxt, parsed_spec, struct):
 
     _bind_struct_common(ctxt, parsed_spec, struct, ast_struct)
 
+    # The view of a struct only holds the BSON elements of its fields, so there is nothing for
+    # chained types or structs to be parsed into, and no parsed value to validate. A default can
+    # only be returned by the accessors which decode the field.
+    if ast_struct.view:
+        if struct.chained_types or struct.chained_structs:
+            ctxt.add_view_chained_error(ast_struct, ast_struct.name)
+
+        for ast_field in ast_struct.fields:
+            if ast_field.validator:
+                ctxt.add_view_field_validator_error(ast_field, ast_struct.name, ast_field.name)
+            if ast_field.default and not ast_field.optional and not ast_field.ignore and \
+                    cpp_types.get_view_cpp_type(ast_field) == 'BSONElement':
+                ctxt.add_view_field_default_error(ast_field, ast_struct.name, ast_field.name)
+
     return ast_struct
 
 
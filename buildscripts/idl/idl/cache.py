@@ -0,0 +1,136 @@
+# Copyright (C) 2021-present MongoDB, Inc.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the Server Side Public License, version 1,
+# as published by MongoDB, Inc.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# Server Side Public License for more details.
+#
+# You should have received a copy of the Server Side Public License
+# along with this program. If not, see
+# <http://www.mongodb.com/licensing/server-side-public-license>.
+#
+# As a special exception, the copyright holders give permission to link the
+# code of portions of this program with the OpenSSL library under certain
+# conditions as described in each individual source file and distribute
+# linked combinations including the program with the OpenSSL library. You
+# must comply with the Server Side Public License in all respects for
+# all of the code used other than as permitted herein. If you modify file(s)
+# with this exception, you may extend this exception to your version of the
+# file(s), but you are not obligated to do so. If you do not wish to do so,
+# delete this exception statement from your version. If you delete this
+# exception statement from all source files in the program, then also delete
+# it in the license file.
+#
+"""
+On-disk cache of parsed IDL documents.
+
+Parsing an IDL document with PyYAML is much slower than loading its pickled idl.syntax tree, and
+the same documents are parsed by every idlc process importing them, by the SCons scanner, and by
+the IDL checking scripts. The cache is keyed by the content and name of a document, and by the
+version of the IDL compiler, so it never needs to be invalidated.
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+from typing import Optional
+
+import yaml
+
+from . import syntax
+
+_COMPILER_VERSION = None  # type: Optional[str]
+
+
+def get_compiler_version():
+    # type: () -> str
+    """Return a digest of the IDL compiler sources, and of the libraries it parses with."""
+    global _COMPILER_VERSION  # pylint: disable=global-statement
+
+    if _COMPILER_VERSION is None:
+        digest = hashlib.sha256()
+        digest.update(("%s %s" % (sys.version_info[:2], yaml.__version__)).encode())
+        for file_name in sorted(glob.glob(os.path.join(os.path.dirname(__file__), "*.py"))):
+            with open(file_name, "rb") as file_stream:
+                digest.update(file_stream.read())
+        _COMPILER_VERSION = digest.hexdigest()
+
+    return _COMPILER_VERSION
+
+
+class ParsedSpecCache(object):
+    """
+    Cache of parsed IDL documents stored as pickle files in a directory.
+
+    The directory can be shared by concurrent processes. Documents with errors are not cached.
+    """
+
+    def __init__(self, cache_dir):
+        # type: (str) -> None
+        """Construct a ParsedSpecCache."""
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.misses = 0
+
+    def _get_path(self, file_name, content):
+        # type: (str, str) -> str
+        """Return the path of the cache entry for a document."""
+        digest = hashlib.sha256()
+        # The file name is part of the key since it is recorded in the source locations of the tree.
+        for part in [get_compiler_version(), file_name, content]:
+            digest.update(part.encode())
+            digest.update(b"\0")
+        key = digest.hexdigest()
+
+        return os.path.join(self.cache_dir, key[:2], key + ".pickle")
+
+    def get(self, file_name, content):
+        # type: (str, str) -> Optional[syntax.IDLParsedSpec]
+        """Return the cached parsed document for the content of a file, or None."""
+        path = self._get_path(file_name, content)
+        try:
+            with open(path, "rb") as file_stream:
+                parsed_doc = pickle.load(file_stream)
+        except FileNotFoundError:
+            parsed_doc = None
+        except Exception:  # pylint: disable=broad-except
+            # A corrupt entry is treated as a miss, and replaced by add().
+            logging.warning("Ignoring unreadable IDL parse cache entry '%s'", path)
+            parsed_doc = None
+
+        if parsed_doc is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return parsed_doc
+
+    def add(self, file_name, content, parsed_doc):
+        # type: (str, str, syntax.IDLParsedSpec) -> None
+        """Add a parsed document without errors to the cache."""
+        assert not parsed_doc.errors
+
+        path = self._get_path(file_name, content)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file and rename it so concurrent readers never see a partial entry.
+        (fd, temp_path) = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file_stream:
+                pickle.dump(parsed_doc, file_stream, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except:  # pylint: disable=bare-except
+            os.remove(temp_path)
+            raise
+
+    def format_stats(self):
+        # type: () -> str
+        """Return a description of the number of hits and misses."""
+        return "IDL parse cache '%s': %d hits, %d misses" % (self.cache_dir, self.hits, self.misses)
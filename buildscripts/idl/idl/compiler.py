@@ -38,6 +38,7 @@ import platform
 from typing import Any, List
 
 from . import binder
+from . import cache
 from . import errors
 from . import generator
 from . import parser
@@ -64,6 +65,9 @@ class CompilerArgs(object):
         self.write_dependencies = False  # type: bool
         self.write_dependencies_inline = False  # type: bool
 
+        # The command line recorded in the generated files, defaults to sys.argv
+        self.command_line = None  # type: str
+
 
 class CompilerImportResolver(parser.ImportResolverBase):
     """Class for the IDL compiler to resolve imported files."""
@@ -175,9 +179,15 @@ def _update_import_includes(args, spec, header_file_name):
         spec.globals.cpp_includes.append(include_h_file_name)
 
 
-def compile_idl(args):
-    # type: (CompilerArgs) -> bool
-    """Compile an IDL file into C++ code."""
+def compile_idl(args, import_cache=None, parse_cache=None):
+    # type: (CompilerArgs, parser.ParsedImportCache, cache.ParsedSpecCache) -> bool
+    """
+    Compile an IDL file into C++ code.
+
+    import_cache: an optional cache of parsed imported files, shared by the compilation of many IDL
+    files in the same process.
+    parse_cache: an optional on-disk cache of parsed IDL documents.
+    """
     # Named compile_idl to avoid naming conflict with builtin
     if not os.path.exists(args.input_file):
         logging.error("File '%s' not found", args.input_file)
@@ -203,7 +213,8 @@ def compile_idl(args):
     # Compile the IDL through the 3 passes
     with io.open(args.input_file, encoding='utf-8') as file_stream:
         parsed_doc = parser.parse(file_stream, args.input_file,
-                                  CompilerImportResolver(args.import_directories))
+                                  CompilerImportResolver(args.import_directories), import_cache,
+                                  parse_cache)
 
         if not parsed_doc.errors:
             if args.write_dependencies or args.write_dependencies_inline:
@@ -218,7 +229,7 @@ def compile_idl(args):
             bound_doc = binder.bind(parsed_doc.spec)
             if not bound_doc.errors:
                 generator.generate_code(bound_doc.spec, args.target_arch, args.output_base_dir,
-                                        header_file_name, source_file_name)
+                                        header_file_name, source_file_name, args.command_line)
 
                 return True
             else:
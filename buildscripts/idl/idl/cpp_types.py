@@ -574,6 +574,39 @@ def get_cpp_type(field):
     return cpp_type_info
 
 
+def get_view_cpp_type(field):
+    # type: (ast.Field) -> str
+    """
+    Get the C++ type returned by the accessor of a field in the view of a struct.
+
+    Strings and objects are returned as StringData and unowned BSONObjs, and primitive scalars are
+    decoded. Any other field is returned as the BSONElement holding it.
+    """
+    field_type = field.type
+    if field_type.is_array or field_type.is_variant or field_type.is_struct or field_type.is_enum:
+        return 'BSONElement'
+
+    method_name = None
+    if field_type.deserializer:
+        method_name = writer.get_method_name(field_type.deserializer)
+
+    # A default which isn't a string literal may be a temporary std::string, which a StringData
+    # can't refer to.
+    if field_type.bson_serialization_type == ['string'] and field_type.cpp_type == 'std::string' \
+            and method_name == 'str' and (not field.default or field.default.startswith('"')):
+        return 'StringData'
+
+    if field_type.bson_serialization_type == ['object'] and \
+            field_type.cpp_type == 'mongo::BSONObj' and method_name in [None, 'getOwned']:
+        return 'BSONObj'
+
+    if is_primitive_scalar_type(field_type.cpp_type) and method_name and \
+            'BSONElement::' in field_type.deserializer:
+        return field_type.cpp_type
+
+    return 'BSONElement'
+
+
 class BsonCppTypeBase(object, metaclass=ABCMeta):
     """Base type for custom C++ support for BSON Types information."""
 
@@ -123,6 +123,9 @@ ERROR_ID_VARIANT_DUPLICATE_TYPES = "ID0080"
 ERROR_ID_VARIANT_STRUCTS = "ID0081"
 ERROR_ID_NO_VARIANT_ENUM = "ID0082"
 ERROR_ID_COMMAND_DUPLICATES_NAME_AND_ALIAS = "ID0083"
+ERROR_ID_VIEW_CHAINED = "ID0084"
+ERROR_ID_VIEW_FIELD_VALIDATOR = "ID0085"
+ERROR_ID_VIEW_FIELD_DEFAULT = "ID0086"
 
 
 class IDLError(Exception):
@@ -709,6 +712,28 @@ class ParserContext(object):
             ("Variant field '%s' has multiple alternatives with BSON type '%s', this is prohibited"
              " to avoid ambiguity while parsing BSON.") % (field_name, type_name))
 
+    def add_view_chained_error(self, location, struct_name):
+        # type: (common.SourceLocation, str) -> None
+        """Add an error about a view struct with chained types or structs."""
+        self._add_error(location, ERROR_ID_VIEW_CHAINED,
+                        ("Struct '%s' cannot have a view since it has chained types or structs.") %
+                        (struct_name))
+
+    def add_view_field_validator_error(self, location, struct_name, field_name):
+        # type: (common.SourceLocation, str, str) -> None
+        """Add an error about a field with a validator in a view struct."""
+        self._add_error(location, ERROR_ID_VIEW_FIELD_VALIDATOR,
+                        ("Struct '%s' cannot have a view since its field '%s' has a validator.") %
+                        (struct_name, field_name))
+
+    def add_view_field_default_error(self, location, struct_name, field_name):
+        # type: (common.SourceLocation, str, str) -> None
+        """Add an error about a field with a default the view of a struct cannot return."""
+        self._add_error(
+            location, ERROR_ID_VIEW_FIELD_DEFAULT,
+            ("Struct '%s' cannot have a view since its field '%s' has a default, and the"
+             " view returns the field as a BSONElement.") % (struct_name, field_name))
+
     def add_variant_structs_error(self, location, field_name):
         # type: (common.SourceLocation, str) -> None
         """Add an error about a variant having more than one struct alternative."""
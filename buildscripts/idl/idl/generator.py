@@ -35,7 +35,7 @@ import re
 import sys
 import textwrap
 from abc import ABCMeta, abstractmethod
-from typing import Dict, Iterable, List, Mapping, Tuple, Union
+from typing import Callable, Dict, Iterable, List, Mapping, Tuple, Union
 
 from . import (ast, bson, common, cpp_types, enum_types, generic_field_list_types, struct_types,
                writer)
@@ -190,9 +190,9 @@ class _FieldUsageCheckerBase(object, metaclass=ABCMeta):
         self._fields = []  # type: List[ast.Field]
 
     @abstractmethod
-    def add_store(self, field_name):
+    def add_extra(self, field_name):
         # type: (str) -> None
-        """Create the C++ field store initialization code."""
+        """Create the C++ code to track a field which is not part of the struct."""
         pass
 
     @abstractmethod
@@ -208,53 +208,6 @@ class _FieldUsageCheckerBase(object, metaclass=ABCMeta):
         pass
 
 
-class _SlowFieldUsageChecker(_FieldUsageCheckerBase):
-    """
-    Check for duplicate fields, and required fields as needed.
-
-    Detects duplicate extra fields.
-    Generates code with a C++ std::set to maintain a set of fields seen while parsing a BSON
-    document. The std::set has O(N lg N) lookup, and allocates memory in the heap.
-    """
-
-    def __init__(self, indented_writer):
-        # type: (writer.IndentedTextWriter) -> None
-        super(_SlowFieldUsageChecker, self).__init__(indented_writer)
-
-        self._writer.write_line('std::set<StringData> usedFields;')
-
-    def add_store(self, field_name):
-        # type: (str) -> None
-        self._writer.write_line('auto push_result = usedFields.insert(%s);' % (field_name))
-        with writer.IndentedScopedBlock(self._writer,
-                                        'if (MONGO_unlikely(push_result.second == false)) {', '}'):
-            self._writer.write_line('ctxt.throwDuplicateField(%s);' % (field_name))
-
-    def add(self, field, bson_element_variable):
-        # type: (ast.Field, str) -> None
-        if not field in self._fields:
-            self._fields.append(field)
-
-    def add_final_checks(self):
-        # type: () -> None
-        for field in self._fields:
-            if (not field.optional) and (not field.ignore) and (not field.chained):
-                pred = 'if (MONGO_unlikely(usedFields.find(%s) == usedFields.end())) {' % \
-                    (_get_field_constant_name(field))
-                with writer.IndentedScopedBlock(self._writer, pred, '}'):
-                    if field.default:
-                        if field.type.is_enum:
-                            self._writer.write_line(
-                                '%s = %s::%s;' % (_get_field_member_name(field),
-                                                  field.type.cpp_type, field.default))
-                        else:
-                            self._writer.write_line(
-                                '%s = %s;' % (_get_field_member_name(field), field.default))
-                    else:
-                        self._writer.write_line(
-                            'ctxt.throwMissingField(%s);' % (_get_field_constant_name(field)))
-
-
 def _gen_field_usage_constant(field):
     # type: (ast.Field) -> str
     """Get the name for a bitset constant in field usage checking."""
@@ -271,16 +224,19 @@ class _FastFieldUsageChecker(_FieldUsageCheckerBase):
     """
     Check for duplicate fields, and required fields as needed.
 
-    Does not detect duplicate extra fields. Only works for strict parsers.
     Generates code with a C++ std::bitset to maintain a record each field seen while parsing a
     document. The std::bitset has O(1) lookup, and allocates a single int or similar on the stack.
+    Non-strict parsers also detect duplicate extra fields with a C++ std::set, which only allocates
+    memory in the heap once an extra field is seen.
     """
 
-    def __init__(self, indented_writer, fields):
-        # type: (writer.IndentedTextWriter, List[ast.Field]) -> None
+    def __init__(self, indented_writer, fields, strict):
+        # type: (writer.IndentedTextWriter, List[ast.Field], bool) -> None
         super(_FastFieldUsageChecker, self).__init__(indented_writer)
 
         self._writer.write_line('std::bitset<%d> usedFields;' % (len(fields)))
+        if not strict:
+            self._writer.write_line('std::set<StringData> usedExtraFields;')
 
         bit_id = 0
         for field in fields:
@@ -291,10 +247,13 @@ class _FastFieldUsageChecker(_FieldUsageCheckerBase):
                 'const size_t %s = %d;' % (_gen_field_usage_constant(field), bit_id))
             bit_id += 1
 
-    def add_store(self, field_name):
+    def add_extra(self, field_name):
         # type: (str) -> None
-        """Create the C++ field store initialization code."""
-        pass
+        """Create the C++ code to track a field which is not part of the struct."""
+        self._writer.write_line('auto push_result = usedExtraFields.insert(%s);' % (field_name))
+        with writer.IndentedScopedBlock(self._writer,
+                                        'if (MONGO_unlikely(push_result.second == false)) {', '}'):
+            self._writer.write_line('ctxt.throwDuplicateField(%s);' % (field_name))
 
     def add(self, field, bson_element_variable):
         # type: (ast.Field, str) -> None
@@ -344,15 +303,66 @@ class _FastFieldUsageChecker(_FieldUsageCheckerBase):
                                 'ctxt.throwMissingField(%s);' % (_get_field_constant_name(field)))
 
 
+class _ViewFieldUsageChecker(_FastFieldUsageChecker):
+    """
+    Check for duplicate fields, and required fields as needed, in the view of a struct.
+
+    Missing fields with a default are not an error, and are left alone since the accessors of the
+    view return the default.
+    """
+
+    def add_final_checks(self):
+        # type: () -> None
+        """Output the code to check for missing fields."""
+        required_fields = [
+            field for field in self._fields
+            if not field.optional and not field.ignore and not field.default
+        ]
+        if not required_fields:
+            return
+
+        with writer.IndentedScopedBlock(self._writer, 'if (MONGO_unlikely(!usedFields.all())) {',
+                                        '}'):
+            for field in required_fields:
+                with writer.IndentedScopedBlock(
+                        self._writer, 'if (!usedFields[%s]) {' % (_gen_field_usage_constant(field)),
+                        '}'):
+                    self._writer.write_line(
+                        'ctxt.throwMissingField(%s);' % (_get_field_constant_name(field)))
+
+
 def _get_field_usage_checker(indented_writer, struct):
     # type: (writer.IndentedTextWriter, ast.Struct) -> _FieldUsageCheckerBase
+    return _FastFieldUsageChecker(indented_writer, struct.fields, struct.strict)
+
+
+# The parameters of the methods parsing the view of a struct.
+_VIEW_PARSE_PARAMS = 'const IDLParserErrorContext& ctxt, const BSONObj& bsonObject'
 
-    # Only use the fast field usage checker if we never expect extra fields that we need to ignore
-    # but still wish to do duplicate detection on.
-    if struct.strict:
-        return _FastFieldUsageChecker(indented_writer, struct.fields)
 
-    return _SlowFieldUsageChecker(indented_writer)
+def _get_view_class_name(struct):
+    # type: (ast.Struct) -> str
+    """Get the name of the C++ class of the view of a struct."""
+    return common.title_case(struct.cpp_name) + 'View'
+
+
+def _get_view_accessor(field):
+    # type: (ast.Field) -> Tuple[str, str]
+    """
+    Get the C++ type returned by the accessor of a field in a view, and the expression to decode it.
+
+    See cpp_types.get_view_cpp_type() for which fields are decoded.
+    """
+    member_name = _get_field_member_name(field)
+    return_type = cpp_types.get_view_cpp_type(field)
+    if return_type == 'StringData':
+        return (return_type, '%s.valueStringData()' % (member_name))
+    if return_type == 'BSONObj':
+        return (return_type, '%s.Obj()' % (member_name))
+    if return_type != 'BSONElement':
+        return (return_type,
+                '%s.%s()' % (member_name, writer.get_method_name(field.type.deserializer)))
+    return (return_type, member_name)
 
 
 # Turn a python string into a C++ literal.
@@ -367,6 +377,17 @@ def _encaps(val):
     return '"' + val + '"'
 
 
+# Turn a byte into a C++ character literal.
+def _encaps_char(val):
+    # type: (int) -> str
+    char = chr(val)
+    if char in ["\\", "'"]:
+        return "'\\%s'" % (char)
+    if val < 0x80 and char.isprintable():
+        return "'%s'" % (char)
+    return "'\\x%02x'" % (val)
+
+
 # Turn a list of pything strings into a C++ initializer list.
 def _encaps_list(vals):
     # type: (List[str]) -> str
@@ -395,10 +416,11 @@ class _CppFileWriterBase(object):
     Relies on caller to orchestrate calls correctly though.
     """
 
-    def __init__(self, indented_writer):
-        # type: (writer.IndentedTextWriter) -> None
+    def __init__(self, indented_writer, command_line=None):
+        # type: (writer.IndentedTextWriter, str) -> None
         """Create a C++ code writer."""
         self._writer = indented_writer  # type: writer.IndentedTextWriter
+        self._command_line = command_line  # type: str
 
     def write_unindented_line(self, msg):
         # type: (str) -> None
@@ -420,7 +442,7 @@ class _CppFileWriterBase(object):
          *
          * Source: %s
          */
-            """ % (" ".join(sys.argv))))
+            """ % (self._command_line or " ".join(sys.argv))))
 
     def gen_system_include(self, include):
         # type: (str) -> None
@@ -753,6 +775,77 @@ class _CppHeaderFileWriter(_CppFileWriterBase):
                     common.template_args('${name} ${value},', name=enum_value.name,
                                          value=enum_type_info.get_cpp_value_assignment(enum_value)))
 
+    def gen_view_getter(self, field):
+        # type: (ast.Field) -> None
+        """Generate the C++ accessor definition for a field in the view of a struct."""
+        (return_type, expression) = _get_view_accessor(field)
+        member_name = _get_field_member_name(field)
+        method_name = _get_field_member_getter_name(field)
+
+        if return_type == 'BSONElement':
+            # The caller decodes the element, and sees an EOO element if the field is missing.
+            self._writer.write_line(
+                'BSONElement %s() const { return %s; }' % (method_name, member_name))
+        elif field.optional:
+            with self._block('boost::optional<%s> %s() const {' % (return_type, method_name), '}'):
+                with self._predicate('%s.eoo()' % (member_name)):
+                    self._writer.write_line('return boost::none;')
+                self._writer.write_line('return %s;' % (expression))
+        elif field.default:
+            self._writer.write_line(
+                '%s %s() const { return %s.eoo() ? %s(%s) : %s; }' %
+                (return_type, method_name, member_name, return_type, field.default, expression))
+        else:
+            self._writer.write_line(
+                '%s %s() const { return %s; }' % (return_type, method_name, expression))
+
+    def gen_view_class_declaration(self, struct):
+        # type: (ast.Struct) -> None
+        """Generate the declaration of the view class of a struct."""
+        view_class_name = _get_view_class_name(struct)
+
+        struct_class_name = common.title_case(struct.cpp_name)
+        comment_lines = [
+            'A view of a %s, which decodes its fields from the BSON it was parsed from' %
+            (struct_class_name),
+            'when they are read. Parsing the view checks the fields as parsing a %s does.' %
+            (struct_class_name),
+            '',
+            'Strings and objects are returned without copying them, and fields which cannot',
+            'be decoded without copying or parsing them are returned as their BSONElement.',
+            'Unless the BSON the view was parsed from is owned, it must outlive the view.',
+        ]
+        self._writer.write_line('/**')
+        for line in comment_lines:
+            self._writer.write_line((' * ' + line).rstrip())
+        self._writer.write_line(' */')
+        with self.gen_class_declaration_block(view_class_name):
+            self.write_unindented_line('public:')
+
+            self.gen_string_constants_declarations(struct)
+            self.write_empty_line()
+
+            self._writer.write_line('static %s parse(%s);' % (view_class_name, _VIEW_PARSE_PARAMS))
+            self.write_empty_line()
+
+            for field in struct.fields:
+                if not field.ignore:
+                    if field.description:
+                        self.gen_description_comment(field.description)
+                    self.gen_view_getter(field)
+            self.write_empty_line()
+
+            self.write_unindented_line('private:')
+            self._writer.write_line('%s() = default;' % (view_class_name))
+            self._writer.write_line('void parseProtected(%s);' % (_VIEW_PARSE_PARAMS))
+            self.write_empty_line()
+
+            # Holding the BSON keeps it alive if it is owned.
+            self._writer.write_line('BSONObj _bsonObject;')
+            for field in struct.fields:
+                if not field.ignore:
+                    self._writer.write_line('BSONElement %s;' % (_get_field_member_name(field)))
+
     def gen_op_msg_request_methods(self, command):
         # type: (ast.Command) -> None
         """Generate the methods for a command."""
@@ -1165,6 +1258,10 @@ class _CppHeaderFileWriter(_CppFileWriterBase):
 
                 self.write_empty_line()
 
+                if struct.view:
+                    self.gen_view_class_declaration(struct)
+                    self.write_empty_line()
+
             field_lists_list: Iterable[Iterable[ast.FieldListBase]]
             field_lists_list = [spec.generic_argument_lists, spec.generic_reply_field_lists]
             for field_lists in field_lists_list:
@@ -1204,11 +1301,11 @@ class _CppHeaderFileWriter(_CppFileWriterBase):
 class _CppSourceFileWriter(_CppFileWriterBase):
     """C++ .cpp File writer."""
 
-    def __init__(self, indented_writer, target_arch):
-        # type: (writer.IndentedTextWriter, str) -> None
+    def __init__(self, indented_writer, target_arch, command_line=None):
+        # type: (writer.IndentedTextWriter, str, str) -> None
         """Create a C++ .cpp file code writer."""
         self._target_arch = target_arch
-        super(_CppSourceFileWriter, self).__init__(indented_writer)
+        super(_CppSourceFileWriter, self).__init__(indented_writer, command_line)
 
     def _gen_field_deserializer_expression(self, element_name, field, ast_type):
         # type: (str, ast.Field, ast.Type) -> str
@@ -1263,9 +1360,13 @@ class _CppSourceFileWriter(_CppFileWriterBase):
 
         return '%s(%s)' % (method_name, element_name)
 
-    def _gen_array_deserializer(self, field, bson_element, ast_type):
-        # type: (ast.Field, str, ast.Type) -> None
-        """Generate the C++ deserializer piece for an array field."""
+    def _gen_array_deserializer(self, field, bson_element, ast_type, store=True):
+        # type: (ast.Field, str, ast.Type, bool) -> None
+        """
+        Generate the C++ deserializer piece for an array field.
+
+        If store is False, the elements are deserialized and discarded.
+        """
         assert ast_type.is_array
         cpp_type_info = cpp_types.get_cpp_type_from_cpp_type_name(field, ast_type.cpp_type, True)
         cpp_type = cpp_type_info.get_type_name()
@@ -1273,7 +1374,8 @@ class _CppSourceFileWriter(_CppFileWriterBase):
         self._writer.write_line('std::uint32_t expectedFieldNumber{0};')
         self._writer.write_line(
             'const IDLParserErrorContext arrayCtxt(%s, &ctxt);' % (_get_field_constant_name(field)))
-        self._writer.write_line('std::vector<%s> values;' % (cpp_type))
+        if store:
+            self._writer.write_line('std::vector<%s> values;' % (cpp_type))
         self._writer.write_empty_line()
 
         self._writer.write_line('const BSONObj arrayObject = %s.Obj();' % (bson_element))
@@ -1298,23 +1400,33 @@ class _CppSourceFileWriter(_CppFileWriterBase):
                 with self._predicate(_get_bson_type_check('arrayElement', 'arrayCtxt', ast_type)):
                     array_value = self._gen_field_deserializer_expression(
                         'arrayElement', field, ast_type)
-                    self._writer.write_line('values.emplace_back(%s);' % (array_value))
+                    if store:
+                        self._writer.write_line('values.emplace_back(%s);' % (array_value))
+                    else:
+                        self._writer.write_line('static_cast<void>(%s);' % (array_value))
 
             with self._block('else {', '}'):
                 self._writer.write_line('arrayCtxt.throwBadArrayFieldNumberValue(arrayFieldName);')
 
             self._writer.write_line('++expectedFieldNumber;')
 
+        if not store:
+            return
+
         if field.chained_struct_field:
             self._writer.write_line('%s.%s(std::move(values));' % (_get_field_member_name(
                 field.chained_struct_field), _get_field_member_setter_name(field)))
         else:
             self._writer.write_line('%s = std::move(values);' % (_get_field_member_name(field)))
 
-    def _gen_variant_deserializer(self, field, bson_element):
-        # type: (ast.Field, str) -> None
+    def _gen_variant_deserializer(self, field, bson_element, store=True):
+        # type: (ast.Field, str, bool) -> None
         # pylint: disable=too-many-statements
-        """Generate the C++ deserializer piece for a variant field."""
+        """
+        Generate the C++ deserializer piece for a variant field.
+
+        If store is False, the value is deserialized and discarded.
+        """
         self._writer.write_empty_line()
         self._writer.write_line('const BSONType variantType = %s.type();' % (bson_element, ))
 
@@ -1327,7 +1439,7 @@ class _CppSourceFileWriter(_CppFileWriterBase):
             self._writer.indent()
             with self._predicate('%s.Obj().isEmpty()' % (bson_element, )):
                 # Can't determine element type of an empty array, use the first array type.
-                self._gen_array_deserializer(field, bson_element, array_types[0])
+                self._gen_array_deserializer(field, bson_element, array_types[0], store)
 
             with self._block('else {', '}'):
                 self._writer.write_line(
@@ -1340,7 +1452,7 @@ class _CppSourceFileWriter(_CppFileWriterBase):
                         self._writer.write_line('case %s:' % (bson.cpp_bson_type_name(bson_type), ))
                     # Each copy of the array deserialization code gets an anonymous block.
                     with self._block('{', '}'):
-                        self._gen_array_deserializer(field, bson_element, array_type)
+                        self._gen_array_deserializer(field, bson_element, array_type, store)
                         self._writer.write_line('break;')
 
                 self._writer.write_line('default:')
@@ -1363,8 +1475,11 @@ class _CppSourceFileWriter(_CppFileWriterBase):
             for bson_type in scalar_type.bson_serialization_type:
                 self._writer.write_line('case %s:' % (bson.cpp_bson_type_name(bson_type), ))
             self._writer.indent()
-            self.gen_field_deserializer(field, scalar_type, "bsonObject", bson_element, None,
-                                        check_type=False)
+            if store:
+                self.gen_field_deserializer(field, scalar_type, "bsonObject", bson_element, None,
+                                            check_type=False)
+            else:
+                self._gen_discarded_value(field, bson_element, scalar_type)
             self._writer.write_line('break;')
             self._writer.unindent()
 
@@ -1374,7 +1489,9 @@ class _CppSourceFileWriter(_CppFileWriterBase):
             object_value = '%s::parse(ctxt, %s.Obj())' % (field.type.variant_struct_type.cpp_type,
                                                           bson_element)
 
-            if field.chained_struct_field:
+            if not store:
+                self._writer.write_line('static_cast<void>(%s);' % (object_value))
+            elif field.chained_struct_field:
                 self._writer.write_line(
                     '%s.%s(%s);' % (_get_field_member_name(field.chained_struct_field),
                                     _get_field_member_setter_name(field), object_value))
@@ -1395,6 +1512,28 @@ class _CppSourceFileWriter(_CppFileWriterBase):
         # End of outer switch statement.
         self._writer.write_line('}')
 
+    def _gen_discarded_value(self, field, bson_element, ast_type):
+        # type: (ast.Field, str, ast.Type) -> None
+        """Generate the C++ code deserializing a scalar value of a field and discarding it."""
+        with self._block('{', '}'):
+            expression = self._gen_field_deserializer_expression(bson_element, field, ast_type)
+            self._writer.write_line('static_cast<void>(%s);' % (expression))
+
+    def _gen_view_value_check(self, field, bson_element):
+        # type: (ast.Field, str) -> None
+        """
+        Generate the C++ code checking a field which the view of a struct returns as a BSONElement.
+
+        The value is deserialized as the parser of the struct does, so that a view rejects the same
+        array elements, enum values and nested structs, and then discarded.
+        """
+        if field.type.is_array:
+            self._gen_array_deserializer(field, bson_element, field.type, store=False)
+        elif field.type.is_variant:
+            self._gen_variant_deserializer(field, bson_element, store=False)
+        else:
+            self._gen_discarded_value(field, bson_element, field.type)
+
     def _gen_usage_check(self, field, bson_element, field_usage_check):
         # type: (ast.Field, str, _FieldUsageCheckerBase) -> None
         """Generate the field usage check and insert the required field check."""
@@ -1632,6 +1771,51 @@ class _CppSourceFileWriter(_CppFileWriterBase):
             # Generate namespace check now that "$db" has been read or defaulted
             struct_type_info.gen_namespace_check(self._writer, "_dbName", "commandElement")
 
+    def _gen_field_name_dispatch(self, field_name, fields, gen_field):
+        # type: (str, List[ast.Field], Callable[[ast.Field], None]) -> None
+        """
+        Generate the C++ code to run the code generated by gen_field for the field named field_name.
+
+        Instead of comparing field_name with the name of every field in turn, switch on the length
+        of the name, and then on its first character, so that it is compared with few names at
+        most. The code for each field ends by continuing the enclosing loop, so that only unknown
+        fields reach the code following the dispatch.
+        """
+        if not fields:
+            return
+
+        fields_by_length = {}  # type: Dict[int, List[ast.Field]]
+        for field in fields:
+            fields_by_length.setdefault(len(field.name.encode()), []).append(field)
+
+        def gen_field_predicates(fields_to_compare):
+            # type: (List[ast.Field]) -> None
+            for field in fields_to_compare:
+                with self._predicate('%s == %s' % (field_name, _get_field_constant_name(field))):
+                    gen_field(field)
+                    self._writer.write_line('continue;')
+            self._writer.write_line('break;')
+
+        with self._block('switch (%s.size()) {' % (field_name), '}'):
+            for length in sorted(fields_by_length):
+                fields_by_char = {}  # type: Dict[int, List[ast.Field]]
+                for field in fields_by_length[length]:
+                    fields_by_char.setdefault(field.name.encode()[0], []).append(field)
+
+                self._writer.write_line('case %d:' % (length))
+                self._writer.indent()
+                if len(fields_by_char) == 1:
+                    gen_field_predicates(fields_by_length[length])
+                else:
+                    with self._block('switch (%s[0]) {' % (field_name), '}'):
+                        for char in sorted(fields_by_char):
+                            self._writer.write_line('case %s:' % (_encaps_char(char)))
+                            self._writer.indent()
+                            gen_field_predicates(fields_by_char[char])
+                            self._writer.unindent()
+                    self._writer.write_line('break;')
+                self._writer.unindent()
+
     def _gen_fields_deserializer_common(self, struct, bson_object):
         # type: (ast.Struct, str) -> _FieldUsageCheckerBase
         """Generate the C++ code to deserialize list of fields."""
@@ -1657,43 +1841,36 @@ class _CppSourceFileWriter(_CppFileWriterBase):
 
                     self._writer.write_line('firstFieldFound = true;')
                     self._writer.write_line('continue;')
+                self._writer.write_empty_line()
 
-            field_usage_check.add_store("fieldName")
-            self._writer.write_empty_line()
-
-            first_field = True
-            for field in struct.fields:
-                # Do not parse chained fields as fields since they are actually chained types.
-                if field.chained and not field.chained_struct_field:
-                    continue
-
-                field_predicate = 'fieldName == %s' % (_get_field_constant_name(field))
-
-                with self._predicate(field_predicate, not first_field):
-
-                    if field.ignore:
-                        field_usage_check.add(field, "element")
+            def gen_field(field):
+                # type: (ast.Field) -> None
+                if field.ignore:
+                    field_usage_check.add(field, "element")
 
-                        self._writer.write_line('// ignore field')
-                    else:
-                        self.gen_field_deserializer(field, field.type, bson_object, "element",
-                                                    field_usage_check)
+                    self._writer.write_line('// ignore field')
+                else:
+                    self.gen_field_deserializer(field, field.type, bson_object, "element",
+                                                field_usage_check)
 
-                if first_field:
-                    first_field = False
+            # Do not parse chained fields as fields since they are actually chained types.
+            self._gen_field_name_dispatch("fieldName", [
+                field for field in struct.fields if not field.chained or field.chained_struct_field
+            ], gen_field)
+            self._writer.write_empty_line()
 
-            # End of for fields
             # Generate strict check for extranous fields
             if struct.strict:
-                with self._block('else {', '}'):
-                    # For commands, check if this a well known command field that the IDL parser
-                    # should ignore regardless of strict mode.
-                    command_predicate = None
-                    if isinstance(struct, ast.Command):
-                        command_predicate = "!mongo::isGenericArgument(fieldName)"
-
-                    with self._predicate(command_predicate):
-                        self._writer.write_line('ctxt.throwUnknownField(fieldName);')
+                # For commands, check if this a well known command field that the IDL parser
+                # should ignore regardless of strict mode.
+                command_predicate = None
+                if isinstance(struct, ast.Command):
+                    command_predicate = "!mongo::isGenericArgument(fieldName)"
+
+                with self._predicate(command_predicate):
+                    self._writer.write_line('ctxt.throwUnknownField(fieldName);')
+            else:
+                field_usage_check.add_extra("fieldName")
 
         # Parse chained structs if not inlined
         # Parse chained types always here
@@ -1826,6 +2003,61 @@ class _CppSourceFileWriter(_CppFileWriterBase):
 
             self._gen_command_deserializer(struct, "bsonObject")
 
+    def gen_view_deserializer_methods(self, struct):
+        # type: (ast.Struct) -> None
+        """Generate the C++ deserializer method definitions of the view of a struct."""
+        view_class_name = _get_view_class_name(struct)
+
+        with self._block(
+                '%s %s::parse(%s) {' % (view_class_name, view_class_name, _VIEW_PARSE_PARAMS), '}'):
+            self._writer.write_line('%s object;' % (view_class_name))
+            self._writer.write_line('object.parseProtected(ctxt, bsonObject);')
+            self._writer.write_line('return object;')
+        self._writer.write_empty_line()
+
+        with self._block('void %s::parseProtected(%s) {' % (view_class_name, _VIEW_PARSE_PARAMS),
+                         '}'):
+            self._writer.write_line('_bsonObject = bsonObject;')
+            self._writer.write_empty_line()
+
+            field_usage_check = _ViewFieldUsageChecker(self._writer, struct.fields, struct.strict)
+            self._writer.write_empty_line()
+
+            with self._block('for (const auto& element : bsonObject) {', '}'):
+                self._writer.write_line('const auto fieldName = element.fieldNameStringData();')
+                self._writer.write_empty_line()
+
+                def gen_field(field):
+                    # type: (ast.Field) -> None
+                    if field.ignore:
+                        field_usage_check.add(field, "element")
+
+                        self._writer.write_line('// ignore field')
+                        return
+
+                    predicate = None
+                    if field.type.is_array:
+                        predicate = 'ctxt.checkAndAssertType(element, Array)'
+                    elif not field.type.is_variant:
+                        predicate = _get_bson_type_check('element', 'ctxt', field.type)
+
+                    with self._predicate(predicate and 'MONGO_likely(%s)' % (predicate)):
+                        field_usage_check.add(field, "element")
+                        if cpp_types.get_view_cpp_type(field) == 'BSONElement':
+                            self._gen_view_value_check(field, "element")
+                        self._writer.write_line('%s = element;' % (_get_field_member_name(field)))
+
+                self._gen_field_name_dispatch("fieldName", struct.fields, gen_field)
+                self._writer.write_empty_line()
+
+                if struct.strict:
+                    self._writer.write_line('ctxt.throwUnknownField(fieldName);')
+                else:
+                    field_usage_check.add_extra("fieldName")
+
+            self._writer.write_empty_line()
+            field_usage_check.add_final_checks()
+
     def gen_op_msg_request_deserializer_methods(self, struct):
         # type: (ast.Struct) -> None
         """Generate the C++ deserializer method definitions from OpMsgRequest."""
@@ -1852,34 +2084,29 @@ class _CppSourceFileWriter(_CppFileWriterBase):
                 [field for field in struct.fields if field.supports_doc_sequence])
             if has_doc_sequence:
                 with self._block('for (auto&& sequence : request.sequences) {', '}'):
-                    field_usage_check.add_store("sequence.name")
-                    self._writer.write_empty_line()
 
-                    first_field = True
-                    for field in struct.fields:
-                        # Only parse document sequence fields here
-                        if not field.supports_doc_sequence:
-                            continue
-
-                        field_predicate = 'sequence.name == %s' % (_get_field_constant_name(field))
-
-                        with self._predicate(field_predicate, not first_field):
-                            field_usage_check.add(field, "sequence.name")
+                    def gen_doc_sequence_field(field):
+                        # type: (ast.Field) -> None
+                        field_usage_check.add(field, "sequence.name")
 
-                            if _is_required_serializer_field(field):
-                                self._writer.write_line(
-                                    '%s = true;' % (_get_has_field_member_name(field)))
+                        if _is_required_serializer_field(field):
+                            self._writer.write_line(
+                                '%s = true;' % (_get_has_field_member_name(field)))
 
-                            self.gen_doc_sequence_deserializer(field)
+                        self.gen_doc_sequence_deserializer(field)
 
-                        if first_field:
-                            first_field = False
+                    # Only parse document sequence fields here
+                    self._gen_field_name_dispatch(
+                        "sequence.name",
+                        [field for field in struct.fields if field.supports_doc_sequence],
+                        gen_doc_sequence_field)
+                    self._writer.write_empty_line()
 
-                    # End of for fields
                     # Generate strict check for extranous fields
                     if struct.strict:
-                        with self._block('else {', '}'):
-                            self._writer.write_line('ctxt.throwUnknownField(sequence.name);')
+                        self._writer.write_line('ctxt.throwUnknownField(sequence.name);')
+                    else:
+                        field_usage_check.add_extra("sequence.name")
                 self._writer.write_empty_line()
 
             # Check for required fields
@@ -2178,15 +2405,15 @@ class _CppSourceFileWriter(_CppFileWriterBase):
 
             self._writer.write_line('return request;')
 
-    def gen_string_constants_definitions(self, struct):
-        # type: (ast.Struct) -> None
+    def gen_string_constants_definitions(self, struct, class_name=None):
+        # type: (ast.Struct, str) -> None
         # pylint: disable=invalid-name
         """Generate a StringData constant for field name in the cpp file."""
 
         for field in _get_all_fields(struct):
             self._writer.write_line(
                 common.template_args('constexpr StringData ${class_name}::${constant_name};',
-                                     class_name=common.title_case(struct.cpp_name),
+                                     class_name=class_name or common.title_case(struct.cpp_name),
                                      constant_name=_get_field_constant_name(field)))
 
         if isinstance(struct, ast.Command):
@@ -2667,6 +2894,13 @@ class _CppSourceFileWriter(_CppFileWriterBase):
                 self.gen_to_bson_serializer_method(struct)
                 self.write_empty_line()
 
+                if struct.view:
+                    self.gen_string_constants_definitions(struct, _get_view_class_name(struct))
+                    self.write_empty_line()
+
+                    self.gen_view_deserializer_methods(struct)
+                    self.write_empty_line()
+
             field_lists_list: Iterable[Iterable[ast.FieldListBase]]
             field_lists_list = [spec.generic_argument_lists, spec.generic_reply_field_lists]
             for field_lists in field_lists_list:
@@ -2685,58 +2919,81 @@ class _CppSourceFileWriter(_CppFileWriterBase):
                 self.gen_config_options(spec, header_file_name)
 
 
-def generate_header_str(spec):
-    # type: (ast.IDLAST) -> str
+def generate_header_str(spec, command_line=None):
+    # type: (ast.IDLAST, str) -> str
     """Generate a C++ header in-memory."""
     stream = io.StringIO()
     text_writer = writer.IndentedTextWriter(stream)
 
-    header = _CppHeaderFileWriter(text_writer)
+    header = _CppHeaderFileWriter(text_writer, command_line)
 
     header.generate(spec)
 
     return stream.getvalue()
 
 
-def _generate_header(spec, file_name):
-    # type: (ast.IDLAST, str) -> None
+def _write_if_changed(file_name, str_value):
+    # type: (str, str) -> None
+    """
+    Write a generated file, unless it already has the same contents.
+
+    Leaving an unchanged file untouched avoids recompiling everything which includes it.
+    """
+    contents = str_value.encode()
+
+    try:
+        with io.open(file_name, mode='rb') as file_handle:
+            if file_handle.read() == contents:
+                return
+    except FileNotFoundError:
+        pass
+
+    with io.open(file_name, mode='wb') as file_handle:
+        file_handle.write(contents)
+
+
+def _generate_header(spec, file_name, command_line):
+    # type: (ast.IDLAST, str, str) -> None
     """Generate a C++ header."""
 
-    str_value = generate_header_str(spec)
+    str_value = generate_header_str(spec, command_line)
 
     # Generate structs
-    with io.open(file_name, mode='wb') as file_handle:
-        file_handle.write(str_value.encode())
+    _write_if_changed(file_name, str_value)
 
 
-def generate_source_str(spec, target_arch, header_file_name):
-    # type: (ast.IDLAST, str, str) -> str
+def generate_source_str(spec, target_arch, header_file_name, command_line=None):
+    # type: (ast.IDLAST, str, str, str) -> str
     """Generate a C++ source file in-memory."""
     stream = io.StringIO()
     text_writer = writer.IndentedTextWriter(stream)
 
-    source = _CppSourceFileWriter(text_writer, target_arch)
+    source = _CppSourceFileWriter(text_writer, target_arch, command_line)
 
     source.generate(spec, header_file_name)
 
     return stream.getvalue()
 
 
-def _generate_source(spec, target_arch, file_name, header_file_name):
-    # type: (ast.IDLAST, str, str, str) -> None
+def _generate_source(spec, target_arch, file_name, header_file_name, command_line):
+    # type: (ast.IDLAST, str, str, str, str) -> None
     """Generate a C++ source file."""
-    str_value = generate_source_str(spec, target_arch, header_file_name)
+    str_value = generate_source_str(spec, target_arch, header_file_name, command_line)
 
     # Generate structs
-    with io.open(file_name, mode='wb') as file_handle:
-        file_handle.write(str_value.encode())
+    _write_if_changed(file_name, str_value)
 
 
-def generate_code(spec, target_arch, output_base_dir, header_file_name, source_file_name):
-    # type: (ast.IDLAST, str, str, str, str) -> None
-    """Generate a C++ header and source file from an idl.ast tree."""
+def generate_code(spec, target_arch, output_base_dir, header_file_name, source_file_name,
+                  command_line=None):
+    # type: (ast.IDLAST, str, str, str, str, str) -> None
+    """
+    Generate a C++ header and source file from an idl.ast tree.
+
+    command_line: the idlc command line recorded in the generated files, defaults to sys.argv.
+    """
 
-    _generate_header(spec, header_file_name)
+    _generate_header(spec, header_file_name, command_line)
 
     if output_base_dir:
         include_h_file_name = os.path.relpath(
@@ -2747,4 +3004,4 @@ def generate_code(spec, target_arch, output_base_dir, header_file_name, source_f
     # Normalize to POSIX style for consistency across Windows and POSIX.
     include_h_file_name = include_h_file_name.replace("\\", "/")
 
-    _generate_source(spec, target_arch, source_file_name, include_h_file_name)
+    _generate_source(spec, target_arch, source_file_name, include_h_file_name, command_line)
@@ -39,6 +39,7 @@ from typing import Any, Callable, Dict, List, Set, Tuple, Union
 import yaml
 from yaml import nodes
 
+from . import cache
 from . import common
 from . import cpp_types
 from . import errors
@@ -522,6 +523,7 @@ def _parse_struct(ctxt, spec, name, node):
             "immutable": _RuleDesc('bool_scalar'),
             "generate_comparison_operators": _RuleDesc("bool_scalar"),
             "non_const_getter": _RuleDesc('bool_scalar'),
+            "view": _RuleDesc('bool_scalar'),
         })
 
     # PyLint has difficulty with some iterables: https://github.com/PyCQA/pylint/issues/3105
@@ -997,17 +999,80 @@ class ImportResolverBase(object, metaclass=ABCMeta):
         pass
 
 
-def parse(stream, input_file_name, resolver):
-    # type: (Any, str, ImportResolverBase) -> syntax.IDLParsedSpec
+class ParsedImportCache(object):
+    """
+    Cache of parsed imported files, shared by the compilation of many IDL files.
+
+    Only imported files are cached, and the syntax trees of imported files are not modified by the
+    later passes of the compiler, so they can be reused across compilations. The imported files are
+    assumed to not change for the lifetime of the cache.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        """Construct a ParsedImportCache."""
+        self._parsed_docs = {}  # type: Dict[str, syntax.IDLParsedSpec]
+
+    def get(self, resolved_file_name):
+        # type: (str) -> syntax.IDLParsedSpec
+        """Return the parsed document of an imported file, or None if it has not been parsed."""
+        return self._parsed_docs.get(resolved_file_name)
+
+    def add(self, resolved_file_name, parsed_doc):
+        # type: (str, syntax.IDLParsedSpec) -> None
+        """Add the parsed document of an imported file to the cache."""
+        self._parsed_docs[resolved_file_name] = parsed_doc
+
+
+def _parse_cached(stream, file_name, parse_cache):
+    # type: (Any, str, cache.ParsedSpecCache) -> syntax.IDLParsedSpec
+    """Parse a YAML document, or load its parsed document from the on-disk cache."""
+    if parse_cache is None:
+        return _parse(stream, file_name)
+
+    content = stream if isinstance(stream, str) else stream.read()
+
+    parsed_doc = parse_cache.get(file_name, content)
+    if parsed_doc is None:
+        parsed_doc = _parse(content, file_name)
+        if not parsed_doc.errors:
+            parse_cache.add(file_name, content, parsed_doc)
+
+    return parsed_doc
+
+
+def _parse_import(resolver, resolved_file_name, import_cache, parse_cache):
+    # type: (ImportResolverBase, str, ParsedImportCache, cache.ParsedSpecCache) -> syntax.IDLParsedSpec
+    """Parse an imported file, or return its parsed document from the caches."""
+    if import_cache is not None:
+        parsed_doc = import_cache.get(resolved_file_name)
+        if parsed_doc is not None:
+            return parsed_doc
+
+    with resolver.open(resolved_file_name) as file_stream:
+        parsed_doc = _parse_cached(file_stream, resolved_file_name, parse_cache)
+
+    # Documents with errors are not cached so the errors are reported by each compilation.
+    if import_cache is not None and not parsed_doc.errors:
+        import_cache.add(resolved_file_name, parsed_doc)
+
+    return parsed_doc
+
+
+def parse(stream, input_file_name, resolver, import_cache=None, parse_cache=None):
+    # type: (Any, str, ImportResolverBase, ParsedImportCache, cache.ParsedSpecCache) -> syntax.IDLParsedSpec
     """
     Parse a YAML document into an idl.syntax tree.
 
     stream: is a io.Stream.
     input_file_name: a file name for error messages to use, and to help resolve imported files.
+    import_cache: an optional cache of parsed imported files shared with other calls to parse.
+    parse_cache: an optional on-disk cache of parsed documents, for both the document and its
+    imported files.
     """
     # pylint: disable=too-many-locals
 
-    root_doc = _parse(stream, input_file_name)
+    root_doc = _parse_cached(stream, input_file_name, parse_cache)
 
     if root_doc.errors:
         return root_doc
@@ -1043,8 +1108,7 @@ def parse(stream, input_file_name, resolver):
         resolved_file_names.append(resolved_file_name)
 
         # Parse imported file
-        with resolver.open(resolved_file_name) as file_stream:
-            parsed_doc = _parse(file_stream, resolved_file_name)
+        parsed_doc = _parse_import(resolver, resolved_file_name, import_cache, parse_cache)
 
         # Check for errors
         if parsed_doc.errors:
@@ -502,6 +502,7 @@ class Struct(common.SourceLocation):
         self.fields = None  # type: List[Field]
         self.allow_global_collection_name = False  # type: bool
         self.non_const_getter = False  # type: bool
+        self.view = False  # type: bool
 
         # Command only property
         self.cpp_name = None  # type: str
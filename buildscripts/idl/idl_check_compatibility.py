@@ -43,12 +43,14 @@ import sys
 from typing import Dict, List, Optional, Tuple, Union
 
 from idl import parser, syntax, errors, common
+from idl.cache import ParsedSpecCache
 from idl.compiler import CompilerImportResolver
 from idl_compatibility_errors import IDLCompatibilityContext, IDLCompatibilityErrorCollection
 
 
 def get_new_commands(
-        ctxt: IDLCompatibilityContext, new_idl_dir: str, import_directories: List[str]
+        ctxt: IDLCompatibilityContext, new_idl_dir: str, import_directories: List[str],
+        parse_cache: Optional[ParsedSpecCache] = None
 ) -> Tuple[Dict[str, syntax.Command], Dict[str, syntax.IDLParsedSpec], Dict[str, str]]:
     """Get new IDL commands and check validity."""
     new_commands: Dict[str, syntax.Command] = dict()
@@ -64,7 +66,8 @@ def get_new_commands(
             with open(new_idl_file_path) as new_file:
                 new_idl_file = parser.parse(
                     new_file, new_idl_file_path,
-                    CompilerImportResolver(import_directories + [new_idl_dir]))
+                    CompilerImportResolver(import_directories + [new_idl_dir]),
+                    parse_cache=parse_cache)
                 if new_idl_file.errors:
                     new_idl_file.errors.dump_errors()
                     raise ValueError(f"Cannot parse {new_idl_file_path}")
@@ -339,15 +342,17 @@ def check_namespace(ctxt: IDLCompatibilityContext, old_cmd: syntax.Command, new_
         assert False, 'unrecognized namespace option'
 
 
-def check_error_reply(old_basic_types_path: str, new_basic_types_path: str,
-                      import_directories: List[str]) -> IDLCompatibilityErrorCollection:
+def check_error_reply(
+        old_basic_types_path: str, new_basic_types_path: str, import_directories: List[str],
+        parse_cache: Optional[ParsedSpecCache] = None) -> IDLCompatibilityErrorCollection:
     """Check IDL compatibility between old and new ErrorReply."""
     old_idl_dir = os.path.dirname(old_basic_types_path)
     new_idl_dir = os.path.dirname(new_basic_types_path)
     ctxt = IDLCompatibilityContext(old_idl_dir, new_idl_dir, IDLCompatibilityErrorCollection())
     with open(old_basic_types_path) as old_file:
         old_idl_file = parser.parse(old_file, old_basic_types_path,
-                                    CompilerImportResolver(import_directories))
+                                    CompilerImportResolver(import_directories),
+                                    parse_cache=parse_cache)
         if old_idl_file.errors:
             old_idl_file.errors.dump_errors()
             raise ValueError(f"Cannot parse {old_basic_types_path}")
@@ -359,7 +364,8 @@ def check_error_reply(old_basic_types_path: str, new_basic_types_path: str,
         else:
             with open(new_basic_types_path) as new_file:
                 new_idl_file = parser.parse(new_file, new_basic_types_path,
-                                            CompilerImportResolver(import_directories))
+                                            CompilerImportResolver(import_directories),
+                                            parse_cache=parse_cache)
                 if new_idl_file.errors:
                     new_idl_file.errors.dump_errors()
                     raise ValueError(f"Cannot parse {new_basic_types_path}")
@@ -375,14 +381,15 @@ def check_error_reply(old_basic_types_path: str, new_basic_types_path: str,
     return ctxt.errors
 
 
-def check_compatibility(old_idl_dir: str, new_idl_dir: str,
-                        import_directories: List[str]) -> IDLCompatibilityErrorCollection:
+def check_compatibility(
+        old_idl_dir: str, new_idl_dir: str, import_directories: List[str],
+        parse_cache: Optional[ParsedSpecCache] = None) -> IDLCompatibilityErrorCollection:
     """Check IDL compatibility between old and new IDL commands."""
     # pylint: disable=too-many-locals
     ctxt = IDLCompatibilityContext(old_idl_dir, new_idl_dir, IDLCompatibilityErrorCollection())
 
     new_commands, new_command_file, new_command_file_path = get_new_commands(
-        ctxt, new_idl_dir, import_directories)
+        ctxt, new_idl_dir, import_directories, parse_cache)
 
     # Check new commands' compatibility with old ones.
     # Note, a command can be added to V1 at any time, it's ok if a
@@ -397,7 +404,8 @@ def check_compatibility(old_idl_dir: str, new_idl_dir: str,
             with open(old_idl_file_path) as old_file:
                 old_idl_file = parser.parse(
                     old_file, old_idl_file_path,
-                    CompilerImportResolver(import_directories + [old_idl_dir]))
+                    CompilerImportResolver(import_directories + [old_idl_dir]),
+                    parse_cache=parse_cache)
                 if old_idl_file.errors:
                     old_idl_file.errors.dump_errors()
                     raise ValueError(f"Cannot parse {old_idl_file_path}")
@@ -449,18 +457,29 @@ def main():
                             help="Directory where old IDL files are located")
     arg_parser.add_argument("new_idl_dir", metavar="NEW_IDL_DIR",
                             help="Directory where new IDL files are located")
+    arg_parser.add_argument("--parse-cache-dir", dest="parse_cache_dir",
+                            help="Directory of an on-disk cache of parsed IDL files")
     args = arg_parser.parse_args()
 
-    error_coll = check_compatibility(args.old_idl_dir, args.new_idl_dir, [])
+    if args.verbose:
+        logging.basicConfig(level=logging.DEBUG)
+
+    parse_cache = ParsedSpecCache(args.parse_cache_dir) if args.parse_cache_dir else None
+
+    error_coll = check_compatibility(args.old_idl_dir, args.new_idl_dir, [], parse_cache)
     if error_coll.errors.has_errors():
         sys.exit(1)
 
     old_basic_types_path = os.path.join(args.old_idl_dir, "mongo/idl/basic_types.idl")
     new_basic_types_path = os.path.join(args.new_idl_dir, "mongo/idl/basic_types.idl")
-    error_reply_coll = check_error_reply(old_basic_types_path, new_basic_types_path, [])
+    error_reply_coll = check_error_reply(old_basic_types_path, new_basic_types_path, [],
+                                         parse_cache)
     if error_reply_coll.has_errors():
         sys.exit(1)
 
+    if parse_cache:
+        logging.info(parse_cache.format_stats())
+
 
 if __name__ == "__main__":
     main()
@@ -32,8 +32,46 @@
 import argparse
 import logging
 import sys
+from typing import List
 
+import idl.cache
 import idl.compiler
+import idl.parser
+
+
+def _make_compiler_args(args, input_file, output_source, output_header):
+    # type: (argparse.Namespace, str, str, str) -> idl.compiler.CompilerArgs
+    """Create the compiler arguments to compile input_file."""
+    compiler_args = idl.compiler.CompilerArgs()
+
+    compiler_args.input_file = input_file
+    compiler_args.import_directories = args.include
+    compiler_args.target_arch = args.target_arch
+
+    compiler_args.output_source = output_source
+    compiler_args.output_header = output_header
+    compiler_args.output_base_dir = args.base_dir
+    compiler_args.output_suffix = "_gen"
+    compiler_args.write_dependencies = args.write_dependencies
+    compiler_args.write_dependencies_inline = args.write_dependencies_inline
+
+    return compiler_args
+
+
+def _get_batch_command_line(input_file, output_source, output_header):
+    # type: (str, str, str) -> str
+    """Return the command line which compiles one file of a batch on its own."""
+    argv = []  # type: List[str]
+    args = iter(sys.argv)
+    for arg in args:
+        if arg == '--batch':
+            # Skip the FILE, HEADER, and OUTPUT of the batched file
+            for _ in range(3):
+                next(args)
+            continue
+        argv.append(arg)
+
+    return " ".join(argv + ['--header', output_header, '--output', output_source, input_file])
 
 
 def main():
@@ -41,12 +79,17 @@ def main():
     """Execute Main Entry point."""
     parser = argparse.ArgumentParser(description='MongoDB IDL Compiler.')
 
-    parser.add_argument('file', type=str, help="IDL input file")
+    parser.add_argument('file', type=str, nargs='?', help="IDL input file")
 
     parser.add_argument('-o', '--output', type=str, help="IDL output source file")
 
     parser.add_argument('--header', type=str, help="IDL output header file")
 
+    parser.add_argument(
+        '--batch', type=str, nargs=3, action='append', metavar=('FILE', 'HEADER', 'OUTPUT'),
+        help="Compile FILE into HEADER and OUTPUT. Can be repeated to compile many IDL files in"
+        " one process, which parses each imported file only once")
+
     parser.add_argument('-i', '--include', type=str, action="append",
                         help="Directory to search for IDL import files")
 
@@ -63,31 +106,57 @@ def main():
     parser.add_argument('--target_arch', type=str,
                         help="IDL target archiecture (amd64, s390x). defaults to current machine")
 
+    parser.add_argument('--parse-cache-dir', type=str,
+                        help="Directory of an on-disk cache of parsed IDL files")
+
     args = parser.parse_args()
 
     if args.verbose:
         logging.basicConfig(level=logging.DEBUG)
 
-    compiler_args = idl.compiler.CompilerArgs()
-
-    compiler_args.input_file = args.file
-    compiler_args.import_directories = args.include
-    compiler_args.target_arch = args.target_arch
-
-    compiler_args.output_source = args.output
-    compiler_args.output_header = args.header
-    compiler_args.output_base_dir = args.base_dir
-    compiler_args.output_suffix = "_gen"
-    compiler_args.write_dependencies = args.write_dependencies
-    compiler_args.write_dependencies_inline = args.write_dependencies_inline
+    parse_cache = None
+    if args.parse_cache_dir:
+        parse_cache = idl.cache.ParsedSpecCache(args.parse_cache_dir)
+
+    if args.batch:
+        if args.file is not None or args.output is not None or args.header is not None:
+            print("ERROR: --batch cannot be specified with an input file, --header, or --output.")
+            sys.exit(1)
+
+        # Compile every IDL document even if one fails so all the errors are reported
+        import_cache = idl.parser.ParsedImportCache()
+        success = True
+        for (input_file, output_header, output_source) in args.batch:
+            compiler_args = _make_compiler_args(args, input_file, output_source, output_header)
+            # Record the same command line as if the file had been compiled on its own, so the
+            # generated files don't depend on the other files in the batch.
+            compiler_args.command_line = _get_batch_command_line(input_file, output_source,
+                                                                 output_header)
+            success = idl.compiler.compile_idl(compiler_args, import_cache, parse_cache) and success
+
+        if parse_cache:
+            logging.info(parse_cache.format_stats())
+
+        if not success:
+            sys.exit(1)
+        return
+
+    if args.file is None:
+        print("ERROR: Either an input file or --batch must be specified.")
+        sys.exit(1)
 
     if (args.output is not None and args.header is None) or \
         (args.output is  None and args.header is not None):
         print("ERROR: Either both --header and --output must be specified or neither.")
         sys.exit(1)
 
+    compiler_args = _make_compiler_args(args, args.file, args.output, args.header)
+
     # Compile the IDL document the user specified
-    success = idl.compiler.compile_idl(compiler_args)
+    success = idl.compiler.compile_idl(compiler_args, parse_cache=parse_cache)
+
+    if parse_cache:
+        logging.info(parse_cache.format_stats())
 
     if not success:
         sys.exit(1)
@@ -34,6 +34,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 import idl.ast  # pylint: disable=wrong-import-position
 import idl.binder  # pylint: disable=wrong-import-position
+import idl.cache  # pylint: disable=wrong-import-position
 import idl.compiler  # pylint: disable=wrong-import-position
 import idl.errors  # pylint: disable=wrong-import-position
 import idl.generator  # pylint: disable=wrong-import-position
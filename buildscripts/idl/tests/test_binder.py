@@ -1077,6 +1077,87 @@ class TestBinder(testcase.IDLTestcase):
                             non_const_getter: true
             """), idl.errors.ERROR_ID_NON_CONST_GETTER_IN_IMMUTABLE_STRUCT)
 
+    def test_struct_view_negative(self):
+        # type: () -> None
+        """Negative struct view tests."""
+
+        # Setup some common types
+        test_preamble = textwrap.dedent("""
+        types:
+            string:
+                description: foo
+                cpp_type: foo
+                bson_serialization_type: string
+                serializer: foo
+                deserializer: foo
+                default: foo
+            int:
+                description: foo
+                cpp_type: std::int32_t
+                bson_serialization_type: int
+                deserializer: mongo::BSONElement::_numberInt
+        """)
+
+        # Test view of a struct with chained structs
+        self.assert_bind_fail(
+            test_preamble + textwrap.dedent("""
+            structs:
+                chained:
+                    description: foo
+                    fields:
+                        foo: int
+                foo:
+                    description: foo
+                    view: true
+                    chained_structs:
+                        chained: alias
+            """), idl.errors.ERROR_ID_VIEW_CHAINED)
+
+        # Test view of a struct with a field validator
+        self.assert_bind_fail(
+            test_preamble + textwrap.dedent("""
+            structs:
+                foo:
+                    description: foo
+                    view: true
+                    fields:
+                        foo:
+                            type: int
+                            validator:
+                                gt: 0
+            """), idl.errors.ERROR_ID_VIEW_FIELD_VALIDATOR)
+
+        # Test view of a struct with a default for a field returned as a BSONElement
+        self.assert_bind_fail(
+            test_preamble + textwrap.dedent("""
+            enums:
+                foo_enum:
+                    description: foo
+                    type: int
+                    values:
+                        v0: 0
+                        v1: 1
+            structs:
+                foo:
+                    description: foo
+                    view: true
+                    fields:
+                        foo:
+                            type: foo_enum
+                            default: v1
+            """), idl.errors.ERROR_ID_VIEW_FIELD_DEFAULT)
+
+        # Test view of a struct with a field whose type has a default
+        self.assert_bind_fail(
+            test_preamble + textwrap.dedent("""
+            structs:
+                foo:
+                    description: foo
+                    view: true
+                    fields:
+                        foo: string
+            """), idl.errors.ERROR_ID_VIEW_FIELD_DEFAULT)
+
     def test_ignored_field_negative(self):
         # type: () -> None
         """Test that if a field is marked as ignored, no other properties are set."""
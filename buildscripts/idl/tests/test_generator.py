@@ -37,6 +37,9 @@ $ coverage run run_tests.py && coverage html
 """
 
 import os
+import shutil
+import tempfile
+import textwrap
 import unittest
 
 # import package so that it works regardless of whether we run as a module or file
@@ -132,6 +135,133 @@ class TestGenerator(testcase.IDLTestcase):
 
         self.assertTrue(found, "Bad Header: " + header)
 
+    def test_field_name_dispatch(self):
+        # type: () -> None
+        """Validate fields are dispatched on the length and first character of their names."""
+        _, source = self.assert_generate("""
+        types:
+            string:
+                description: foo
+                cpp_type: foo
+                bson_serialization_type: string
+                deserializer: foo
+
+        structs:
+            strict_struct:
+                description: mock
+                fields:
+                    abc: string
+                    abd: string
+                    xyz: string
+                    z: string
+
+            non_strict_struct:
+                description: mock
+                strict: false
+                fields:
+                    abc: string
+        """)
+
+        self.assertIn("switch (fieldName.size()) {", source)
+        self.assertIn("switch (fieldName[0]) {", source)
+        self.assertIn("case 'x':", source)
+        # The names which share a length and first character are compared in turn.
+        self.assertIn("if (fieldName == kAbcFieldName) {", source)
+        self.assertIn("if (fieldName == kAbdFieldName) {", source)
+        self.assertNotIn("else if (fieldName ==", source)
+
+        # Only extra fields of the non-strict struct are tracked in a std::set.
+        self.assertEqual(1, source.count("std::set<StringData> usedExtraFields;"))
+        self.assertEqual(2, source.count("std::bitset<"))
+
+    def test_struct_view(self):
+        # type: () -> None
+        """Validate the view of a struct returns its fields without copying them."""
+        header, source = self.assert_generate("""
+        types:
+            string:
+                description: foo
+                cpp_type: std::string
+                bson_serialization_type: string
+                deserializer: mongo::BSONElement::str
+            int:
+                description: foo
+                cpp_type: std::int32_t
+                bson_serialization_type: int
+                deserializer: mongo::BSONElement::_numberInt
+
+        structs:
+            one_view:
+                description: mock
+                view: true
+                fields:
+                    name: string
+                    comment:
+                        type: string
+                        optional: true
+                    count:
+                        type: int
+                        default: 5
+                    values: array<int>
+        """)
+
+        self.assertIn("class One_viewView {", header)
+        self.assertIn("StringData getName() const { return _name.valueStringData(); }", header)
+        self.assertIn("boost::optional<StringData> getComment() const {", header)
+        self.assertIn(
+            "std::int32_t getCount() const { return _count.eoo() ? std::int32_t(5) : "
+            "_count._numberInt(); }", header)
+        self.assertIn("BSONElement getValues() const { return _values; }", header)
+
+        self.assertIn("One_viewView One_viewView::parse(", source)
+        self.assertIn("_name = element;", source)
+        # Fields with defaults are not required.
+        self.assertIn("ctxt.throwMissingField(kNameFieldName);", source)
+        self.assertNotIn("ctxt.throwMissingField(kCountFieldName);", source)
+        # The elements of arrays are checked, but not kept.
+        self.assertIn("arrayCtxt.checkAndAssertType(arrayElement, NumberInt)", source)
+        self.assertIn("static_cast<void>(arrayElement._numberInt());", source)
+
+    def test_unchanged_output_not_rewritten(self):
+        # type: () -> None
+        """Validate the generated files are only written when their contents change."""
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+
+        idl_file = os.path.join(tmp_dir, "enums.idl")
+        args = idl.compiler.CompilerArgs()
+        args.input_file = idl_file
+        args.output_source = os.path.join(tmp_dir, "enums_gen.cpp")
+        args.output_header = os.path.join(tmp_dir, "enums_gen.h")
+
+        def compile_enum(values):
+            with open(idl_file, "w") as idl_stream:
+                idl_stream.write(
+                    textwrap.dedent("""
+                global:
+                    cpp_namespace: 'mongo'
+                enums:
+                    StringEnum:
+                        description: "An example string enum"
+                        type: string
+                        values:
+                """) + "".join("            %s: \"%s\"\n" % (value, value) for value in values))
+            self.assertTrue(idl.compiler.compile_idl(args))
+            return (os.stat(args.output_source), os.stat(args.output_header))
+
+        compile_enum(["s0"])
+        # Make sure a rewrite would be noticed even on filesystems with coarse timestamps.
+        os.utime(args.output_source, ns=(0, 0))
+        os.utime(args.output_header, ns=(0, 0))
+
+        (source_stat, header_stat) = compile_enum(["s0"])
+        self.assertEqual(0, source_stat.st_mtime_ns)
+        self.assertEqual(0, header_stat.st_mtime_ns)
+
+        (source_stat, header_stat) = compile_enum(["s0", "s1"])
+        self.assertNotEqual(0, source_stat.st_mtime_ns)
+        self.assertNotEqual(0, header_stat.st_mtime_ns)
+
 
 if __name__ == '__main__':
 
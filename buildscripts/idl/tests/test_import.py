@@ -29,10 +29,13 @@
 #
 """Test cases for IDL binder."""
 
+import glob
 import io
+import os
+import tempfile
 import textwrap
 import unittest
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 # import package so that it works regardless of whether we run as a module or file
 if __package__ is None:
@@ -463,6 +466,172 @@ class TestImport(testcase.IDLTestcase):
                 bson_serialization_type: string
             """), idl.errors.ERROR_ID_MISSING_REQUIRED_FIELD, resolver=resolver)
 
+    def test_import_cache(self):
+        # type: () -> None
+        """Test the parsed imports are shared through an import cache."""
+
+        import_dict = {
+            "basetypes.idl":
+                textwrap.dedent("""
+            global:
+                cpp_namespace: 'something'
+
+            types:
+                string:
+                    description: foo
+                    cpp_type: foo
+                    bson_serialization_type: string
+                    serializer: foo
+                    deserializer: foo
+                    default: foo
+
+            structs:
+                bar:
+                    description: foo
+                    strict: false
+                    fields:
+                        foo: string
+            """),
+            "bug.idl":
+                textwrap.dedent("""
+            types:
+                bool:
+                    description: foo
+                    bson_serialization_type: bool
+                    deserializer: BSONElement::fake
+            """),
+        }
+
+        opened = []  # type: List[str]
+
+        class CountingImportResolver(DictionaryImportResolver):
+            """An import resolver which records the files it opens."""
+
+            def open(self, resolved_file_name):
+                # type: (str) -> Any
+                """Return an io.Stream for the requested file."""
+                opened.append(resolved_file_name)
+                return super(CountingImportResolver, self).open(resolved_file_name)
+
+        resolver = CountingImportResolver(import_dict)
+        import_cache = idl.parser.ParsedImportCache()
+
+        docs = [
+            textwrap.dedent("""
+        global:
+            cpp_namespace: 'something'
+
+        imports:
+            - "basetypes.idl"
+
+        structs:
+            foobar%d:
+                description: foo
+                strict: false
+                fields:
+                    foo: string
+                    bar: bar
+            """ % (i)) for i in range(3)
+        ]
+
+        for doc_str in docs:
+            parsed_doc = idl.parser.parse(doc_str, "unknown", resolver, import_cache)
+            self.assertIsNone(parsed_doc.errors)
+
+            # The generated code is the same as without the cache
+            header = idl.generator.generate_header_str(idl.binder.bind(parsed_doc.spec).spec)
+            self.assertEqual(self.assert_generate(doc_str, resolver=resolver)[0], header)
+
+        self.assertEqual(["imported_basetypes.idl"] * 4, opened)
+
+        # Imported files with errors are not cached
+        del opened[:]
+        for _ in range(2):
+            parsed_doc = idl.parser.parse(
+                textwrap.dedent("""
+            imports:
+                - "bug.idl"
+                """), "unknown", resolver, import_cache)
+            self.assertTrue(parsed_doc.errors.contains(idl.errors.ERROR_ID_MISSING_REQUIRED_FIELD))
+        self.assertEqual(["imported_bug.idl"] * 2, opened)
+
+    def test_parse_cache(self):
+        # type: () -> None
+        """Test parsed documents are loaded from an on-disk parse cache."""
+
+        import_dict = {
+            "basetypes.idl":
+                textwrap.dedent("""
+            global:
+                cpp_namespace: 'something'
+
+            types:
+                string:
+                    description: foo
+                    cpp_type: foo
+                    bson_serialization_type: string
+                    serializer: foo
+                    deserializer: foo
+                    default: foo
+            """),
+        }
+        resolver = DictionaryImportResolver(import_dict)
+
+        doc_str = textwrap.dedent("""
+        global:
+            cpp_namespace: 'something'
+
+        imports:
+            - "basetypes.idl"
+
+        structs:
+            foobar:
+                description: foo
+                strict: false
+                fields:
+                    foo: string
+            """)
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            headers = []
+            for (hits, misses) in [(0, 2), (2, 0)]:
+                parse_cache = idl.cache.ParsedSpecCache(cache_dir)
+                parsed_doc = idl.parser.parse(doc_str, "unknown", resolver, parse_cache=parse_cache)
+                self.assertIsNone(parsed_doc.errors)
+                self.assertEqual((hits, misses), (parse_cache.hits, parse_cache.misses))
+
+                bound_doc = idl.binder.bind(parsed_doc.spec)
+                headers.append(idl.generator.generate_header_str(bound_doc.spec))
+
+            self.assertEqual(headers[0], headers[1])
+
+            # A different file name is a different entry, since it is recorded in the syntax tree
+            parse_cache = idl.cache.ParsedSpecCache(cache_dir)
+            idl.parser.parse(doc_str, "other", resolver, parse_cache=parse_cache)
+            self.assertEqual((1, 1), (parse_cache.hits, parse_cache.misses))
+
+            # Corrupt entries are misses, and are replaced
+            for entry_path in glob.glob(os.path.join(cache_dir, "*", "*.pickle")):
+                with open(entry_path, "wb") as entry:
+                    entry.write(b"corrupt")
+            for (hits, misses) in [(0, 2), (2, 0)]:
+                parse_cache = idl.cache.ParsedSpecCache(cache_dir)
+                self.assertIsNone(
+                    idl.parser.parse(doc_str, "unknown", resolver, parse_cache=parse_cache).errors)
+                self.assertEqual((hits, misses), (parse_cache.hits, parse_cache.misses))
+
+            # Documents with errors are not cached
+            bad_doc_str = textwrap.dedent("""
+            types:
+                bool:
+                    description: foo
+            """)
+            for _ in range(2):
+                parse_cache = idl.cache.ParsedSpecCache(cache_dir)
+                self.assertIsNotNone(
+                    idl.parser.parse(bad_doc_str, "bad", resolver, parse_cache=parse_cache).errors)
+                self.assertEqual((0, 1), (parse_cache.hits, parse_cache.misses))
+
 
 if __name__ == '__main__':
 
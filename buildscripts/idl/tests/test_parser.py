@@ -286,6 +286,7 @@ class TestParser(testcase.IDLTestcase):
                 immutable: true
                 inline_chained_structs: true
                 generate_comparison_operators: true
+                view: true
                 fields:
                     foo: bar
             """))
@@ -300,6 +301,7 @@ class TestParser(testcase.IDLTestcase):
                 immutable: false
                 inline_chained_structs: false
                 generate_comparison_operators: false
+                view: false
                 fields:
                     foo: bar
             """))
@@ -379,6 +381,17 @@ class TestParser(testcase.IDLTestcase):
                     foo: bar
             """), idl.errors.ERROR_ID_IS_NODE_VALID_BOOL)
 
+        # view is a bool
+        self.assert_parse_fail(
+            textwrap.dedent("""
+        structs:
+            foo:
+                description: foo
+                view: bar
+                fields:
+                    foo: bar
+            """), idl.errors.ERROR_ID_IS_NODE_VALID_BOOL)
+
         # cpp_name is not allowed
         self.assert_parse_fail(
             textwrap.dedent("""
@@ -4,6 +4,7 @@ import collections
 import datetime
 import itertools
 import os.path
+import tempfile
 import time
 
 # Subdirectory under the dbpath prefix that contains directories with data files of mongod's started
@@ -43,27 +44,43 @@ DEFAULT_MULTIVERSION_DIR = os.path.normpath("/data/multiversion")
 # desired.
 DEFAULT_GENNY_EXECUTABLE = os.path.normpath("genny/build/src/driver/genny")
 
+# Default location of the cache of the tags of JavaScript tests. It is only written if the build
+# directory exists.
+DEFAULT_JSTEST_TAGS_CACHE_FILE = os.path.normpath("build/jstest_tags_cache.json")
+
+# Default location of the file in which the resmoke.py processes on the machine record the ports
+# they leased when DYNAMIC_PORTS is true.
+DEFAULT_PORT_LEASES_FILE = os.path.join(tempfile.gettempdir(), "resmoke_port_leases.json")
+
 # Names below correspond to how they are specified via the command line or in the options YAML file.
 DEFAULTS = {
     "always_use_log_files": False,
     "archive_limit_mb": 5000,
     "archive_limit_tests": 10,
+    "archive_local_dir": None,
     "base_port": 20000,
     "backup_on_restart_dir": None,
     "buildlogger_url": "https://logkeeper.mongodb.org",
+    "concurrent_suites": False,
     "continue_on_failure": False,
     "dbpath_prefix": None,
     "dbtest_executable": None,
     "dry_run": None,
+    "dynamic_ports": False,
     "exclude_with_any_tags": None,
+    "fixture_snapshot_dir": None,
     "flow_control": None,
     "flow_control_tickets": None,
     "fuzz_mongod_configs": False,
     "config_fuzz_seed": None,
     "genny_executable": None,
+    "historic_runtime_file": None,
     "include_with_any_tags": None,
     "install_dir": None,
+    "job_processes": False,
     "jobs": 1,
+    "jstest_tags_cache_file": DEFAULT_JSTEST_TAGS_CACHE_FILE,
+    "log_multiplexer": False,
     "logger_file": "console",
     "mongo_executable": None,
     "mongod_executable": None,
@@ -74,7 +91,9 @@ DEFAULTS = {
     "mrlog": None,
     "no_journal": False,
     "num_clients_per_fixture": 1,
+    "order_by_runtime_history": False,
     "perf_report_file": None,
+    "port_leases_file": DEFAULT_PORT_LEASES_FILE,
     "repeat_suites": 1,
     "repeat_tests": 1,
     "repeat_tests_max": None,
@@ -83,8 +102,12 @@ DEFAULTS = {
     "replay_file": None,
     "report_failure_status": "fail",
     "report_file": None,
+    "resource_sample_interval_ms": None,
+    "reuse_fixtures": False,
+    "runtime_history_file": None,
     "seed": int(time.time() * 256),  # Taken from random.py code in Python 2.7.
     "service_executor": None,
+    "scheduler_lookahead": 1,
     "shell_conn_string": None,
     "shell_port": None,
     "shell_read_mode": None,
@@ -102,6 +125,7 @@ DEFAULTS = {
     "user_friendly_output": None,
     "mixed_bin_versions": None,
     "linear_chain": None,
+    "fast_replset_initiate": False,
     "num_replset_nodes": None,
     "num_shards": None,
 
@@ -247,6 +271,10 @@ ARCHIVE_LIMIT_MB = None
 # The limit number of tests to archive for an Evergreen task.
 ARCHIVE_LIMIT_TESTS = None
 
+# If set, archives are copied to this directory instead of being uploaded to S3. Archival is then
+# enabled even when not running in an Evergreen task.
+ARCHIVE_LOCAL_DIR = None
+
 # The starting port number to use for mongod and mongos processes spawned by resmoke.py and the
 # mongo shell.
 BASE_PORT = None
@@ -260,6 +288,10 @@ CEDAR_URL = None
 # Cedar gRPC service port.
 CEDAR_RPC_PORT = None
 
+# If true, then the suites are run at the same time rather than one after another, with no more
+# than JOBS tests running at once across all of them.
+CONCURRENT_SUITES = None
+
 # Root directory for where resmoke.py puts directories containing data files of mongod's it starts,
 # as well as those started by individual tests.
 DBPATH_PREFIX = None
@@ -271,6 +303,10 @@ DBTEST_EXECUTABLE = None
 # actually running them).
 DRY_RUN = None
 
+# If true, then ports are leased from all of the ports above BASE_PORT as the fixtures and tests of
+# each job need them, rather than each job being given a fixed range of ports.
+DYNAMIC_PORTS = None
+
 # An identifier consisting of the project name, build variant name, commit hash, and the timestamp.
 # For patch builds, it also includes the patch version id.
 EVERGREEN_BUILD_ID = None
@@ -322,6 +358,10 @@ CONFIG_FUZZ_SEED = None
 # Executable file for genny, passed in as a command line arg.
 GENNY_EXECUTABLE = None
 
+# Path to a JSON file of historic test runtimes, in the format of Evergreen's test stats. If set,
+# then the tests expected to run the longest are started first.
+HISTORIC_RUNTIME_FILE = None
+
 # If set, then only jstests that have at least one of the specified tags will be run during the
 # jstest portion of the suite(s).
 INCLUDE_WITH_ANY_TAGS = None
@@ -330,9 +370,27 @@ INCLUDE_WITH_ANY_TAGS = None
 # not be set by the user.
 INTERNAL_PARAMS = []
 
+# If set, then the dbpaths of replica sets are saved to this directory once they are initialized,
+# and later replica sets with the same binary and configuration start from a copy of them instead.
+FIXTURE_SNAPSHOT_DIR = None
+
 # If set, then resmoke.py starts the specified number of Job instances to run tests.
 JOBS = None
 
+# If true, then each Job instance runs in its own worker process instead of a thread.
+JOB_PROCESSES = None
+
+# If true, then JOBS is only an upper bound and the number of Job instances of each suite is sized
+# to fit its fixtures on the host. Tests also aren't started while the host is overloaded.
+AUTO_JOBS = None
+
+# If set, the tags of JavaScript tests are cached in this file between invocations of resmoke.py.
+JSTEST_TAGS_CACHE_FILE = None
+
+# If true, the output of every process is read by a single thread rather than by two threads per
+# process. Has no effect on Windows.
+LOG_MULTIPLEXER = None
+
 # Yaml file that specified logging configuration.
 LOGGER_FILE = None
 
@@ -367,6 +425,14 @@ NUM_CLIENTS_PER_FIXTURE = None
 # Report file for the Evergreen performance plugin.
 PERF_REPORT_FILE = None
 
+# The file in which the resmoke.py processes on the machine record the ports they leased when
+# DYNAMIC_PORTS is true.
+PORT_LEASES_FILE = None
+
+# If set, then the CPU, memory, and disk usage of the fixture and test processes is sampled every
+# RESOURCE_SAMPLE_INTERVAL_MS milliseconds and summarized per test in the report file.
+RESOURCE_SAMPLE_INTERVAL_MS = None
+
 # If set, then the RNG is seeded with the specified value. Otherwise uses a seed based on the time
 # this module was loaded.
 RANDOM_SEED = None
@@ -394,6 +460,22 @@ REPORT_FAILURE_STATUS = None
 # If set, then resmoke.py will write out a report file with the status of each test that ran.
 REPORT_FILE = None
 
+# If true, then fixtures are kept running after a suite finishes and are reused, after having their
+# data reset, by later suites with an identical fixture configuration.
+REUSE_FIXTURES = None
+
+# Path to the local runtime history file. If set, then the runtime of each test is appended to it
+# after the tests finish.
+RUNTIME_HISTORY_FILE = None
+
+# If true, then the tests expected to run the longest according to RUNTIME_HISTORY_FILE are started
+# first when HISTORIC_RUNTIME_FILE isn't set.
+ORDER_BY_RUNTIME_HISTORY = False
+
+# The number of upcoming tests each job claims at a time when tests are ordered by their historic
+# runtimes. Jobs which run out of tests steal unstarted tests claimed by other jobs.
+SCHEDULER_LOOKAHEAD = None
+
 # IF set, then mongod/mongos's started by resmoke.py will use the specified service executor
 SERVICE_EXECUTOR = None
 
@@ -408,7 +490,8 @@ SHELL_READ_MODE = None
 SHELL_WRITE_MODE = None
 
 # If true, then the order the tests run in is randomized. Otherwise the tests will run in
-# alphabetical (case-insensitive) order.
+# alphabetical (case-insensitive) order. If None, then the tests of a suite are randomized only if
+# it runs more than one job once it is sized for --jobs=auto.
 SHUFFLE = None
 
 # Possible values are python and jasper. If python, resmoke uses the python built-in subprocess
@@ -440,6 +523,10 @@ NUM_SHARDS = None
 # If true, run ReplicaSetFixture with linear chaining.
 LINEAR_CHAIN = None
 
+# If true, ReplicaSetFixture starts all of its nodes concurrently and initiates the replica set with
+# its full membership in a single replSetInitiate command when all nodes run the same binary.
+FAST_REPLSET_INITIATE = None
+
 # If set to "on", it enables flow control. If set to "off", it disables flow control. If left as
 # None, the server's default will determine whether flow control is enabled.
 FLOW_CONTROL = None
@@ -45,6 +45,13 @@ def _validate_options(parser, args):
             "Cannot use --replayFile with additional test files listed on the command line invocation."
         )
 
+    # Ordering the tests by their historic runtimes would undo shuffling them.
+    if args.shuffle == "on" and (args.historic_runtime_file or args.order_by_runtime_history):
+        parser.error("Cannot use --shuffle with --historicRuntimeFile or --orderByRuntimeHistory")
+
+    if args.order_by_runtime_history and not args.runtime_history_file:
+        parser.error("Must specify --runtimeHistoryFile with --orderByRuntimeHistory")
+
     def get_set_param_errors(process_params):
         agg_set_params = collections.defaultdict(list)
         for set_param in process_params:
@@ -97,6 +104,13 @@ def _validate_config(parser):  # pylint: disable=too-many-branches
     if _config.REPEAT_TESTS > 1 and _config.REPEAT_TESTS_SECS:
         parser.error("Cannot specify --repeatTests and --repeatTestsSecs")
 
+    if _config.HISTORIC_RUNTIME_FILE is not None and not os.path.isfile(
+            _config.HISTORIC_RUNTIME_FILE):
+        parser.error(f"Cannot find the historic runtime file '{_config.HISTORIC_RUNTIME_FILE}'")
+
+    if _config.SCHEDULER_LOOKAHEAD < 1:
+        parser.error("--schedulerLookahead must be a positive integer")
+
     if _config.MIXED_BIN_VERSIONS is not None:
         for version in _config.MIXED_BIN_VERSIONS:
             if version not in set(['old', 'new']):
@@ -146,18 +160,30 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     _config.BASE_PORT = int(config.pop("base_port"))
     _config.BACKUP_ON_RESTART_DIR = config.pop("backup_on_restart_dir")
     _config.BUILDLOGGER_URL = config.pop("buildlogger_url")
+    _config.CONCURRENT_SUITES = config.pop("concurrent_suites")
     _config.DBPATH_PREFIX = _expand_user(config.pop("dbpath_prefix"))
     _config.DRY_RUN = config.pop("dry_run")
+    _config.DYNAMIC_PORTS = config.pop("dynamic_ports")
     # EXCLUDE_WITH_ANY_TAGS will always contain the implicitly defined EXCLUDED_TAG.
     _config.EXCLUDE_WITH_ANY_TAGS = [_config.EXCLUDED_TAG]
     _config.EXCLUDE_WITH_ANY_TAGS.extend(
         utils.default_if_none(_tags_from_list(config.pop("exclude_with_any_tags")), []))
     _config.FAIL_FAST = not config.pop("continue_on_failure")
+    _config.FIXTURE_SNAPSHOT_DIR = _expand_user(config.pop("fixture_snapshot_dir"))
+    _config.FAST_REPLSET_INITIATE = config.pop("fast_replset_initiate")
     _config.FLOW_CONTROL = config.pop("flow_control")
     _config.FLOW_CONTROL_TICKETS = config.pop("flow_control_tickets")
     _config.INCLUDE_WITH_ANY_TAGS = _tags_from_list(config.pop("include_with_any_tags"))
     _config.GENNY_EXECUTABLE = _expand_user(config.pop("genny_executable"))
-    _config.JOBS = config.pop("jobs")
+    _config.HISTORIC_RUNTIME_FILE = _expand_user(config.pop("historic_runtime_file"))
+    jobs = config.pop("jobs")
+    _config.AUTO_JOBS = jobs == "auto"
+    _config.JOBS = utils.get_num_cpus() if _config.AUTO_JOBS else int(jobs)
+    _config.JOB_PROCESSES = config.pop("job_processes")
+    _config.JSTEST_TAGS_CACHE_FILE = _expand_user(config.pop("jstest_tags_cache_file"))
+    if _config.JSTEST_TAGS_CACHE_FILE == "off":
+        _config.JSTEST_TAGS_CACHE_FILE = None
+    _config.LOG_MULTIPLEXER = config.pop("log_multiplexer")
     _config.LINEAR_CHAIN = config.pop("linear_chain") == "on"
     _config.MAJORITY_READ_CONCERN = config.pop("majority_read_concern") == "on"
     _config.MIXED_BIN_VERSIONS = config.pop("mixed_bin_versions")
@@ -209,6 +235,7 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     _config.NUM_REPLSET_NODES = config.pop("num_replset_nodes")
     _config.NUM_SHARDS = config.pop("num_shards")
     _config.PERF_REPORT_FILE = config.pop("perf_report_file")
+    _config.PORT_LEASES_FILE = _expand_user(config.pop("port_leases_file"))
     _config.RANDOM_SEED = config.pop("seed")
     _config.REPEAT_SUITES = config.pop("repeat_suites")
     _config.REPEAT_TESTS = config.pop("repeat_tests")
@@ -217,6 +244,11 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     _config.REPEAT_TESTS_SECS = config.pop("repeat_tests_secs")
     _config.REPORT_FAILURE_STATUS = config.pop("report_failure_status")
     _config.REPORT_FILE = config.pop("report_file")
+    _config.RESOURCE_SAMPLE_INTERVAL_MS = config.pop("resource_sample_interval_ms")
+    _config.REUSE_FIXTURES = config.pop("reuse_fixtures")
+    _config.ORDER_BY_RUNTIME_HISTORY = config.pop("order_by_runtime_history")
+    _config.RUNTIME_HISTORY_FILE = _expand_user(config.pop("runtime_history_file"))
+    _config.SCHEDULER_LOOKAHEAD = config.pop("scheduler_lookahead")
     _config.SERVICE_EXECUTOR = config.pop("service_executor")
     _config.SHELL_READ_MODE = config.pop("shell_read_mode")
     _config.SHELL_WRITE_MODE = config.pop("shell_write_mode")
@@ -251,8 +283,10 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     _config.CEDAR_URL = config.pop("cedar_url")
     _config.CEDAR_RPC_PORT = config.pop("cedar_rpc_port")
 
-    # Archival options. Archival is enabled only when running on evergreen.
-    if not _config.EVERGREEN_TASK_ID:
+    # Archival options. Archival is enabled only when running on evergreen or when archiving to a
+    # local directory.
+    _config.ARCHIVE_LOCAL_DIR = _expand_user(config.pop("archive_local_dir"))
+    if not _config.EVERGREEN_TASK_ID and not _config.ARCHIVE_LOCAL_DIR:
         _config.ARCHIVE_FILE = None
     _config.ARCHIVE_LIMIT_MB = config.pop("archive_limit_mb")
     _config.ARCHIVE_LIMIT_TESTS = config.pop("archive_limit_tests")
@@ -316,8 +350,15 @@ def _update_config_vars(values):  # pylint: disable=too-many-statements,too-many
     if shuffle == "auto":
         # If the user specified a value for --jobs > 1 (or -j > 1), then default to randomize
         # the order in which tests are executed. This is because with multiple threads the tests
-        # wouldn't run in a deterministic order anyway.
-        _config.SHUFFLE = _config.JOBS > 1
+        # wouldn't run in a deterministic order anyway. Tests ordered by their historic runtimes
+        # aren't shuffled. With --jobs=auto, the number of jobs isn't known until each suite is
+        # sized to the host, so the decision is left to when the suite is run.
+        if _config.HISTORIC_RUNTIME_FILE or _config.ORDER_BY_RUNTIME_HISTORY:
+            _config.SHUFFLE = False
+        elif _config.AUTO_JOBS:
+            _config.SHUFFLE = None
+        else:
+            _config.SHUFFLE = _config.JOBS > 1
     else:
         _config.SHUFFLE = shuffle == "on"
 
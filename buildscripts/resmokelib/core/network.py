@@ -1,12 +1,26 @@
 """Class used to allocate ports for mongod and mongos processes involved in running the tests."""
 
+import atexit
 import collections
+import contextlib
 import functools
+import json
+import os
+import socket
 import threading
 
+import psutil
+
 from buildscripts.resmokelib import config
 from buildscripts.resmokelib import errors
 
+try:
+    import fcntl
+except ImportError:
+    # Windows doesn't have fcntl. The ports leased by concurrent resmoke.py processes are then only
+    # kept apart by probing whether the ports can be bound.
+    fcntl = None
+
 
 def _check_port(func):
     """Provide decorator that verifies the port returned by the wrapped function is in range.
@@ -38,6 +52,10 @@ class PortAllocator(object):
     that range used for the fixture started by that job, and the second
     part of the range used for mongod and mongos processes started by
     tests run by that job.
+
+    If config.DYNAMIC_PORTS is true, then the ports are instead leased
+    on demand from all of the ports above config.BASE_PORT, see
+    _PortLeases.
     """
 
     # A PortAllocator will not return any port greater than this number.
@@ -56,6 +74,21 @@ class PortAllocator(object):
     # Used to keep track of how many ports a fixture has allocated.
     _NUM_USED_PORTS = collections.defaultdict(int)  # type: ignore
 
+    # The number of ports reserved for the tests of each job.
+    _PORTS_PER_TEST_RANGE = _PORTS_PER_JOB - _PORTS_PER_FIXTURE
+
+    # The ports leased by each job when config.DYNAMIC_PORTS is true.
+    _LEASES = None
+
+    @classmethod
+    def _get_leases(cls):
+        """Return the _PortLeases, creating them on first use."""
+        with cls._NUM_USED_PORTS_LOCK:
+            if cls._LEASES is None:
+                cls._LEASES = _PortLeases(config.PORT_LEASES_FILE)
+                atexit.register(cls._LEASES.release_all)
+            return cls._LEASES
+
     @classmethod
     @_check_port
     def next_fixture_port(cls, job_num):
@@ -65,6 +98,9 @@ class PortAllocator(object):
         ports than are reserved per job, or if the next port is not a
         valid port number.
         """
+        if config.DYNAMIC_PORTS:
+            return cls._get_leases().lease(job_num, 1)
+
         with cls._NUM_USED_PORTS_LOCK:
             start_port = config.BASE_PORT + (job_num * cls._PORTS_PER_JOB)
             num_used_ports = cls._NUM_USED_PORTS[job_num]
@@ -87,6 +123,9 @@ class PortAllocator(object):
         Raises a PortAllocationError if that port is higher than the
         maximum port.
         """
+        if config.DYNAMIC_PORTS:
+            return cls._get_leases().test_port_range(job_num, cls._PORTS_PER_TEST_RANGE)[0]
+
         return config.BASE_PORT + (job_num * cls._PORTS_PER_JOB) + cls._PORTS_PER_FIXTURE
 
     @classmethod
@@ -97,16 +136,185 @@ class PortAllocator(object):
         Raises a PortAllocationError if that port is higher than the
         maximum port.
         """
+        if config.DYNAMIC_PORTS:
+            return cls._get_leases().test_port_range(job_num, cls._PORTS_PER_TEST_RANGE)[1]
+
         next_range_start = config.BASE_PORT + ((job_num + 1) * cls._PORTS_PER_JOB)
         return next_range_start - 1
 
     @classmethod
-    def reset(cls):
+    def max_num_jobs(cls):
+        """Return how many jobs have a range of ports below MAX_PORT.
+
+        There is no limit if config.DYNAMIC_PORTS is true, in which case None is returned.
+        """
+        if config.DYNAMIC_PORTS:
+            return None
+        return (cls.MAX_PORT + 1 - config.BASE_PORT) // cls._PORTS_PER_JOB
+
+    @classmethod
+    def release(cls, job_num):
+        """Return the ports leased by the job once its fixture was torn down.
+
+        The ports of a job are fixed unless config.DYNAMIC_PORTS is true,
+        in which case there is nothing to return.
+        """
+        if config.DYNAMIC_PORTS:
+            cls._get_leases().release(job_num)
+
+    @classmethod
+    def reset(cls, preserve_job_nums=(), job_nums=None):
         """Reset the internal state of the PortAllocator.
 
         This method is intended to be called each time resmoke.py starts
-        a new test suite.
+        a new test suite. The ports already handed out to the jobs in
+        'preserve_job_nums' stay reserved, which allows a fixture that
+        is still running from the previous test suite to be reused. If
+        'job_nums' is specified, then only the ports of those jobs are
+        released, which leaves alone the jobs of suites running
+        concurrently.
         """
 
+        if config.DYNAMIC_PORTS:
+            cls._get_leases().reset(preserve_job_nums=preserve_job_nums, job_nums=job_nums)
+            return
+
         with cls._NUM_USED_PORTS_LOCK:
-            cls._NUM_USED_PORTS = collections.defaultdict(int)
+            if job_nums is None:
+                job_nums = list(cls._NUM_USED_PORTS)
+            for job_num in job_nums:
+                if job_num not in preserve_job_nums:
+                    cls._NUM_USED_PORTS.pop(job_num, None)
+
+
+class _PortLeases(object):
+    """Ports leased by the jobs, shared with the other resmoke.py processes on the machine.
+
+    The leases of all of the resmoke.py processes are recorded in 'leases_file' as a JSON list of
+    [first port, last port, pid] triples, which is only read and written while holding an exclusive
+    lock on it. The leases of processes which have exited are dropped. A port is only leased if it
+    can also be bound, in order to avoid ports in use by processes other than resmoke.py.
+    """
+
+    def __init__(self, leases_file):
+        """Initialize the _PortLeases."""
+        self._leases_file = leases_file
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        # Maps job numbers to the (first port, last port) ranges leased for them.
+        self._job_leases = collections.defaultdict(list)
+        # Maps job numbers to the (first port, last port) range leased for their tests.
+        self._test_port_ranges = {}
+
+    def lease(self, job_num, num_ports):
+        """Lease 'num_ports' consecutive ports for the job and return the first one."""
+        with self._lock, self._locked_leases() as leases:
+            first_port = self._find_free_range(leases, num_ports)
+            port_range = (first_port, first_port + num_ports - 1)
+            leases.append([port_range[0], port_range[1], self._pid])
+            self._job_leases[job_num].append(port_range)
+            return first_port
+
+    def test_port_range(self, job_num, num_ports):
+        """Return the (first port, last port) range leased for the tests of the job."""
+        with self._lock:
+            port_range = self._test_port_ranges.get(job_num)
+        if port_range is None:
+            first_port = self.lease(job_num, num_ports)
+            port_range = (first_port, first_port + num_ports - 1)
+            with self._lock:
+                self._test_port_ranges[job_num] = port_range
+        return port_range
+
+    def release(self, job_num):
+        """Return the ports leased for the job."""
+        self.reset(job_nums=[job_num])
+
+    def reset(self, preserve_job_nums=(), job_nums=None):
+        """Return the ports leased for 'job_nums', or all jobs, other than 'preserve_job_nums'."""
+        with self._lock:
+            if job_nums is None:
+                job_nums = list(self._job_leases)
+            released = set()
+            for job_num in job_nums:
+                if job_num in preserve_job_nums:
+                    continue
+                released.update(self._job_leases.pop(job_num, []))
+                self._test_port_ranges.pop(job_num, None)
+
+            if not released:
+                return
+            with self._locked_leases() as leases:
+                leases[:] = [
+                    lease for lease in leases
+                    if not (lease[2] == self._pid and (lease[0], lease[1]) in released)
+                ]
+
+    def release_all(self):
+        """Return the ports leased by this process."""
+        self.reset()
+
+    @contextlib.contextmanager
+    def _locked_leases(self):
+        """Yield the list of leases of all of the processes and write it back afterwards."""
+        with open(self._leases_file, "a+", encoding="utf-8") as fh:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                fh.seek(0)
+                contents = fh.read()
+                leases = json.loads(contents) if contents.strip() else []
+                leases = [lease for lease in leases if self._is_running(lease[2])]
+
+                yield leases
+
+                fh.seek(0)
+                fh.truncate()
+                json.dump(leases, fh)
+                fh.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(fh, fcntl.LOCK_UN)
+
+    def _is_running(self, pid):
+        return pid == self._pid or psutil.pid_exists(pid)
+
+    @staticmethod
+    def _find_free_range(leases, num_ports):
+        """Return the first port of the lowest range of 'num_ports' ports free to be leased."""
+        leased = sorted((lease[0], lease[1]) for lease in leases)
+        first_port = config.BASE_PORT
+        while first_port + num_ports - 1 <= PortAllocator.MAX_PORT:
+            last_port = first_port + num_ports - 1
+            overlapping = [
+                end for (start, end) in leased if start <= last_port and end >= first_port
+            ]
+            if overlapping:
+                first_port = max(overlapping) + 1
+                continue
+
+            unbindable = [port for port in range(first_port, last_port + 1) if not _can_bind(port)]
+            if unbindable:
+                first_port = unbindable[-1] + 1
+                continue
+
+            return first_port
+
+        raise errors.PortAllocationError(
+            "Exhausted all available ports. Consider decreasing the number of jobs, or using a"
+            " lower base port")
+
+
+def _can_bind(port):
+    """Return True if 'port' isn't in use on any interface."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        # The mongod and mongos processes set SO_REUSEADDR, so ports in the TIME_WAIT state left
+        # behind by a previous fixture are still usable.
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("", port))
+        return True
+    except OSError:
+        return False
+    finally:
+        sock.close()
@@ -1,11 +1,123 @@
 """
-Helper class to read output of a subprocess.
+Helper classes to read output of a subprocess.
 
 Used to avoid deadlocks from the pipe buffer filling up and blocking the subprocess while it's
-being waited on.
+being waited on. A LoggerPipe reads a single pipe on a thread of its own, whereas a LogMultiplexer
+reads the pipes of many subprocesses on one thread.
 """
 
+import collections
+import os
+import selectors
+import sys
 import threading
+import time
+
+from buildscripts.resmokelib.logging import compressed
+from buildscripts.resmokelib.logging import handlers
+
+# Maximum number of bytes read from the pipe at once. All of the complete lines in a chunk are
+# logged as a single batch.
+_READ_CHUNK_BYTES = 64 * 1024
+
+
+class LoggingStatsSnapshot(collections.namedtuple("LoggingStatsSnapshot", ["num_lines", "secs"])):
+    """The number of lines of process output logged and the time spent logging them."""
+
+    def since(self, earlier):
+        """Return the lines logged and time spent logging since the 'earlier' snapshot."""
+        return LoggingStatsSnapshot(self.num_lines - earlier.num_lines, self.secs - earlier.secs)
+
+    def lines_per_sec(self):
+        """Return the rate at which lines were logged while logging them."""
+        return self.num_lines / self.secs if self.secs > 0 else 0.0
+
+
+class LoggingStats(object):
+    """Running totals of the output logged by every LoggerPipe, kept separately for each job.
+
+    Suites running concurrently use disjoint job numbers, so the totals of a suite's jobs only
+    include its own output.
+    """
+
+    def __init__(self):
+        """Initialize the LoggingStats."""
+        self._lock = threading.Lock()
+        # Maps the job number of the logger, or None if it doesn't belong to a job, to the
+        # LoggingStatsSnapshot of the output it logged.
+        self._totals = {}
+
+    def add(self, job_num, num_lines, secs):
+        """Record that 'num_lines' lines were logged in 'secs' seconds for the job 'job_num'."""
+        with self._lock:
+            (prev_lines, prev_secs) = self._totals.get(job_num, (0, 0.0))
+            self._totals[job_num] = LoggingStatsSnapshot(prev_lines + num_lines, prev_secs + secs)
+
+    def snapshot(self, job_nums):
+        """Return the totals so far of the jobs numbered 'job_nums'."""
+        with self._lock:
+            totals = [self._totals.get(job_num, (0, 0.0)) for job_num in job_nums]
+        return LoggingStatsSnapshot(
+            sum(num_lines for (num_lines, _) in totals), sum(secs for (_, secs) in totals))
+
+
+LOGGING_STATS = LoggingStats()
+
+
+class _OutputLogger(object):
+    """Split the output of a subprocess into lines and log them in batches."""
+
+    def __init__(self, logger, level, listeners):
+        """Initialize the _OutputLogger."""
+        self.logger = logger
+        self.level = level
+        self.listeners = tuple(listeners) if listeners else ()
+        self.job_num = compressed.get_metadata(logger).get("job")
+
+        # The bytes after the last newline received so far, which are held back until the rest of
+        # their line has been received.
+        self._partial = []
+
+    def feed(self, chunk):
+        """Log the lines completed by 'chunk'."""
+        end = chunk.rfind(b"\n")
+        if end == -1:
+            self._partial.append(chunk)
+            return
+
+        self._partial.append(chunk[:end])
+        self._log_lines(b"".join(self._partial))
+        self._partial = [chunk[end + 1:]]
+
+    def finish(self):
+        """Log the final line of output if it didn't end with a newline."""
+        remaining = b"".join(self._partial)
+        self._partial = []
+        if remaining:
+            self._log_lines(remaining)
+
+    def _log_lines(self, output):
+        """Log each line of 'output', which must not end part way through a line."""
+
+        start_time = time.time()
+
+        # Replace null bytes in the output of the subprocess with a literal backslash ('\') followed
+        # by a literal zero ('0') so tools like grep don't treat resmoke.py's output as binary data.
+        output = output.replace(b"\0", b"\\0")
+
+        # Convert the output of the process from a bytestring to a UTF-8 string, and replace any
+        # characters that cannot be decoded with the official Unicode replacement character,
+        # U+FFFD. The log messages of MongoDB processes are not always valid UTF-8 sequences. See
+        # SERVER-7506. Decoding the whole chunk at once is safe because a newline can never be part
+        # of a multibyte UTF-8 sequence.
+        lines = [line.rstrip() for line in output.decode("utf-8", "replace").split("\n")]
+
+        handlers.log_batch(self.logger, self.level, lines)
+        for line in lines:
+            for listener in self.listeners:
+                listener(line)
+
+        LOGGING_STATS.add(self.job_num, len(lines), time.time() - start_time)
 
 
 class LoggerPipe(threading.Thread):  # pylint: disable=too-many-instance-attributes
@@ -16,15 +128,18 @@ class LoggerPipe(threading.Thread):  # pylint: disable=too-many-instance-attribu
     __start = threading.Thread.start
     __join = threading.Thread.join
 
-    def __init__(self, logger, level, pipe_out):
-        """Initialize the LoggerPipe with the specified arguments."""
+    def __init__(self, logger, level, pipe_out, listeners=None):
+        """Initialize the LoggerPipe with the specified arguments.
+
+        Each callable in 'listeners' is called with every decoded line of output after it has
+        been logged. Listeners run on the LoggerPipe thread and so must not block.
+        """
 
         threading.Thread.__init__(self)
         # Main thread should not call join() when exiting
         self.daemon = True
 
-        self.__logger = logger
-        self.__level = level
+        self.__output = _OutputLogger(logger, level, listeners)
         self.__pipe_out = pipe_out
 
         self.__lock = threading.Lock()
@@ -48,19 +163,17 @@ class LoggerPipe(threading.Thread):  # pylint: disable=too-many-instance-attribu
 
         # Close the pipe when finished reading all of the output.
         with self.__pipe_out:
-            # Avoid buffering the output from the pipe.
-            for line in iter(self.__pipe_out.readline, b""):
-                # Replace null bytes in the output of the subprocess with a literal backslash ('\')
-                # followed by a literal zero ('0') so tools like grep don't treat resmoke.py's
-                # output as binary data.
-                line = line.replace(b"\0", b"\\0")
-
-                # Convert the output of the process from a bytestring to a UTF-8 string, and replace
-                # any characters that cannot be decoded with the official Unicode replacement
-                # character, U+FFFD. The log messages of MongoDB processes are not always valid
-                # UTF-8 sequences. See SERVER-7506.
-                line = line.decode("utf-8", "replace")
-                self.__logger.log(self.__level, line.rstrip())
+            # Read whatever output is available rather than waiting for a full chunk so the lines
+            # aren't delayed. Pipes without read1() are read a line at a time.
+            read1 = getattr(self.__pipe_out, "read1", None)
+            if read1 is not None:
+                chunks = iter(lambda: read1(_READ_CHUNK_BYTES), b"")
+            else:
+                chunks = iter(self.__pipe_out.readline, b"")
+
+            for chunk in chunks:
+                self.__output.feed(chunk)
+            self.__output.finish()
 
         with self.__lock:
             self.__finished = True
@@ -85,3 +198,172 @@ class LoggerPipe(threading.Thread):  # pylint: disable=too-many-instance-attribu
         # No need to pass a timeout to join() because the thread should already be done after
         # notifying us it has finished reading output from the pipe.
         LoggerPipe.__join(self)  # Tidy up the started thread.
+
+
+class MultiplexedPipe(object):
+    """A pipe whose output is read by a LogMultiplexer.
+
+    It offers the same wait_until_started() and wait_until_finished() methods as a LoggerPipe.
+    """
+
+    def __init__(self, logger, level, pipe_out, listeners=None):
+        """Initialize the MultiplexedPipe."""
+        self.output = _OutputLogger(logger, level, listeners)
+        self.pipe_out = pipe_out
+        # Set once logging the output failed. The rest of the output is then read and dropped.
+        self.discard_output = False
+
+        self.__lock = threading.Lock()
+        self.__condition = threading.Condition(self.__lock)
+
+        self.__started = False
+        self.__finished = False
+
+    def mark_started(self):
+        """Record that the LogMultiplexer is reading from the pipe."""
+        with self.__lock:
+            self.__started = True
+            self.__condition.notify_all()
+
+    def mark_finished(self):
+        """Log any remaining output, close the pipe, and wake up wait_until_finished()."""
+        try:
+            if not self.discard_output:
+                self.output.finish()
+        finally:
+            self.pipe_out.close()
+            with self.__lock:
+                self.__finished = True
+                self.__condition.notify_all()
+
+    def wait_until_started(self):
+        """Wait until started."""
+        with self.__lock:
+            while not self.__started:
+                self.__condition.wait()
+
+    def wait_until_finished(self):
+        """Wait until finished."""
+        with self.__lock:
+            while not self.__finished:
+                self.__condition.wait()
+
+
+class LogMultiplexer(threading.Thread):
+    """Read the output of many subprocesses on a single thread and send it to their loggers.
+
+    Each call to add() registers a pipe with a selector which the thread waits on. Since handlers
+    run on the multiplexer's thread, a handler which blocks delays the output of every process.
+    """
+
+    def __init__(self):
+        """Initialize and start the LogMultiplexer."""
+        threading.Thread.__init__(self, name="LogMultiplexer")
+        # Main thread should not call join() when exiting
+        self.daemon = True
+
+        self.__selector = selectors.DefaultSelector()
+
+        # Pipes are registered with the selector by the multiplexer's thread because a selector
+        # mustn't be modified while another thread is waiting on it. The other end of
+        # 'self.__wakeup_pipe' interrupts the wait when there are new pipes to register.
+        self.__lock = threading.Lock()
+        self.__pending = []
+        (self.__wakeup_read, self.__wakeup_write) = os.pipe()
+        self.__selector.register(self.__wakeup_read, selectors.EVENT_READ, None)
+
+        self.start()
+
+    @staticmethod
+    def is_supported():
+        """Return True if the platform can wait on subprocess pipes with a selector."""
+        return sys.platform != "win32"
+
+    def add(self, logger, level, pipe_out, listeners=None):
+        """Read the output from 'pipe_out' and log each line to 'logger'.
+
+        Return a MultiplexedPipe to wait on.
+        """
+        multiplexed_pipe = MultiplexedPipe(logger, level, pipe_out, listeners)
+        with self.__lock:
+            self.__pending.append(multiplexed_pipe)
+        os.write(self.__wakeup_write, b"\0")
+        return multiplexed_pipe
+
+    def run(self):
+        """Wait for output from the registered pipes and log it."""
+        while True:
+            for (key, _) in self.__selector.select():
+                if key.data is None:
+                    self.__register_pending()
+                else:
+                    self.__read(key.fileobj, key.data)
+
+    def __register_pending(self):
+        """Start waiting on the pipes added since the last call."""
+        os.read(self.__wakeup_read, _READ_CHUNK_BYTES)
+        with self.__lock:
+            pending = self.__pending
+            self.__pending = []
+
+        for multiplexed_pipe in pending:
+            self.__selector.register(multiplexed_pipe.pipe_out.fileno(), selectors.EVENT_READ,
+                                     multiplexed_pipe)
+            multiplexed_pipe.mark_started()
+
+    def __read(self, fd, multiplexed_pipe):
+        """Log the output available from 'fd' and stop waiting on it once it's closed."""
+        try:
+            # The pipe's file object is bypassed so the read doesn't wait for a full chunk.
+            chunk = os.read(fd, _READ_CHUNK_BYTES)
+        except OSError:
+            multiplexed_pipe.output.logger.exception("Failed to read the output of a process.")
+            chunk = b""
+
+        if chunk:
+            if not multiplexed_pipe.discard_output:
+                self.__log(multiplexed_pipe, chunk)
+            return
+
+        self.__selector.unregister(fd)
+        try:
+            multiplexed_pipe.mark_finished()
+        except Exception:  # pylint: disable=broad-except
+            multiplexed_pipe.output.logger.exception("Failed to log the output of a process.")
+
+    @staticmethod
+    def __log(multiplexed_pipe, chunk):
+        """Log 'chunk', or drop the rest of the pipe's output if that fails."""
+        try:
+            multiplexed_pipe.output.feed(chunk)
+        except Exception:  # pylint: disable=broad-except
+            # An error with one pipe mustn't stop the output of every other process from being
+            # logged. The pipe is still read until the process closes it so that the process
+            # doesn't block once the pipe is full.
+            multiplexed_pipe.output.logger.exception(
+                "Failed to log the output of a process, discarding the rest of it.")
+            multiplexed_pipe.discard_output = True
+
+
+_LOG_MULTIPLEXER = None
+_LOG_MULTIPLEXER_LOCK = threading.Lock()
+
+
+def get_log_multiplexer():
+    """Return the LogMultiplexer shared by all processes, starting it if necessary."""
+    global _LOG_MULTIPLEXER  # pylint: disable=global-statement
+    with _LOG_MULTIPLEXER_LOCK:
+        if _LOG_MULTIPLEXER is None:
+            _LOG_MULTIPLEXER = LogMultiplexer()
+        return _LOG_MULTIPLEXER
+
+
+def reset_log_multiplexer_after_fork():
+    """Forget the LogMultiplexer of the parent in a child process created with os.fork().
+
+    The parent's multiplexer thread doesn't exist in the child, so a new LogMultiplexer is started
+    the first time the child needs one.
+    """
+    global _LOG_MULTIPLEXER, _LOG_MULTIPLEXER_LOCK  # pylint: disable=global-statement
+    _LOG_MULTIPLEXER = None
+    _LOG_MULTIPLEXER_LOCK = threading.Lock()
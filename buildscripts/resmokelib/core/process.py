@@ -95,8 +95,13 @@ class Process(object):
         self._recorder = None
         self._stdout_pipe = None
         self._stderr_pipe = None
+        self._stdout_listeners = []
         self._cwd = cwd
 
+    def add_stdout_listener(self, listener):
+        """Call 'listener' with each line the process writes to stdout once start() is called."""
+        self._stdout_listeners.append(listener)
+
     def start(self):
         """Start the process and the logger pipes for its stdout and stderr."""
 
@@ -134,8 +139,14 @@ class Process(object):
                 self._recorder = subprocess.Popen(recorder_args, bufsize=buffer_size, env=self.env,
                                                   creationflags=creation_flags)
 
-        self._stdout_pipe = pipe.LoggerPipe(self.logger, logging.INFO, self._process.stdout)
-        self._stderr_pipe = pipe.LoggerPipe(self.logger, logging.ERROR, self._process.stderr)
+        if _config.LOG_MULTIPLEXER and pipe.LogMultiplexer.is_supported():
+            # Read the output of every process on a single thread rather than two per process.
+            new_pipe = pipe.get_log_multiplexer().add
+        else:
+            new_pipe = pipe.LoggerPipe
+        self._stdout_pipe = new_pipe(self.logger, logging.INFO, self._process.stdout,
+                                     listeners=self._stdout_listeners)
+        self._stderr_pipe = new_pipe(self.logger, logging.ERROR, self._process.stderr)
 
         self._stdout_pipe.wait_until_started()
         self._stderr_pipe.wait_until_started()
@@ -0,0 +1,42 @@
+"""Manage interactions with the local runtime history file."""
+
+import os.path
+
+from buildscripts.resmokelib import config
+from buildscripts.resmokelib.testing import report as _report
+from buildscripts.util import runtime_history
+
+# Build variant the runtimes are recorded under when resmoke.py isn't running in Evergreen.
+LOCAL_VARIANT = "local"
+
+
+def get_variant():
+    """Return the build variant the runtimes of this invocation are recorded under."""
+    return config.EVERGREEN_VARIANT_NAME or LOCAL_VARIANT
+
+
+def read(suite):
+    """Return the HistoricTaskData recorded for 'suite', or None if there isn't any history."""
+
+    if config.RUNTIME_HISTORY_FILE is None or not os.path.isfile(config.RUNTIME_HISTORY_FILE):
+        return None
+
+    history = runtime_history.RuntimeHistory(config.RUNTIME_HISTORY_FILE)
+    historic_data = history.to_historic_task_data(suite.get_name(), get_variant())
+    return historic_data if historic_data else None
+
+
+def write(suites):
+    """Append the runtimes of all executions if --runtimeHistoryFile was specified."""
+
+    if config.RUNTIME_HISTORY_FILE is None:
+        return
+
+    records = []
+    for suite in suites:
+        report_dict = _report.TestReport.combine(*suite.get_reports()).as_dict()
+        records.extend(
+            runtime_history.records_from_report(report_dict, suite.get_name(), get_variant(),
+                                                suite.tests))
+
+    runtime_history.RuntimeHistory(config.RUNTIME_HISTORY_FILE).append(records)
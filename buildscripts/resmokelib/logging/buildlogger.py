@@ -134,6 +134,10 @@ class _BaseBuildloggerHandler(handlers.BufferedHandler):
         msg = self.format(record)
         return (record.created, msg)
 
+    def process_records(self, records):
+        """Return the (time, message) tuples of a batch of log records."""
+        return [(record.created, self.format(record)) for record in records]
+
     def post(self, *args, **kwargs):
         """Provide convenience method for subclasses to use when making POST requests."""
         return self.http_handler.post(*args, **kwargs)
@@ -0,0 +1,185 @@
+"""Log handler writing compressed frames along with an index of what each frame contains.
+
+The log file is a sequence of gzip members, so it remains readable with zcat. Each member, or
+frame, holds the output of a single job, test, and fixture node. A frame is described by a line of
+JSON in the sidecar index file, which lets one test's or one node's output be read back without
+decompressing the rest of the log file.
+"""
+
+import collections
+import gzip
+import json
+import logging
+
+# The amount of formatted output buffered before it's written out as frames.
+DEFAULT_BUFFER_BYTES = 1024 * 1024
+
+# The suffix appended to the name of the log file to get the name of its index file.
+INDEX_SUFFIX = ".idx"
+
+# The attribute of a logging.LogRecord holding the metadata set by a MetadataLogger.
+_METADATA_ATTR = "resmoke_metadata"
+
+# The metadata fields which are recorded in the index.
+METADATA_FIELDS = ("job", "test", "test_id", "node")
+
+
+class MetadataLogger(logging.Logger):
+    """Logger attaching the job, test, and fixture node to each of the records it creates.
+
+    The metadata is attached when the record is made rather than by a logging.Filter, so that the
+    logger has no filters and its output can still be batched by handlers.log_batch(). Records
+    propagated from child loggers are attributed by the child, so each logger whose output is
+    attributed must be a MetadataLogger.
+    """
+
+    def __init__(self, name, **metadata):
+        """Initialize the MetadataLogger."""
+        logging.Logger.__init__(self, name)
+        self.metadata = metadata
+
+    def makeRecord(self, *args, **kwargs):  # pylint: disable=invalid-name
+        """Make a record as logging.Logger does and attach the metadata to it."""
+        record = logging.Logger.makeRecord(self, *args, **kwargs)
+        setattr(record, _METADATA_ATTR, self.metadata)
+        return record
+
+
+def get_metadata(logger):
+    """Return the metadata attached by 'logger' if it is a MetadataLogger, or an empty dict."""
+    return getattr(logger, "metadata", {}) if isinstance(logger, MetadataLogger) else {}
+
+
+class _Stream(object):
+    """The buffered output of one job, test, and fixture node."""
+
+    def __init__(self, metadata):
+        self.metadata = metadata
+        self.chunks = []
+        self.start = None
+        self.end = None
+
+    def append(self, chunk, created):
+        self.chunks.append(chunk)
+        if self.start is None:
+            self.start = created
+        self.end = created
+
+
+class CompressedFileHandler(logging.Handler):
+    """Handler writing records to a file of compressed frames with a sidecar index.
+
+    Records are buffered in memory until 'buffer_bytes' of output is pending, at which point each
+    job, test, and fixture node with pending output gets a frame. Larger buffers produce fewer and
+    larger frames, which compress better.
+    """
+
+    def __init__(self, filename, mode="w", buffer_bytes=DEFAULT_BUFFER_BYTES, compresslevel=6):
+        """Initialize the CompressedFileHandler."""
+        logging.Handler.__init__(self)
+
+        if mode not in ("w", "a"):
+            raise ValueError("mode must be 'w' or 'a'")
+
+        self.filename = filename
+        self.buffer_bytes = buffer_bytes
+        self.compresslevel = compresslevel
+
+        self._file = open(filename, mode + "b")
+        self._index_file = open(filename + INDEX_SUFFIX, mode, encoding="utf-8")
+        self._streams = collections.OrderedDict()
+        self._num_buffered_bytes = 0
+
+    def emit(self, record):
+        """Buffer the formatted record, writing out frames if the buffer is full."""
+        try:
+            chunk = (self.format(record) + "\n").encode("utf-8")
+            metadata = getattr(record, _METADATA_ATTR, {})
+            key = tuple(sorted(metadata.items()))
+
+            stream = self._streams.get(key)
+            if stream is None:
+                stream = self._streams[key] = _Stream(metadata)
+            stream.append(chunk, record.created)
+
+            self._num_buffered_bytes += len(chunk)
+            if self._num_buffered_bytes >= self.buffer_bytes:
+                self._write_frames()
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+    def flush(self):
+        """Write out the buffered records."""
+        self.acquire()
+        try:
+            if not self._file.closed:
+                self._write_frames()
+        finally:
+            self.release()
+
+    def close(self):
+        """Write out the buffered records and close the files."""
+        self.acquire()
+        try:
+            if not self._file.closed:
+                self._write_frames()
+                self._file.close()
+                self._index_file.close()
+        finally:
+            self.release()
+        logging.Handler.close(self)
+
+    def _write_frames(self):
+        entries = []
+        for stream in self._streams.values():
+            frame = gzip.compress(b"".join(stream.chunks), compresslevel=self.compresslevel,
+                                  mtime=0)
+            entry = {
+                field: stream.metadata[field]
+                for field in METADATA_FIELDS if field in stream.metadata
+            }
+            entry.update({
+                "offset": self._file.tell(), "length": len(frame), "start": stream.start,
+                "end": stream.end, "num_lines": len(stream.chunks)
+            })
+            self._file.write(frame)
+            entries.append(entry)
+
+        self._streams.clear()
+        self._num_buffered_bytes = 0
+
+        # The frames are flushed before the index entries referring to them are written, so that a
+        # reader of a log file still being written never sees an entry without its frame.
+        self._file.flush()
+        for entry in entries:
+            self._index_file.write(json.dumps(entry) + "\n")
+        self._index_file.flush()
+
+
+def read_index(filename):
+    """Return the list of index entries of the compressed log file 'filename'."""
+    entries = []
+    with open(filename + INDEX_SUFFIX, encoding="utf-8") as index_file:
+        for line in index_file:
+            if line.strip():
+                entries.append(json.loads(line))
+    return entries
+
+
+def matches(entry, job=None, test=None, node=None):
+    """Return True if the index entry is for the given job, test name or id, and node."""
+    if job is not None and entry.get("job") != job:
+        return False
+    if test is not None and test not in (entry.get("test"), entry.get("test_id")):
+        return False
+    if node is not None and entry.get("node") != node:
+        return False
+    return True
+
+
+def extract(filename, entries):
+    """Yield the decompressed output of each of the index entries of 'filename'."""
+    with open(filename, "rb") as log_file:
+        for entry in entries:
+            log_file.seek(entry["offset"])
+            yield gzip.decompress(log_file.read(entry["length"]))
@@ -41,6 +41,26 @@ def stop_thread():
     return success
 
 
+def restart_thread_after_fork():
+    """Start a new flush thread in a child process created with os.fork().
+
+    Only the forking thread survives in the child process, so the flushes and closes the parent's
+    flush thread had scheduled are scheduled again on the new flush thread.
+    """
+
+    global _FLUSH_THREAD  # pylint: disable=global-statement
+    global _FLUSH_THREAD_LOCK  # pylint: disable=global-statement
+    _FLUSH_THREAD_LOCK = threading.Lock()
+
+    parent_flush_thread = _FLUSH_THREAD
+    _FLUSH_THREAD = None
+    start_thread()
+
+    if parent_flush_thread is not None:
+        for action in parent_flush_thread.get_scheduled_actions():
+            _FLUSH_THREAD.submit(action, 0.0)
+
+
 def flush_after(handler, delay):
     """Add 'handler' to the queue so that it is flushed after 'delay' seconds by the flush thread.
 
@@ -155,6 +175,11 @@ class _FlushThread(threading.Thread):
         self.__schedule_updated.set()
         return event
 
+    def get_scheduled_actions(self):
+        """Return the actions which are scheduled but haven't run yet."""
+
+        return [event.action for event in self.__scheduler.queue]
+
     def cancel_event(self, event):
         """Attempt to cancel the specified event.
 
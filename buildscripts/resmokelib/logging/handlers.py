@@ -95,10 +95,30 @@ class BufferedHandler(logging.Handler):
         immediately process the buffer.
         """
 
-        processed_record = self.process_record(record)
+        self.__append_to_buffer([self.process_record(record)])
+
+    def process_records(self, records):
+        """Apply process_record() to each of the records in a batch."""
+
+        return [self.process_record(record) for record in records]
+
+    def handle_batch(self, records):
+        """Emit a batch of records with a single acquisition of the buffer's lock.
+
+        This is equivalent to calling handle() on each of the records in turn.
+        """
+
+        if self.filters:
+            records = [record for record in records if self.filter(record)]
+
+        if records:
+            self.__append_to_buffer(self.process_records(records))
+
+    def __append_to_buffer(self, processed_records):
+        """Add the processed records to the buffer and schedule a flush() if necessary."""
 
         with self.__emit_lock:
-            self.__emit_buffer.append(processed_record)
+            self.__emit_buffer.extend(processed_records)
 
             if self.__flush_event is None:
                 # Now that we've added our first record to the buffer, we schedule a call to flush()
@@ -161,6 +181,82 @@ class BufferedHandler(logging.Handler):
         logging.Handler.close(self)
 
 
+def log_batch(logger, level, messages):
+    """Log each of the messages at 'level' as though logger.log() was called for it.
+
+    The records are handed to each handler of 'logger' and its ancestors as a single batch. Handlers
+    with a handle_batch() method, such as BufferedHandler, receive the whole batch at once and
+    stream handlers write it out with a single acquisition of their lock.
+    """
+
+    if not messages or not logger.isEnabledFor(level):
+        return
+
+    batch_handlers = _get_batch_handlers(logger, level)
+    if batch_handlers is None:
+        for message in messages:
+            logger.log(level, message)
+        return
+
+    records = [
+        logger.makeRecord(logger.name, level, "(unknown file)", 0, message, None, None)
+        for message in messages
+    ]
+
+    for handler in batch_handlers:
+        if hasattr(handler, "handle_batch"):
+            handler.handle_batch(records)
+        elif _can_write_batch(handler):
+            _write_batch(handler, records)
+        else:
+            for record in records:
+                handler.handle(record)
+
+
+def _get_batch_handlers(logger, level):
+    """Return the handlers logger.log() would call for a record at 'level'.
+
+    None is returned if the records must go through logger.log() instead, either because 'logger'
+    filters its records or because no handler would have been found for them.
+    """
+
+    if not isinstance(logger, logging.Logger) or logger.filters or logger.disabled:
+        return None
+
+    batch_handlers = []
+    current = logger
+    while current is not None:
+        batch_handlers.extend(handler for handler in current.handlers if level >= handler.level)
+        if not current.propagate:
+            break
+        current = current.parent
+
+    return batch_handlers if batch_handlers else None
+
+
+def _can_write_batch(handler):
+    """Return True if 'handler' is a stream handler whose emit() can be done in bulk."""
+
+    # A FileHandler opened with delay=True doesn't have a stream until its first emit().
+    return (type(handler).emit is logging.StreamHandler.emit and not handler.filters
+            and handler.stream is not None)
+
+
+def _write_batch(handler, records):
+    """Write the formatted records to the stream of 'handler' and flush it once."""
+
+    handler.acquire()
+    try:
+        try:
+            handler.stream.write("".join(
+                handler.format(record) + handler.terminator for record in records))
+            handler.flush()
+        except Exception:  # pylint: disable=broad-except
+            handler.handleError(records[0])
+    finally:
+        handler.release()
+
+
 class HTTPHandler(object):
     """A class which sends data to a web server using POST requests."""
 
@@ -9,6 +9,7 @@ from buildscripts.resmokelib import config
 from buildscripts.resmokelib import errors
 from buildscripts.resmokelib.core import redirect as redirect_lib
 from buildscripts.resmokelib.logging import buildlogger
+from buildscripts.resmokelib.logging import compressed
 from buildscripts.resmokelib.logging import formatters
 from buildscripts.resmokelib.logging import jasper_logger
 
@@ -125,7 +126,7 @@ def new_resmoke_logger():
 def new_job_logger(test_kind, job_num):
     """Create a new logger for a given job thread."""
     name = "executor:%s:job%d" % (test_kind, job_num)
-    logger = logging.Logger(name)
+    logger = compressed.MetadataLogger(name, job=job_num)
     logger.parent = ROOT_EXECUTOR_LOGGER
 
     def _prepare_build_id(job_num):
@@ -158,7 +159,7 @@ def new_job_logger(test_kind, job_num):
 def new_fixture_logger(fixture_class, job_num):
     """Create a logger for a particular fixture class."""
     name = "%s:job%d" % (fixture_class, job_num)
-    logger = logging.Logger(name)
+    logger = compressed.MetadataLogger(name, job=job_num)
     logger.parent = ROOT_FIXTURE_LOGGER
     if config.SPAWN_USING == "jasper":
         _add_jasper_logger_handler(logger, job_num)
@@ -172,7 +173,7 @@ def new_fixture_logger(fixture_class, job_num):
 def new_fixture_node_logger(fixture_class, job_num, node_name):
     """Create a logger for a particular element in a multi-process fixture."""
     name = "%s:job%d:%s" % (fixture_class, job_num, node_name)
-    logger = logging.Logger(name)
+    logger = compressed.MetadataLogger(name, job=job_num, node=node_name)
     logger.parent = _FIXTURE_LOGGER_REGISTRY[job_num]
     return logger
 
@@ -191,7 +192,7 @@ def new_testqueue_logger(test_kind):
 def new_test_logger(test_shortname, test_basename, command, parent, job_num, test_id, job_logger):
     """Create a new test logger that will be a child of the given parent."""
     name = "%s:%s" % (parent.name, test_shortname)
-    logger = logging.Logger(name)
+    logger = compressed.MetadataLogger(name, job=job_num, test=test_basename, test_id=str(test_id))
     logger.parent = parent
 
     def _get_test_endpoint(job_num, test_basename, command, meta_logger):
@@ -225,7 +226,9 @@ def new_test_logger(test_shortname, test_basename, command, parent, job_num, tes
 
 def new_test_thread_logger(parent, test_kind, thread_id):
     """Create a new test thread logger that will be the child of the given parent."""
-    logger = logging.Logger("%s:%s" % (test_kind, thread_id))
+    # The output of the thread is attributed to the test it's running for.
+    logger = compressed.MetadataLogger("%s:%s" % (test_kind, thread_id),
+                                       **compressed.get_metadata(parent))
     logger.parent = parent
     return logger
 
@@ -233,7 +236,7 @@ def new_test_thread_logger(parent, test_kind, thread_id):
 def new_hook_logger(hook_class, job_num):
     """Create a new hook logger from a given fixture logger."""
     name = "{}:job{:d}".format(hook_class, job_num)
-    logger = logging.Logger(name)
+    logger = compressed.MetadataLogger(name, job=job_num)
     logger.parent = _FIXTURE_LOGGER_REGISTRY[job_num]
     return logger
 
@@ -247,6 +250,10 @@ def _add_handler(logger, handler_info, formatter):
     if handler_class == "logging.FileHandler":
         handler = logging.FileHandler(filename=handler_info["filename"], mode=handler_info.get(
             "mode", "w"))
+    elif handler_class == "compressed":
+        handler = compressed.CompressedFileHandler(
+            filename=handler_info["filename"], mode=handler_info.get("mode", "w"),
+            buffer_bytes=handler_info.get("buffer_bytes", compressed.DEFAULT_BUFFER_BYTES))
     elif handler_class == "logging.NullHandler":
         handler = logging.NullHandler()
     elif handler_class == "logging.StreamHandler":
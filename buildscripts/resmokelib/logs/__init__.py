@@ -0,0 +1,95 @@
+"""Read the output of a test or fixture node from a compressed resmoke.py log file."""
+
+import sys
+
+from buildscripts.resmokelib.logging import compressed
+from buildscripts.resmokelib.plugin import PluginInterface, Subcommand
+
+_COMMAND = "logs"
+
+
+class Logs(Subcommand):
+    """Print the output matching the given job, test, and node from a compressed log file."""
+
+    def __init__(self, filename, job=None, test=None, node=None, list_entries=False, output=None):
+        """Initialize Logs."""
+        self.filename = filename
+        self.job = job
+        self.test = test
+        self.node = node
+        self.list_entries = list_entries
+        self.output = output if output is not None else sys.stdout.buffer
+
+    def execute(self):
+        """Print the matching output, or a summary of it if listing."""
+        entries = [
+            entry for entry in compressed.read_index(self.filename)
+            if compressed.matches(entry, job=self.job, test=self.test, node=self.node)
+        ]
+
+        if self.list_entries:
+            self._list(entries)
+            return
+
+        for data in compressed.extract(self.filename, entries):
+            self.output.write(data)
+        self.output.flush()
+
+    def _list(self, entries):
+        """Print the time range and number of lines of each job, test, and node."""
+        summaries = {}
+        for entry in entries:
+            key = tuple(entry.get(field) for field in compressed.METADATA_FIELDS)
+            summary = summaries.setdefault(key, {"start": entry["start"], "num_lines": 0})
+            summary["end"] = entry["end"]
+            summary["num_lines"] += entry["num_lines"]
+
+        for (key, summary) in summaries.items():
+            description = " ".join("{}={}".format(field, value)
+                                   for (field, value) in zip(compressed.METADATA_FIELDS, key)
+                                   if value is not None)
+            line = "{} start={:.3f} end={:.3f} lines={}\n".format(description or "(resmoke.py)",
+                                                                  summary["start"], summary["end"],
+                                                                  summary["num_lines"])
+            self.output.write(line.encode("utf-8"))
+        self.output.flush()
+
+
+class LogsPlugin(PluginInterface):
+    """Read compressed resmoke.py log files."""
+
+    def add_subcommand(self, subparsers):
+        """
+        Add 'logs' subcommand.
+
+        :param subparsers: argparse parser to add to
+        :return: None
+        """
+        parser = subparsers.add_parser(
+            _COMMAND, help=("Print the output of a test or fixture node from a log file written"
+                            " with the 'compressed' logging handler."))
+        parser.add_argument("filename", metavar="FILE", help="The compressed log file.")
+        parser.add_argument("--job", dest="job", type=int, metavar="JOB_NUM",
+                            help="Only print the output of job number JOB_NUM.")
+        parser.add_argument("--test", dest="test", metavar="TEST",
+                            help="Only print the output of TEST, a test file or test id.")
+        parser.add_argument("--node", dest="node", metavar="NODE",
+                            help="Only print the output of the fixture node named NODE.")
+        parser.add_argument("--list", dest="list_entries", action="store_true",
+                            help="List the jobs, tests, and nodes with output instead.")
+
+    def parse(self, subcommand, parser, parsed_args, **kwargs):
+        """
+        Return Logs if command is one we recognize.
+
+        :param subcommand: equivalent to parsed_args.command
+        :param parser: parser used
+        :param parsed_args: output of parsing
+        :param kwargs: additional args
+        :return: None or a Subcommand
+        """
+        if subcommand != _COMMAND:
+            return None
+
+        return Logs(parsed_args.filename, job=parsed_args.job, test=parsed_args.test,
+                    node=parsed_args.node, list_entries=parsed_args.list_entries)
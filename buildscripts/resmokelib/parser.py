@@ -5,6 +5,7 @@ import shlex
 
 from buildscripts.resmokelib import configure_resmoke
 from buildscripts.resmokelib.hang_analyzer import HangAnalyzerPlugin
+from buildscripts.resmokelib.logs import LogsPlugin
 from buildscripts.resmokelib.powercycle import PowercyclePlugin
 from buildscripts.resmokelib.run import RunPlugin
 from buildscripts.resmokelib.setup_multiversion import SetupMultiversionPlugin
@@ -16,6 +17,7 @@ _PLUGINS = [
     UndoDbPlugin(),
     SetupMultiversionPlugin(),
     PowercyclePlugin(),
+    LogsPlugin(),
 ]
 
 
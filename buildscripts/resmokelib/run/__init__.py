@@ -10,6 +10,7 @@ import shlex
 import subprocess
 import sys
 import tarfile
+import threading
 import time
 
 import curatorbin
@@ -26,12 +27,14 @@ from buildscripts.resmokelib import parser as main_parser
 from buildscripts.resmokelib import config
 from buildscripts.resmokelib import configure_resmoke
 from buildscripts.resmokelib import errors
+from buildscripts.resmokelib import historyfile
 from buildscripts.resmokelib import logging
 from buildscripts.resmokelib import reportfile
 from buildscripts.resmokelib import sighandler
 from buildscripts.resmokelib import suitesconfig
 from buildscripts.resmokelib import testing
 from buildscripts.resmokelib import utils
+from buildscripts.resmokelib.core import network
 from buildscripts.resmokelib.core import process
 from buildscripts.resmokelib.core import jasper_process
 from buildscripts.resmokelib.core import redirect as redirect_lib
@@ -53,6 +56,7 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
         self._exec_logger = None
         self._resmoke_logger = None
         self._archive = None
+        self._fixture_pool = None
         self._jasper_server = None
         self._interrupted = False
         self._exit_code = 0
@@ -159,6 +163,7 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
         """List which tests would run and which tests would be excluded in a resmoke invocation."""
         suites = self._get_suites()
         for suite in suites:
+            self._resolve_auto_jobs(suite)
             self._shuffle_tests(suite)
             sb = ["Tests that would be run in suite {}".format(suite.get_display_name())]
             sb.extend(suite.tests or ["(no tests)"])
@@ -192,15 +197,23 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
         try:
             suites = self._get_suites()
             self._setup_archival()
+            self._setup_fixture_pool()
             if config.SPAWN_USING == "jasper":
                 self._setup_jasper()
             self._setup_signal_handler(suites)
 
-            for suite in suites:
-                self._interrupted = self._run_suite(suite)
-                if self._interrupted or (suite.options.fail_fast and suite.return_code != 0):
+            if config.CONCURRENT_SUITES and len(suites) > 1:
+                (self._interrupted, stopping_suite) = self._run_suites_concurrently(suites)
+                if stopping_suite is not None:
                     self._log_resmoke_summary(suites)
-                    self.exit(suite.return_code)
+                    self.exit(stopping_suite.return_code)
+            else:
+                for suite in suites:
+                    self._resolve_auto_jobs(suite)
+                    self._interrupted = self._run_suite(suite)
+                    if self._interrupted or (suite.options.fail_fast and suite.return_code != 0):
+                        self._log_resmoke_summary(suites)
+                        self.exit(suite.return_code)
 
             self._log_resmoke_summary(suites)
 
@@ -208,19 +221,100 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
             exit_code = max(suite.return_code for suite in suites)
             self.exit(exit_code)
         finally:
+            self._exit_fixture_pool()
             self._exit_archival()
             if suites:
                 reportfile.write(suites)
+                historyfile.write(suites)
 
-    def _run_suite(self, suite):
+    def _run_suite(self, suite, job_budget=None, job_num_offset=0):
         """Run a test suite."""
         self._log_suite_config(suite)
         suite.record_suite_start()
-        interrupted = self._execute_suite(suite)
+        interrupted = self._execute_suite(suite, job_budget=job_budget,
+                                          job_num_offset=job_num_offset)
         suite.record_suite_end()
         self._log_suite_summary(suite)
         return interrupted
 
+    def _run_suites_concurrently(self, suites):
+        """Run all of the suites at the same time.
+
+        The suites share a budget of config.JOBS job slots, so no more than that many tests run at
+        once, and the slots are shared among the suites' jobs so that no more than that many
+        fixtures are set up. Each suite's jobs are numbered after those of the previous suites so
+        that their port ranges are disjoint. If a suite is interrupted or fails with fail_fast
+        enabled, then the other suites are stopped.
+
+        Return a (interrupted, stopping suite) pair, where the stopping suite is the suite which
+        caused the others to stop, or None.
+        """
+        job_budget = testing.job_budget.JobBudget(config.JOBS)
+        for suite in suites:
+            self._resolve_auto_jobs(suite)
+        self._share_jobs(suites, job_budget)
+        self._exec_logger.info("Running %d suites concurrently with at most %d tests at once.",
+                               len(suites), job_budget.num_slots)
+
+        # Holds the (suite, interrupted) pair for the suite which stopped the job budget.
+        stopped_by = []
+
+        def run_suite(suite, job_num_offset):
+            interrupted = self._run_suite(suite, job_budget=job_budget,
+                                          job_num_offset=job_num_offset)
+            if interrupted or (suite.options.fail_fast and suite.return_code != 0):
+                if job_budget.stop():
+                    stopped_by.append((suite, interrupted))
+
+        threads = []
+        job_num_offset = 0
+        for suite in suites:
+            thread = threading.Thread(target=run_suite, args=(suite, job_num_offset),
+                                      name="suite-{}".format(suite.get_display_name()))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+            job_num_offset += suite.options.num_jobs
+
+        user_interrupted = False
+        for thread in threads:
+            while thread.is_alive():
+                try:
+                    # Need to pass a timeout to join() so that KeyboardInterrupt exceptions are
+                    # propagated.
+                    thread.join(job_budget.POLL_INTERVAL_SECS)
+                except (KeyboardInterrupt, SystemExit):
+                    user_interrupted = True
+                    job_budget.stop()
+
+        if stopped_by:
+            (stopping_suite, interrupted) = stopped_by[0]
+            return (user_interrupted or interrupted, stopping_suite)
+        return (user_interrupted, None)
+
+    def _share_jobs(self, suites, job_budget):
+        """Give the suites which run concurrently no more jobs in total than the budget has slots.
+
+        Exit if the port ranges of all of the jobs don't fit below the highest port.
+        """
+        num_jobs = job_budget.share_jobs([suite.options.num_jobs for suite in suites])
+        for (suite, suite_num_jobs) in zip(suites, num_jobs):
+            if suite_num_jobs < suite.options.num_jobs:
+                self._exec_logger.info(
+                    "Reducing the number of jobs of suite %s from %d to %d to share the %d job"
+                    " slots with the other suites.", suite.get_display_name(),
+                    suite.options.num_jobs, suite_num_jobs, job_budget.num_slots)
+                suite.set_num_jobs(suite_num_jobs)
+
+        max_num_jobs = network.PortAllocator.max_num_jobs()
+        if max_num_jobs is not None and sum(num_jobs) > max_num_jobs:
+            self._resmoke_logger.error(
+                "The %d suites need %d jobs in total, but only %d jobs have a range of ports"
+                " starting at base port %d. Run fewer suites concurrently, or use --dynamicPorts"
+                " or a lower base port.", len(suites), sum(num_jobs), max_num_jobs,
+                config.BASE_PORT)
+            self.exit(1)
+
     def _log_resmoke_summary(self, suites):
         """Log a summary of the resmoke run."""
         time_taken = time.time() - self.__start_time
@@ -233,7 +327,7 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
         self._resmoke_logger.info("Summary of %s suite: %s", suite.get_display_name(),
                                   self._get_suite_summary(suite))
 
-    def _execute_suite(self, suite):
+    def _execute_suite(self, suite, job_budget=None, job_num_offset=0):
         """Execute a suite and return True if interrupted, False otherwise."""
         self._shuffle_tests(suite)
         if not suite.tests:
@@ -243,7 +337,9 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
         executor_config = suite.get_executor_config()
         try:
             executor = testing.executor.TestSuiteExecutor(
-                self._exec_logger, suite, archive_instance=self._archive, **executor_config)
+                self._exec_logger, suite, archive_instance=self._archive,
+                fixture_pool=self._fixture_pool, job_budget=job_budget,
+                job_num_offset=job_num_offset, **executor_config)
             executor.run()
         except (errors.UserInterrupt, errors.LoggerRuntimeConfigError) as err:
             self._exec_logger.error("Encountered an error when running %ss of suite %s: %s",
@@ -260,10 +356,28 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
             return False
         return False
 
+    def _resolve_auto_jobs(self, suite):
+        """Size the number of jobs of the suite to the host if --jobs=auto was specified."""
+        if not config.AUTO_JOBS:
+            return
+        max_num_jobs = suite.options.num_jobs
+        (num_jobs, reason) = testing.admission.resolve_num_jobs(suite)
+        self._exec_logger.info(
+            "Chose to run %d job(s) out of at most %d for %ss in suite %s, for %s.", num_jobs,
+            max_num_jobs, suite.test_kind, suite.get_display_name(), reason)
+        suite.set_num_jobs(num_jobs)
+
     def _shuffle_tests(self, suite):
-        """Shuffle the tests if the shuffle cli option was set."""
+        """Shuffle the tests if the shuffle cli option was set.
+
+        If the shuffle cli option was left as "auto" with --jobs=auto, then the tests are shuffled
+        only if the suite runs more than one job.
+        """
         random.seed(config.RANDOM_SEED)
-        if not config.SHUFFLE:
+        shuffle = config.SHUFFLE
+        if shuffle is None:
+            shuffle = suite.options.num_jobs > 1
+        if not shuffle:
             return
         self._exec_logger.info("Shuffling order of tests for %ss in suite %s. The seed is %d.",
                                suite.test_kind, suite.get_display_name(), config.RANDOM_SEED)
@@ -304,13 +418,24 @@ class TestRunner(Subcommand):  # pylint: disable=too-many-instance-attributes
         if config.ARCHIVE_FILE:
             self._archive = utils.archival.Archival(
                 archival_json_file=config.ARCHIVE_FILE, limit_size_mb=config.ARCHIVE_LIMIT_MB,
-                limit_files=config.ARCHIVE_LIMIT_TESTS, logger=self._exec_logger)
+                limit_files=config.ARCHIVE_LIMIT_TESTS, logger=self._exec_logger,
+                local_dir=config.ARCHIVE_LOCAL_DIR)
 
     def _exit_archival(self):
         """Finish up archival tasks before exit if enabled in the cli options."""
         if self._archive and not self._interrupted:
             self._archive.exit()
 
+    def _setup_fixture_pool(self):
+        """Set up the pool of fixtures shared between suites if enabled in the cli options."""
+        if config.REUSE_FIXTURES:
+            self._fixture_pool = testing.fixture_pool.FixturePool(self._exec_logger)
+
+    def _exit_fixture_pool(self):
+        """Tear down the fixtures remaining in the fixture pool."""
+        if self._fixture_pool and not self._fixture_pool.teardown_all():
+            self._exec_logger.warning("Teardown of the pooled fixtures was not successful")
+
     def _setup_jasper(self):
         """Start up the jasper process manager."""
         curator_path = self._get_jasper_reqs()
@@ -527,6 +652,19 @@ class TestRunnerEvg(TestRunner):
         return suites
 
 
+def _parse_jobs(value):
+    """Return the value of the --jobs option, which is a positive integer or 'auto'."""
+    if value == "auto":
+        return value
+    try:
+        jobs = int(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError("must be a positive integer or 'auto'") from err
+    if jobs < 1:
+        raise argparse.ArgumentTypeError("must be a positive integer or 'auto'")
+    return jobs
+
+
 class RunPlugin(PluginInterface):
     """Interface to parsing."""
 
@@ -597,6 +735,31 @@ class RunPlugin(PluginInterface):
                   " spawned by resmoke.py or the tests themselves. Each fixture and Job"
                   " allocates a contiguous range of ports."))
 
+        parser.add_argument(
+            "--dynamicPorts", action="store_true", dest="dynamic_ports",
+            help=("Leases ports above the base port as the fixtures and tests of each Job need"
+                  " them instead of giving each Job a fixed range of ports. Ports which can't"
+                  " be bound are skipped, the ports of a fixture are returned once it is torn"
+                  " down, and concurrent resmoke.py invocations on the same machine coordinate"
+                  " their leases through the file given by --portLeasesFile."))
+
+        parser.add_argument(
+            "--portLeasesFile", dest="port_leases_file", metavar="PATH",
+            help=("The file in which resmoke.py invocations using --dynamicPorts record the"
+                  " ports they leased. Defaults to '%s'." % config.DEFAULT_PORT_LEASES_FILE))
+
+        parser.add_argument(
+            "--reuseFixtures", action="store_true", dest="reuse_fixtures",
+            help=("Keeps fixtures running after a suite finishes so that later suites with an"
+                  " identical fixture configuration reuse them after dropping all non-system"
+                  " databases, rather than starting new ones."))
+
+        parser.add_argument(
+            "--concurrentSuites", action="store_true", dest="concurrent_suites",
+            help=("Runs the suites at the same time rather than one after another. The suites"
+                  " share JOBS jobs, so at most JOBS fixtures are set up and JOBS tests run at"
+                  " once across all of the suites, unless there are more suites than JOBS."))
+
         parser.add_argument("--continueOnFailure", action="store_true", dest="continue_on_failure",
                             help="Executes all tests in all suites, even if some of them fail.")
 
@@ -615,6 +778,13 @@ class RunPlugin(PluginInterface):
                   " specified tags will be excluded from any suites that are run."
                   " The tag '{}' is implicitly part of this list.".format(config.EXCLUDED_TAG)))
 
+        parser.add_argument(
+            "--fixtureSnapshotDir", dest="fixture_snapshot_dir", metavar="DIR",
+            help=("Saves the dbpaths of each replica set fixture to DIR once it is initialized."
+                  " Later replica sets using the same mongod binary, options, and ports start"
+                  " from a copy of the snapshot instead of being initiated again. The files are"
+                  " cloned rather than copied on filesystems supporting copy-on-write."))
+
         parser.add_argument("--genny", dest="genny_executable", metavar="PATH",
                             help="The path to the genny executable for resmoke to use.")
 
@@ -645,12 +815,35 @@ class RunPlugin(PluginInterface):
                   " (if MODE=tests). Defaults to MODE=%%default."))
 
         parser.add_argument(
-            "-j", "--jobs", type=int, dest="jobs", metavar="JOBS",
+            "-j", "--jobs", type=_parse_jobs, dest="jobs", metavar="JOBS",
             help=("The number of Job instances to use. Each instance will receive its"
-                  " own MongoDB deployment to dispatch tests to."))
+                  " own MongoDB deployment to dispatch tests to. If 'auto', then the number"
+                  " of Job instances is chosen from the number of processes in the fixture"
+                  " and the CPUs and memory of the host, and tests are held back while the"
+                  " host's load average or memory usage is too high."))
+
+        parser.add_argument(
+            "--jobProcesses", action="store_true", dest="job_processes",
+            help=("Runs each Job instance and its MongoDB deployment in a worker process forked"
+                  " from resmoke.py instead of a thread, so the jobs don't contend on the Python"
+                  " GIL. The log output and test reports are sent back to resmoke.py. Not"
+                  " supported on Windows, or with --repeatTestsSecs, --reuseFixtures, or"
+                  " --concurrentSuites; the jobs run as threads then."))
 
         parser.set_defaults(logger_file="console")
 
+        parser.add_argument(
+            "--jstestTagsCacheFile", dest="jstest_tags_cache_file", metavar="PATH",
+            help=("The file in which the tags of JavaScript tests are cached between runs. The"
+                  " cache is only written if the directory containing it exists. Specify 'off' to"
+                  " always read the tags from the test files. Defaults to '%s'." %
+                  config.DEFAULT_JSTEST_TAGS_CACHE_FILE))
+
+        parser.add_argument(
+            "--logMultiplexer", action="store_true", dest="log_multiplexer",
+            help="Read the output of every process spawned by resmoke.py on a single thread rather"
+            " than on two threads per process. Has no effect on Windows.")
+
         parser.add_argument("--mongo", dest="mongo_executable", metavar="PATH",
                             help="The path to the mongo shell executable for resmoke.py to use.")
 
@@ -756,6 +949,30 @@ class RunPlugin(PluginInterface):
             help=("Randomizes the order in which tests are executed. This is equivalent"
                   " to specifying --shuffleMode=on."))
 
+        parser.add_argument(
+            "--historicRuntimeFile", dest="historic_runtime_file", metavar="HISTORIC_RUNTIME_FILE",
+            help=("A JSON file of historic test runtimes in the format of Evergreen's test stats."
+                  " When specified, the tests expected to run the longest are started first to"
+                  " reduce the time the last job spends running alone. Cannot be used with"
+                  " --shuffle."))
+
+        parser.add_argument(
+            "--runtimeHistoryFile", dest="runtime_history_file", metavar="RUNTIME_HISTORY_FILE",
+            help=("Append the runtime, hook overhead, and outcome of each test to this local"
+                  " runtime history file."))
+
+        parser.add_argument(
+            "--orderByRuntimeHistory", action="store_true", dest="order_by_runtime_history",
+            help=("Start the tests with the longest moving average runtime in the"
+                  " --runtimeHistoryFile first when --historicRuntimeFile isn't specified."
+                  " Cannot be used with --shuffle."))
+
+        parser.add_argument(
+            "--schedulerLookahead", type=int, dest="scheduler_lookahead", metavar="N",
+            help=("The number of upcoming tests each job claims at a time when"
+                  " --historicRuntimeFile or --orderByRuntimeHistory is specified. Jobs which"
+                  " run out of tests steal unstarted tests claimed by other jobs. Defaults to 1."))
+
         parser.add_argument(
             "--shuffleMode", action="store", dest="shuffle", choices=("on", "off", "auto"),
             metavar="ON|OFF|AUTO",
@@ -824,6 +1041,12 @@ class RunPlugin(PluginInterface):
             metavar="ON|OFF", help="Enable or disable linear chaining for tests using "
             "ReplicaSetFixture.")
 
+        parser.add_argument(
+            "--fastReplSetInitiate", action="store_true", dest="fast_replset_initiate",
+            help="Start the nodes of each ReplicaSetFixture concurrently and initiate the replica"
+            " set with all of its members at once. Has no effect on replica sets with mixed binary"
+            " versions.")
+
         parser.add_argument(
             "--backupOnRestartDir", action="store", type=str, dest="backup_on_restart_dir",
             metavar="DIRECTORY", help=
@@ -890,6 +1113,13 @@ class RunPlugin(PluginInterface):
             "--reportFile", dest="report_file", metavar="REPORT",
             help="Writes a JSON file with test status and timing information.")
 
+        internal_options.add_argument(
+            "--resourceSampleIntervalMs", type=int, dest="resource_sample_interval_ms",
+            metavar="MILLISECONDS",
+            help=("Samples the CPU, memory, and disk usage of the fixture and test processes every"
+                  " MILLISECONDS and includes the peak and mean usage of each test in the report"
+                  " file. Only supported on Linux."))
+
         internal_options.add_argument(
             "--staggerJobs", action="store", dest="stagger_jobs", choices=("on", "off"),
             metavar="ON|OFF", help=("Enables or disables the stagger of launching resmoke jobs."
@@ -911,6 +1141,11 @@ class RunPlugin(PluginInterface):
             help=("Sets the maximum number of tests to archive to S3. A value"
                   " of 0 indicates there is no limit."))
 
+        evergreen_options.add_argument(
+            "--archiveLocalDir", dest="archive_local_dir", metavar="DIR",
+            help=("Copies archived files to DIR instead of uploading them to S3. This enables"
+                  " archival outside of an Evergreen task."))
+
         evergreen_options.add_argument("--buildId", dest="build_id", metavar="BUILD_ID",
                                        help="Sets the build ID of the task.")
 
@@ -58,6 +58,18 @@ class TestFileExplorer(object):
         """
         return jscomment.get_tags(file_path)
 
+    @staticmethod
+    def jstest_tags_for_files(file_paths):  # noqa: D406,D407,D411,D413
+        """Extract the tags from many JavaScript test files at once.
+
+        The tags are read from the cache file given by config.JSTEST_TAGS_CACHE_FILE for any
+        files which haven't changed since they were last read.
+        See buildscripts.resmokelib.utils.jscomment.get_tags_for_files().
+        Returns:
+            A dict of each file path to its list of tags.
+        """
+        return jscomment.get_tags_for_files(file_paths, config.JSTEST_TAGS_CACHE_FILE)
+
     @staticmethod
     def read_root_file(root_file_path):  # noqa: D406,D407,D411,D413
         """Read a file containing the list of root test files.
@@ -153,6 +165,7 @@ class _TestList(object):
         self._test_file_explorer = test_file_explorer
         self._tests_are_files = tests_are_files
         self._roots = self._expand_files(roots) if tests_are_files else roots
+        self._roots_set = set(self._roots)
         self._filtered = set(self._roots)
 
     def _expand_files(self, tests):
@@ -184,7 +197,7 @@ class _TestList(object):
                 expanded_include_files.add(os.path.normpath(path))
         self._filtered = self._filtered & expanded_include_files
         if force:
-            self._filtered |= set(self._roots) & expanded_include_files
+            self._filtered |= self._roots_set & expanded_include_files
 
     def exclude_files(self, exclude_files):  # noqa: D406,D407,D411,D413
         """Exclude from the test list the files that match elements from 'exclude_files'.
@@ -199,12 +212,10 @@ class _TestList(object):
             raise TypeError("_TestList does not contain files.")
         for path in exclude_files:
             if self._test_file_explorer.is_glob_pattern(path):
-                paths = self._test_file_explorer.iglob(path)
-                for expanded_path in paths:
-                    self._filtered.discard(expanded_path)
+                self._filtered.difference_update(self._test_file_explorer.iglob(path))
             else:
                 path = os.path.normpath(path)
-                if path not in self._roots:
+                if path not in self._roots_set:
                     raise ValueError(
                         ("Excluded test file {} does not exist, perhaps it was renamed or removed"
                          " , and should be modified in, or removed from, the exclude_files list.".
@@ -222,6 +233,10 @@ class _TestList(object):
         """
         self._filtered = {test for test in self._filtered if tag_expression(get_tags(test))}
 
+    def get_filtered_tests(self):
+        """Return the tests which haven't been filtered out so far, in no particular order."""
+        return list(self._filtered)
+
     def include_any_pattern(self, patterns):
         """Filter the test list to only include tests that match any provided glob patterns."""
 
@@ -241,13 +256,17 @@ class _TestList(object):
         """
         tests = []
         excluded = []
+        seen = set()
         for test in self._roots:
             if test in self._filtered:
-                if config.TEST_FILES or test not in tests:
+                if config.TEST_FILES or test not in seen:
                     # Allow duplicate tests if the tests were explicitly duplicated on the CLI invocation or replay file.
                     tests.append(test)
-            elif test not in excluded:
+            elif test in seen:
+                continue
+            else:
                 excluded.append(test)
+            seen.add(test)
         return tests, excluded
 
 
@@ -256,6 +275,41 @@ class _TestList(object):
 ##############################
 
 
+class _TagVocabulary(object):
+    """Interns tags as the bits of an integer so that a set of tags can be matched as a bitmask."""
+
+    def __init__(self):
+        self.__bits = {}
+
+    def intern(self, tag):
+        """Return the bit representing 'tag', assigning it a new bit if necessary."""
+        bit = self.__bits.get(tag)
+        if bit is None:
+            bit = 1 << len(self.__bits)
+            self.__bits[tag] = bit
+        return bit
+
+    def mask(self, tags):
+        """Return the bitmask of 'tags'. Tags outside of the vocabulary can't affect a match."""
+        bits = self.__bits
+        mask = 0
+        for tag in tags:
+            mask |= bits.get(tag, 0)
+        return mask
+
+
+def _split_match_children(children, vocabulary):
+    """Return the bits of the children which match a single tag and compile the other children."""
+    bits = 0
+    matchers = []
+    for child in children:
+        if isinstance(child, _MatchExpression):
+            bits |= child.compile_bit(vocabulary)
+        else:
+            matchers.append(child.compile(vocabulary))
+    return (bits, matchers)
+
+
 class _AllOfExpression(object):
     """A tag matching expression that requires all child expressions to match."""
 
@@ -265,6 +319,17 @@ class _AllOfExpression(object):
     def __call__(self, file_tags):
         return all(child(file_tags) for child in self.__children)
 
+    def compile(self, vocabulary):
+        """Return a callable that takes a bitmask of tags and indicates whether it matches."""
+        (required, matchers) = _split_match_children(self.__children, vocabulary)
+        if not matchers:
+            return lambda mask: mask & required == required
+
+        def matches(mask):
+            return mask & required == required and all(matcher(mask) for matcher in matchers)
+
+        return matches
+
 
 class _AnyOfExpression(object):
     """A tag matching expression that requires at least one of the child expressions."""
@@ -275,6 +340,13 @@ class _AnyOfExpression(object):
     def __call__(self, file_tags):
         return any(child(file_tags) for child in self.__children)
 
+    def compile(self, vocabulary):
+        """Return a callable that takes a bitmask of tags and indicates whether it matches."""
+        (any_of, matchers) = _split_match_children(self.__children, vocabulary)
+        if not matchers:
+            return lambda mask: mask & any_of != 0
+        return lambda mask: mask & any_of != 0 or any(matcher(mask) for matcher in matchers)
+
 
 class _NotExpression(object):
     """A tag matching expression that matches if and only if the child expression does not match."""
@@ -285,6 +357,11 @@ class _NotExpression(object):
     def __call__(self, file_tags):
         return not self.__child(file_tags)
 
+    def compile(self, vocabulary):
+        """Return a callable that takes a bitmask of tags and indicates whether it matches."""
+        matcher = self.__child.compile(vocabulary)
+        return lambda mask: not matcher(mask)
+
 
 class _MatchExpression(object):
     """A tag matching expression that matches when a specific tag is present."""
@@ -295,6 +372,31 @@ class _MatchExpression(object):
     def __call__(self, file_tags):
         return self.__tag in file_tags
 
+    def compile_bit(self, vocabulary):
+        """Return the bit of the tag to match."""
+        return vocabulary.intern(self.__tag)
+
+    def compile(self, vocabulary):
+        """Return a callable that takes a bitmask of tags and indicates whether it matches."""
+        bit = self.compile_bit(vocabulary)
+        return lambda mask: mask & bit != 0
+
+
+class _CompiledExpression(object):
+    """A tag matching expression compiled into a single check of a bitmask of the tags.
+
+    Only the tags that appear in the expression are interned, so converting the tags of a file to a
+    bitmask is a dict lookup per tag, after which the expression is evaluated with integer
+    operations rather than by walking the expression tree with membership tests on lists.
+    """
+
+    def __init__(self, expression):
+        self.__vocabulary = _TagVocabulary()
+        self.__matcher = expression.compile(self.__vocabulary)
+
+    def __call__(self, file_tags):
+        return self.__matcher(self.__vocabulary.mask(file_tags))
+
 
 def make_expression(conf):
     """Create a tag matching expression from an expression configuration.
@@ -398,7 +500,7 @@ class _SelectorConfig(object):
             expressions.append(exclude_with_any_expr)
 
         if expressions:
-            return _AllOfExpression(expressions)
+            return _CompiledExpression(_AllOfExpression(expressions))
         return None
 
 
@@ -436,6 +538,7 @@ class _Selector(object):
             test_list.exclude_files(selector_config.exclude_files)
         # 4. Apply the tag filters.
         if selector_config.tags_expression:
+            self.load_tags(test_list.get_filtered_tests())
             test_list.match_tag_expression(selector_config.tags_expression, self.get_tags)
         # 5. Apply the include files last with force=True to take precedence over the tags.
         if self._tests_are_files and selector_config.include_files:
@@ -450,6 +553,13 @@ class _Selector(object):
             return sorted(tests, key=str.lower), sorted(excluded, key=str.lower)
         return tests, excluded
 
+    def load_tags(self, tests):
+        """Retrieve the tags of all of 'tests' ahead of calls to get_tags().
+
+        The default implementation does nothing.
+        """
+        pass
+
     @staticmethod
     def get_tags(test_file):  # pylint: disable=unused-argument
         """Retrieve the tags associated with the give test file."""
@@ -475,15 +585,22 @@ class _JSTestSelector(_Selector):
     def __init__(self, test_file_explorer):
         _Selector.__init__(self, test_file_explorer)
         self._tags = self._test_file_explorer.parse_tag_file("js_test", config.TAG_FILE)
+        self._file_tags = {}
 
     def select(self, selector_config):
         self._tags = self._test_file_explorer.parse_tag_file("js_test", selector_config.tag_file,
                                                              self._tags)
         return _Selector.select(self, selector_config)
 
+    def load_tags(self, tests):
+        """Read the tags of all of 'tests' at once, which lets unchanged files be skipped."""
+        self._file_tags = self._test_file_explorer.jstest_tags_for_files(tests)
+
     def get_tags(self, test_file):
         """Return tags from test_file."""
-        file_tags = self._test_file_explorer.jstest_tags(test_file)
+        file_tags = self._file_tags.get(test_file)
+        if file_tags is None:
+            file_tags = self._test_file_explorer.jstest_tags(test_file)
         if test_file in self._tags:
             return list(set(file_tags) | set(self._tags[test_file]))
         return file_tags
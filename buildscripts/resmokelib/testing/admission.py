@@ -0,0 +1,176 @@
+"""Size the number of jobs and hold off starting tests based on the capacity of the host."""
+
+import os
+import threading
+
+import psutil
+
+from buildscripts.resmokelib import config as _config
+from buildscripts.resmokelib import utils
+from buildscripts.resmokelib.testing import fixtures
+
+# The fraction of a CPU assumed to be used by each mongod or mongos process of a fixture, and by the
+# process running the test.
+CPUS_PER_FIXTURE_PROCESS = 0.5
+CPUS_PER_TEST_PROCESS = 1.0
+
+# The memory assumed to be used by each mongod in addition to its storage engine cache, and by each
+# mongos. The cache of a mongod is assumed to be DEFAULT_CACHE_SIZE_GB if it isn't configured since
+# the tests rarely fill more than that.
+MONGOD_OVERHEAD_GB = 0.25
+MONGOS_GB = 0.25
+DEFAULT_CACHE_SIZE_GB = 0.5
+
+# The fraction of the available memory the fixtures of all the jobs may use.
+MAX_MEMORY_FRACTION = 0.8
+
+# The test kinds which are never run with more than one job.
+BENCHMARK_TEST_KINDS = ("benchmark_test", )
+
+
+def count_fixture_processes(fixture_config):
+    """Return a (number of mongods, number of mongoses) pair for the fixture."""
+    fixture_class = fixture_config.get("class")
+    if fixture_class in (fixtures.EXTERNAL_FIXTURE_CLASS, fixtures.NOOP_FIXTURE_CLASS):
+        return (0, 0)
+
+    if fixture_class == "ReplicaSetFixture":
+        num_nodes = _config.NUM_REPLSET_NODES or fixture_config.get("num_nodes", 2)
+        if fixture_config.get("start_initial_sync_node", False):
+            num_nodes += 1
+        return (num_nodes, 0)
+
+    if fixture_class == "ShardedClusterFixture":
+        num_shards = _config.NUM_SHARDS or fixture_config.get("num_shards", 1)
+        num_rs_nodes_per_shard = (_config.NUM_REPLSET_NODES
+                                  or fixture_config.get("num_rs_nodes_per_shard", 1))
+        num_configsvr_nodes = fixture_config.get("configsvr_options", {}).get("num_nodes", 1)
+        return (num_shards * num_rs_nodes_per_shard + num_configsvr_nodes,
+                fixture_config.get("num_mongos", 1))
+
+    if fixture_class == "TenantMigrationFixture":
+        num_nodes = (_config.NUM_REPLSET_NODES
+                     or fixture_config.get("num_nodes_per_replica_set", 2))
+        return (fixture_config.get("num_replica_sets", 1) * num_nodes, 0)
+
+    # MongoDFixture, and a guess for the other fixtures.
+    return (1, 0)
+
+
+def get_cache_size_gb(fixture_config):
+    """Return the storage engine cache size of each mongod of the fixture in GB."""
+    if _config.STORAGE_ENGINE_CACHE_SIZE is not None:
+        return float(_config.STORAGE_ENGINE_CACHE_SIZE)
+
+    mongod_options = fixture_config.get("mongod_options", {})
+    for option in ("wiredTigerCacheSizeGB", "inMemorySizeGB"):
+        if option in mongod_options:
+            return float(mongod_options[option])
+    return DEFAULT_CACHE_SIZE_GB
+
+
+def estimate_num_jobs(fixture_config, num_cpus=None, available_memory_bytes=None):
+    """Return how many jobs running the fixture fit on the host, and a description of why."""
+    if num_cpus is None:
+        num_cpus = utils.get_num_cpus()
+    if available_memory_bytes is None:
+        available_memory_bytes = psutil.virtual_memory().available
+
+    (num_mongods, num_mongoses) = count_fixture_processes(fixture_config)
+    cpus_per_job = CPUS_PER_TEST_PROCESS + CPUS_PER_FIXTURE_PROCESS * (num_mongods + num_mongoses)
+    gb_per_job = (num_mongods * (get_cache_size_gb(fixture_config) + MONGOD_OVERHEAD_GB) +
+                  num_mongoses * MONGOS_GB)
+
+    num_jobs_by_cpu = int(num_cpus / cpus_per_job)
+    num_jobs = num_jobs_by_cpu
+    if gb_per_job > 0:
+        available_gb = available_memory_bytes * MAX_MEMORY_FRACTION / 1024**3
+        num_jobs = min(num_jobs, int(available_gb / gb_per_job))
+
+    reason = ("{} mongod(s) and {} mongos(es) per job needing {:.1f} CPU(s) and {:.2f} GB of"
+              " memory, with {} CPU(s) and {:.1f} GB of memory available").format(
+                  num_mongods, num_mongoses, cpus_per_job, gb_per_job, num_cpus,
+                  available_memory_bytes / 1024**3)
+    return (max(1, num_jobs), reason)
+
+
+def resolve_num_jobs(suite):
+    """Return how many jobs to run the suite with when --jobs=auto is specified, and why.
+
+    Benchmark suites always run a single job since parallel jobs make their results inaccurate.
+    """
+    if suite.test_kind in BENCHMARK_TEST_KINDS:
+        return (1, "benchmark tests which must run one at a time")
+
+    if _config.SHELL_CONN_STRING is not None:
+        fixture_config = {"class": fixtures.EXTERNAL_FIXTURE_CLASS}
+    else:
+        fixture_config = suite.get_executor_config().get("fixture", {})
+    (num_jobs, reason) = estimate_num_jobs(fixture_config)
+    return (min(num_jobs, suite.options.num_jobs), reason)
+
+
+class AdmissionController(object):
+    """Delay starting the next test while the host is overloaded.
+
+    The host is overloaded if its 1-minute load average per CPU exceeds 'max_load_per_cpu' or the
+    fraction of its memory which is available drops below 'min_available_memory_fraction'. A test is
+    always started when no other test is running, so the suite keeps making progress on a host that
+    is busy for reasons unrelated to resmoke.py.
+    """
+
+    # How often a job waiting to start a test checks the load of the host again.
+    POLL_INTERVAL_SECS = 1.0
+
+    def __init__(self, logger, max_load_per_cpu=1.5, min_available_memory_fraction=0.1):
+        """Initialize the AdmissionController."""
+        self.logger = logger
+        self.max_load_per_cpu = max_load_per_cpu
+        self.min_available_memory_fraction = min_available_memory_fraction
+
+        self._num_cpus = utils.get_num_cpus()
+        self._lock = threading.Lock()
+        self._num_running = 0
+
+    def acquire(self, interrupt_flag):
+        """Wait until the host can take on another test and return True once it may start.
+
+        Return False if 'interrupt_flag' is set while waiting.
+        """
+        logged = False
+        while not interrupt_flag.is_set():
+            with self._lock:
+                reason = self._get_overload_reason() if self._num_running > 0 else None
+                if reason is None:
+                    self._num_running += 1
+                    if logged:
+                        self.logger.info("Host load went back down; starting the next test.")
+                    return True
+
+            if not logged:
+                self.logger.info("Delaying the next test since %s.", reason)
+                logged = True
+            interrupt_flag.wait(AdmissionController.POLL_INTERVAL_SECS)
+        return False
+
+    def release(self):
+        """Record that a test admitted by acquire() finished."""
+        with self._lock:
+            self._num_running -= 1
+
+    def _get_overload_reason(self):
+        """Return a description of why the host is overloaded, or None if it isn't."""
+        # The load average isn't available on Windows.
+        if hasattr(os, "getloadavg"):
+            load_per_cpu = os.getloadavg()[0] / self._num_cpus
+            if load_per_cpu > self.max_load_per_cpu:
+                return "the load average per CPU is {:.2f}, above {:.2f}".format(
+                    load_per_cpu, self.max_load_per_cpu)
+
+        memory = psutil.virtual_memory()
+        available_fraction = memory.available / memory.total
+        if available_fraction < self.min_available_memory_fraction:
+            return "only {:.0%} of the memory is available, below {:.0%}".format(
+                available_fraction, self.min_available_memory_fraction)
+
+        return None
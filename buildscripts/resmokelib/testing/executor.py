@@ -5,17 +5,25 @@ import time
 
 from buildscripts.resmokelib import config as _config
 from buildscripts.resmokelib import errors
+from buildscripts.resmokelib import historyfile
 from buildscripts.resmokelib import logging
 from buildscripts.resmokelib import utils
 from buildscripts.resmokelib.core import network
+from buildscripts.resmokelib.core import pipe as _pipe
+from buildscripts.resmokelib.testing import admission
+from buildscripts.resmokelib.testing import fixture_pool as _fixture_pool
 from buildscripts.resmokelib.testing import fixtures
 from buildscripts.resmokelib.testing import hook_test_archival as archival
 from buildscripts.resmokelib.testing import hooks as _hooks
 from buildscripts.resmokelib.testing import job as _job
+from buildscripts.resmokelib.testing import job_process
 from buildscripts.resmokelib.testing import report as _report
+from buildscripts.resmokelib.testing import resource_sampler
 from buildscripts.resmokelib.testing import testcases
 from buildscripts.resmokelib.testing.queue_element import queue_elem_factory
 from buildscripts.resmokelib.utils.queue import Queue
+from buildscripts.resmokelib.utils.queue import WorkStealingQueue
+from buildscripts.util import teststats
 
 
 class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
@@ -29,9 +37,24 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
 
     def __init__(  # pylint: disable=too-many-arguments
             self, exec_logger, suite, config=None, fixture=None, hooks=None, archive_instance=None,
-            archive=None):
-        """Initialize the TestSuiteExecutor with the test suite to run."""
+            archive=None, fixture_pool=None, job_budget=None, job_num_offset=0):
+        """Initialize the TestSuiteExecutor with the test suite to run.
+
+        If 'fixture_pool' is specified, then the fixtures are drawn from it and returned to it once
+        the suite finishes instead of being torn down.
+
+        If 'job_budget' is specified, then the suite runs at the same time as other suites and its
+        jobs share the budget's slots with them. The jobs are then numbered from 'job_num_offset'
+        so that their port ranges don't overlap with those of the other suites' jobs.
+        """
         self.logger = exec_logger
+        self.fixture_pool = fixture_pool
+        self.job_budget = job_budget
+        self._job_num_offset = job_num_offset
+        # Maps job numbers to the pool key of the job's fixture.
+        self._fixture_keys = {}
+        # Job numbers whose fixture was reused from a previous suite.
+        self._reused_job_nums = set()
 
         if _config.SHELL_CONN_STRING is not None:
             # Specifying the shellConnString command line option should override the fixture
@@ -53,10 +76,48 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
 
         self._suite = suite
         self.num_tests = len(suite.tests) * suite.options.num_repeat_tests
+        self._historic_runtimes = self._load_historic_runtimes()
         self.test_queue_logger = logging.loggers.new_testqueue_logger(suite.test_kind)
+        self._resource_sampler = self._make_resource_sampler()
+        self._admission_controller = None
+        if _config.AUTO_JOBS:
+            self._admission_controller = admission.AdmissionController(self.logger)
 
         # Must be done after getting buildlogger configuration.
         self._jobs = self._create_jobs(self.num_tests)
+        self._job_process_pool = None
+
+    def _make_resource_sampler(self):
+        """Return a ResourceSampler if the resource usage of the tests should be profiled."""
+        if not _config.RESOURCE_SAMPLE_INTERVAL_MS:
+            return None
+
+        sampler = resource_sampler.ResourceSampler(self.logger,
+                                                   _config.RESOURCE_SAMPLE_INTERVAL_MS / 1000.0)
+        if not sampler.is_supported():
+            self.logger.warning("Not sampling the resource usage of the tests since /proc isn't"
+                                " available on this platform.")
+            return None
+        return sampler
+
+    def _use_job_processes(self):
+        """Return True if the jobs should run in worker processes rather than threads."""
+        if not _config.JOB_PROCESSES:
+            return False
+
+        reason = None
+        if not job_process.is_supported():
+            reason = "this platform doesn't support os.fork()"
+        elif self.fixture_pool is not None or self.job_budget is not None:
+            reason = "the fixtures are shared with other suites"
+        elif self._suite.options.time_repeat_tests_secs:
+            reason = "tests are repeated for a period of time"
+
+        if reason is not None:
+            self.logger.warning(
+                "Running the jobs in threads rather than worker processes since %s.", reason)
+            return False
+        return True
 
     def _num_jobs_to_start(self, suite, num_tests):
         """
@@ -65,13 +126,12 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         :param suite: Test suite being run.
         :return: Number of jobs to start.
         """
-        options = suite.options
-        num_jobs_to_start = options.num_jobs
+        num_jobs_to_start = suite.options.num_jobs
 
         if num_tests < num_jobs_to_start:
             self.logger.info(
                 "Reducing the number of jobs from %d to %d since there are only %d test(s) to run.",
-                options.num_jobs, num_tests, num_tests)
+                num_jobs_to_start, num_tests, num_tests)
             num_jobs_to_start = num_tests
 
         return num_jobs_to_start
@@ -86,7 +146,10 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         :return: List of jobs.
         """
         n_jobs_to_start = self._num_jobs_to_start(self._suite, num_tests)
-        return [self._make_job(job_num) for job_num in range(n_jobs_to_start)]
+        return [
+            self._make_job(job_num)
+            for job_num in range(self._job_num_offset, self._job_num_offset + n_jobs_to_start)
+        ]
 
     def run(self):
         """Execute the test suite.
@@ -100,10 +163,21 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         return_code = 0
         # The first run of the job will set up the fixture.
         setup_flag = threading.Event()
-        # We reset the internal state of the PortAllocator so that ports used by the fixture during
-        # a test suite run earlier can be reused during this current test suite.
-        network.PortAllocator.reset()
+        job_nums = [job.job_num for job in self._jobs]
+        self._reset_ports(job_nums)
+        # Only the output of this suite's own jobs is counted, since other suites may be running
+        # concurrently.
+        logging_stats_start = _pipe.LOGGING_STATS.snapshot(job_nums)
         teardown_flag = None
+        if self._use_job_processes():
+            # The tests run in the worker processes, so each of them starts its own sampler after
+            # it's forked.
+            self._job_process_pool = job_process.JobProcessPool(
+                self.logger, self._jobs, self._create_queue_elem_for_test_name,
+                resource_sampler=self._resource_sampler)
+            self._job_process_pool.start()
+        elif self._resource_sampler is not None:
+            self._resource_sampler.start()
         try:
             num_repeat_suites = self._suite.options.num_repeat_suites
             while num_repeat_suites > 0:
@@ -115,8 +189,10 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                 # Have the Job threads destroy their fixture during the final repetition after they
                 # finish running their last test. This avoids having a large number of processes
                 # still running if an Evergreen task were to time out from a hang/deadlock being
-                # triggered.
-                teardown_flag = threading.Event() if num_repeat_suites == 1 else None
+                # triggered. Fixtures which go back into the fixture pool are kept running instead.
+                teardown_flag = None
+                if num_repeat_suites == 1 and self.fixture_pool is None:
+                    teardown_flag = threading.Event()
                 (report, interrupted) = self._run_tests(test_queue, setup_flag, teardown_flag)
 
                 self._suite.record_test_end(report)
@@ -157,11 +233,34 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                     job.report.reset()
                 num_repeat_suites -= 1
         finally:
-            if not teardown_flag:
+            if self._resource_sampler is not None:
+                self._resource_sampler.stop()
+            self._record_hook_runs()
+            if self.fixture_pool is not None:
+                self._release_fixtures()
+            elif not teardown_flag:
                 if not self._teardown_fixtures():
                     return_code = 2
+            if self._job_process_pool is not None:
+                self._job_process_pool.stop()
+            self._suite.record_logging_stats(
+                _pipe.LOGGING_STATS.snapshot(job_nums).since(logging_stats_start))
             self._suite.return_code = return_code
 
+    def _record_hook_runs(self):
+        """Record how often the hooks with a 'run_policy' other than "always" ran on the suite."""
+        if self._job_process_pool is not None:
+            for (hook_name, num_ran, num_skipped) in self._job_process_pool.get_hook_runs():
+                self._suite.record_hook_runs(hook_name, num_ran, num_skipped)
+            return
+
+        for job in self._jobs:
+            for hook in job.hooks:
+                if getattr(hook, "run_policy", "always") == "always":
+                    continue
+                self._suite.record_hook_runs(hook.__class__.__name__, hook.num_ran,
+                                             hook.num_skipped)
+
     def _run_tests(self, test_queue, setup_flag, teardown_flag):
         """Start a thread for each Job instance and block until all of the tests are run.
 
@@ -170,6 +269,9 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         by all of the threads.
         """
 
+        if self._job_process_pool is not None:
+            return self._run_tests_in_processes(test_queue, setup_flag, teardown_flag)
+
         threads = []
         interrupt_flag = threading.Event()
         user_interrupted = False
@@ -193,7 +295,17 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
             while not joined:
                 # Need to pass a timeout to join() so that KeyboardInterrupt exceptions
                 # are propagated.
-                joined = test_queue.join(TestSuiteExecutor._TIMEOUT)
+                if self.job_budget is None:
+                    joined = test_queue.join(TestSuiteExecutor._TIMEOUT)
+                    continue
+
+                # KeyboardInterrupt exceptions are only raised in the main thread, which stops the
+                # job budget to interrupt the suites running concurrently.
+                joined = test_queue.join(self.job_budget.POLL_INTERVAL_SECS)
+                if not joined and self.job_budget.is_stopped():
+                    interrupt_flag.set()
+                    user_interrupted = True
+                    break
         except (KeyboardInterrupt, SystemExit):
             interrupt_flag.set()
             user_interrupted = True
@@ -220,12 +332,29 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         # StopExecution exception in TestSuiteExecutor.run() if the user triggered the interrupt.
         return (combined_report, user_interrupted)
 
+    def _run_tests_in_processes(self, test_queue, setup_flag, teardown_flag):
+        """Run the tests of 'test_queue' on the worker processes, in the order of the queue.
+
+        Returns the same (combined report, user interrupted) pair as _run_tests().
+        """
+        test_names = []
+        while not test_queue.empty():
+            test_names.append(test_queue.get_nowait().testcase.test_name)
+
+        user_interrupted = self._job_process_pool.run_tests(test_names, setup_flag, teardown_flag)
+
+        reports = [job.report for job in self._jobs]
+        return (_report.TestReport.combine(*reports), user_interrupted)
+
     def _teardown_fixtures(self):
         """Tear down all of the fixtures.
 
         Returns true if all fixtures were torn down successfully, and
         false otherwise.
         """
+        if self._job_process_pool is not None:
+            return self._job_process_pool.teardown_fixtures()
+
         success = True
         for job in self._jobs:
             if not job.manager.teardown_fixture(self.logger):
@@ -234,8 +363,36 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
                 success = False
         return success
 
+    def _release_fixtures(self):
+        """Return the fixtures of all jobs to the fixture pool.
+
+        Fixtures that aren't running anymore are torn down rather than kept in the pool.
+        """
+        for job in self._jobs:
+            key = self._fixture_keys.get(job.job_num)
+            if key is None:
+                if not job.manager.teardown_fixture(self.logger):
+                    self.logger.warning("Teardown of %s of job %s was not successful", job.fixture,
+                                        job.job_num)
+                continue
+            self.fixture_pool.release(job.job_num, key, job.fixture)
+
+    def _reset_ports(self, job_nums):
+        """Reset the internal state of the PortAllocator before running the suite.
+
+        The ports used by the fixtures during a test suite run earlier can then be reused during
+        this current test suite. The ports of fixtures reused from the fixture pool, and of the
+        fixtures still parked in it for a later suite, stay reserved since those fixtures are still
+        running. Suites running concurrently only reset the ports of their own jobs.
+        """
+        preserve_job_nums = set(self._reused_job_nums)
+        if self.fixture_pool is not None:
+            preserve_job_nums |= self.fixture_pool.parked_job_nums()
+        network.PortAllocator.reset(preserve_job_nums=preserve_job_nums,
+                                    job_nums=job_nums if self.job_budget is not None else None)
+
     def _make_fixture(self, job_num):
-        """Create a fixture for a job."""
+        """Create a fixture for a job, or reuse a running one from the fixture pool."""
 
         fixture_config = {}
         fixture_class = fixtures.NOOP_FIXTURE_CLASS
@@ -243,6 +400,14 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
             fixture_config = self.fixture_config.copy()
             fixture_class = fixture_config.pop("class")
 
+        if self.fixture_pool is not None and self.fixture_pool.is_poolable(fixture_class):
+            key = _fixture_pool.make_fixture_key(fixture_class, fixture_config)
+            self._fixture_keys[job_num] = key
+            fixture = self.fixture_pool.acquire(job_num, key)
+            if fixture is not None:
+                self._reused_job_nums.add(job_num)
+                return fixture
+
         fixture_logger = logging.loggers.new_fixture_logger(fixture_class, job_num)
 
         return fixtures.make_fixture(fixture_class, fixture_logger, job_num, **fixture_config)
@@ -274,10 +439,13 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
         fixture = self._make_fixture(job_num)
         hooks = self._make_hooks(fixture, job_num)
 
-        report = _report.TestReport(job_logger, self._suite.options, job_num)
+        report = _report.TestReport(job_logger, self._suite.options, job_num,
+                                    resource_sampler=self._resource_sampler)
 
         return _job.Job(job_num, job_logger, fixture, hooks, report, self.archival,
-                        self._suite.options, self.test_queue_logger)
+                        self._suite.options, self.test_queue_logger,
+                        reuse_fixture=job_num in self._reused_job_nums, job_budget=self.job_budget,
+                        admission_controller=self._admission_controller)
 
     def _num_times_to_repeat_tests(self):
         """
@@ -315,16 +483,67 @@ class TestSuiteExecutor(object):  # pylint: disable=too-many-instance-attributes
 
         :return: Queue of testcases to run.
         """
-        queue = Queue()
+        queue_elems = [
+            self._create_queue_elem_for_test_name(test_name)
+            for _ in range(self._num_times_to_repeat_tests()) for test_name in self._suite.tests
+        ]
+
+        if self._historic_runtimes is None:
+            queue = Queue()
+        else:
+            queue_elems = self._order_longest_first(queue_elems)
+            queue = WorkStealingQueue(lookahead=_config.SCHEDULER_LOOKAHEAD)
 
         # Put all the test cases in a queue.
-        for _ in range(self._num_times_to_repeat_tests()):
-            for test_name in self._suite.tests:
-                queue_elem = self._create_queue_elem_for_test_name(test_name)
-                queue.put(queue_elem)
+        for queue_elem in queue_elems:
+            queue.put(queue_elem)
 
         return queue
 
+    def _load_historic_runtimes(self):
+        """Return a dict of test names to their historic runtimes, or None if there is no history."""
+        if _config.HISTORIC_RUNTIME_FILE is not None:
+            historic_data = teststats.HistoricTaskData.from_file(_config.HISTORIC_RUNTIME_FILE)
+        elif _config.ORDER_BY_RUNTIME_HISTORY:
+            historic_data = historyfile.read(self._suite)
+            if historic_data is None:
+                return None
+        else:
+            return None
+
+        return {
+            test_runtime.test_name: test_runtime.runtime
+            for test_runtime in historic_data.get_tests_runtimes()
+        }
+
+    def _order_longest_first(self, queue_elems):
+        """Return 'queue_elems' ordered so the tests with the longest historic runtimes run first.
+
+        Tests without any history are assumed to take the average runtime of the tests with
+        history. When tests are repeated, each repetition is ordered on its own so that all tests
+        still run once before any test runs again.
+        """
+        runtimes = self._historic_runtimes
+        default_runtime = sum(runtimes.values()) / len(runtimes) if runtimes else 0.0
+
+        def expected_runtime(queue_elem):
+            test_name = teststats.normalize_test_name(queue_elem.testcase.test_name)
+            return runtimes.get(test_name, default_runtime)
+
+        num_tests = len(self._suite.tests)
+        ordered = sorted(
+            enumerate(queue_elems),
+            key=lambda item: (item[0] // num_tests, -expected_runtime(item[1])))
+
+        num_unknown = sum(1 for test_name in self._suite.tests
+                          if teststats.normalize_test_name(test_name) not in runtimes)
+        self.logger.info(
+            "Ordering tests longest first using the historic runtimes in %s. %d of %d test(s) had"
+            " no history and are assumed to take %0.2f seconds.", _config.HISTORIC_RUNTIME_FILE
+            or _config.RUNTIME_HISTORY_FILE, num_unknown, num_tests, default_runtime)
+
+        return [queue_elem for (_, queue_elem) in ordered]
+
     def _log_timeout_warning(self, seconds):
         """Log a message if any thread fails to terminate after `seconds`."""
         self.logger.warning(
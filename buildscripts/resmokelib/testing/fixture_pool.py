@@ -0,0 +1,122 @@
+"""Pool of running fixtures that can be reused by later test suites in the same invocation."""
+
+import hashlib
+import json
+import threading
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing import fixtures
+
+
+def make_fixture_key(fixture_class, fixture_config):
+    """Return a hash that identifies fixtures built from equivalent YAML configurations.
+
+    The configuration is normalized by sorting its keys so that two suites which spell the same
+    fixture configuration differently still map onto the same key.
+    """
+    normalized = json.dumps({"class": fixture_class, "config": fixture_config}, sort_keys=True,
+                            default=str)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class _PooledFixture(object):
+    """A fixture parked in the pool along with the key it was created from."""
+
+    def __init__(self, key, fixture):
+        self.key = key
+        self.fixture = fixture
+
+
+class FixturePool(object):
+    """Keep the fixtures of finished suites running so that later suites can reuse them.
+
+    Fixtures are parked per job number because each job owns its own range of ports and its own
+    dbpath. A parked fixture is handed back out only when the requesting suite's fixture
+    configuration hashes to the same key and the fixture is still healthy. Otherwise the parked
+    fixture is torn down before the caller creates a new one in its place.
+    """
+
+    # Fixtures that don't start any processes have nothing worth reusing.
+    _UNPOOLED_FIXTURE_CLASSES = (fixtures.NOOP_FIXTURE_CLASS, fixtures.EXTERNAL_FIXTURE_CLASS)
+
+    def __init__(self, logger):
+        """Initialize the FixturePool."""
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._parked = {}
+
+    @classmethod
+    def is_poolable(cls, fixture_class):
+        """Return True if fixtures of 'fixture_class' can be kept running between suites."""
+        return fixture_class not in cls._UNPOOLED_FIXTURE_CLASSES
+
+    def acquire(self, job_num, key):
+        """Return the parked fixture for 'job_num' if it was created from 'key', else None.
+
+        A parked fixture with a different key, or one which is no longer running, is torn down so
+        its ports and dbpath are free for the fixture the caller is about to create.
+        """
+        with self._lock:
+            pooled = self._parked.pop(job_num, None)
+
+        if pooled is None:
+            return None
+
+        if pooled.key == key and pooled.fixture.is_running():
+            self.logger.info("Reusing %s from the fixture pool.", pooled.fixture)
+            return pooled.fixture
+
+        if pooled.key != key:
+            self.logger.info("Tearing down pooled %s because the fixture configuration differs.",
+                             pooled.fixture)
+        else:
+            self.logger.info("Tearing down pooled %s because it is no longer running.",
+                             pooled.fixture)
+        self._teardown(pooled.fixture)
+        return None
+
+    def release(self, job_num, key, fixture):
+        """Park 'fixture' so a later suite with the same fixture configuration can reuse it.
+
+        Return True if the fixture was parked, and False if it was torn down instead.
+        """
+        if not fixture.is_running():
+            self.logger.info("Not returning %s to the fixture pool because it is not running.",
+                             fixture)
+            self._teardown(fixture)
+            return False
+
+        with self._lock:
+            previous = self._parked.pop(job_num, None)
+            self._parked[job_num] = _PooledFixture(key, fixture)
+
+        if previous is not None and previous.fixture is not fixture:
+            self._teardown(previous.fixture)
+
+        self.logger.info("Returned %s to the fixture pool.", fixture)
+        return True
+
+    def parked_job_nums(self):
+        """Return the job numbers which currently have a fixture parked in the pool."""
+        with self._lock:
+            return set(self._parked)
+
+    def teardown_all(self):
+        """Tear down every parked fixture. Return True if all of them stopped successfully."""
+        with self._lock:
+            parked = list(self._parked.values())
+            self._parked.clear()
+
+        success = True
+        for pooled in parked:
+            success = self._teardown(pooled.fixture) and success
+        return success
+
+    def _teardown(self, fixture):
+        """Tear down 'fixture' and return True if it was successful."""
+        try:
+            fixture.teardown(finished=True)
+            return True
+        except errors.ServerFailure as err:
+            self.logger.warning("Teardown of pooled %s was not successful: %s", fixture, err)
+            return False
@@ -18,6 +18,9 @@ from buildscripts.resmokelib.utils import registry
 
 _FIXTURES = {}  # type: ignore
 
+# Databases that are left in place when a running fixture is reset for reuse.
+_PROTECTED_DBS = ("admin", "config", "local", "$external")
+
 
 class TeardownMode(Enum):
     """
@@ -114,6 +117,28 @@ class Fixture(object, metaclass=registry.make_registry_metaclass(_FIXTURES)):
         """Return true if the fixture is still operating and more tests and can be run."""
         return True
 
+    def reset_data(self):
+        """Return the already running fixture to the state it had right after await_ready().
+
+        All non-system databases are dropped. Subclasses extend this to restore any settings the
+        fixture applies during setup.
+
+        Raises:
+            errors.ServerFailure: If the fixture could not be reset.
+        """
+        self._drop_non_system_databases(self.mongo_client())
+
+    def _drop_non_system_databases(self, client):
+        """Drop every database other than admin, config, local, and $external through 'client'."""
+        try:
+            for db_name in client.list_database_names():
+                if db_name in _PROTECTED_DBS:
+                    continue
+                self.logger.info("Dropping database %s to reset %s.", db_name, self)
+                client.drop_database(db_name)
+        except pymongo.errors.PyMongoError as err:
+            raise errors.ServerFailure("Failed to reset {}: {}".format(self, err))
+
     def get_node_info(self):  # pylint: disable=no-self-use
         """Return a list of NodeInfo objects."""
         return []
@@ -0,0 +1,161 @@
+"""Helper for waiting on a mongod or mongos process to reach some state.
+
+Rather than polling on a fixed interval with a new client for every attempt, a ReadinessWaiter
+reuses a single client per node, backs off exponentially from a few milliseconds, and is woken up
+early when the node logs a message indicating that its state may have changed.
+"""
+
+import random
+import socket
+import threading
+import time
+
+import pymongo
+import pymongo.errors
+
+from buildscripts.resmokelib import errors
+
+# Log IDs of the server messages which indicate that a pending wait may now be satisfied.
+_WAKEUP_LOG_IDS = (
+    23016,  # Waiting for connections
+    21331,  # Transition to primary complete; database writes are now permitted
+    21358,  # Replica set state transition
+    21392,  # New replica set config in use
+)
+
+# The structured log lines are matched as plain text to keep the cost of inspecting every line of
+# the server's output low.
+_WAKEUP_MARKERS = tuple('"id":{},'.format(log_id) for log_id in _WAKEUP_LOG_IDS)
+
+
+class ReadinessWaiter(object):
+    """Wait for a condition on a single mongod or mongos to become true."""
+
+    INITIAL_DELAY_SECS = 0.002
+    MAX_DELAY_SECS = 0.5
+
+    def __init__(self, logger, client_factory):
+        """Initialize the ReadinessWaiter.
+
+        'client_factory' is called with a read preference to create the client which is cached and
+        reused for every subsequent wait with that read preference.
+        """
+        self.logger = logger
+        self._client_factory = client_factory
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+        self._condition = threading.Condition()
+        self._generation = 0
+
+    def client(self, read_preference=pymongo.ReadPreference.PRIMARY):
+        """Return the cached client for 'read_preference', creating it if necessary."""
+        with self._clients_lock:
+            if read_preference.name not in self._clients:
+                self._clients[read_preference.name] = self._client_factory(read_preference)
+            return self._clients[read_preference.name]
+
+    def close(self):
+        """Close the cached clients so that new ones are created for a restarted process."""
+        with self._clients_lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+
+        for client in clients:
+            client.close()
+
+    def watch(self, process):
+        """Wake up any pending waits when 'process' logs a message that may change their outcome."""
+        process.add_stdout_listener(self.on_output_line)
+
+    def on_output_line(self, line):
+        """Wake up pending waits if 'line' indicates the node's state may have changed."""
+        if any(marker in line for marker in _WAKEUP_MARKERS):
+            self.notify()
+
+    def notify(self):
+        """Wake up pending waits so they re-evaluate their condition immediately."""
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+
+    def wait_until(self, description, predicate, timeout_secs, retry_on=()):
+        """Call 'predicate' until it returns a truthy value and return that value.
+
+        Exceptions of the types in 'retry_on' are treated like a falsy return value. The time it
+        took for 'predicate' to be satisfied is logged.
+
+        Raises:
+            errors.ServerFailure: If 'predicate' isn't satisfied within 'timeout_secs' seconds.
+        """
+        start = time.time()
+        deadline = start + timeout_secs
+        delay = ReadinessWaiter.INITIAL_DELAY_SECS
+
+        while True:
+            with self._condition:
+                generation = self._generation
+
+            try:
+                result = predicate()
+            except retry_on:
+                result = None
+
+            if result:
+                self.logger.info("Finished %s after %0.3f seconds.", description,
+                                 time.time() - start)
+                return result
+
+            remaining = deadline - time.time()
+            if remaining <= 0.0:
+                raise errors.ServerFailure("Timed out after {} seconds while {}.".format(
+                    timeout_secs, description))
+
+            # Use "equal jitter" so that concurrent waiters don't retry in lockstep while still
+            # waiting at least half of the current delay.
+            sleep_secs = min(remaining, delay / 2 + random.uniform(0, delay / 2))
+            with self._condition:
+                if self._generation == generation:
+                    self._condition.wait(sleep_secs)
+                woken = self._generation != generation
+
+            # A log message means the node's state just changed, so the next change is likely to
+            # follow soon after it.
+            if woken:
+                delay = ReadinessWaiter.INITIAL_DELAY_SECS
+            else:
+                delay = min(delay * 2, ReadinessWaiter.MAX_DELAY_SECS)
+
+
+def is_port_open(port, host="localhost"):
+    """Return True if a TCP connection to 'host':'port' can be established.
+
+    Probing the socket directly is much cheaper than server selection through a client, which won't
+    check an unreachable server again for at least half a second.
+    """
+    try:
+        with socket.create_connection((host, port), timeout=0.5):
+            return True
+    except OSError:
+        return False
+
+
+def await_accepting_connections(waiter, process, port, process_name, timeout_secs):
+    """Wait until the 'process_name' process listening on 'port' responds to a ping."""
+
+    def _is_ready():
+        # Check whether the process exited for some reason.
+        exit_code = process.poll()
+        if exit_code is not None:
+            raise errors.ServerFailure("Could not connect to {} on port {}, process ended"
+                                       " unexpectedly with code {}.".format(
+                                           process_name, port, exit_code))
+
+        if not is_port_open(port):
+            return False
+
+        waiter.client().admin.command("ping")
+        return True
+
+    waiter.wait_until("waiting to connect to {} on port {}".format(process_name, port), _is_ready,
+                      timeout_secs, retry_on=(pymongo.errors.ConnectionFailure, ))
@@ -1,5 +1,8 @@
 """Replica set fixture for executing JSTests against."""
 
+import collections
+import concurrent.futures
+import contextlib
 import os.path
 import time
 
@@ -11,9 +14,11 @@ from buildscripts.resmokelib import config
 from buildscripts.resmokelib import errors
 from buildscripts.resmokelib import logging
 from buildscripts.resmokelib import utils
+from buildscripts.resmokelib.core import network
 from buildscripts.resmokelib.multiversionconstants import LAST_LTS_MONGOD_BINARY
 from buildscripts.resmokelib.testing.fixtures import interface
 from buildscripts.resmokelib.testing.fixtures import replicaset_utils
+from buildscripts.resmokelib.testing.fixtures import snapshots
 from buildscripts.resmokelib.testing.fixtures import standalone
 
 
@@ -34,7 +39,7 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
             replset_config_options=None, voting_secondaries=True, all_nodes_electable=False,
             use_replica_set_connection_string=None, linear_chain=False, mixed_bin_versions=None,
             default_read_concern=None, default_write_concern=None, shard_logging_prefix=None,
-            replicaset_logging_prefix=None):
+            replicaset_logging_prefix=None, fast_initiate=None):
         """Initialize ReplicaSetFixture."""
 
         interface.ReplFixture.__init__(self, logger, job_num, dbpath_prefix=dbpath_prefix)
@@ -62,6 +67,10 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
         self.linear_chain = linear_chain_option if linear_chain_option else linear_chain
         num_replset_nodes = config.NUM_REPLSET_NODES
         self.num_nodes = num_replset_nodes if num_replset_nodes else num_nodes
+        # Use the value given from the command line if it is set, otherwise fall back to the YAML
+        # configuration.
+        self.fast_initiate = bool(
+            config.FAST_REPLSET_INITIATE or utils.default_if_none(fast_initiate, False))
 
         if self.mixed_bin_versions is not None:
             mongod_executable = utils.default_if_none(
@@ -114,9 +123,16 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
         self.replset_name = None
         self.initial_sync_node = None
         self.initial_sync_node_idx = -1
+        self._phase_timings = collections.OrderedDict()
+
+        self._snapshots = None
+        if config.FIXTURE_SNAPSHOT_DIR is not None:
+            self._snapshots = snapshots.DBPathSnapshots(config.FIXTURE_SNAPSHOT_DIR)
 
     def setup(self):  # pylint: disable=too-many-branches,too-many-statements,too-many-locals
         """Set up the replica set."""
+        self._phase_timings = collections.OrderedDict()
+        fast_initiate = self._use_fast_initiate()
         self.replset_name = self.mongod_options.get("replSet", "rs")
         if not self.nodes:
             for i in range(self.num_nodes):
@@ -136,15 +152,25 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
                         "mode": "alwaysOn",
                         "data": {"hostAndPort": self.nodes[i - 1].get_internal_connection_string()}
                     }
-            self.nodes[i].setup()
 
-        if self.start_initial_sync_node:
-            if not self.initial_sync_node:
-                self.initial_sync_node_idx = len(self.nodes)
-                self.initial_sync_node = self._new_mongod(self.initial_sync_node_idx,
-                                                          self.replset_name)
-            self.initial_sync_node.setup()
-            self.initial_sync_node.await_ready()
+        if self.start_initial_sync_node and not self.initial_sync_node:
+            self.initial_sync_node_idx = len(self.nodes)
+            self.initial_sync_node = self._new_mongod(self.initial_sync_node_idx, self.replset_name)
+
+        snapshot_key = self._get_snapshot_key()
+        restored = self._restore_snapshot(snapshot_key)
+        # The nodes restored from a snapshot already form a replica set, so they're all waited on.
+        start_all_nodes = fast_initiate or restored
+
+        with self._timed_phase("start_nodes"):
+            if start_all_nodes:
+                self._run_on_all_nodes(lambda node: node.setup())
+            else:
+                for node in self.nodes:
+                    node.setup()
+                if self.initial_sync_node:
+                    self.initial_sync_node.setup()
+                    self.initial_sync_node.await_ready()
 
         if self.mixed_bin_versions:
             for i in range(self.num_nodes):
@@ -154,9 +180,13 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
                            f"{self.mixed_bin_versions[i]}.")
                     raise errors.ServerFailure(msg)
 
-        # We need only to wait to connect to the first node of the replica set because we first
-        # initiate it as a single node replica set.
-        self.nodes[0].await_ready()
+        with self._timed_phase("await_nodes_ready"):
+            if start_all_nodes:
+                self._run_on_all_nodes(lambda node: node.await_ready())
+            else:
+                # We need only to wait to connect to the first node of the replica set because we
+                # first initiate it as a single node replica set.
+                self.nodes[0].await_ready()
 
         # Initiate the replica set.
         members = []
@@ -184,6 +214,10 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
 
         if client.local.system.replset.count():
             # Skip initializing the replset if there is an existing configuration.
+            if restored:
+                with self._timed_phase("step_up"):
+                    self._step_up_until_primary(client)
+            self._log_phase_timings()
             return
 
         if self.write_concern_majority_journal_default is not None:
@@ -207,43 +241,234 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
         if "electionTimeoutMillis" not in repl_config["settings"]:
             repl_config["settings"]["electionTimeoutMillis"] = 24 * 60 * 60 * 1000
 
-        # Start up a single node replica set then reconfigure to the correct size (if the config
-        # contains more than 1 node), so the primary is elected more quickly.
-        repl_config["members"] = [members[0]]
-        self.logger.info("Issuing replSetInitiate command: %s", repl_config)
-        self._initiate_repl_set(client, repl_config)
-        self._await_primary()
+        if fast_initiate:
+            # Every node is already accepting connections, so the replica set is initiated with
+            # its full membership in a single command instead of growing it one reconfig at a time.
+            repl_config["members"] = members
+            self.logger.info("Issuing replSetInitiate command: %s", repl_config)
+            with self._timed_phase("initiate"):
+                self._initiate_repl_set(client, repl_config)
+                self._step_up_first_node(client)
+                self._await_primary()
+        else:
+            # Start up a single node replica set then reconfigure to the correct size (if the
+            # config contains more than 1 node), so the primary is elected more quickly.
+            repl_config["members"] = [members[0]]
+            self.logger.info("Issuing replSetInitiate command: %s", repl_config)
+            with self._timed_phase("initiate"):
+                self._initiate_repl_set(client, repl_config)
+                self._await_primary()
+
+            if self.mixed_bin_versions is not None:
+                if self.mixed_bin_versions[0] == "new":
+                    fcv_response = client.admin.command(
+                        {"getParameter": 1, "featureCompatibilityVersion": 1})
+                    fcv = fcv_response["featureCompatibilityVersion"]["version"]
+                    if fcv != ReplicaSetFixture._LATEST_FCV:
+                        msg = (("Server returned FCV{} when we expected FCV{}.").format(
+                            fcv, ReplicaSetFixture._LATEST_FCV))
+                        raise errors.ServerFailure(msg)
+
+                # Initiating a replica set with a single node will use "latest" FCV. This will
+                # cause IncompatibleServerVersion errors if additional "last-lts" binary version
+                # nodes are subsequently added to the set, since such nodes cannot set their FCV
+                # to "latest". Therefore, we make sure the primary is "last-lts" FCV before adding
+                # in nodes of different binary versions to the replica set.
+                client.admin.command(
+                    {"setFeatureCompatibilityVersion": ReplicaSetFixture._LAST_LTS_FCV})
+
+            if self.nodes[1:]:
+                # Wait to connect to each of the secondaries before running the replSetReconfig
+                # command.
+                with self._timed_phase("await_secondaries_ready"):
+                    for node in self.nodes[1:]:
+                        node.await_ready()
+                # Add in the members one at a time, since non force reconfigs can only add/remove a
+                # single voting member at a time.
+                with self._timed_phase("add_members"):
+                    for ind in range(2, len(members) + 1):
+                        self._add_node_to_repl_set(client, repl_config, ind, members)
+
+        with self._timed_phase("await_secondaries"):
+            self._await_secondaries()
+        with self._timed_phase("await_newly_added_removals"):
+            self._await_newly_added_removals()
+
+        if snapshot_key is not None:
+            with self._timed_phase("save_snapshot"):
+                self._save_snapshot(snapshot_key)
+
+        self._log_phase_timings()
+
+    def _get_snapshot_key(self):
+        """Return the key of the snapshot of the initialized replica set, or None.
+
+        The key covers the mongod binary, the options of the nodes including their ports, and the
+        options of the replica set. Replica sets which are part of a sharded cluster, have an
+        initial sync node, have mixed binary versions, or don't persist their data aren't
+        snapshotted.
+        """
+        if (self._snapshots is None or self.shard_logging_prefix is not None
+                or self.replset_config_options.get("configsvr", False)
+                or self.initial_sync_node is not None or self.mixed_bin_versions is not None
+                or config.STORAGE_ENGINE == "inMemory"
+                or self.mongod_options.get("storageEngine") == "inMemory"):
+            return None
+
+        executable = utils.default_if_none(self.mongod_executable, config.MONGOD_EXECUTABLE,
+                                           config.DEFAULT_MONGOD_EXECUTABLE)
+        fingerprint = snapshots.get_executable_fingerprint(executable)
+        if fingerprint is None:
+            return None
+
+        # The ports are part of the replica set config stored in the snapshot, so they are
+        # allocated ahead of starting the nodes.
+        nodes_options = []
+        for node in self.nodes:
+            if "port" not in node.mongod_options:
+                node.mongod_options["port"] = network.PortAllocator.next_fixture_port(self.job_num)
+            nodes_options.append({
+                key: value
+                for (key, value) in node.mongod_options.items()
+                if key not in ("dbpath", "logpath", "logappend")
+            })
+
+        return snapshots.make_key({
+            "mongod": fingerprint,
+            # The command line options which resmoke.py applies to every mongod it starts.
+            "mongod_command_line": [
+                config.STORAGE_ENGINE, config.STORAGE_ENGINE_CACHE_SIZE, config.NO_JOURNAL,
+                config.MAJORITY_READ_CONCERN, config.MONGOD_SET_PARAMETERS,
+                config.FUZZ_MONGOD_CONFIGS, config.CONFIG_FUZZ_SEED
+            ],
+            "nodes": nodes_options,
+            "replset_config_options": self.replset_config_options,
+            "write_concern_majority_journal_default": self.write_concern_majority_journal_default,
+            "auth_options": self.auth_options,
+            "voting_secondaries": self.voting_secondaries,
+            "all_nodes_electable": self.all_nodes_electable,
+        })
+
+    def _restore_snapshot(self, snapshot_key):
+        """Have the nodes start from the snapshot for 'snapshot_key' and return True if it exists."""
+        snapshot_dir = None
+        if snapshot_key is not None:
+            snapshot_dir = self._snapshots.find(snapshot_key)
+
+        for (i, node) in enumerate(self.nodes):
+            node.dbpath_snapshot = None
+            if snapshot_dir is not None:
+                node.dbpath_snapshot = os.path.join(snapshot_dir, "node{}".format(i))
+
+        if snapshot_dir is None:
+            return False
+
+        self.logger.info("Restoring the dbpaths of replica set '%s' from the snapshot in %s.",
+                         self.replset_name, snapshot_dir)
+        return True
+
+    def _save_snapshot(self, snapshot_key):
+        """Save a snapshot of the dbpaths of the nodes while writes to them are blocked."""
+        clients = [self.auth(node.mongo_client(), self.auth_options) for node in self.nodes]
+        locked_clients = []
+        try:
+            for client in clients:
+                client.admin.command("fsync", lock=True)
+                locked_clients.append(client)
+
+            dbpaths = {
+                "node{}".format(i): node.get_dbpath_prefix()
+                for (i, node) in enumerate(self.nodes)
+            }
+            self._snapshots.save(snapshot_key, dbpaths)
+            self.logger.info("Saved a snapshot of the dbpaths of replica set '%s'.",
+                             self.replset_name)
+        except (OSError, pymongo.errors.PyMongoError) as err:
+            # The snapshot only speeds up later runs, so failing to save it isn't a failure.
+            self.logger.warning("Failed to save a snapshot of the dbpaths of replica set '%s': %s",
+                                self.replset_name, err)
+        finally:
+            for client in locked_clients:
+                client.admin.command("fsyncUnlock")
+
+    def _step_up_until_primary(self, client):
+        """Have the first node run for election until it becomes primary.
+
+        The election timeout is too long to wait for one of the nodes to call an election, and the
+        node may not be electable yet when it's first asked to run for election, so it's asked
+        again until it wins.
+        """
+        primary = self.nodes[0]
+
+        def step_up():
+            try:
+                client.admin.command({"replSetStepUp": 1})
+            except pymongo.errors.OperationFailure as err:
+                self.logger.debug("replSetStepUp on port %d failed: %s", primary.port, err)
+            return client.admin.command("isMaster")["ismaster"]
+
+        primary.readiness.wait_until(
+            "waiting for primary on port {} to be elected".format(primary.port), step_up,
+            ReplicaSetFixture.AWAIT_REPL_TIMEOUT_FOREVER_MINS * 60,
+            retry_on=(pymongo.errors.AutoReconnect, ))
+
+    def _use_fast_initiate(self):
+        """Return True if the replica set can be initiated with its full membership at once.
+
+        Nodes running a last-lts binary can only join after the primary has set its FCV to
+        last-lts, so mixed binary version replica sets always grow one member at a time.
+        """
+        if not self.fast_initiate:
+            return False
 
         if self.mixed_bin_versions is not None:
-            if self.mixed_bin_versions[0] == "new":
-                fcv_response = client.admin.command(
-                    {"getParameter": 1, "featureCompatibilityVersion": 1})
-                fcv = fcv_response["featureCompatibilityVersion"]["version"]
-                if fcv != ReplicaSetFixture._LATEST_FCV:
-                    msg = (("Server returned FCV{} when we expected FCV{}.").format(
-                        fcv, ReplicaSetFixture._LATEST_FCV))
-                    raise errors.ServerFailure(msg)
+            self.logger.info("Not using fast initiation because the replica set has mixed binary"
+                             " versions.")
+            return False
 
-            # Initiating a replica set with a single node will use "latest" FCV. This will
-            # cause IncompatibleServerVersion errors if additional "last-lts" binary version
-            # nodes are subsequently added to the set, since such nodes cannot set their FCV to
-            # "latest". Therefore, we make sure the primary is "last-lts" FCV before adding in
-            # nodes of different binary versions to the replica set.
-            client.admin.command(
-                {"setFeatureCompatibilityVersion": ReplicaSetFixture._LAST_LTS_FCV})
-
-        if self.nodes[1:]:
-            # Wait to connect to each of the secondaries before running the replSetReconfig
-            # command.
-            for node in self.nodes[1:]:
-                node.await_ready()
-            # Add in the members one at a time, since non force reconfigs can only add/remove a
-            # single voting member at a time.
-            for ind in range(2, len(members) + 1):
-                self._add_node_to_repl_set(client, repl_config, ind, members)
+        return True
 
-        self._await_secondaries()
-        self._await_newly_added_removals()
+    def _run_on_all_nodes(self, fn):
+        """Call 'fn' on every node, including the initial sync node, concurrently.
+
+        The first exception raised by 'fn' is re-raised once all of the calls have finished.
+        """
+        nodes = self.nodes[:]
+        if self.initial_sync_node:
+            nodes.append(self.initial_sync_node)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(nodes)) as pool:
+            futures = [pool.submit(fn, node) for node in nodes]
+            for future in futures:
+                future.result()
+
+    def _step_up_first_node(self, client):
+        """Have the first node become primary right away.
+
+        When the replica set is initiated with more than one electable node, no node would
+        otherwise call an election until the (very long) election timeout expires.
+        """
+        if len(self.nodes) == 1:
+            return
+
+        self._step_up_until_primary(client)
+
+    @contextlib.contextmanager
+    def _timed_phase(self, phase):
+        """Record how long the block of code for 'phase' of the setup took."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self._phase_timings[phase] = time.time() - start
+
+    def _log_phase_timings(self):
+        """Log how long each phase of the setup took."""
+        total = sum(self._phase_timings.values())
+        breakdown = ", ".join(
+            "{}={:0.2f}s".format(phase, secs) for (phase, secs) in self._phase_timings.items())
+        self.logger.info("Set up replica set '%s' in %0.2f seconds: %s", self.replset_name, total,
+                         breakdown)
 
     def pids(self):
         """:return: all pids owned by this fixture if any."""
@@ -346,13 +571,15 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
         # Since this method is called at startup we expect the first node to be primary even when
         # self.all_nodes_electable is True.
         primary = self.nodes[0]
-        client = primary.mongo_client()
-        while True:
-            self.logger.info("Waiting for primary on port %d to be elected.", primary.port)
-            is_master = client.admin.command("isMaster")["ismaster"]
-            if is_master:
-                break
-            time.sleep(0.1)  # Wait a little bit before trying again.
+        client = primary.readiness.client()
+        self.logger.info("Waiting for primary on port %d to be elected.", primary.port)
+
+        def is_primary():
+            return client.admin.command("isMaster")["ismaster"]
+
+        primary.readiness.wait_until(
+            "waiting for primary on port {} to be elected".format(primary.port), is_primary,
+            ReplicaSetFixture.AWAIT_REPL_TIMEOUT_FOREVER_MINS * 60)
         self.logger.info("Primary on port %d successfully elected.", primary.port)
 
     def _await_secondaries(self):
@@ -364,14 +591,13 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
             secondaries.append(self.initial_sync_node)
 
         for secondary in secondaries:
-            client = secondary.mongo_client(read_preference=pymongo.ReadPreference.SECONDARY)
-            while True:
-                self.logger.info("Waiting for secondary on port %d to become available.",
-                                 secondary.port)
-                is_secondary = client.admin.command("isMaster")["secondary"]
-                if is_secondary:
-                    break
-                time.sleep(0.1)  # Wait a little bit before trying again.
+            client = secondary.readiness.client(pymongo.ReadPreference.SECONDARY)
+            self.logger.info("Waiting for secondary on port %d to become available.",
+                             secondary.port)
+            secondary.readiness.wait_until(
+                "waiting for secondary on port {} to become available".format(secondary.port),
+                lambda client=client: client.admin.command("isMaster")["secondary"],
+                ReplicaSetFixture.AWAIT_REPL_TIMEOUT_FOREVER_MINS * 60)
             self.logger.info("Secondary on port %d is now available.", secondary.port)
 
     @staticmethod
@@ -414,12 +640,10 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
         for node in self.nodes:
             self.logger.info("Waiting for node on port %d to have a stable recovery timestamp.",
                              node.port)
-            client = node.mongo_client(read_preference=pymongo.ReadPreference.SECONDARY)
+            client = node.readiness.client(pymongo.ReadPreference.SECONDARY)
             self.auth(client, self.auth_options)
 
-            client_admin = client["admin"]
-
-            while True:
+            def has_stable_recovery_timestamp(client_admin=client["admin"], node=node):
                 status = client_admin.command("replSetGetStatus")
 
                 # The `lastStableRecoveryTimestamp` field contains a stable timestamp guaranteed to
@@ -429,7 +653,7 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
                 # A missing `lastStableRecoveryTimestamp` field indicates that the storage
                 # engine does not support "recover to a stable timestamp".
                 if not last_stable_recovery_timestamp:
-                    break
+                    return True
 
                 # A null `lastStableRecoveryTimestamp` indicates that the storage engine supports
                 # "recover to a stable timestamp" but does not have a stable recovery timestamp yet.
@@ -437,8 +661,13 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
                     self.logger.info(
                         "Node on port %d now has a stable timestamp for recovery. Time: %s",
                         node.port, last_stable_recovery_timestamp)
-                    break
-                time.sleep(0.1)  # Wait a little bit before trying again.
+                    return True
+                return False
+
+            node.readiness.wait_until(
+                "waiting for node on port {} to have a stable recovery timestamp".format(node.port),
+                has_stable_recovery_timestamp,
+                ReplicaSetFixture.AWAIT_REPL_TIMEOUT_FOREVER_MINS * 60)
 
     def _should_await_newly_added_removals_longer(self, client):
         """
@@ -472,10 +701,15 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
 
         self.logger.info("Waiting to remove all 'newlyAdded' fields")
         primary = self.get_primary()
-        client = primary.mongo_client()
+        client = primary.readiness.client()
         self.auth(client, self.auth_options)
-        while self._should_await_newly_added_removals_longer(client):
-            time.sleep(0.1)  # Wait a little bit before trying again.
+
+        def newly_added_removed():
+            return not self._should_await_newly_added_removals_longer(client)
+
+        primary.readiness.wait_until("waiting to remove all 'newlyAdded' fields",
+                                     newly_added_removed,
+                                     ReplicaSetFixture.AWAIT_REPL_TIMEOUT_FOREVER_MINS * 60)
         self.logger.info("All 'newlyAdded' fields removed")
 
     def _setup_cwrwc_defaults(self):
@@ -490,6 +724,15 @@ class ReplicaSetFixture(interface.ReplFixture):  # pylint: disable=too-many-inst
         primary = self.nodes[0]
         primary.mongo_client().admin.command(cmd)
 
+    def reset_data(self):
+        """Drop the non-system databases and restore the cluster-wide read/write concern defaults."""
+        client = self.auth(self.get_primary().mongo_client(), self.auth_options)
+        self._drop_non_system_databases(client)
+        try:
+            self._setup_cwrwc_defaults()
+        except pymongo.errors.PyMongoError as err:
+            raise errors.ServerFailure("Failed to reset {}: {}".format(self, err))
+
     def _do_teardown(self, mode=None):
         self.logger.info("Stopping all members of the replica set...")
 
@@ -1,7 +1,6 @@
 """Sharded cluster fixture for executing JSTests against."""
 
 import os.path
-import time
 
 import pymongo
 import pymongo.errors
@@ -13,6 +12,7 @@ from buildscripts.resmokelib import logging
 from buildscripts.resmokelib import utils
 from buildscripts.resmokelib.multiversionconstants import LAST_LTS_MONGOS_BINARY
 from buildscripts.resmokelib.testing.fixtures import interface
+from buildscripts.resmokelib.testing.fixtures import readiness
 from buildscripts.resmokelib.testing.fixtures import replicaset
 from buildscripts.resmokelib.testing.fixtures import standalone
 from buildscripts.resmokelib.utils import registry
@@ -195,6 +195,33 @@ class ShardedClusterFixture(interface.Fixture):  # pylint: disable=too-many-inst
         client.admin.command({"balancerStart": 1}, maxTimeMS=timeout_ms)
         self.logger.info("Started the balancer")
 
+    def reset_data(self):
+        """Drop the non-system databases and restore the settings applied in await_ready()."""
+        client = self.mongo_client()
+        self._auth_to_db(client)
+
+        # Dropping databases while the balancer is moving chunks around only makes the drops
+        # slower, so we restart the balancer afterwards if the fixture is meant to have it on.
+        if self.enable_balancer:
+            self.stop_balancer()
+        self._drop_non_system_databases(client)
+
+        try:
+            if self.enable_balancer:
+                self.start_balancer()
+
+            if not self.enable_autosplit:
+                wc = pymongo.WriteConcern(w="majority", wtimeout=30000)
+                coll = client.config.get_collection("settings", write_concern=wc)
+                coll.update_one({"_id": "autosplit"}, {"$set": {"enabled": False}}, upsert=True)
+
+            # Dropping a database also drops its sharding metadata.
+            for db_name in self.enable_sharding:
+                self.logger.info("Enabling sharding for '%s' database...", db_name)
+                client.admin.command({"enablesharding": db_name})
+        except pymongo.errors.PyMongoError as err:
+            raise errors.ServerFailure("Failed to reset {}: {}".format(self, err))
+
     def _do_teardown(self, mode=None):
         """Shut down the sharded cluster."""
         self.logger.info("Stopping all members of the sharded cluster...")
@@ -394,6 +421,7 @@ class _MongoSFixture(interface.Fixture):
         self.mongos = None
         self.port = None
         self._dbpath_prefix = dbpath_prefix
+        self.readiness = readiness.ReadinessWaiter(self.logger, self.mongo_client)
 
     def setup(self):
         """Set up the sharded cluster."""
@@ -408,6 +436,7 @@ class _MongoSFixture(interface.Fixture):
 
         mongos = core.programs.mongos_program(
             self.logger, self.job_num, executable=self.mongos_executable, **self.mongos_options)
+        self.readiness.watch(mongos)
         try:
             self.logger.info("Starting mongos on port %d...\n%s", self.port, mongos.as_command())
             mongos.start()
@@ -429,34 +458,8 @@ class _MongoSFixture(interface.Fixture):
 
     def await_ready(self):
         """Block until the fixture can be used for testing."""
-        deadline = time.time() + standalone.MongoDFixture.AWAIT_READY_TIMEOUT_SECS
-
-        # Wait until the mongos is accepting connections. The retry logic is necessary to support
-        # versions of PyMongo <3.0 that immediately raise a ConnectionFailure if a connection cannot
-        # be established.
-        while True:
-            # Check whether the mongos exited for some reason.
-            exit_code = self.mongos.poll()
-            if exit_code is not None:
-                raise errors.ServerFailure("Could not connect to mongos on port {}, process ended"
-                                           " unexpectedly with code {}.".format(
-                                               self.port, exit_code))
-
-            try:
-                # Use a shorter connection timeout to more closely satisfy the requested deadline.
-                client = self.mongo_client(timeout_millis=500)
-                client.admin.command("ping")
-                break
-            except pymongo.errors.ConnectionFailure:
-                remaining = deadline - time.time()
-                if remaining <= 0.0:
-                    raise errors.ServerFailure(
-                        "Failed to connect to mongos on port {} after {} seconds".format(
-                            self.port, standalone.MongoDFixture.AWAIT_READY_TIMEOUT_SECS))
-
-                self.logger.info("Waiting to connect to mongos on port %d.", self.port)
-                time.sleep(0.1)  # Wait a little bit before trying again.
-
+        readiness.await_accepting_connections(self.readiness, self.mongos, self.port, "mongos",
+                                              standalone.MongoDFixture.AWAIT_READY_TIMEOUT_SECS)
         self.logger.info("Successfully contacted the mongos on port %d.", self.port)
 
     def _do_teardown(self, mode=None):
@@ -464,6 +467,8 @@ class _MongoSFixture(interface.Fixture):
             self.logger.warning("The mongos fixture has not been set up yet.")
             return  # Teardown is still a success even if nothing is running.
 
+        self.readiness.close()
+
         if mode == interface.TeardownMode.ABORT:
             self.logger.info(
                 "Attempting to send SIGABRT from resmoke to mongos on port %d with pid %d...",
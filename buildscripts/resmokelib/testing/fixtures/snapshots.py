@@ -0,0 +1,111 @@
+"""Snapshots of the dbpaths of freshly initialized fixtures, which later runs restore from."""
+
+import hashlib
+import json
+import os
+import os.path
+import shutil
+import uuid
+
+from buildscripts.resmokelib import utils
+
+try:
+    import fcntl
+except ImportError:
+    # Windows doesn't have fcntl, so the files are always copied.
+    fcntl = None
+
+# The ioctl request which makes a file share the extents of another one on Linux filesystems
+# supporting copy-on-write (e.g. btrfs and XFS).
+_FICLONE = 0x40049409
+
+# Files at the top of a dbpath which aren't part of a snapshot. A mongod.lock left by a running
+# mongod would otherwise have the restored mongod report an unclean shutdown.
+_SKIPPED_NAMES = frozenset(["mongod.lock", "mongod.log", "diagnostic.data"])
+
+
+def get_executable_fingerprint(executable):
+    """Return a JSON-serializable identifier of the binary 'executable', or None if not found."""
+    path = shutil.which(executable)
+    if path is None:
+        return None
+    path = os.path.realpath(path)
+    stat = os.stat(path)
+    return [path, stat.st_size, stat.st_mtime_ns]
+
+
+def make_key(fixture_description):
+    """Return the key of the snapshot of a fixture described by a JSON-serializable dict."""
+    encoded = json.dumps(fixture_description, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def copy_dbpath(src, dst):
+    """Replace 'dst' with a copy of the dbpath 'src'.
+
+    The files are cloned when the filesystem supports it, which is almost free. Hard links aren't
+    used since the storage engine modifies its files in place, which would corrupt the snapshot.
+    """
+    if os.path.lexists(dst):
+        utils.rmtree(dst, ignore_errors=False)
+
+    for (dirpath, dirnames, filenames) in os.walk(src):
+        if dirpath == src:
+            dirnames[:] = [name for name in dirnames if name not in _SKIPPED_NAMES]
+            filenames = [name for name in filenames if name not in _SKIPPED_NAMES]
+
+        dst_dirpath = os.path.join(dst, os.path.relpath(dirpath, src))
+        os.makedirs(dst_dirpath, exist_ok=True)
+        for filename in filenames:
+            _clone_file(os.path.join(dirpath, filename), os.path.join(dst_dirpath, filename))
+
+
+def _clone_file(src, dst):
+    if fcntl is not None:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            try:
+                fcntl.ioctl(fdst.fileno(), _FICLONE, fsrc.fileno())
+                return
+            except OSError:
+                # The filesystem doesn't support cloning, or 'src' and 'dst' are on different
+                # filesystems.
+                pass
+    shutil.copyfile(src, dst)
+
+
+class DBPathSnapshots(object):
+    """A directory of snapshots, each containing a subdirectory per node of a fixture."""
+
+    def __init__(self, snapshot_dir):
+        """Initialize DBPathSnapshots."""
+        self.snapshot_dir = snapshot_dir
+
+    def find(self, key):
+        """Return the directory of the snapshot for 'key', or None if there isn't one."""
+        path = os.path.join(self.snapshot_dir, key)
+        return path if os.path.isdir(path) else None
+
+    def save(self, key, dbpaths):
+        """Copy the {node name: dbpath} 'dbpaths' into the snapshot for 'key'.
+
+        The mongods using the dbpaths must not be writing to them, e.g. because they are locked with
+        the fsync command. Saving a snapshot which already exists has no effect.
+        """
+        if self.find(key) is not None:
+            return
+
+        # The snapshot is copied under a unique name and renamed into place once complete, so that
+        # concurrent resmoke.py invocations never restore a partial snapshot.
+        tmp_path = os.path.join(self.snapshot_dir, "{}.tmp-{}".format(key, uuid.uuid4().hex))
+        try:
+            for (name, dbpath) in dbpaths.items():
+                copy_dbpath(dbpath, os.path.join(tmp_path, name))
+            try:
+                os.rename(tmp_path, os.path.join(self.snapshot_dir, key))
+            except OSError:
+                # Another resmoke.py invocation saved the same snapshot first.
+                if self.find(key) is None:
+                    raise
+        finally:
+            if os.path.lexists(tmp_path):
+                utils.rmtree(tmp_path, ignore_errors=True)
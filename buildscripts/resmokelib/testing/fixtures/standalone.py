@@ -2,16 +2,14 @@
 
 import os
 import os.path
-import time
-
-import pymongo
-import pymongo.errors
 
 from buildscripts.resmokelib import config
 from buildscripts.resmokelib import core
 from buildscripts.resmokelib import errors
 from buildscripts.resmokelib import utils
 from buildscripts.resmokelib.testing.fixtures import interface
+from buildscripts.resmokelib.testing.fixtures import readiness
+from buildscripts.resmokelib.testing.fixtures import snapshots
 
 
 class MongoDFixture(interface.Fixture):
@@ -50,10 +48,19 @@ class MongoDFixture(interface.Fixture):
 
         self.mongod = None
         self.port = None
+        self.readiness = readiness.ReadinessWaiter(self.logger, self.mongo_client)
+
+        # If set, then the dbpath is replaced by a copy of this snapshot of a dbpath on the next
+        # setup. Later setups, e.g. when a hook restarts the mongod, keep the data it has since
+        # written.
+        self.dbpath_snapshot = None
 
     def setup(self):
         """Set up the mongod."""
-        if not self.preserve_dbpath and os.path.lexists(self._dbpath):
+        if self.dbpath_snapshot is not None:
+            snapshots.copy_dbpath(self.dbpath_snapshot, self._dbpath)
+            self.dbpath_snapshot = None
+        elif not self.preserve_dbpath and os.path.lexists(self._dbpath):
             utils.rmtree(self._dbpath, ignore_errors=False)
 
         try:
@@ -68,6 +75,7 @@ class MongoDFixture(interface.Fixture):
 
         mongod = core.programs.mongod_program(
             self.logger, self.job_num, executable=self.mongod_executable, **self.mongod_options)
+        self.readiness.watch(mongod)
         try:
             self.logger.info("Starting mongod on port %d...\n%s", self.port, mongod.as_command())
             mongod.start()
@@ -88,34 +96,8 @@ class MongoDFixture(interface.Fixture):
 
     def await_ready(self):
         """Block until the fixture can be used for testing."""
-        deadline = time.time() + MongoDFixture.AWAIT_READY_TIMEOUT_SECS
-
-        # Wait until the mongod is accepting connections. The retry logic is necessary to support
-        # versions of PyMongo <3.0 that immediately raise a ConnectionFailure if a connection cannot
-        # be established.
-        while True:
-            # Check whether the mongod exited for some reason.
-            exit_code = self.mongod.poll()
-            if exit_code is not None:
-                raise errors.ServerFailure("Could not connect to mongod on port {}, process ended"
-                                           " unexpectedly with code {}.".format(
-                                               self.port, exit_code))
-
-            try:
-                # Use a shorter connection timeout to more closely satisfy the requested deadline.
-                client = self.mongo_client(timeout_millis=500)
-                client.admin.command("ping")
-                break
-            except pymongo.errors.ConnectionFailure:
-                remaining = deadline - time.time()
-                if remaining <= 0.0:
-                    raise errors.ServerFailure(
-                        "Failed to connect to mongod on port {} after {} seconds".format(
-                            self.port, MongoDFixture.AWAIT_READY_TIMEOUT_SECS))
-
-                self.logger.info("Waiting to connect to mongod on port %d.", self.port)
-                time.sleep(0.1)  # Wait a little bit before trying again.
-
+        readiness.await_accepting_connections(self.readiness, self.mongod, self.port, "mongod",
+                                              MongoDFixture.AWAIT_READY_TIMEOUT_SECS)
         self.logger.info("Successfully contacted the mongod on port %d.", self.port)
 
     def _do_teardown(self, mode=None):
@@ -123,6 +105,8 @@ class MongoDFixture(interface.Fixture):
             self.logger.warning("The mongod fixture has not been set up yet.")
             return  # Still a success even if nothing is running.
 
+        self.readiness.close()
+
         if mode == interface.TeardownMode.ABORT:
             self.logger.info(
                 "Attempting to send SIGABRT from resmoke to mongod on port %d with pid %d...",
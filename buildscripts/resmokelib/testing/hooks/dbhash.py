@@ -3,19 +3,30 @@
 import os.path
 
 from buildscripts.resmokelib.testing.hooks import jsfile
+from buildscripts.resmokelib.testing.hooks import native_consistency
 
 
-class CheckReplDBHash(jsfile.DataConsistencyHook):
+class CheckReplDBHash(jsfile.NativeDataConsistencyHook):
     """Check if the dbhashes match.
 
     This includes dbhashes for all non-local databases and non-replicated system collections that
     match on the primary and secondaries.
+
+    If 'in_process' is true, then the dbhashes are compared through PyMongo clients which are
+    reused between tests instead of by starting a mongo shell after every test.
     """
 
-    def __init__(  # pylint: disable=super-init-not-called
-            self, hook_logger, fixture, shell_options=None):
+    def __init__(  # pylint: disable=too-many-arguments,invalid-name
+            self, hook_logger, fixture, shell_options=None, in_process=False, run_policy="always",
+            n=jsfile.DataConsistencyHook.DEFAULT_N):
         """Initialize CheckReplDBHash."""
         description = "Check dbhashes of all replica set or master/slave members"
         js_filename = os.path.join("jstests", "hooks", "run_check_repl_dbhash.js")
-        jsfile.JSHook.__init__(  # pylint: disable=non-parent-init-called
-            self, hook_logger, fixture, js_filename, description, shell_options=shell_options)
+        jsfile.NativeDataConsistencyHook.__init__(self, hook_logger, fixture, js_filename,
+                                                  description, shell_options=shell_options,
+                                                  in_process=in_process, run_policy=run_policy, n=n)
+
+    def _make_checker(self, clients, test_data):
+        """Return the in-process dbhash checker."""
+        return native_consistency.DBHashChecker(self.fixture, clients,
+                                                excluded_dbs=test_data.get("excludedDBsFromDBHash"))
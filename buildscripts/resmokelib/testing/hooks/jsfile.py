@@ -2,6 +2,8 @@
 
 from buildscripts.resmokelib import errors
 from buildscripts.resmokelib.testing.hooks import interface
+from buildscripts.resmokelib.testing.hooks import native_consistency
+from buildscripts.resmokelib.testing.hooks import write_watermark
 from buildscripts.resmokelib.testing.testcases import jstest
 from buildscripts.resmokelib.utils import registry
 
@@ -43,17 +45,142 @@ class DataConsistencyHook(JSHook):
 
     If the mongo shell process running the JavaScript file exits with a non-zero return code, then
     an errors.ServerFailure exception is raised to cause resmoke.py's test execution to stop.
+
+    The 'run_policy' controls after which tests the check runs:
+        always: after every test.
+        on_write: after every test which wrote to the fixture.
+        every_n_tests: after every 'n' tests, and at the end of the suite.
+        end_of_suite: once at the end of the suite.
     """
 
     REGISTERED_NAME = registry.LEAVE_UNREGISTERED
 
+    RUN_POLICIES = ("always", "on_write", "every_n_tests", "end_of_suite")
+
+    DEFAULT_N = 10
+
+    def __init__(  # pylint: disable=too-many-arguments,invalid-name
+            self, hook_logger, fixture, js_filename, description, shell_options=None,
+            run_policy="always", n=DEFAULT_N):
+        """Initialize DataConsistencyHook."""
+        JSHook.__init__(self, hook_logger, fixture, js_filename, description,
+                        shell_options=shell_options)
+
+        if run_policy not in DataConsistencyHook.RUN_POLICIES:
+            raise ValueError("run_policy must be one of {}, not '{}'".format(
+                DataConsistencyHook.RUN_POLICIES, run_policy))
+        if run_policy == "every_n_tests" and n < 1:
+            raise ValueError("n must be a positive integer")
+
+        self.run_policy = run_policy
+        self.n = n  # pylint: disable=invalid-name
+        self.num_ran = 0
+        self.num_skipped = 0
+        self._num_unchecked = 0
+        self._last_test = None
+        self._write_watermark = None
+        self._watermark = None
+        if run_policy == "on_write":
+            self._write_watermark = write_watermark.WriteWatermark(self.fixture)
+
+    def before_test(self, test, test_report):
+        """Capture the write watermark of the fixture before the test runs."""
+        if self._write_watermark is not None:
+            self._watermark = self._write_watermark.capture()
+
     def after_test(self, test, test_report):
         """After test execution."""
+        self._last_test = test
+        if not self._should_check_after_test():
+            self.num_skipped += 1
+            self._num_unchecked += 1
+            self.logger.info("Skipping %s after %s due to the '%s' run policy.", self.description,
+                             test.short_name(), self.run_policy)
+            return
+
+        self._run_check_after(test, test_report)
+
+    def after_suite(self, test_report):
+        """Check the tests which weren't checked yet, then release the write watermark."""
+        if self._num_unchecked > 0 and self.run_policy in ("every_n_tests", "end_of_suite"):
+            self.logger.info("Running %s at the end of the suite to check %d test(s).",
+                             self.description, self._num_unchecked)
+            self._run_check_after(self._last_test, test_report)
+
+        if self._write_watermark is not None:
+            self._write_watermark.close()
+
+    def _should_check_after_test(self):
+        """Return True if the run policy requires checking the test which just finished."""
+        if self.run_policy == "on_write":
+            return self._write_watermark.has_writes_since(self._watermark)
+        if self.run_policy == "every_n_tests":
+            return self._num_unchecked + 1 >= self.n
+        if self.run_policy == "end_of_suite":
+            return False
+        return True
+
+    def _run_check_after(self, test, test_report):
+        self.num_ran += 1
+        self._num_unchecked = 0
         try:
-            JSHook.after_test(self, test, test_report)
+            self._run_check(test, test_report)
         except errors.TestFailure as err:
             raise errors.ServerFailure(err.args[0])
 
+    def _run_check(self, test, test_report):
+        """Run the check after 'test'. Subclasses may override this to run it some other way."""
+        JSHook.after_test(self, test, test_report)
+
+
+class NativeDataConsistencyHook(DataConsistencyHook):
+    """A DataConsistencyHook whose check can also run in-process.
+
+    If 'in_process' is true, then the check runs through PyMongo clients which are reused between
+    tests instead of by starting a mongo shell after every test. Subclasses create the in-process
+    checker in _make_checker().
+    """
+
+    REGISTERED_NAME = registry.LEAVE_UNREGISTERED
+
+    def __init__(  # pylint: disable=too-many-arguments,invalid-name
+            self, hook_logger, fixture, js_filename, description, shell_options=None,
+            in_process=False, run_policy="always", n=DataConsistencyHook.DEFAULT_N):
+        """Initialize NativeDataConsistencyHook."""
+        DataConsistencyHook.__init__(self, hook_logger, fixture, js_filename, description,
+                                     shell_options=shell_options, run_policy=run_policy, n=n)
+
+        self._clients = None
+        self._checker = None
+        if in_process:
+            test_data = native_consistency.get_test_data(shell_options)
+            self._clients = native_consistency.NodeClients(fixture)
+            self._checker = self._make_checker(self._clients, test_data)
+
+    def _make_checker(self, clients, test_data):
+        """Return the in-process checker, which has a check(logger) method."""
+        raise NotImplementedError("_make_checker must be implemented by NativeDataConsistencyHook"
+                                  " subclasses")
+
+    def after_suite(self, test_report):
+        """Run any pending check, then close the clients of the in-process check."""
+        try:
+            DataConsistencyHook.after_suite(self, test_report)
+        finally:
+            if self._clients is not None:
+                self._clients.close()
+
+    def _run_check(self, test, test_report):
+        """Run the check after 'test'."""
+        if self._checker is None:
+            DataConsistencyHook._run_check(self, test, test_report)
+            return
+
+        hook_test_case = native_consistency.NativeConsistencyTestCase.create_after_test(
+            self.logger, test, self, self._checker)
+        hook_test_case.configure(self.fixture)
+        hook_test_case.run_dynamic_test(test_report)
+
 
 class DynamicJSTestCase(interface.DynamicTestCase):
     """A dynamic TestCase that runs a JavaScript file."""
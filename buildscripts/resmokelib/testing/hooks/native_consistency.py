@@ -0,0 +1,524 @@
+"""In-process data consistency checks for the CheckReplDBHash and ValidateCollections hooks.
+
+Rather than starting a mongo shell after every test, the checks are run through PyMongo clients
+which are kept open for the whole suite, and the nodes are checked at the same time from a pool of
+threads.
+"""
+
+import concurrent.futures
+import time
+
+import bson
+import pymongo
+import pymongo.errors
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing.fixtures import replicaset
+from buildscripts.resmokelib.testing.fixtures import shardedcluster
+from buildscripts.resmokelib.testing.fixtures import standalone
+from buildscripts.resmokelib.testing.hooks import interface
+
+# The TestData options of the JavaScript hooks which the in-process checks understand.
+_SUPPORTED_TEST_DATA = frozenset([
+    "excludedDBsFromDBHash",
+    "skipValidationNamespaces",
+    "skipValidationOnNamespaceNotFound",
+])
+
+# The maximum number of documents printed when dumping a collection or the differences between two
+# copies of a collection.
+_DUMP_LIMIT = 100
+
+# How long a frozen secondary is prevented from running for election, as ReplSetTest.kForeverSecs.
+_FOREVER_SECS = 24 * 60 * 60
+
+# How long to retry freezing a secondary which can't be frozen yet.
+_FREEZE_TIMEOUT_SECS = 5 * 60
+
+# The error codes on which freezing a secondary is retried, as ReplSetTest.freeze() does.
+_FREEZE_RETRY_CODES = frozenset([
+    94,  # NotYetInitialized
+    95,  # NotSecondary
+])
+
+# The listCollections filter of the collections whose attributes are compared, as
+# DataConsistencyChecker.checkDBHash() does.
+_COLLECTIONS_FILTER = [{"type": "collection"}, {"type": {"$exists": False}}]
+
+# The data of a database which doesn't exist on a node.
+_EMPTY_DB_DATA = {"hash": None, "infos": {}, "stats": {}}
+
+
+def get_test_data(shell_options):
+    """Return the TestData of 'shell_options'.
+
+    Raise a ValueError if it sets an option which only the JavaScript version of the hooks supports.
+    """
+    test_data = ((shell_options or {}).get("global_vars") or {}).get("TestData") or {}
+    unsupported = sorted(set(test_data) - _SUPPORTED_TEST_DATA)
+    if unsupported:
+        raise ValueError("The TestData options {} aren't supported when the hook runs in-process."
+                         " Set 'in_process: false' to use them.".format(unsupported))
+    return test_data
+
+
+def get_replica_sets(fixture):
+    """Return the ReplicaSetFixtures which are part of 'fixture'."""
+    if isinstance(fixture, replicaset.ReplicaSetFixture):
+        return [fixture]
+    if isinstance(fixture, shardedcluster.ShardedClusterFixture):
+        return [fixture.configsvr] + [
+            shard for shard in fixture.shards if isinstance(shard, replicaset.ReplicaSetFixture)
+        ]
+    return []
+
+
+def get_mongod_nodes(fixture):
+    """Return the MongoDFixtures of every mongod which is part of 'fixture'."""
+    if isinstance(fixture, standalone.MongoDFixture):
+        return [fixture]
+    if isinstance(fixture, replicaset.ReplicaSetFixture):
+        nodes = fixture.nodes[:]
+        if fixture.initial_sync_node:
+            nodes.append(fixture.initial_sync_node)
+        return nodes
+    if isinstance(fixture, shardedcluster.ShardedClusterFixture):
+        nodes = get_mongod_nodes(fixture.configsvr)
+        for shard in fixture.shards:
+            nodes.extend(get_mongod_nodes(shard))
+        return nodes
+    raise ValueError("The in-process consistency checks don't support {}".format(
+        fixture.__class__.__name__))
+
+
+class NodeClients(object):
+    """PyMongo clients to the individual nodes of a fixture, which are reused between tests."""
+
+    def __init__(self, fixture):
+        """Initialize NodeClients."""
+        self._auth_options = getattr(fixture, "auth_options", None)
+        self._clients = {}
+        self._pool = None
+
+    def get(self, node):
+        """Return an authenticated client connected directly to 'node'."""
+        client = self._clients.get(node.port)
+        if client is None:
+            client = replicaset.ReplicaSetFixture.auth(node.mongo_client(), self._auth_options)
+            self._clients[node.port] = client
+        return client
+
+    def run_on_nodes(self, nodes, fn):
+        """Call fn(node, client) for every node in 'nodes' concurrently.
+
+        Return a list of the results in the same order as 'nodes'. The clients are created in the
+        calling thread, so 'fn' must not call get().
+        """
+        clients = [self.get(node) for node in nodes]
+        if self._pool is None:
+            self._pool = concurrent.futures.ThreadPoolExecutor(
+                thread_name_prefix="consistency_check")
+        futures = [self._pool.submit(fn, node, client) for (node, client) in zip(nodes, clients)]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Close all of the clients and stop the threads."""
+        for client in self._clients.values():
+            client.close()
+        self._clients = {}
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+def _is_arbiter(client):
+    return client.admin.command("isMaster").get("arbiterOnly", False)
+
+
+def _dump_collection(logger, client, db_name, coll_name):
+    coll = client[db_name][coll_name]
+    logger.info("Printing indexes in %s.%s on %s: %s", db_name, coll_name, client.address,
+                list(coll.list_indexes()))
+    logger.info("Printing the first %d documents in %s.%s on %s:", _DUMP_LIMIT, db_name, coll_name,
+                client.address)
+    for doc in coll.find().limit(_DUMP_LIMIT):
+        logger.info("%s", doc)
+
+
+def _normalize_coll_info(info):
+    """Return a copy of the listCollections entry 'info' without the fields which may differ.
+
+    The 'flags' option was removed in 4.2 and the 'ns' field of index specs was removed in 4.4.
+    """
+    info = dict(info)
+    info["options"] = dict(info.get("options", {}))
+    info["options"].pop("flags", None)
+    if "idIndex" in info:
+        info["idIndex"] = dict(info["idIndex"])
+        info["idIndex"].pop("ns", None)
+    return info
+
+
+def _get_coll_stats(database, coll_name):
+    """Return the collStats fields of 'coll_name' which must match across replica set members."""
+    stats = database.command("collStats", coll_name)
+    index_builds = stats.get("indexBuilds")
+    return {
+        "capped": stats.get("capped"),
+        "ns": stats.get("ns"),
+        "nindexes": stats.get("nindexes"),
+        "indexBuilds": None if index_builds is None else set(index_builds),
+    }
+
+
+class DBHashChecker(object):
+    """Compare the dbHash of every database across the members of each replica set."""
+
+    def __init__(self, fixture, clients, excluded_dbs=None):
+        """Initialize DBHashChecker."""
+        self.logger = None
+        self.fixture = fixture
+        self._clients = clients
+        self._excluded_dbs = set(excluded_dbs or []) | {"local"}
+
+    def check(self, logger):
+        """Raise an errors.TestFailure if the data of any replica set member differs."""
+        self.logger = logger
+        replica_sets = get_replica_sets(self.fixture)
+        if not replica_sets:
+            self.logger.info(
+                "Skipping data consistency checks for %s, which isn't a replica set"
+                " or sharded cluster.", self.fixture)
+            return
+
+        failures = []
+        for repl_set in replica_sets:
+            failures.extend(self._check_replica_set(repl_set))
+        if failures:
+            raise errors.TestFailure("dbhash mismatch between primary and secondary: {}".format(
+                "; ".join(failures)))
+
+    def _check_replica_set(self, repl_set):
+        if len(repl_set.nodes) < 2:
+            self.logger.info("Skipping data consistency checks for 1-node replica set %s.",
+                             repl_set)
+            return []
+
+        primary = repl_set.get_primary()
+        secondaries = [node for node in repl_set.nodes if node.port != primary.port]
+        primary_client = self._clients.get(primary)
+        electable_clients = [
+            client for client in (self._clients.get(node) for node in secondaries)
+            if not _is_arbiter(client)
+        ]
+
+        # As ReplSetTest.checkReplicaSet() does in the JavaScript version of the hook, the
+        # secondaries are frozen to prevent an election, which could start and then hang due to the
+        # fsyncLock, and the primary is locked to prevent writes while the dbhashes are computed.
+        frozen_clients = []
+        locked = False
+        try:
+            for client in electable_clients:
+                self._freeze(client)
+                frozen_clients.append(client)
+
+            # Await the primary in case freezing had to step down a node which was primary.
+            repl_set.get_primary()
+            # It doesn't matter if the storage engine fails to fsync, only that writes are locked
+            # out.
+            primary_client.admin.command({"fsync": 1, "lock": 1, "allowFsyncFailure": True})
+            locked = True
+
+            # Wait for every member to have applied the last write, as
+            # ReplSetTest.awaitReplication() does.
+            repl_set.await_last_op_committed()
+            return self._compare_replica_set(repl_set, primary, secondaries)
+        finally:
+            if locked:
+                self._run_ignoring_errors(primary_client, {"fsyncUnlock": 1})
+            for client in frozen_clients:
+                self._run_ignoring_errors(client, {"replSetFreeze": 0})
+
+    def _freeze(self, client):
+        """Prevent the node of 'client' from running for election, as ReplSetTest.freeze() does."""
+        deadline = time.time() + _FREEZE_TIMEOUT_SECS
+        while True:
+            try:
+                # Make sure the node isn't primary. An error likely means it's a secondary already.
+                client.admin.command({"replSetStepDown": _FOREVER_SECS, "force": True})
+            except pymongo.errors.PyMongoError:
+                pass
+
+            try:
+                client.admin.command({"replSetFreeze": _FOREVER_SECS})
+                return
+            except pymongo.errors.PyMongoError as err:
+                retryable = (isinstance(err, pymongo.errors.ConnectionFailure)
+                             or getattr(err, "code", None) in _FREEZE_RETRY_CODES)
+                if not retryable or time.time() >= deadline:
+                    raise
+                self.logger.info("Failed to freeze %s, retrying: %s", client.address, err)
+                time.sleep(0.1)
+
+    def _run_ignoring_errors(self, client, command):
+        try:
+            client.admin.command(command)
+        except pymongo.errors.PyMongoError as err:
+            self.logger.info("Continuing after %s error on %s: %s", next(iter(command)),
+                             client.address, err)
+
+    def _compare_replica_set(self, repl_set, primary, secondaries):
+        """Return a list of messages describing how the data of the secondaries differs."""
+        nodes = [primary] + secondaries
+        node_data = self._clients.run_on_nodes(nodes, self._get_db_data)
+
+        primary_client = self._clients.get(primary)
+        members = primary_client.admin.command({"replSetGetConfig": 1})["config"]["members"]
+        no_index_hosts = {
+            member["host"]
+            for member in members if member.get("buildIndexes", True) is False
+        }
+
+        (primary_data, failures) = (node_data[0], [])
+        for (secondary, secondary_data) in zip(secondaries, node_data[1:]):
+            if secondary_data is None:
+                self.logger.info("Skipping data of arbiter %s.", secondary.port)
+                continue
+            secondary_client = self._clients.get(secondary)
+            has_indexes = secondary.get_internal_connection_string() not in no_index_hosts
+            for db_name in sorted(set(primary_data) | set(secondary_data)):
+                primary_db = primary_data.get(db_name) or _EMPTY_DB_DATA
+                secondary_db = secondary_data.get(db_name) or _EMPTY_DB_DATA
+                failures.extend(
+                    self._compare_db_hashes(db_name, primary_client, primary_db["hash"],
+                                            secondary_client, secondary_db["hash"]))
+                failures.extend(
+                    self._compare_collections(db_name, primary_client, primary_db, secondary_client,
+                                              secondary_db, has_indexes))
+
+        if failures:
+            self.logger.info("Dumping the oplogs of all members of %s.", repl_set)
+            for node in nodes:
+                self._dump_oplog(self._clients.get(node))
+        return failures
+
+    def _get_db_data(self, node, client):  # pylint: disable=unused-argument
+        """Return a dict of database names to their dbHash and collection metadata.
+
+        Return None if 'client' is an arbiter.
+        """
+        if _is_arbiter(client):
+            return None
+
+        db_data = {}
+        for db_name in client.list_database_names():
+            if db_name in self._excluded_dbs:
+                continue
+            database = client[db_name]
+            db_hash = database.command("dbHash")
+            coll_names = list(db_hash["collections"])
+            coll_filter = {"$or": _COLLECTIONS_FILTER, "name": {"$in": coll_names}}
+            db_data[db_name] = {
+                "hash": db_hash,
+                "infos": {
+                    info["name"]: _normalize_coll_info(info)
+                    for info in database.list_collections(filter=coll_filter)
+                },
+                "stats": {
+                    coll_name: _get_coll_stats(database, coll_name)
+                    for coll_name in coll_names
+                },
+            }
+        return db_data
+
+    def _compare_db_hashes(  # pylint: disable=too-many-arguments
+            self, db_name, primary_client, primary_hash, secondary_client, secondary_hash):
+        """Return a list of messages describing the differences between the two dbHash responses."""
+        primary_hash = primary_hash or {"collections": {}, "uuids": {}, "capped": []}
+        secondary_hash = secondary_hash or {"collections": {}, "uuids": {}, "capped": []}
+        if primary_hash.get("md5") == secondary_hash.get("md5"):
+            return []
+
+        prefix = "{} on primary {} and secondary {}".format(db_name, primary_client.address,
+                                                            secondary_client.address)
+        self.logger.info("Checking the dbhash of %s: primary: %s, secondary: %s", prefix,
+                         primary_hash, secondary_hash)
+
+        failures = []
+        primary_colls = primary_hash["collections"]
+        secondary_colls = secondary_hash["collections"]
+        for coll_name in sorted(set(primary_colls) ^ set(secondary_colls)):
+            failures.append("{}.{} only exists on the {}".format(
+                db_name, coll_name, "primary" if coll_name in primary_colls else "secondary"))
+
+        # Capped collections aren't necessarily truncated at the same points on every member, so
+        # only the hashes of non-capped collections are compared.
+        capped = set(primary_hash.get("capped", []))
+        for coll_name in sorted(set(primary_colls) & set(secondary_colls) - capped):
+            if primary_colls[coll_name] != secondary_colls[coll_name]:
+                failures.append("{}.{} has a different hash ({})".format(
+                    db_name, coll_name, prefix))
+                self._dump_collection_diff(db_name, coll_name, primary_client, secondary_client)
+            primary_uuid = primary_hash.get("uuids", {}).get(coll_name)
+            secondary_uuid = secondary_hash.get("uuids", {}).get(coll_name)
+            if primary_uuid != secondary_uuid:
+                failures.append("{}.{} has a different UUID ({}): {} != {}".format(
+                    db_name, coll_name, prefix, primary_uuid, secondary_uuid))
+
+        if not failures:
+            # The databases differ in something other than the collections' contents and UUIDs,
+            # such as the capped collections.
+            self.logger.info("The dbhash of %s differs only in capped collections.", prefix)
+        return failures
+
+    def _compare_collections(  # pylint: disable=too-many-arguments
+            self, db_name, primary_client, primary_db, secondary_client, secondary_db,
+            secondary_has_indexes):
+        """Return a list of messages describing the differences between the collections' metadata.
+
+        The number of indexes and the index builds aren't compared if the secondary is configured
+        with 'buildIndexes: false'.
+        """
+        prefix = "{} on primary {} and secondary {}".format(db_name, primary_client.address,
+                                                            secondary_client.address)
+        failures = []
+
+        (primary_infos, secondary_infos) = (primary_db["infos"], secondary_db["infos"])
+        for coll_name in sorted(set(primary_infos) & set(secondary_infos)):
+            (primary_info, secondary_info) = (primary_infos[coll_name], secondary_infos[coll_name])
+            if primary_info.get("type") != secondary_info.get("type"):
+                continue
+            if primary_info != secondary_info:
+                failures.append("{}.{} has different attributes ({}): {} != {}".format(
+                    db_name, coll_name, prefix, primary_info, secondary_info))
+
+        (primary_stats, secondary_stats) = (primary_db["stats"], secondary_db["stats"])
+        for coll_name in sorted(set(primary_stats) & set(secondary_stats)):
+            fields = ["capped", "ns"]
+            if secondary_has_indexes:
+                fields.extend(["nindexes", "indexBuilds"])
+            reasons = [
+                field for field in fields
+                if primary_stats[coll_name][field] != secondary_stats[coll_name][field]
+            ]
+            if reasons:
+                failures.append("{}.{} has a different state ({}): {}".format(
+                    db_name, coll_name, prefix, ", ".join(reasons)))
+        return failures
+
+    def _dump_collection_diff(self, db_name, coll_name, primary_client, secondary_client):
+        """Log the documents which are missing from, or differ between, the two collections."""
+        primary_docs = {
+            bson.BSON.encode({"_id": doc["_id"]}): doc
+            for doc in primary_client[db_name][coll_name].find().sort("_id", pymongo.ASCENDING)
+        }
+        secondary_docs = {
+            bson.BSON.encode({"_id": doc["_id"]}): doc
+            for doc in secondary_client[db_name][coll_name].find().sort("_id", pymongo.ASCENDING)
+        }
+
+        num_printed = 0
+        for key in sorted(set(primary_docs) | set(secondary_docs)):
+            primary_doc = primary_docs.get(key)
+            secondary_doc = secondary_docs.get(key)
+            if primary_doc == secondary_doc:
+                continue
+            if num_printed == _DUMP_LIMIT:
+                self.logger.info("Only printing the first %d differences in %s.%s.", _DUMP_LIMIT,
+                                 db_name, coll_name)
+                break
+            num_printed += 1
+            if secondary_doc is None:
+                self.logger.info("Missing on secondary %s.%s: %s", db_name, coll_name, primary_doc)
+            elif primary_doc is None:
+                self.logger.info("Missing on primary %s.%s: %s", db_name, coll_name, secondary_doc)
+            else:
+                self.logger.info("Mismatching documents in %s.%s: primary: %s, secondary: %s",
+                                 db_name, coll_name, primary_doc, secondary_doc)
+
+    def _dump_oplog(self, client):
+        self.logger.info("Dumping the latest %d oplog entries of %s:", _DUMP_LIMIT, client.address)
+        oplog = client.local["oplog.rs"]
+        for entry in oplog.find().sort("$natural", pymongo.DESCENDING).limit(_DUMP_LIMIT):
+            self.logger.info("%s", entry)
+
+
+class CollectionValidator(object):
+    """Run full validation of every collection on every mongod."""
+
+    def __init__(self, fixture, clients, skip_namespaces=None, skip_namespace_not_found=False):
+        """Initialize CollectionValidator."""
+        self.logger = None
+        self.fixture = fixture
+        self._clients = clients
+        self._skip_namespaces = set(skip_namespaces or [])
+        self._skip_namespace_not_found = skip_namespace_not_found
+
+    def check(self, logger):
+        """Raise an errors.TestFailure if any collection fails validation."""
+        self.logger = logger
+        nodes = get_mongod_nodes(self.fixture)
+        failures = [
+            failure for node_failures in self._clients.run_on_nodes(nodes, self._validate_node)
+            for failure in node_failures
+        ]
+        if failures:
+            raise errors.TestFailure("Collection validation failed: {}".format("; ".join(failures)))
+
+    def _validate_node(self, node, client):  # pylint: disable=unused-argument
+        """Validate the collections on 'client' and return a list of failure messages."""
+        if _is_arbiter(client):
+            self.logger.info("Skipping collection validation on arbiter %s.", client.address)
+            return []
+
+        failures = []
+        for db_name in client.list_database_names():
+            database = client[db_name]
+            # Views can't be validated.
+            for coll_name in database.list_collection_names(filter={"type": "collection"}):
+                namespace = "{}.{}".format(db_name, coll_name)
+                if namespace in self._skip_namespaces:
+                    continue
+                failure = self._validate_collection(client, database, coll_name)
+                if failure is not None:
+                    failures.append(failure)
+        return failures
+
+    def _validate_collection(self, client, database, coll_name):
+        """Validate a collection and return a failure message, or None if it's valid."""
+        namespace = "{}.{}".format(database.name, coll_name)
+        try:
+            res = database.command("validate", coll_name, full=True)
+        except pymongo.errors.OperationFailure as err:
+            if self._skip_namespace_not_found and err.code == 26:  # NamespaceNotFound
+                self.logger.info(
+                    "Skipping collection validation for %s since collection was not found",
+                    namespace)
+                return None
+            res = err.details
+
+        if res.get("ok") and res.get("valid"):
+            return None
+
+        self.logger.info("Collection validation failed on host %s with response: %s",
+                         client.address, res)
+        _dump_collection(self.logger, client, database.name, coll_name)
+        return "{} on {}: {}".format(namespace, client.address, res.get("errors") or res)
+
+
+class NativeConsistencyTestCase(interface.DynamicTestCase):
+    """A dynamic TestCase that runs an in-process data consistency check."""
+
+    def __init__(  # pylint: disable=too-many-arguments
+            self, logger, test_name, description, base_test_name, hook, checker):
+        """Initialize NativeConsistencyTestCase."""
+        interface.DynamicTestCase.__init__(self, logger, test_name, description, base_test_name,
+                                           hook)
+        self._checker = checker
+
+    def run_test(self):
+        """Execute the check."""
+        try:
+            self._checker.check(self.logger)
+        except pymongo.errors.PyMongoError as err:
+            raise errors.TestFailure("{} failed: {}".format(self.description, err))
@@ -5,13 +5,14 @@ import os.path
 from buildscripts.resmokelib.testing.hooks import jsfile
 
 
-class CheckReplOplogs(jsfile.DataConsistencyHook):  # pylint: disable=non-parent-init-called,super-init-not-called
+class CheckReplOplogs(jsfile.DataConsistencyHook):
     """Check that local.oplog.rs matches on the primary and secondaries."""
 
-    def __init__(  # pylint: disable=super-init-not-called
-            self, hook_logger, fixture, shell_options=None):
+    def __init__(  # pylint: disable=too-many-arguments,invalid-name
+            self, hook_logger, fixture, shell_options=None, run_policy="always",
+            n=jsfile.DataConsistencyHook.DEFAULT_N):
         """Initialize CheckReplOplogs."""
         description = "Check oplogs of all replica set members"
         js_filename = os.path.join("jstests", "hooks", "run_check_repl_oplogs.js")
-        jsfile.JSHook.__init__(  # pylint: disable=non-parent-init-called
-            self, hook_logger, fixture, js_filename, description, shell_options=shell_options)
+        jsfile.DataConsistencyHook.__init__(self, hook_logger, fixture, js_filename, description,
+                                            shell_options=shell_options, run_policy=run_policy, n=n)
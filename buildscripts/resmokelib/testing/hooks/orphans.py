@@ -9,7 +9,9 @@ from buildscripts.resmokelib.testing.hooks import jsfile
 class CheckOrphansDeleted(jsfile.DataConsistencyHook):
     """Check if the range deleter failed to delete any orphan documents."""
 
-    def __init__(self, hook_logger, fixture, shell_options=None):
+    def __init__(  # pylint: disable=too-many-arguments,invalid-name
+            self, hook_logger, fixture, shell_options=None, run_policy="always",
+            n=jsfile.DataConsistencyHook.DEFAULT_N):
         """Initialize CheckOrphansDeleted."""
 
         if not isinstance(fixture, shardedcluster.ShardedClusterFixture):
@@ -19,9 +21,9 @@ class CheckOrphansDeleted(jsfile.DataConsistencyHook):
         description = "Check orphan documents are eventually deleted"
         js_filename = os.path.join("jstests", "hooks", "run_check_orphans_are_deleted.js")
         super().__init__(hook_logger, fixture, js_filename, description,
-                         shell_options=shell_options)
+                         shell_options=shell_options, run_policy=run_policy, n=n)
 
-    def after_test(self, test, test_report):
+    def _run_check(self, test, test_report):
         """Run the run_check_orphans_are_deleted.js hook."""
 
         # We temporarily disable the balancer so more work isn't generated for the range deleter
@@ -29,7 +31,7 @@ class CheckOrphansDeleted(jsfile.DataConsistencyHook):
         if self.fixture.enable_balancer:
             self.fixture.stop_balancer()
 
-        super().after_test(test, test_report)
+        super()._run_check(test, test_report)
 
         if self.fixture.enable_balancer:
             self.fixture.start_balancer()
@@ -1,6 +1,7 @@
 """Test hook that periodically makes the primary of a replica set step down."""
 
 import collections
+import os
 import os.path
 import random
 import threading
@@ -15,6 +16,7 @@ from buildscripts.resmokelib.testing.fixtures import interface as fixture_interf
 from buildscripts.resmokelib.testing.fixtures import replicaset
 from buildscripts.resmokelib.testing.fixtures import shardedcluster
 from buildscripts.resmokelib.testing.hooks import interface
+from buildscripts.resmokelib.utils import file_notifier
 
 
 class ContinuousStepdown(interface.Hook):  # pylint: disable=too-many-instance-attributes
@@ -58,6 +60,7 @@ class ContinuousStepdown(interface.Hook):  # pylint: disable=too-many-instance-a
 
         self._rs_fixtures = []
         self._mongos_fixtures = []
+        self._stepdown_lifecycle = None
         self._stepdown_thread = None
 
         # kill implies terminate.
@@ -82,13 +85,16 @@ class ContinuousStepdown(interface.Hook):  # pylint: disable=too-many-instance-a
             self._add_fixture(self._fixture)
 
         if self.__stepdown_files is not None:
-            lifecycle = FileBasedStepdownLifecycle(self.__stepdown_files)
+            self._stepdown_lifecycle = FileBasedStepdownLifecycle(self.__stepdown_files)
+            if not self._stepdown_lifecycle.start_notifications():
+                self.logger.info("File notifications aren't available; polling for the stepdown"
+                                 " files instead.")
         else:
-            lifecycle = FlagBasedStepdownLifecycle()
+            self._stepdown_lifecycle = FlagBasedStepdownLifecycle()
 
         self._stepdown_thread = _StepdownThread(
             self.logger, self._mongos_fixtures, self._rs_fixtures, self._stepdown_interval_secs,
-            self._terminate, self._kill, lifecycle, self._wait_for_mongos_retarget,
+            self._terminate, self._kill, self._stepdown_lifecycle, self._wait_for_mongos_retarget,
             self._stepdown_via_heartbeats, self._background_reconfig, self._fixture)
         self.logger.info("Starting the stepdown thread.")
         self._stepdown_thread.start()
@@ -99,6 +105,12 @@ class ContinuousStepdown(interface.Hook):  # pylint: disable=too-many-instance-a
         self._stepdown_thread.stop()
         self.logger.info("Stepdown thread stopped.")
 
+        if isinstance(self._stepdown_lifecycle, FileBasedStepdownLifecycle):
+            self._stepdown_lifecycle.stop_notifications()
+            summary = self._stepdown_lifecycle.summarize_handshake_latencies()
+            if summary:
+                self.logger.info("Stepdown handshake latencies: %s", summary)
+
     def before_test(self, test, test_report):
         """Before test."""
         self.logger.info("Resuming the stepdown thread.")
@@ -255,8 +267,18 @@ class FileBasedStepdownLifecycle(object):
 
     Note that the job thread still synchronizes with the stepdown thread outside the context of this
     object to know it isn't in the process of running a stepdown.
+
+    The stepdown thread is woken up as soon as the test creates the "permitted" or "idle_request"
+    file if start_notifications() succeeded, and otherwise checks for them every POLL_INTERVAL_SECS.
+    The time between the test creating a file and the stepdown thread acting on it is recorded as
+    the handshake latency.
     """
 
+    POLL_INTERVAL_SECS = 0.1
+
+    # How often the files are checked for when notifications are delivered, in case one is missed.
+    NOTIFIED_POLL_INTERVAL_SECS = 5.0
+
     def __init__(self, stepdown_files):
         """Initialize the FileBasedStepdownLifecycle instance."""
         self.__stepdown_files = stepdown_files
@@ -265,6 +287,61 @@ class FileBasedStepdownLifecycle(object):
         self.__cond = threading.Condition(self.__lock)
 
         self.__should_stop = False
+        self.__notifier = None
+        self.__permitted_seen = False
+        self.__handshake_latencies = {"permitted": [], "idle_request": []}
+
+    def start_notifications(self):
+        """Watch for the test creating the stepdown files and return True if it's supported."""
+        directory = os.path.dirname(self.__stepdown_files.permitted)
+        # The "idle_ack" file is created by the stepdown thread itself.
+        filenames = [
+            os.path.basename(self.__stepdown_files.permitted),
+            os.path.basename(self.__stepdown_files.idle_request)
+        ]
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            return False
+
+        notifier = file_notifier.FileCreationNotifier(directory, filenames, self.__notify)
+        if not notifier.start():
+            return False
+
+        self.__notifier = notifier
+        return True
+
+    def stop_notifications(self):
+        """Stop watching for the stepdown files."""
+        if self.__notifier is not None:
+            self.__notifier.stop()
+            self.__notifier = None
+
+    def summarize_handshake_latencies(self):
+        """Return a description of the handshake latencies, or None if there weren't any."""
+        parts = []
+        for (name, latencies) in self.__handshake_latencies.items():
+            if latencies:
+                parts.append("{} mean {:.1f} ms, max {:.1f} ms over {} handshake(s)".format(
+                    name, 1000 * sum(latencies) / len(latencies), 1000 * max(latencies),
+                    len(latencies)))
+        return "; ".join(parts) or None
+
+    def __notify(self):
+        with self.__lock:
+            self.__cond.notify_all()
+
+    def __poll_interval_secs(self):
+        if self.__notifier is not None and self.__notifier.is_running():
+            return self.NOTIFIED_POLL_INTERVAL_SECS
+        return self.POLL_INTERVAL_SECS
+
+    def __record_handshake_latency(self, name, path):
+        try:
+            created = os.stat(path).st_mtime
+        except OSError:
+            return
+        self.__handshake_latencies[name].append(max(0.0, time.time() - created))
 
     def mark_test_started(self):
         """Signal to the stepdown thread that a new test has started.
@@ -287,6 +364,7 @@ class FileBasedStepdownLifecycle(object):
         utils.remove_if_exists(self.__stepdown_files.permitted)
         utils.remove_if_exists(self.__stepdown_files.idle_request)
         utils.remove_if_exists(self.__stepdown_files.idle_ack)
+        self.__permitted_seen = False
 
     def stop(self):
         """Signal to the stepdown thread that it should exit.
@@ -306,15 +384,23 @@ class FileBasedStepdownLifecycle(object):
         with self.__lock:
             while not self.__should_stop:
                 if os.path.isfile(self.__stepdown_files.permitted):
+                    if not self.__permitted_seen:
+                        self.__permitted_seen = True
+                        self.__record_handshake_latency("permitted",
+                                                        self.__stepdown_files.permitted)
                     return True
 
-                # Wait a little bit before checking for the "permitted" file again.
-                self.__cond.wait(0.1)
+                # Wait until the "permitted" file is created before checking for it again.
+                self.__cond.wait(self.__poll_interval_secs())
 
         return False
 
     def wait_for_stepdown_interval(self, timeout):
-        """Block for 'timeout' seconds, or until stop() is called."""
+        """Block for 'timeout' seconds, or until stop() is called.
+
+        When notifications are delivered, this also returns as soon as the test requests the
+        stepdown thread to become idle, so the request isn't acknowledged a full interval late.
+        """
         with self.__lock:
             self.__cond.wait(timeout)
 
@@ -334,6 +420,9 @@ class FileBasedStepdownLifecycle(object):
         with open(self.__stepdown_files.idle_ack, "w"):
             pass
 
+        self.__record_handshake_latency("idle_request", self.__stepdown_files.idle_request)
+        self.__permitted_seen = False
+
         # We remove the "permitted" file to revoke permission for the stepdown thread to continue
         # performing stepdowns.
         os.remove(self.__stepdown_files.permitted)
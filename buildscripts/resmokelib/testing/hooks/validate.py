@@ -3,19 +3,32 @@
 import os.path
 
 from buildscripts.resmokelib.testing.hooks import jsfile
+from buildscripts.resmokelib.testing.hooks import native_consistency
 
 
-class ValidateCollections(jsfile.DataConsistencyHook):
+class ValidateCollections(jsfile.NativeDataConsistencyHook):
     """Run full validation.
 
     This will run on all collections in all databases on every stand-alone
     node, primary replica-set node, or primary shard node.
+
+    If 'in_process' is true, then the collections are validated through PyMongo
+    clients which are reused between tests instead of by starting a mongo shell
+    after every test.
     """
 
-    def __init__(  # pylint: disable=super-init-not-called
-            self, hook_logger, fixture, shell_options=None):
+    def __init__(  # pylint: disable=too-many-arguments,invalid-name
+            self, hook_logger, fixture, shell_options=None, in_process=False, run_policy="always",
+            n=jsfile.DataConsistencyHook.DEFAULT_N):
         """Initialize ValidateCollections."""
         description = "Full collection validation"
         js_filename = os.path.join("jstests", "hooks", "run_validate_collections.js")
-        jsfile.JSHook.__init__(  # pylint: disable=non-parent-init-called
-            self, hook_logger, fixture, js_filename, description, shell_options=shell_options)
+        jsfile.NativeDataConsistencyHook.__init__(self, hook_logger, fixture, js_filename,
+                                                  description, shell_options=shell_options,
+                                                  in_process=in_process, run_policy=run_policy, n=n)
+
+    def _make_checker(self, clients, test_data):
+        """Return the in-process collection validator."""
+        return native_consistency.CollectionValidator(
+            self.fixture, clients, skip_namespaces=test_data.get("skipValidationNamespaces"),
+            skip_namespace_not_found=test_data.get("skipValidationOnNamespaceNotFound", False))
@@ -0,0 +1,82 @@
+"""Cheap detection of whether a test wrote to a fixture."""
+
+import pymongo
+import pymongo.errors
+
+from buildscripts.resmokelib.testing.hooks import native_consistency
+
+# The opcounters in serverStatus which are incremented by writes on a stand-alone mongod.
+_WRITE_OPCOUNTERS = ("insert", "update", "delete")
+
+# The WiredTiger cursor statistics in serverStatus which are incremented by any write to a table.
+# Unlike the opcounters, they also count the catalog and index changes made by DDL commands such as
+# createIndexes, collMod, renameCollection, drop, and dropIndexes.
+_WRITE_CURSOR_STATS = ("cursor insert calls", "cursor update calls", "cursor remove calls",
+                       "cursor modify calls")
+
+
+class WriteWatermark(object):
+    """Record a per-node marker of the writes done so far, to later tell if any writes happened.
+
+    Members of a replica set are marked with the timestamp of their newest oplog entry, and any
+    later oplog entry other than a no-op counts as a write. Stand-alone mongods are marked with the
+    insert, update, and delete opcounters and the WiredTiger cursor write calls from serverStatus.
+    Stand-alone mongods using another storage engine are always treated as having been written
+    to, since the opcounters alone miss DDL commands.
+
+    Fixtures which are neither stand-alone mongods, replica sets, nor sharded clusters made up of
+    them are always treated as having been written to.
+    """
+
+    def __init__(self, fixture):
+        """Initialize WriteWatermark."""
+        self.fixture = fixture
+        self._clients = native_consistency.NodeClients(fixture)
+
+    def capture(self):
+        """Return the current watermark, or None if the fixture isn't supported or not reachable."""
+        try:
+            nodes = native_consistency.get_mongod_nodes(self.fixture)
+            return {node.port: self._capture_node(node) for node in nodes}
+        except (pymongo.errors.PyMongoError, ValueError):
+            return None
+
+    def has_writes_since(self, watermark):
+        """Return True if any writes may have happened since 'watermark' was captured."""
+        if watermark is None:
+            return True
+        try:
+            nodes = native_consistency.get_mongod_nodes(self.fixture)
+            if {node.port for node in nodes} != set(watermark):
+                return True
+            return any(self._node_has_writes(node, watermark[node.port]) for node in nodes)
+        except (pymongo.errors.PyMongoError, ValueError):
+            return True
+
+    def close(self):
+        """Close the clients used to capture the watermark."""
+        self._clients.close()
+
+    def _capture_node(self, node):
+        client = self._clients.get(node)
+        if "replSet" not in node.mongod_options:
+            server_status = client.admin.command("serverStatus")
+            if "wiredTiger" not in server_status:
+                return None
+            opcounters = [server_status["opcounters"][name] for name in _WRITE_OPCOUNTERS]
+            cursor_stats = [
+                server_status["wiredTiger"]["cursor"][name] for name in _WRITE_CURSOR_STATS
+            ]
+            return tuple(opcounters + cursor_stats)
+
+        newest = client.local["oplog.rs"].find_one(sort=[("$natural", pymongo.DESCENDING)])
+        return newest["ts"] if newest is not None else None
+
+    def _node_has_writes(self, node, node_watermark):
+        if "replSet" not in node.mongod_options:
+            return node_watermark is None or self._capture_node(node) != node_watermark
+
+        query = {"op": {"$ne": "n"}}
+        if node_watermark is not None:
+            query["ts"] = {"$gt": node_watermark}
+        return self._clients.get(node).local["oplog.rs"].find_one(query) is not None
@@ -7,6 +7,7 @@ from collections import defaultdict
 
 from buildscripts.resmokelib import config
 from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.core import network
 from buildscripts.resmokelib.testing import testcases
 from buildscripts.resmokelib.testing.hooks import stepdown
 from buildscripts.resmokelib.testing.testcases import fixture as _fixture
@@ -19,8 +20,14 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
 
     def __init__(  # pylint: disable=too-many-arguments
             self, job_num, logger, fixture, hooks, report, archival, suite_options,
-            test_queue_logger):
-        """Initialize the job with the specified fixture and hooks."""
+            test_queue_logger, reuse_fixture=False, job_budget=None, admission_controller=None):
+        """Initialize the job with the specified fixture and hooks.
+
+        If 'reuse_fixture' is true, then 'fixture' is already running from a previous suite and
+        only has its data reset instead of being set up again. If 'job_budget' is specified, then
+        a slot is taken from it for the duration of each test. If 'admission_controller' is
+        specified, then each test is only started once it admits the test.
+        """
 
         self.logger = logger
         self.fixture = fixture
@@ -28,7 +35,10 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
         self.report = report
         self.archival = archival
         self.suite_options = suite_options
-        self.manager = FixtureTestCaseManager(test_queue_logger, self.fixture, job_num, self.report)
+        self.job_budget = job_budget
+        self.admission_controller = admission_controller
+        self.manager = FixtureTestCaseManager(test_queue_logger, self.fixture, job_num, self.report,
+                                              reuse_fixture=reuse_fixture)
 
         # Don't check fixture.is_running() when using the ContinuousStepdown hook, which kills
         # and restarts the primary. Even if the fixture is still running as expected, there is a
@@ -125,20 +135,56 @@ class Job(object):  # pylint: disable=too-many-instance-attributes
             hook.before_suite(self.report)
 
         while not queue.empty() and not interrupt_flag.is_set():
-            queue_elem = queue.get_nowait()
-            test_time_start = self._get_time()
+            if not self._acquire_slots(interrupt_flag):
+                break
             try:
-                test = queue_elem.testcase
-                self._execute_test(test)
+                if not self._run_next_test(queue, interrupt_flag):
+                    break
             finally:
-                queue_elem.job_completed(self._get_time() - test_time_start)
-                queue.task_done()
-
-            self._requeue_test(queue, queue_elem, interrupt_flag)
+                self._release_slots()
 
         for hook in self.hooks:
             hook.after_suite(self.report)
 
+    def _acquire_slots(self, interrupt_flag):
+        """Wait for the job budget and the admission controller to let the next test start.
+
+        Return False if the job should stop running tests instead.
+        """
+        if self.job_budget is not None and not self.job_budget.acquire(interrupt_flag):
+            return False
+        if (self.admission_controller is not None
+                and not self.admission_controller.acquire(interrupt_flag)):
+            if self.job_budget is not None:
+                self.job_budget.release()
+            return False
+        return True
+
+    def _release_slots(self):
+        """Give back what _acquire_slots() took."""
+        if self.admission_controller is not None:
+            self.admission_controller.release()
+        if self.job_budget is not None:
+            self.job_budget.release()
+
+    def _run_next_test(self, queue, interrupt_flag):
+        """Execute the next test from 'queue' and return False if there was no test left."""
+        try:
+            queue_elem = queue.get_for_job(self.job_num)
+        except _queue.Empty:
+            # Another job took the last test between checking queue.empty() and getting it.
+            return False
+        test_time_start = self._get_time()
+        try:
+            test = queue_elem.testcase
+            self._execute_test(test)
+        finally:
+            queue_elem.job_completed(self._get_time() - test_time_start)
+            queue.task_done()
+
+        self._requeue_test(queue, queue_elem, interrupt_flag)
+        return True
+
     def _log_requeue_test(self, queue_elem):
         """Log the requeue of a test."""
 
@@ -312,7 +358,8 @@ TestResult = namedtuple('TestResult', ['test', 'hook', 'success'])
 class FixtureTestCaseManager:
     """Class that holds information needed to create new fixture setup/teardown test cases for a single job."""
 
-    def __init__(self, test_queue_logger, fixture, job_num, report):
+    def __init__(  # pylint: disable=too-many-arguments
+            self, test_queue_logger, fixture, job_num, report, reuse_fixture=False):
         """
         Initialize the test case manager.
 
@@ -320,19 +367,31 @@ class FixtureTestCaseManager:
         :param fixture: The fixture associated with this job.
         :param job_num: This job's unique identifier.
         :param report: Report object collecting test results.
+        :param reuse_fixture: Whether the fixture is already running from a previous suite.
         """
         self.test_queue_logger = test_queue_logger
         self.fixture = fixture
         self.job_num = job_num
         self.report = report
         self.times_set_up = 0  # Setups and kills may run multiple times.
+        self.reuse_fixture = reuse_fixture
 
     def setup_fixture(self, logger):
         """
         Run a test that sets up the job's fixture and waits for it to be ready.
 
+        A fixture reused from a previous suite only has its data reset. If the reset fails, then
+        the fixture is restarted and set up from scratch.
+
         Return True if the setup was successful, False otherwise.
         """
+        if self.reuse_fixture:
+            # Only the first setup of a reused fixture may skip the restart. Later setups, e.g.
+            # after archival aborted the fixture, must start its processes again.
+            self.reuse_fixture = False
+            if self._reset_fixture(logger):
+                return True
+
         test_case = _fixture.FixtureSetupTestCase(self.test_queue_logger, self.fixture,
                                                   "job{}".format(self.job_num), self.times_set_up)
         test_case(self.report)
@@ -342,6 +401,26 @@ class FixtureTestCaseManager:
 
         return True
 
+    def _reset_fixture(self, logger):
+        """
+        Reset the data of the already running fixture.
+
+        Return True if the reset was successful. Otherwise the fixture is stopped so that it can be
+        set up again and False is returned.
+        """
+        try:
+            logger.info("Resetting the data of %s reused from a previous suite.", self.fixture)
+            self.fixture.reset_data()
+            return True
+        except errors.ServerFailure as err:
+            logger.warning("The reset of %s failed, restarting it instead: %s", self.fixture, err)
+
+        try:
+            self.fixture.teardown()
+        except errors.ServerFailure as err:
+            logger.warning("Error while stopping %s after a failed reset: %s", self.fixture, err)
+        return False
+
     def teardown_fixture(self, logger, abort=False):
         """
         Run a test that tears down the job's fixture.
@@ -362,4 +441,7 @@ class FixtureTestCaseManager:
             logger.error("The teardown of %s failed.", self.fixture)
             return False
 
+        # An aborted fixture is set up again using the same ports.
+        if not abort:
+            network.PortAllocator.release(self.job_num)
         return True
@@ -0,0 +1,71 @@
+"""Budget of job slots shared by suites which run concurrently."""
+
+import threading
+
+
+class JobBudget(object):
+    """Limit the number of tests running at once across all of the suites sharing the budget.
+
+    A Job holds a slot while it runs a test and gives it back afterwards. Since every job sets up
+    its own fixture, the suites are also given no more jobs in total than there are slots, see
+    share_jobs().
+    """
+
+    # How often a job waiting for a slot checks whether it should stop waiting.
+    POLL_INTERVAL_SECS = 1.0
+
+    def __init__(self, num_slots):
+        """Initialize the JobBudget with 'num_slots' slots."""
+        if num_slots < 1:
+            raise ValueError("num_slots must be a positive integer")
+        self.num_slots = num_slots
+        self._slots = threading.BoundedSemaphore(num_slots)
+        self._stopped = threading.Event()
+        self._stop_lock = threading.Lock()
+
+    def share_jobs(self, wanted_num_jobs):
+        """Return how many jobs each suite gets when they want 'wanted_num_jobs' jobs.
+
+        The slots are handed out one at a time to the suites which want more jobs, so a suite only
+        gets fewer jobs than it wants if another suite gets at least as many. Every suite gets at
+        least one job, even if there are more suites than slots.
+        """
+        num_jobs = [1] * len(wanted_num_jobs)
+        num_left = self.num_slots - len(wanted_num_jobs)
+        wanting = [i for (i, wanted) in enumerate(wanted_num_jobs) if wanted > 1]
+        while num_left > 0 and wanting:
+            for i in wanting[:num_left]:
+                num_jobs[i] += 1
+            num_left -= len(wanting[:num_left])
+            wanting = [i for i in wanting if num_jobs[i] < wanted_num_jobs[i]]
+        return num_jobs
+
+    def acquire(self, interrupt_flag):
+        """Wait for a free slot and return True once it is held.
+
+        Return False without holding a slot if 'interrupt_flag' is set or the budget is stopped
+        while waiting.
+        """
+        while not (interrupt_flag.is_set() or self._stopped.is_set()):
+            if self._slots.acquire(timeout=JobBudget.POLL_INTERVAL_SECS):
+                return True
+        return False
+
+    def release(self):
+        """Give back a slot obtained from acquire()."""
+        self._slots.release()
+
+    def stop(self):
+        """Stop the suites sharing the budget from running any more tests.
+
+        Return True if this call stopped the budget, and False if it was already stopped.
+        """
+        with self._stop_lock:
+            if self._stopped.is_set():
+                return False
+            self._stopped.set()
+            return True
+
+    def is_stopped(self):
+        """Return True if stop() has been called."""
+        return self._stopped.is_set()
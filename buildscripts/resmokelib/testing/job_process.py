@@ -0,0 +1,327 @@
+"""Run each Job in its own worker process instead of a thread of the resmoke.py process.
+
+The worker processes are forked from resmoke.py once the jobs are created, so each inherits its
+Job, fixture, and hooks. TestSuiteExecutor puts the names of the tests to run on a queue shared by
+the workers. The workers send back the log records of the executor, fixture, and tests loggers,
+along with the state of their TestReport after each test, so the logs and reports of resmoke.py
+look the same as when the jobs run as threads.
+"""
+
+import logging
+import logging.handlers
+import os
+import queue as _std_queue
+import signal
+import sys
+import threading
+
+from buildscripts.resmokelib import logging as _logging
+from buildscripts.resmokelib.core import pipe as _pipe
+from buildscripts.resmokelib.utils import queue as _queue
+
+_LOG_EVENT = "log"
+_REPORT_EVENT = "report"
+_FINISHED_EVENT = "finished"
+_TORN_DOWN_EVENT = "torn_down"
+
+_RUN_COMMAND = "run"
+_TEARDOWN_COMMAND = "teardown"
+_EXIT_COMMAND = "exit"
+
+
+def is_supported():
+    """Return True if jobs can run in worker processes on this platform."""
+    return hasattr(os, "fork")
+
+
+class _ForwardingHandler(logging.handlers.QueueHandler):
+    """Send the log records of a worker to resmoke.py for its handlers to emit."""
+
+    def __init__(self, events, root_logger_name):
+        """Initialize the _ForwardingHandler."""
+        logging.handlers.QueueHandler.__init__(self, events)
+        self.root_logger_name = root_logger_name
+
+    def enqueue(self, record):
+        """Send 'record' to resmoke.py."""
+        self.queue.put((_LOG_EVENT, self.root_logger_name, record))
+
+
+class _TestNameQueue(object):
+    """The queue interface a Job uses, over the names of tests sent by resmoke.py.
+
+    The end of the tests of an execution is marked by a None sentinel for each worker.
+    """
+
+    def __init__(self, tests, make_queue_elem, on_task_done):
+        """Initialize the _TestNameQueue."""
+        self._tests = tests
+        self._make_queue_elem = make_queue_elem
+        self._on_task_done = on_task_done
+        self._next_name = None
+        self._exhausted = False
+
+    def empty(self):
+        """Return True once this worker has taken its sentinel."""
+        if self._next_name is None and not self._exhausted:
+            self._next_name = self._tests.get()
+            self._exhausted = self._next_name is None
+        return self._exhausted
+
+    def get_for_job(self, _job_num):
+        """Return the queue element of the next test."""
+        return self._make_queue_elem(self.get_nowait())
+
+    def get_nowait(self):
+        """Return the name of the next test, or raise queue.Empty if there are none left."""
+        if self.empty():
+            raise _queue.Empty()
+        (name, self._next_name) = (self._next_name, None)
+        return name
+
+    def put(self, queue_elem):
+        """Have the test of 'queue_elem' run again by any worker."""
+        self._tests.put(queue_elem.testcase.test_name)
+
+    def task_done(self):
+        """Call 'on_task_done' since a test finished."""
+        self._on_task_done()
+
+
+class _Worker(object):
+    """The resmoke.py side of a worker process running a Job."""
+
+    def __init__(self, job, process, commands):
+        """Initialize the _Worker."""
+        self.job = job
+        self.process = process
+        self.commands = commands
+        self.hook_runs = []
+
+
+class JobProcessPool(object):  # pylint: disable=too-many-instance-attributes
+    """Worker processes each running the tests of a Job until the pool is stopped."""
+
+    # How often resmoke.py checks that the workers are still alive while waiting for them.
+    POLL_INTERVAL_SECS = 1.0
+
+    def __init__(self, logger, jobs, make_queue_elem, resource_sampler=None):
+        """Initialize the JobProcessPool.
+
+        'make_queue_elem' is called in the worker processes to create the queue element of a test
+        from its name.
+        """
+        import multiprocessing  # pylint: disable=import-outside-toplevel
+
+        self.logger = logger
+        self._jobs = jobs
+        self._make_queue_elem = make_queue_elem
+        self._resource_sampler = resource_sampler
+
+        self._context = multiprocessing.get_context("fork")
+        # The queues and events must be created before the workers are forked since they can't be
+        # sent to them afterwards.
+        self._tests = self._context.Queue()
+        self._events = self._context.Queue()
+        self._interrupt_flag = self._context.Event()
+        self._workers = {}
+
+    def start(self):
+        """Fork a worker process for each job."""
+        # Output buffered by the handlers would otherwise be written by each worker too.
+        for handler in _get_root_handlers():
+            handler.flush()
+        sys.stdout.flush()
+        sys.stderr.flush()
+
+        for job in self._jobs:
+            commands = self._context.Queue()
+            process = self._context.Process(target=self._worker_main, args=(job, commands),
+                                            name="job{}".format(job.job_num), daemon=True)
+            process.start()
+            self._workers[job.job_num] = _Worker(job, process, commands)
+            self.logger.info("Started worker process %d for job %d.", process.pid, job.job_num)
+
+    def run_tests(self, test_names, setup_flag, teardown_flag):
+        """Run the tests on the workers and return True if the user interrupted them.
+
+        'setup_flag' and 'teardown_flag' behave as they do for Job.__call__() and are set if
+        setting up or tearing down the fixture of any worker failed.
+        """
+        self._interrupt_flag.clear()
+        for name in test_names:
+            self._tests.put(name)
+        for _ in self._workers:
+            self._tests.put(None)
+
+        for worker in self._workers.values():
+            worker.commands.put((_RUN_COMMAND, setup_flag is not None, teardown_flag is not None))
+
+        user_interrupted = False
+        pending = set(self._workers)
+        while pending:
+            try:
+                event = self._next_event(pending)
+            except (KeyboardInterrupt, SystemExit):
+                # The workers ignore SIGINT, so they only stop once they see the interrupt flag.
+                self._interrupt_flag.set()
+                user_interrupted = True
+                continue
+
+            if event is None:
+                continue
+
+            (kind, job_num, payload) = event
+            if kind == _FINISHED_EVENT:
+                pending.discard(job_num)
+                (setup_failed, teardown_failed, hook_runs) = payload
+                self._workers[job_num].hook_runs = hook_runs
+                if setup_failed and setup_flag is not None:
+                    setup_flag.set()
+                if teardown_failed and teardown_flag is not None:
+                    teardown_flag.set()
+
+        self._drain_tests()
+        return user_interrupted
+
+    def teardown_fixtures(self):
+        """Have the workers tear down their fixtures and return True if all of them succeeded."""
+        pending = set()
+        for (job_num, worker) in self._workers.items():
+            if worker.process.is_alive():
+                worker.commands.put((_TEARDOWN_COMMAND, ))
+                pending.add(job_num)
+
+        success = len(pending) == len(self._workers)
+        while pending:
+            event = self._next_event(pending)
+            if event is not None and event[0] == _TORN_DOWN_EVENT:
+                pending.discard(event[1])
+                success = success and event[2]
+        return success
+
+    def get_hook_runs(self):
+        """Return the (hook name, number of runs, number of skips) of the hooks of every job."""
+        return [hook_run for worker in self._workers.values() for hook_run in worker.hook_runs]
+
+    def stop(self):
+        """Have the workers exit and wait for them to."""
+        for worker in self._workers.values():
+            if worker.process.is_alive():
+                worker.commands.put((_EXIT_COMMAND, ))
+
+        # The log records sent by the workers while exiting are still emitted.
+        pending = set(
+            job_num for (job_num, worker) in self._workers.items() if worker.process.is_alive())
+        while pending:
+            self._next_event(pending)
+
+        for worker in self._workers.values():
+            worker.process.join()
+
+    def _next_event(self, pending):
+        """Handle the next event from the workers and return it, or None if there wasn't any.
+
+        Workers in 'pending' which exit are removed from it, since they'll never send the event
+        being waited for.
+        """
+        try:
+            event = self._events.get(timeout=self.POLL_INTERVAL_SECS)
+        except _std_queue.Empty:
+            for job_num in list(pending):
+                worker = self._workers[job_num]
+                if not worker.process.is_alive():
+                    self._handle_worker_exit(worker)
+                    pending.discard(job_num)
+            return None
+
+        if event[0] == _LOG_EVENT:
+            (_, root_logger_name, record) = event
+            logging.getLogger(root_logger_name).handle(record)
+            return None
+
+        if event[0] == _REPORT_EVENT:
+            (_, job_num, report_state) = event
+            self._workers[job_num].job.report.set_state(report_state)
+            return None
+
+        return event
+
+    def _handle_worker_exit(self, worker):
+        if worker.process.exitcode == 0:
+            return
+        self.logger.error("The worker process of job %d exited with code %s.", worker.job.job_num,
+                          worker.process.exitcode)
+        # The other jobs stop too, the same as if the job's thread had raised an exception.
+        self._interrupt_flag.set()
+
+    def _drain_tests(self):
+        """Remove the tests and sentinels left over by workers that were interrupted."""
+        try:
+            while True:
+                self._tests.get(timeout=0.1)
+        except _std_queue.Empty:
+            pass
+
+    def _worker_main(self, job, commands):
+        """Run the commands sent by resmoke.py to the worker process of 'job'."""
+        # The user interrupting resmoke.py is handled by it setting the interrupt flag.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        for (name, root_logger) in _get_root_loggers():
+            root_logger.handlers = [_ForwardingHandler(self._events, name)]
+        _logging.flush.restart_thread_after_fork()
+        _pipe.reset_log_multiplexer_after_fork()
+        if self._resource_sampler is not None:
+            self._resource_sampler.reset_after_fork()
+            self._resource_sampler.start()
+
+        try:
+            while True:
+                command = commands.get()
+                if command[0] == _RUN_COMMAND:
+                    self._worker_run(job, command[1], command[2])
+                elif command[0] == _TEARDOWN_COMMAND:
+                    success = job.manager.teardown_fixture(job.logger)
+                    self._events.put((_TORN_DOWN_EVENT, job.job_num, success))
+                else:
+                    break
+        finally:
+            if self._resource_sampler is not None:
+                self._resource_sampler.stop()
+            _logging.flush.stop_thread()
+            for handler in _get_root_handlers():
+                handler.flush()
+            self._events.close()
+            self._events.join_thread()
+
+    def _worker_run(self, job, run_setup, run_teardown):
+        """Run the tests of an execution of the suite with 'job'."""
+        job.report.reset()
+
+        def send_report():
+            self._events.put((_REPORT_EVENT, job.job_num, job.report.get_state()))
+
+        test_queue = _TestNameQueue(self._tests, self._make_queue_elem, send_report)
+        setup_flag = threading.Event() if run_setup else None
+        teardown_flag = threading.Event() if run_teardown else None
+        job(test_queue, self._interrupt_flag, setup_flag=setup_flag, teardown_flag=teardown_flag)
+
+        hook_runs = [(hook.__class__.__name__, hook.num_ran, hook.num_skipped) for hook in job.hooks
+                     if getattr(hook, "run_policy", "always") != "always"]
+        send_report()
+        ran_setup = setup_flag is not None and setup_flag.is_set()
+        ran_teardown = teardown_flag is not None and teardown_flag.is_set()
+        self._events.put((_FINISHED_EVENT, job.job_num, (ran_setup, ran_teardown, hook_runs)))
+
+
+def _get_root_loggers():
+    """Return the (name, logger) pairs of the executor, fixture, and tests root loggers."""
+    loggers = _logging.loggers
+    return [(logger.name, logger)
+            for logger in (loggers.ROOT_EXECUTOR_LOGGER, loggers.ROOT_FIXTURE_LOGGER,
+                           loggers.ROOT_TESTS_LOGGER) if logger is not None]
+
+
+def _get_root_handlers():
+    return [handler for (_, logger) in _get_root_loggers() for handler in logger.handlers]
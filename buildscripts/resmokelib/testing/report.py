@@ -4,25 +4,28 @@ This is used to support additional test status and timing information for the re
 """
 
 import copy
+import functools
 import threading
 import time
 import unittest
 
 from buildscripts.resmokelib import config as _config
 from buildscripts.resmokelib import logging
+from buildscripts.resmokelib.testing import resource_sampler
 
 
 # pylint: disable=attribute-defined-outside-init
 class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attributes
     """Record test status and timing information."""
 
-    def __init__(self, job_logger, suite_options, job_num=None):
+    def __init__(self, job_logger, suite_options, job_num=None, resource_sampler=None):
         """
         Initialize the TestReport with the buildlogger configuration.
 
         :param job_logger: The higher-level logger that will be used to print metadata about the test.
         :param suite_options: Options for the suite being executed.
         :param job_num: The number corresponding to the job this test runs in.
+        :param resource_sampler: The ResourceSampler used to profile each test, if any.
         """
 
         unittest.TestResult.__init__(self)
@@ -31,6 +34,7 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
         self.job_num = job_num
         self.suite_options = suite_options
         self.logging_prefix = None
+        self.resource_sampler = resource_sampler
 
         self._lock = threading.Lock()
 
@@ -133,6 +137,10 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
         test.override_logger(test_logger)
         test_info.start_time = time.time()
 
+        if self.resource_sampler is not None:
+            self.resource_sampler.start_test(
+                test_info, functools.partial(resource_sampler.get_test_pids, test))
+
     def stopTest(self, test):  # pylint: disable=invalid-name
         """Call after 'test' has run."""
 
@@ -141,6 +149,8 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
         with self._lock:
             test_info = self.find_test_info(test)
             test_info.end_time = time.time()
+            if self.resource_sampler is not None:
+                test_info.resource_usage = self.resource_sampler.stop_test(test_info)
             test_status = "no failures detected" if test_info.status == "pass" else "failed"
 
         time_taken = test_info.end_time - test_info.start_time
@@ -297,6 +307,9 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
                     result["url"] = test_info.url_endpoint
                     result["url_raw"] = test_info.url_endpoint + "?raw=1"
 
+                if test_info.resource_usage is not None:
+                    result["resources"] = test_info.resource_usage
+
                 results.append(result)
 
             return {
@@ -325,6 +338,7 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
             test_info.return_code = result["exit_code"]
             test_info.start_time = result["start"]
             test_info.end_time = result["end"]
+            test_info.resource_usage = result.get("resources")
             report.test_infos.append(test_info)
 
             if is_dynamic:
@@ -338,6 +352,28 @@ class TestReport(unittest.TestResult):  # pylint: disable=too-many-instance-attr
 
         return report
 
+    def get_state(self):
+        """Return a picklable copy of the tests recorded so far, for use with set_state()."""
+
+        with self._lock:
+            return ([copy.copy(test_info) for test_info in self.test_infos], self.num_dynamic)
+
+    def set_state(self, state):
+        """Replace the tests recorded so far with those of another report's get_state().
+
+        Used to mirror the report of a job running in a worker process.
+        """
+
+        (test_infos, num_dynamic) = state
+        with self._lock:
+            self.test_infos = test_infos
+            self.num_dynamic = num_dynamic
+
+            self.num_succeeded = sum(1 for info in test_infos if info.status == "pass")
+            self.num_failed = sum(1 for info in test_infos if info.status == "fail")
+            self.num_errored = sum(1 for info in test_infos if info.status == "error")
+            self.num_interrupted = sum(1 for info in test_infos if info.status == "timeout")
+
     def reset(self):
         """Reset the test report back to its initial state."""
 
@@ -380,6 +416,7 @@ class _TestInfo(object):  # pylint: disable=too-many-instance-attributes
         self.evergreen_status = None
         self.return_code = None
         self.url_endpoint = None
+        self.resource_usage = None
 
 
 def test_order(test_name):
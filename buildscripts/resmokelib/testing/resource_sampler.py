@@ -0,0 +1,212 @@
+"""Sample the resource usage of the fixture and test processes while each test runs."""
+
+import os
+import threading
+import time
+
+import psutil
+
+# The kernel reports CPU time in /proc/<pid>/stat in clock ticks.
+_CLOCK_TICKS_PER_SEC = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+
+def get_test_pids(test):
+    """Return the pids of the processes running 'test' and of the fixture it runs against.
+
+    The descendants of those processes are included too, such as the mongod processes started by
+    a test from the mongo shell.
+    """
+    pids = list(test.pids())
+    if test.fixture is not None:
+        pids.extend(test.fixture.pids())
+
+    seen_pids = set(pids)
+    for pid in list(pids):
+        try:
+            children = psutil.Process(pid).children(recursive=True)
+        except psutil.NoSuchProcess:
+            # The process has exited since its pid was recorded.
+            continue
+        for child in children:
+            if child.pid not in seen_pids:
+                seen_pids.add(child.pid)
+                pids.append(child.pid)
+    return pids
+
+
+class ResourceSampler(object):
+    """Periodically read /proc/<pid>/{stat,status,io} for the processes of the running tests.
+
+    Each sample is attributed to every test whose processes it was taken of. Processes which start
+    and exit in between two samples aren't accounted for, so the interval should be short compared
+    to the tests being profiled.
+    """
+
+    def __init__(self, logger, interval_secs, proc_dir="/proc"):
+        """Initialize the ResourceSampler."""
+        self.logger = logger
+        self.interval_secs = interval_secs
+        self._proc_dir = proc_dir
+
+        self._lock = threading.Lock()
+        self._usages = {}
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def is_supported(self):
+        """Return True if the resource usage of processes can be read on this platform."""
+        return os.path.isdir(os.path.join(self._proc_dir, "self"))
+
+    def start(self):
+        """Start sampling in a background thread."""
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="ResourceSampler")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the background thread to exit."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def reset_after_fork(self):
+        """Discard the state inherited from the parent process in a newly forked process.
+
+        The lock may have been held by the parent's sampling thread when the process was forked,
+        and that thread doesn't exist in the child.
+        """
+        self._lock = threading.Lock()
+        self._usages = {}
+        self._thread = None
+        self._stop_event = threading.Event()
+
+    def start_test(self, key, get_pids):
+        """Start attributing the samples of the processes returned by get_pids() to 'key'."""
+        usage = _ResourceUsage(get_pids)
+        with self._lock:
+            self._usages[key] = usage
+            self._sample(usage)
+
+    def stop_test(self, key):
+        """Stop sampling for 'key' and return a dict summarizing its resource usage, or None."""
+        with self._lock:
+            usage = self._usages.pop(key, None)
+            if usage is None:
+                return None
+            self._sample(usage)
+        return usage.as_dict()
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval_secs):
+            with self._lock:
+                for usage in self._usages.values():
+                    self._sample(usage)
+
+    def _sample(self, usage):
+        try:
+            pids = usage.get_pids()
+        except Exception:  # pylint: disable=broad-except
+            self.logger.debug("Failed to get the pids to sample.", exc_info=True)
+            return
+
+        samples = {}
+        for pid in pids:
+            sample = self._read_proc(pid)
+            if sample is not None:
+                samples[pid] = sample
+        usage.add_samples(time.time(), samples)
+
+    def _read_proc(self, pid):
+        """Return a (CPU seconds, RSS bytes, bytes written) tuple for 'pid', or None if it exited.
+
+        The bytes written are None if /proc/<pid>/io isn't readable.
+        """
+        pid_dir = os.path.join(self._proc_dir, str(pid))
+        try:
+            with open(os.path.join(pid_dir, "stat"), encoding="utf-8") as fh:
+                stat = fh.read()
+            with open(os.path.join(pid_dir, "status"), encoding="utf-8") as fh:
+                status = fh.read()
+        except (IOError, OSError):
+            return None
+
+        # The command name in parentheses may contain spaces, so the fields are counted from the
+        # closing parenthesis. The utime and stime fields are the 14th and 15th fields.
+        fields = stat[stat.rfind(")") + 2:].split()
+        cpu_secs = (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS_PER_SEC
+
+        rss_bytes = 0
+        for line in status.splitlines():
+            if line.startswith("VmRSS:"):
+                rss_bytes = int(line.split()[1]) * 1024
+                break
+
+        return (cpu_secs, rss_bytes, self._read_bytes_written(pid_dir))
+
+    @staticmethod
+    def _read_bytes_written(pid_dir):
+        try:
+            with open(os.path.join(pid_dir, "io"), encoding="utf-8") as fh:
+                for line in fh:
+                    if line.startswith("write_bytes:"):
+                        return int(line.split()[1])
+        except (IOError, OSError):
+            pass
+        return None
+
+
+class _ResourceUsage(object):  # pylint: disable=too-many-instance-attributes
+    """The accumulated resource usage of the processes of one test."""
+
+    def __init__(self, get_pids):
+        """Initialize the _ResourceUsage."""
+        self.get_pids = get_pids
+
+        self.num_samples = 0
+        self._cpu_percents = []
+        self._rss_bytes = []
+        self._last_time = None
+        self._last_cpu_secs = {}
+        self._first_bytes_written = {}
+        self._last_bytes_written = {}
+
+    def add_samples(self, now, samples):
+        """Add the {pid: (CPU seconds, RSS bytes, bytes written)} samples taken at 'now'."""
+        self.num_samples += 1
+        self._rss_bytes.append(sum(rss_bytes for (_, rss_bytes, _) in samples.values()))
+
+        if self._last_time is not None and now > self._last_time:
+            cpu_secs = sum(sample[0] - self._last_cpu_secs[pid]
+                           for (pid, sample) in samples.items() if pid in self._last_cpu_secs)
+            self._cpu_percents.append(100.0 * cpu_secs / (now - self._last_time))
+        self._last_time = now
+        self._last_cpu_secs = {pid: sample[0] for (pid, sample) in samples.items()}
+
+        for (pid, (_, _, bytes_written)) in samples.items():
+            if bytes_written is None:
+                continue
+            self._first_bytes_written.setdefault(pid, bytes_written)
+            self._last_bytes_written[pid] = bytes_written
+
+    def as_dict(self):
+        """Return the peak and mean usage for the report.json file."""
+        usage = {
+            "num_samples": self.num_samples,
+            "rss_bytes_peak": max(self._rss_bytes, default=0),
+            "rss_bytes_mean": int(_mean(self._rss_bytes)),
+            "cpu_percent_peak": round(max(self._cpu_percents, default=0.0), 1),
+            "cpu_percent_mean": round(_mean(self._cpu_percents), 1),
+        }
+        if self._last_bytes_written:
+            usage["bytes_written"] = sum(
+                self._last_bytes_written[pid] - self._first_bytes_written[pid]
+                for pid in self._last_bytes_written)
+        return usage
+
+
+def _mean(values):
+    if not values:
+        return 0
+    return sum(values) / len(values)
@@ -78,6 +78,12 @@ class Suite(object):  # pylint: disable=too-many-instance-attributes
         self._suite_start_time = None
         self._suite_end_time = None
 
+        self._logging_stats = None
+
+        # Maps the name of a data consistency hook with a 'run_policy' other than "always" to the
+        # number of tests it ran and was skipped after.
+        self._hook_runs = {}
+
         self._test_start_times = []
         self._test_end_times = []
         self._reports = []
@@ -161,6 +167,10 @@ class Suite(object):  # pylint: disable=too-many-instance-attributes
 
         return Suite(self._suite_name, self._suite_config, suite_options)
 
+    def set_num_jobs(self, num_jobs):
+        """Run the suite with 'num_jobs' jobs, e.g. once its size is resolved for --jobs=auto."""
+        self._suite_options = self._suite_options._replace(num_jobs=num_jobs)
+
     @synchronized
     def record_suite_start(self):
         """Record the start time of the suite."""
@@ -171,6 +181,17 @@ class Suite(object):  # pylint: disable=too-many-instance-attributes
         """Record the end time of the suite."""
         self._suite_end_time = time.time()
 
+    @synchronized
+    def record_logging_stats(self, logging_stats):
+        """Record the core.pipe.LoggingStatsSnapshot of the process output logged by the suite."""
+        self._logging_stats = logging_stats
+
+    @synchronized
+    def record_hook_runs(self, hook_name, num_ran, num_skipped):
+        """Record the number of tests a hook ran and was skipped after due to its 'run_policy'."""
+        (prev_ran, prev_skipped) = self._hook_runs.get(hook_name, (0, 0))
+        self._hook_runs[hook_name] = (prev_ran + num_ran, prev_skipped + num_skipped)
+
     @synchronized
     def record_test_start(self, partial_reports):
         """Record the start time of an execution.
@@ -230,6 +251,15 @@ class Suite(object):  # pylint: disable=too-many-instance-attributes
             time_taken = self._suite_end_time - self._suite_start_time
             summary = summary._replace(time_taken=time_taken)
 
+        stats = self._logging_stats
+        if stats is not None and stats.num_lines > 0:
+            sb.append("Logged %d line(s) of process output at %d lines/sec, spending %0.2f seconds"
+                      " in logging." % (stats.num_lines, stats.lines_per_sec(), stats.secs))
+
+        for (hook_name, (num_ran, num_skipped)) in sorted(self._hook_runs.items()):
+            message = "%s ran %d time(s) and was skipped after %d test(s)."
+            sb.append(message % (hook_name, num_ran, num_skipped))
+
     @synchronized
     def summarize_latest(self, sb):
         """Return a summary of the latest execution of the suite.
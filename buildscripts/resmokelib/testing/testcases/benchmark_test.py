@@ -33,7 +33,8 @@ class BenchmarkTestCase(interface.ProcessTestCase):
                 "Please use --benchmarkMinTimeSecs to increase the runtime of a single benchmark "
                 "configuration.")
 
-        if _config.JOBS > 1:
+        # With --jobs=auto, benchmark suites are always sized to a single job.
+        if _config.JOBS > 1 and not _config.AUTO_JOBS:
             raise ValueError(
                 "--jobs=%d cannot be used for benchmark tests. Parallel jobs affect CPU cache access "
                 "patterns and cause additional context switching, which lead to inaccurate benchmark "
@@ -109,10 +109,19 @@ class TestCase(unittest.TestCase, metaclass=registry.make_registry_metaclass(_TE
         """Return the command invocation used to run the test or None."""
         return None
 
+    def pids(self):  # pylint: disable=no-self-use
+        """Return the pids of the processes the test is currently running."""
+        return []
+
 
 class ProcessTestCase(TestCase):  # pylint: disable=abstract-method
     """Base class for TestCases that executes an external process."""
 
+    def __init__(self, *args, **kwargs):
+        """Initialize the ProcessTestCase."""
+        TestCase.__init__(self, *args, **kwargs)
+        self._process = None
+
     def run_test(self):
         """Run the test."""
         try:
@@ -136,12 +145,21 @@ class ProcessTestCase(TestCase):  # pylint: disable=abstract-method
         process.start()
         self.logger.info("%s started with pid %s.", self.short_description(), process.pid)
 
-        self.return_code = process.wait()
+        self._process = process
+        try:
+            self.return_code = process.wait()
+        finally:
+            self._process = None
         if self.return_code != 0:
             raise self.failureException("%s failed" % (self.short_description()))
 
         self.logger.info("%s finished.", self.short_description())
 
+    def pids(self):
+        """Return the pid of the process running the test, if it is running."""
+        process = self._process
+        return [process.pid] if process is not None else []
+
     def _make_process(self):
         """Return a new Process instance that could be used to run the test or log the command."""
         raise NotImplementedError("_make_process must be implemented by TestCase subclasses")
@@ -134,6 +134,8 @@ class JSTestCase(interface.ProcessTestCase):
 
         interface.ProcessTestCase.__init__(self, logger, "JSTest", js_filename)
         self.num_clients = JSTestCase.DEFAULT_CLIENT_NUM
+        # The _SingleJSTestCase instances running the copies of the test.
+        self._client_test_cases = []
         self.test_case_template = _SingleJSTestCase(logger, js_filename, self._id, shell_executable,
                                                     shell_options)
 
@@ -145,6 +147,13 @@ class JSTestCase(interface.ProcessTestCase):
         self.test_case_template.configure(fixture, *args, **kwargs)
         self.test_case_template.configure_shell()
 
+    def pids(self):
+        """Return the pids of the mongo shells running the copies of the test."""
+        pids = []
+        for test_case in list(self._client_test_cases):
+            pids.extend(test_case.pids())
+        return pids
+
     def _make_process(self):
         # This function should only be called by interface.py's as_command().
         return self.test_case_template._make_process()  # pylint: disable=protected-access
@@ -178,6 +187,7 @@ class JSTestCase(interface.ProcessTestCase):
                                       self.test_case_template.shell_executable, shell_options)
 
         test_case.configure(self.fixture)
+        self._client_test_cases.append(test_case)
         return test_case
 
     def _run_single_copy(self):
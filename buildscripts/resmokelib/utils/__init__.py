@@ -51,6 +51,13 @@ def is_windows():
     return sys.platform.startswith("win32") or sys.platform.startswith("cygwin")
 
 
+def get_num_cpus():
+    """Return the number of CPUs the process is allowed to run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
 def remove_if_exists(path):
     """Remove path if it exists."""
     try:
@@ -1,14 +1,18 @@
 """Archival utility."""
 
 import collections
+import concurrent.futures
+import hashlib
 import json
 import os
 import queue
+import shutil
 import sys
 import tarfile
 import tempfile
 import threading
 import time
+import zlib
 
 import math
 
@@ -27,6 +31,23 @@ UploadArgs = collections.namedtuple("UploadArgs", [
 ArchiveArgs = collections.namedtuple("ArchiveArgs",
                                      ["archival_file", "display_name", "remote_file"])
 
+# Number of threads compressing archives. They are shared by all of the archives being created
+# concurrently.
+_COMPRESSION_THREADS = max(1, min(8, os.cpu_count() or 1))
+
+# The tar stream is compressed in independent blocks of this size, each of which becomes a member of
+# a multi-member gzip file. Tools that read .tgz files handle multi-member gzip files transparently.
+_COMPRESSION_BLOCK_BYTES = 4 * 1024 * 1024
+
+# gzip's own default level, which is much faster than the level 9 used by tarfile's "w:gz" mode.
+_COMPRESSION_LEVEL = 6
+
+# Regular files at least this large are hashed so that identical copies, such as the same
+# WiredTiger file on several nodes of a replica set, are only stored in the archive once. A file is
+# hashed while it's being archived, and is only read an extra time beforehand if a file of the same
+# size was already archived.
+_DEDUPE_MIN_BYTES = 1024 * 1024
+
 
 def file_list_size(files):
     """Return size (in bytes) of all 'files' and their subdirectories."""
@@ -69,6 +90,117 @@ def free_space(path):
     return stat.f_bavail * stat.f_bsize
 
 
+def _gzip_block(data):
+    """Compress 'data' as a complete gzip member."""
+    compressor = zlib.compressobj(_COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _file_digest(path):
+    """Return the SHA-256 digest of the contents of 'path'."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_COMPRESSION_BLOCK_BYTES), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class _HashingReader(object):
+    """A file-like object which computes the SHA-256 digest of what is read from 'fileobj'."""
+
+    def __init__(self, fileobj):
+        """Initialize the _HashingReader."""
+        self._fileobj = fileobj
+        self._digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        """Read from 'fileobj' and add the data read to the digest."""
+        data = self._fileobj.read(size)
+        self._digest.update(data)
+        return data
+
+    def digest(self):
+        """Return the digest of the data read so far."""
+        return self._digest.digest()
+
+
+class _ParallelGzipWriter(object):
+    """A file-like object which gzips what is written to it using a pool of threads.
+
+    zlib releases the GIL while compressing, so blocks are compressed in parallel. The compressed
+    blocks are written to 'fileobj' in order, and at most a few blocks per thread are held in
+    memory at once.
+    """
+
+    def __init__(self, fileobj, executor):
+        """Initialize the _ParallelGzipWriter."""
+        self._fileobj = fileobj
+        self._executor = executor
+        self._buffer = bytearray()
+        self._pending = collections.deque()
+        self._max_pending = 2 * _COMPRESSION_THREADS
+
+    def write(self, data):
+        """Buffer 'data' and start compressing each full block."""
+        self._buffer += data
+        while len(self._buffer) >= _COMPRESSION_BLOCK_BYTES:
+            self._submit(bytes(self._buffer[:_COMPRESSION_BLOCK_BYTES]))
+            del self._buffer[:_COMPRESSION_BLOCK_BYTES]
+        return len(data)
+
+    def _submit(self, block):
+        self._pending.append(self._executor.submit(_gzip_block, block))
+        while len(self._pending) > self._max_pending:
+            self._fileobj.write(self._pending.popleft().result())
+
+    def close(self):
+        """Compress the remaining data and wait for every block to be written."""
+        if self._buffer or not self._pending:
+            # An empty gzip member keeps the output a valid gzip file if nothing was written.
+            self._submit(bytes(self._buffer))
+            self._buffer = bytearray()
+        while self._pending:
+            self._fileobj.write(self._pending.popleft().result())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class LocalArchiveClient(object):
+    """Stand-in for the S3 client which copies archives to a local directory.
+
+    The archive for 's3_bucket' and 's3_path' is written to '<root_dir>/<s3_bucket>/<s3_path>'.
+    """
+
+    def __init__(self, root_dir):
+        """Initialize LocalArchiveClient."""
+        self.root_dir = root_dir
+
+    def get_path(self, s3_bucket, s3_path):
+        """Return the local path an archive is copied to."""
+        return os.path.join(self.root_dir, s3_bucket, *s3_path.split("/"))
+
+    def upload_file(self, local_file, s3_bucket, s3_path, ExtraArgs=None):  # pylint: disable=invalid-name,unused-argument
+        """Copy 'local_file' into the local directory."""
+        dest = self.get_path(s3_bucket, s3_path)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.copyfile(local_file, dest)
+
+    def delete_object(self, Bucket, Key):  # pylint: disable=invalid-name
+        """Remove a copied archive."""
+        os.remove(self.get_path(Bucket, Key))
+
+
+def _get_remote_file(s3_client, s3_bucket, s3_path):
+    """Return the link to the uploaded archive."""
+    if isinstance(s3_client, LocalArchiveClient):
+        return "file://" + os.path.abspath(s3_client.get_path(s3_bucket, s3_path))
+    return "https://s3.amazonaws.com/{}/{}".format(s3_bucket, s3_path)
+
+
 def remove_file(file_name):
     """Attempt to remove file. Return status and message."""
     try:
@@ -89,8 +221,11 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
 
     def __init__(  # pylint: disable=too-many-arguments
             self, logger, archival_json_file="archive.json", limit_size_mb=0, limit_files=0,
-            s3_client=None):
-        """Initialize Archival."""
+            s3_client=None, local_dir=None):
+        """Initialize Archival.
+
+        If 'local_dir' is specified, archives are copied to it instead of being uploaded to S3.
+        """
 
         self.archival_json_file = archival_json_file
         self.limit_size_mb = limit_size_mb
@@ -100,8 +235,16 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
         self.archive_time = 0
         self.logger = logger
 
-        # Lock to control access from multiple threads.
+        # Lock to control access from multiple threads. It is only held while checking the limits
+        # and updating the totals, so archives can be created concurrently. The condition is
+        # notified whenever an archive finishes.
         self._lock = threading.Lock()
+        self._archive_done = threading.Condition(self._lock)
+        self._num_in_progress = 0
+        self._reserved_size_mb = 0
+
+        self._compress_pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=_COMPRESSION_THREADS, thread_name_prefix="archive_compress")
 
         # Start the worker thread to update the 'archival_json_file'.
         self._archive_file_queue = queue.Queue()
@@ -110,7 +253,9 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
                                                            logger), name="archive_file_worker")
         self._archive_file_worker.setDaemon(True)
         self._archive_file_worker.start()
-        if not s3_client:
+        if local_dir:
+            self.s3_client = LocalArchiveClient(local_dir)
+        elif not s3_client:
             self.s3_client = self._get_s3_client()
         else:
             self.s3_client = s3_client
@@ -134,33 +279,62 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
 
         Archive is not done if user specified limits are reached. The size limit is
         enforced after it has been exceeded, since it can only be calculated after the
-        tar/gzip has been done.
+        tar/gzip has been done. Archives which are still being created count towards the
+        size limit with the uncompressed size of their files, so if they would reach a limit,
+        the archive waits for them to finish and then checks the limits again.
 
         Return status and message, where message contains information if status is non-0.
         """
 
         start_time = time.time()
-        with self._lock:
-            if not input_files:
-                status = 1
-                message = "No input_files specified"
-            elif self.limit_size_mb and self.size_mb >= self.limit_size_mb:
-                status = 1
-                message = "Files not archived, {}MB size limit reached".format(self.limit_size_mb)
-            elif self.limit_files and self.num_files >= self.limit_files:
-                status = 1
-                message = "Files not archived, {} file limit reached".format(self.limit_files)
-            else:
-                status, message, file_size_mb = self._archive_files(display_name, input_files,
-                                                                    s3_bucket, s3_path)
-
+        if not input_files:
+            return 1, "No input_files specified"
+
+        reserved_size_mb = 0
+        if self.limit_size_mb:
+            reserved_size_mb = int(math.ceil(float(file_list_size(input_files)) / (1024 * 1024)))
+
+        with self._archive_done:
+            while True:
+                if self.limit_size_mb and self.size_mb >= self.limit_size_mb:
+                    return 1, "Files not archived, {}MB size limit reached".format(
+                        self.limit_size_mb)
+                if self.limit_files and self.num_files >= self.limit_files:
+                    return 1, "Files not archived, {} file limit reached".format(self.limit_files)
+                # Archives which are still being created count towards the limits so that
+                # concurrent callers can't exceed them. Since they're likely smaller once
+                # compressed, wait for them to finish rather than rejecting this archive.
+                if not self._would_reach_limits():
+                    break
+                self._archive_done.wait()
+            self._num_in_progress += 1
+            self._reserved_size_mb += reserved_size_mb
+
+        status, message, file_size_mb = 1, "Archival did not complete", 0
+        try:
+            status, message, file_size_mb = self._archive_files(display_name, input_files,
+                                                                s3_bucket, s3_path)
+        finally:
+            with self._archive_done:
+                self._num_in_progress -= 1
+                self._reserved_size_mb -= reserved_size_mb
                 if status == 0:
                     self.num_files += 1
                 self.size_mb += file_size_mb
                 self.archive_time += time.time() - start_time
+                self._archive_done.notify_all()
 
         return status, message
 
+    def _would_reach_limits(self):
+        """Return True if the archives still being created could make another archive reach a limit.
+
+        The caller must hold self._lock.
+        """
+        if self.limit_size_mb and self.size_mb + self._reserved_size_mb >= self.limit_size_mb:
+            return True
+        return bool(self.limit_files and self.num_files + self._num_in_progress >= self.limit_files)
+
     @staticmethod
     def _update_archive_file_wkr(work_queue, logger):
         """Worker thread: Update the archival JSON file from 'work_queue'."""
@@ -210,8 +384,7 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
                 if status:
                     logger.error("Upload to S3 delete file error %s", message)
 
-            remote_file = "https://s3.amazonaws.com/{}/{}".format(upload_args.s3_bucket,
-                                                                  upload_args.s3_path)
+            remote_file = _get_remote_file(s3_client, upload_args.s3_bucket, upload_args.s3_path)
             if upload_completed:
                 archive_file_work_queue.put(
                     ArchiveArgs(upload_args.archival_file, upload_args.display_name, remote_file))
@@ -224,6 +397,8 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
 
         The caller waits until the list of files has been tar/gzipped to a temporary file.
         The S3 upload and subsequent update to 'archival_json_file' will be done asynchronosly.
+        Regular files with identical contents are only stored once, with any later copies stored
+        as hard links to the first one.
 
         Returns status, message and size_mb of archive.
         """
@@ -264,13 +439,15 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
             return 1, "Insufficient space for {}".format(message), 0
 
         try:
-            with tarfile.open(temp_file, "w:gz") as tar_handle:
+            with open(temp_file, "wb") as temp_fh, \
+                 _ParallelGzipWriter(temp_fh, self._compress_pool) as gzip_fh, \
+                 tarfile.open(fileobj=gzip_fh, mode="w|") as tar_handle:
+                file_digests = {}
+                errors = []
                 for input_file in input_files:
-                    try:
-                        tar_handle.add(input_file)
-                    except (IOError, OSError, tarfile.TarError) as err:
-                        message = "{}; Unable to add {} to archive file: {}".format(
-                            message, input_file, err)
+                    self._add_to_tar(tar_handle, input_file, file_digests, errors)
+                for error in errors:
+                    message = "{}; {}".format(message, error)
         except (IOError, OSError, tarfile.TarError) as err:
             status, message = remove_file(temp_file)
             if status:
@@ -285,13 +462,56 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
 
         return status, message, size_mb
 
+    def _add_to_tar(self, tar_handle, path, file_digests, errors):
+        """Add 'path', and everything under it if it's a directory, to 'tar_handle'.
+
+        'file_digests' maps the size of each large regular file already in the archive to a dict
+        of the digests of the files of that size and their names in the archive. A message is
+        appended to 'errors' for each file which couldn't be added.
+        """
+        try:
+            tarinfo = tar_handle.gettarinfo(path)
+            if tarinfo is None:
+                # Sockets and other special files can't be archived.
+                return
+
+            if tarinfo.isreg():
+                if tarinfo.size < _DEDUPE_MIN_BYTES:
+                    with open(path, "rb") as fh:
+                        tar_handle.addfile(tarinfo, fh)
+                    return
+
+                same_size_digests = file_digests.setdefault(tarinfo.size, {})
+                digest = _file_digest(path) if same_size_digests else None
+                if digest in same_size_digests:
+                    tarinfo.type = tarfile.LNKTYPE
+                    tarinfo.linkname = same_size_digests[digest]
+                    tarinfo.size = 0
+                    tar_handle.addfile(tarinfo)
+                    self.logger.debug("Archiving %s as a link to the identical file %s", path,
+                                      tarinfo.linkname)
+                    return
+
+                with open(path, "rb") as fh:
+                    reader = _HashingReader(fh)
+                    tar_handle.addfile(tarinfo, reader)
+                same_size_digests[reader.digest() if digest is None else digest] = tarinfo.name
+                return
+
+            tar_handle.addfile(tarinfo)
+            if tarinfo.isdir():
+                for name in sorted(os.listdir(path)):
+                    self._add_to_tar(tar_handle, os.path.join(path, name), file_digests, errors)
+        except (IOError, OSError, tarfile.TarError) as err:
+            errors.append("Unable to add {} to archive file: {}".format(path, err))
+
     def check_thread(self, thread, expected_alive):
         """Check if the thread is still active."""
-        if thread.isAlive() and not expected_alive:
+        if thread.is_alive() and not expected_alive:
             self.logger.warning(
                 "The %s thread did not complete, some files might not have been uploaded"
                 " to S3 or archived to %s.", thread.name, self.archival_json_file)
-        elif not thread.isAlive() and expected_alive:
+        elif not thread.is_alive() and expected_alive:
             self.logger.warning(
                 "The %s thread is no longer running, some files might not have been uploaded"
                 " to S3 or archived to %s.", thread.name, self.archival_json_file)
@@ -308,6 +528,7 @@ class Archival(object):  # pylint: disable=too-many-instance-attributes
         # Archive file worker thread exit should be triggered by upload thread worker.
         self._archive_file_worker.join(timeout=timeout)
         self.check_thread(self._archive_file_worker, False)
+        self._compress_pool.shutdown(wait=False)
 
         self.logger.info("Total tar/gzip archive time is %0.2f seconds, for %d file(s) %d MB",
                          self.archive_time, self.num_files, self.size_mb)
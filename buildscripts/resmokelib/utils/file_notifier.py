@@ -0,0 +1,129 @@
+"""Notify a callback when files are created in a directory, using inotify on Linux."""
+
+import ctypes
+import ctypes.util
+import os
+import os.path
+import selectors
+import struct
+import sys
+import threading
+
+# Constants from <sys/inotify.h>.
+_IN_CREATE = 0x00000100
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE_SELF = 0x00000400
+_IN_IGNORED = 0x00008000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = 0o2000000
+
+# The fixed-size header of a struct inotify_event: wd, mask, cookie, and the length of the name.
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _load_inotify():
+    """Return libc if it provides inotify, and None otherwise."""
+    if not sys.platform.startswith("linux"):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FileCreationNotifier(object):
+    """Call 'callback' whenever one of 'filenames' is created in 'directory'.
+
+    Notifications are only delivered on Linux. start() returns False on other platforms, or if the
+    directory can't be watched, in which case the caller must fall back to polling for the files.
+    """
+
+    def __init__(self, directory, filenames, callback):
+        """Initialize the FileCreationNotifier."""
+        self.directory = directory
+        self.filenames = frozenset(os.fsencode(filename) for filename in filenames)
+        self.callback = callback
+
+        self._inotify_fd = None
+        self._wakeup_fds = None
+        self._selector = None
+        self._thread = None
+
+    def start(self):
+        """Start watching the directory and return True if notifications will be delivered."""
+        libc = _load_inotify()
+        if libc is None:
+            return False
+
+        inotify_fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if inotify_fd < 0:
+            return False
+
+        mask = _IN_CREATE | _IN_MOVED_TO | _IN_DELETE_SELF
+        if libc.inotify_add_watch(inotify_fd, os.fsencode(self.directory), mask) < 0:
+            os.close(inotify_fd)
+            return False
+
+        self._inotify_fd = inotify_fd
+        self._wakeup_fds = os.pipe()
+        # The wakeup pipe is registered without data to tell it apart from the inotify file
+        # descriptor.
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._inotify_fd, selectors.EVENT_READ, self._inotify_fd)
+        self._selector.register(self._wakeup_fds[0], selectors.EVENT_READ, None)
+        self._thread = threading.Thread(target=self._run, name="FileCreationNotifier", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop watching the directory."""
+        if self._thread is None:
+            return
+
+        os.write(self._wakeup_fds[1], b"x")
+        self._thread.join()
+        self._thread = None
+
+        self._selector.close()
+        self._selector = None
+        os.close(self._inotify_fd)
+        for fd in self._wakeup_fds:
+            os.close(fd)
+
+    def is_running(self):
+        """Return True if notifications are still being delivered."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while True:
+            events = self._selector.select()
+            if any(key.data is None for (key, _) in events):
+                return
+
+            try:
+                buf = os.read(self._inotify_fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+
+            matched = False
+            offset = 0
+            while offset < len(buf):
+                (_, mask, _, name_len) = _EVENT_HEADER.unpack_from(buf, offset)
+                offset += _EVENT_HEADER.size
+                name = buf[offset:offset + name_len].rstrip(b"\0")
+                offset += name_len
+
+                if mask & (_IN_DELETE_SELF | _IN_IGNORED):
+                    # The directory was removed, so no more notifications will come. Waking the
+                    # caller lets it notice is_running() is now false and go back to polling.
+                    self.callback()
+                    return
+                if name in self.filenames:
+                    matched = True
+
+            if matched:
+                self.callback()
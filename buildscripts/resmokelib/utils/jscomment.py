@@ -1,12 +1,22 @@
 """Utility for parsing JS comments."""
 
+import json
+import os
 import re
+import tempfile
 
 import yaml
 
 # TODO: use a more robust regular expression for matching tags
 _JSTEST_TAGS_RE = re.compile(r".*@tags\s*:\s*(\[[^\]]*\])", re.DOTALL)
 
+# Matches the same tag list as _JSTEST_TAGS_RE, but only at a known position of the "@tags" marker.
+_TAGS_AT_MARKER_RE = re.compile(rb"@tags\s*:\s*(\[[^\]]*\])")
+_TAGS_MARKER = b"@tags"
+
+# Bump this whenever the way tags are parsed changes so stale caches are discarded.
+_TAGS_CACHE_VERSION = 1
+
 
 def get_tags(pathname):
     """Return the list of tags found in the (JS-style) comments of 'pathname'.
@@ -27,23 +37,118 @@ def get_tags(pathname):
       */
     """
 
-    with open(pathname, 'r', encoding='utf-8') as fp:
-        match = _JSTEST_TAGS_RE.match(fp.read())
-        if match:
-            try:
-                # TODO: it might be worth supporting the block (indented) style of YAML lists in
-                #       addition to the flow (bracketed) style
-                tags = yaml.safe_load(_strip_jscomments(match.group(1)))
-                if not isinstance(tags, list) and all(isinstance(tag, str) for tag in tags):
-                    raise TypeError("Expected a list of string tags, but got '%s'" % (tags))
-                return tags
-            except yaml.YAMLError as err:
-                raise ValueError(
-                    "File '%s' contained invalid tags (expected YAML): %s" % (pathname, err))
+    with open(pathname, 'rb') as fp:
+        tags_list = _find_tags_list(fp.read())
+
+    if tags_list is not None:
+        try:
+            # TODO: it might be worth supporting the block (indented) style of YAML lists in
+            #       addition to the flow (bracketed) style
+            tags = yaml.safe_load(_strip_jscomments(tags_list))
+            if not isinstance(tags, list) and all(isinstance(tag, str) for tag in tags):
+                raise TypeError("Expected a list of string tags, but got '%s'" % (tags))
+            return tags
+        except yaml.YAMLError as err:
+            raise ValueError(
+                "File '%s' contained invalid tags (expected YAML): %s" % (pathname, err))
 
     return []
 
 
+def _find_tags_list(contents):
+    """Return the bracketed list following the last "@tags:" in 'contents', or None.
+
+    This finds the same list as matching _JSTEST_TAGS_RE against the whole file, but searches
+    backwards for the "@tags" marker rather than backtracking a DOTALL regex over the file, and
+    returns immediately for the many files which have no tags at all. The tags can't be assumed to
+    be in the leading comment because some tests only declare them after "use strict" or load()
+    statements.
+    """
+
+    end = len(contents)
+    while True:
+        pos = contents.rfind(_TAGS_MARKER, 0, end)
+        if pos == -1:
+            return None
+
+        match = _TAGS_AT_MARKER_RE.match(contents, pos)
+        if match:
+            return match.group(1).decode("utf-8")
+        end = pos
+
+
+def get_tags_for_files(pathnames, cache_file=None):
+    """Return a dict of each of 'pathnames' to the list of tags found in its comments.
+
+    If 'cache_file' is given, the tags of each file are remembered there along with its
+    modification time and size, so that only files which changed since the last call are read
+    again. The cache is only written if the directory containing it exists.
+    """
+
+    cache = _TagsCache(cache_file) if cache_file else None
+    tags_by_file = {}
+    for pathname in pathnames:
+        if pathname in tags_by_file:
+            continue
+
+        if cache is None:
+            tags_by_file[pathname] = get_tags(pathname)
+        else:
+            tags_by_file[pathname] = cache.get_tags(pathname)
+
+    if cache is not None:
+        cache.save()
+
+    return tags_by_file
+
+
+class _TagsCache(object):
+    """A file recording the tags of JS tests, keyed by their path, modification time, and size."""
+
+    def __init__(self, path):
+        """Load the cache from 'path', ignoring it if it is missing, stale, or corrupted."""
+        self.path = path
+        self._entries = {}
+        self._modified = False
+
+        try:
+            with open(path, "r") as fp:
+                cached = json.load(fp)
+            if cached.get("version") == _TAGS_CACHE_VERSION:
+                self._entries = cached["entries"]
+        except (IOError, ValueError, KeyError, AttributeError):
+            pass
+
+    def get_tags(self, pathname):
+        """Return the tags of 'pathname', reading them from the file if it has changed."""
+        stat = os.stat(pathname)
+        entry = self._entries.get(pathname)
+        if entry is not None and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+            return list(entry[2])
+
+        tags = get_tags(pathname)
+        self._entries[pathname] = [stat.st_mtime_ns, stat.st_size, tags]
+        self._modified = True
+        return list(tags)
+
+    def save(self):
+        """Atomically write the cache back if any entries were added or changed."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        if not self._modified or not os.path.isdir(directory):
+            return
+
+        (fd, tmp_path) = tempfile.mkstemp(dir=directory, prefix=".jstest_tags")
+        try:
+            with os.fdopen(fd, "w") as fp:
+                json.dump({"version": _TAGS_CACHE_VERSION, "entries": self._entries}, fp)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # The cache is only an optimization, so failing to write it isn't fatal.
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._modified = False
+
+
 def _strip_jscomments(string):
     """Strip JS comments from a 'string'.
 
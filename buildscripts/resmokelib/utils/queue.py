@@ -6,6 +6,7 @@ in order for KeyboardInterrupt exceptions to get propagated.
 See https://bugs.python.org/issue1167930 for more details.
 """
 
+import collections
 import queue as _queue
 import time
 
@@ -16,6 +17,13 @@ Empty = _queue.Empty  # pylint: disable=invalid-name
 class Queue(_queue.Queue):
     """A multi-producer, multi-consumer queue."""
 
+    def get_for_job(self, job_num):  # pylint: disable=unused-argument
+        """Remove and return the next item for the consumer 'job_num' without blocking.
+
+        Raise Empty if no item is available.
+        """
+        return self.get_nowait()
+
     def join(self, timeout=None):  # pylint: disable=arguments-differ
         """Wait until all items in the queue have been processed or 'timeout' seconds have passed.
 
@@ -42,3 +50,56 @@ class Queue(_queue.Queue):
                         return False
                     self.all_tasks_done.wait(remaining)
         return True
+
+
+class WorkStealingQueue(Queue):
+    """A queue which hands each consumer a window of upcoming items and lets idle consumers steal.
+
+    Items are handed out in the order they were put. A consumer calling get_for_job() refills its
+    own window with up to 'lookahead' items at a time. Once both the shared items and its own
+    window are exhausted, it steals the last item from the largest window of another consumer.
+    """
+
+    def __init__(self, lookahead=1):
+        """Initialize the WorkStealingQueue."""
+        if lookahead < 1:
+            raise ValueError("lookahead must be a positive integer")
+        self._lookahead = lookahead
+        Queue.__init__(self)
+
+    def _init(self, maxsize):
+        Queue._init(self, maxsize)
+        self._windows = collections.defaultdict(collections.deque)
+
+    def _qsize(self):
+        return len(self.queue) + sum(len(window) for window in self._windows.values())
+
+    def _get(self):
+        # Used by get() and get_nowait(), which aren't associated with any one consumer.
+        if self.queue:
+            return self.queue.popleft()
+        return self._steal(thief=None)
+
+    def get_for_job(self, job_num):
+        """Remove and return the next item for the consumer 'job_num' without blocking.
+
+        Raise Empty if no item is available.
+        """
+        with self.not_empty:
+            window = self._windows[job_num]
+            while len(window) < self._lookahead and self.queue:
+                window.append(self.queue.popleft())
+
+            item = window.popleft() if window else self._steal(thief=job_num)
+            if item is None:
+                raise Empty
+            self.not_full.notify()
+            return item
+
+    def _steal(self, thief):
+        """Remove and return the last item of the largest window not owned by 'thief', if any."""
+        victims = [window for (job_num, window) in self._windows.items() if job_num != thief]
+        victim = max(victims, key=len, default=None)
+        if not victim:
+            return None
+        return victim.pop()
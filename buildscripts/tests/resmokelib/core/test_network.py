@@ -0,0 +1,138 @@
+"""Unit tests for the dynamic port allocation of buildscripts/resmokelib/core/network.py."""
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.core import network
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestPortLeases(unittest.TestCase):
+    BASE_PORT = 20000
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.leases_file = os.path.join(self.tmpdir, "leases.json")
+        self.leases = network._PortLeases(self.leases_file)
+
+        patchers = [
+            mock.patch.object(network.config, "BASE_PORT", self.BASE_PORT),
+            mock.patch.object(network, "_can_bind", return_value=True),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _read_leases(self):
+        with open(self.leases_file) as fh:
+            return json.load(fh)
+
+    def test_lease_consecutive_ports(self):
+        self.assertEqual(self.BASE_PORT, self.leases.lease(0, 1))
+        self.assertEqual(self.BASE_PORT + 1, self.leases.lease(1, 1))
+        self.assertEqual(self.BASE_PORT + 2, self.leases.lease(0, 1))
+        self.assertEqual(3, len(self._read_leases()))
+
+    def test_release_returns_ports(self):
+        self.leases.lease(0, 1)
+        self.leases.lease(1, 1)
+        self.leases.release(0)
+        lease = [self.BASE_PORT + 1, self.BASE_PORT + 1, os.getpid()]
+        self.assertEqual([lease], self._read_leases())
+        self.assertEqual(self.BASE_PORT, self.leases.lease(2, 1))
+
+    def test_reset_preserves_jobs(self):
+        self.leases.lease(0, 1)
+        self.leases.lease(1, 1)
+        self.leases.reset(preserve_job_nums={1})
+        lease = [self.BASE_PORT + 1, self.BASE_PORT + 1, os.getpid()]
+        self.assertEqual([lease], self._read_leases())
+
+    def test_test_port_range_is_leased_once(self):
+        self.leases.lease(0, 1)
+        port_range = self.leases.test_port_range(0, 10)
+        self.assertEqual((self.BASE_PORT + 1, self.BASE_PORT + 10), port_range)
+        self.assertEqual(port_range, self.leases.test_port_range(0, 10))
+        self.assertEqual(self.BASE_PORT + 11, self.leases.lease(1, 1))
+
+    def test_leases_of_other_processes(self):
+        with open(self.leases_file, "w") as fh:
+            json.dump([[self.BASE_PORT, self.BASE_PORT + 4, 1234]], fh)
+
+        with mock.patch.object(network.psutil, "pid_exists", return_value=True):
+            self.assertEqual(self.BASE_PORT + 5, self.leases.lease(0, 1))
+
+        # The leases of processes which exited are dropped.
+        self.leases.release(0)
+        with mock.patch.object(network.psutil, "pid_exists", return_value=False):
+            self.assertEqual(self.BASE_PORT, self.leases.lease(0, 1))
+        self.assertEqual([[self.BASE_PORT, self.BASE_PORT, os.getpid()]], self._read_leases())
+
+    def test_skips_ports_in_use(self):
+        ports_in_use = (self.BASE_PORT, self.BASE_PORT + 2)
+        network._can_bind.side_effect = lambda port: port not in ports_in_use
+        self.assertEqual(self.BASE_PORT + 1, self.leases.lease(0, 1))
+        self.assertEqual(self.BASE_PORT + 3, self.leases.lease(0, 2))
+
+    def test_exhausted(self):
+        with mock.patch.object(network.config, "BASE_PORT", network.PortAllocator.MAX_PORT):
+            self.leases.lease(0, 1)
+            self.assertRaises(errors.PortAllocationError, self.leases.lease, 0, 1)
+
+
+class TestCanBind(unittest.TestCase):
+    def test_port_in_use(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.addCleanup(sock.close)
+        sock.bind(("", 0))
+        sock.listen(1)
+        self.assertFalse(network._can_bind(sock.getsockname()[1]))
+
+
+class TestPortAllocatorDynamicPorts(unittest.TestCase):
+    def setUp(self):
+        self.leases = mock.Mock()
+        patchers = [
+            mock.patch.object(network.config, "DYNAMIC_PORTS", True),
+            mock.patch.object(network.PortAllocator, "_LEASES", self.leases),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_next_fixture_port(self):
+        self.leases.lease.return_value = 30000
+        self.assertEqual(30000, network.PortAllocator.next_fixture_port(3))
+        self.leases.lease.assert_called_once_with(3, 1)
+
+    def test_test_ports(self):
+        self.leases.test_port_range.return_value = (30000, 30229)
+        self.assertEqual(30000, network.PortAllocator.min_test_port(3))
+        self.assertEqual(30229, network.PortAllocator.max_test_port(3))
+
+    def test_release(self):
+        network.PortAllocator.release(3)
+        self.leases.release.assert_called_once_with(3)
+
+    def test_no_max_num_jobs(self):
+        self.assertIsNone(network.PortAllocator.max_num_jobs())
+
+
+class TestMaxNumJobs(unittest.TestCase):
+    def test_port_ranges_below_max_port(self):
+        with mock.patch.object(network.config, "DYNAMIC_PORTS", False), \
+                mock.patch.object(network.config, "BASE_PORT", 20000):
+            allocator = network.PortAllocator
+            max_num_jobs = allocator.max_num_jobs()
+            self.assertEqual(182, max_num_jobs)
+            self.assertLessEqual(allocator.max_test_port(max_num_jobs - 1), allocator.MAX_PORT)
+            self.assertRaises(errors.PortAllocationError, allocator.max_test_port, max_num_jobs)
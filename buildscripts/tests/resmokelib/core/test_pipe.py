@@ -3,12 +3,15 @@
 from __future__ import absolute_import
 
 import io
+import os
 import logging
 import unittest
 
 import mock
 
 from buildscripts.resmokelib.core import pipe as _pipe
+from buildscripts.resmokelib.logging import compressed
+from buildscripts.resmokelib.logging import handlers
 
 # pylint: disable=missing-docstring
 
@@ -43,3 +46,179 @@ class TestLoggerPipe(unittest.TestCase):
     def test_escapes_null_bytes(self):
         calls = self._get_log_calls(b"a\0b")
         self.assertEqual(calls, [mock.call(self.LOG_LEVEL, u"a\\0b")])
+
+    def test_calls_listeners_with_each_line(self):
+        logger = logging.Logger("for_testing")
+        logger.log = mock.MagicMock()
+        listener = mock.Mock()
+
+        logger_pipe = _pipe.LoggerPipe(logger=logger, level=self.LOG_LEVEL,
+                                       pipe_out=io.BytesIO(b"a\nb \n"), listeners=[listener])
+        logger_pipe.wait_until_started()
+        logger_pipe.wait_until_finished()
+
+        self.assertEqual(listener.call_args_list, [mock.call(u"a"), mock.call(u"b")])
+
+    def test_lines_split_across_reads(self):
+        logger = logging.Logger("for_testing")
+        logger.log = mock.MagicMock()
+        pipe_out = mock.MagicMock()
+        pipe_out.read1.side_effect = [b"a\nb", b"c", b"d\ne", b""]
+
+        logger_pipe = _pipe.LoggerPipe(logger=logger, level=self.LOG_LEVEL, pipe_out=pipe_out)
+        logger_pipe.wait_until_started()
+        logger_pipe.wait_until_finished()
+
+        self.assertEqual(logger.log.call_args_list, [
+            mock.call(self.LOG_LEVEL, u"a"),
+            mock.call(self.LOG_LEVEL, u"bcd"),
+            mock.call(self.LOG_LEVEL, u"e"),
+        ])
+
+    def test_batches_records_for_handlers(self):
+        logger = logging.Logger("for_testing")
+        handler = mock.Mock(level=logging.NOTSET)
+        logger.addHandler(handler)
+
+        logger_pipe = _pipe.LoggerPipe(logger=logger, level=self.LOG_LEVEL,
+                                       pipe_out=io.BytesIO(b"a\nb\nc\n"))
+        logger_pipe.wait_until_started()
+        logger_pipe.wait_until_finished()
+
+        handler.handle_batch.assert_called_once()
+        records = handler.handle_batch.call_args[0][0]
+        self.assertEqual([u"a", u"b", u"c"], [record.getMessage() for record in records])
+        handler.handle.assert_not_called()
+
+    def test_counts_logged_lines(self):
+        before = _pipe.LOGGING_STATS.snapshot([None])
+        self._get_log_calls(b"a\nb\n")
+        self.assertEqual(2, _pipe.LOGGING_STATS.snapshot([None]).since(before).num_lines)
+
+    def test_counts_logged_lines_per_job(self):
+        logger = compressed.MetadataLogger("for_testing", job=7)
+        logger.log = mock.MagicMock()
+        before = _pipe.LOGGING_STATS.snapshot([7, 8])
+
+        logger_pipe = _pipe.LoggerPipe(logger=logger, level=self.LOG_LEVEL,
+                                       pipe_out=io.BytesIO(b"a\nb\n"))
+        logger_pipe.wait_until_started()
+        logger_pipe.wait_until_finished()
+
+        self.assertEqual(2, _pipe.LOGGING_STATS.snapshot([7]).since(before).num_lines)
+        self.assertEqual(0, _pipe.LOGGING_STATS.snapshot([8]).num_lines)
+
+
+class TestLoggingStats(unittest.TestCase):
+    def test_totals_are_kept_per_job(self):
+        stats = _pipe.LoggingStats()
+        stats.add(0, 2, 1.0)
+        stats.add(1, 3, 0.5)
+        stats.add(0, 4, 2.0)
+        self.assertEqual((6, 3.0), stats.snapshot([0]))
+        self.assertEqual((9, 3.5), stats.snapshot([0, 1]))
+        self.assertEqual((0, 0.0), stats.snapshot([2]))
+
+
+class TestLogBatch(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.Logger("for_testing")
+        self.stream = io.StringIO()
+        handler = logging.StreamHandler(self.stream)
+        handler.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
+        self.logger.addHandler(handler)
+
+    def test_stream_handler_output_matches_log(self):
+        handlers.log_batch(self.logger, logging.INFO, ["a", "100%"])
+        batched = self.stream.getvalue()
+
+        self.stream.seek(0)
+        self.stream.truncate()
+        self.logger.info("a")
+        self.logger.log(logging.INFO, "100%")
+        self.assertEqual(self.stream.getvalue(), batched)
+
+    def test_respects_logger_level(self):
+        self.logger.setLevel(logging.ERROR)
+        handlers.log_batch(self.logger, logging.INFO, ["a"])
+        self.assertEqual("", self.stream.getvalue())
+
+    def test_buffered_handler_accepts_batches(self):
+        class _ListHandler(handlers.BufferedHandler):
+            def __init__(self):
+                handlers.BufferedHandler.__init__(self, capacity=100, interval_secs=1000)
+                self.flushed = []
+
+            def _flush_buffer_with_lock(self, buf, close_called):
+                self.flushed.extend(buf)
+
+        buffered_handler = _ListHandler()
+        self.logger.addHandler(buffered_handler)
+        with mock.patch.object(handlers.flush, "flush_after"), \
+             mock.patch.object(handlers.flush, "cancel"):
+            handlers.log_batch(self.logger, logging.INFO, ["a", "b"])
+            buffered_handler.close()
+
+        self.assertEqual(["a", "b"], [record.getMessage() for record in buffered_handler.flushed])
+
+
+@unittest.skipUnless(_pipe.LogMultiplexer.is_supported(), "requires selectors on pipes")
+class TestLogMultiplexer(unittest.TestCase):
+    LOG_LEVEL = logging.DEBUG
+
+    def _add_pipe(self, logger, listeners=None):
+        (read_fd, write_fd) = os.pipe()
+        pipe_out = os.fdopen(read_fd, "rb")
+        multiplexed_pipe = _pipe.get_log_multiplexer().add(logger=logger, level=self.LOG_LEVEL,
+                                                           pipe_out=pipe_out, listeners=listeners)
+        multiplexed_pipe.wait_until_started()
+        return (multiplexed_pipe, os.fdopen(write_fd, "wb", buffering=0))
+
+    def test_routes_output_to_each_logger(self):
+        outputs = []
+        for name in ("a", "b"):
+            logger = logging.Logger(name)
+            logger.log = mock.MagicMock()
+            outputs.append((logger, ) + self._add_pipe(logger))
+
+        for (logger, _, pipe_in) in outputs:
+            pipe_in.write(b"line 1\nline 2 from " + logger.name.encode())
+            pipe_in.close()
+
+        for (logger, multiplexed_pipe, _) in outputs:
+            multiplexed_pipe.wait_until_finished()
+            self.assertEqual(logger.log.call_args_list, [
+                mock.call(self.LOG_LEVEL, u"line 1"),
+                mock.call(self.LOG_LEVEL, u"line 2 from " + logger.name),
+            ])
+
+    def test_calls_listeners(self):
+        logger = logging.Logger("for_testing")
+        logger.log = mock.MagicMock()
+        listener = mock.Mock()
+        (multiplexed_pipe, pipe_in) = self._add_pipe(logger, listeners=[listener])
+
+        pipe_in.write(b"a\n")
+        pipe_in.close()
+        multiplexed_pipe.wait_until_finished()
+
+        self.assertEqual(listener.call_args_list, [mock.call(u"a")])
+
+    def test_output_is_drained_after_handler_error(self):
+        logger = logging.Logger("for_testing")
+        logger.log = mock.MagicMock(side_effect=ValueError("handler failed"))
+        logger.exception = mock.MagicMock()
+        (multiplexed_pipe, pipe_in) = self._add_pipe(logger)
+
+        # Writing more than fits in the pipe's buffer only succeeds if the pipe is still read after
+        # the first line fails to be logged.
+        pipe_in.write(b"line\n" * (1024 * 1024))
+        pipe_in.close()
+        multiplexed_pipe.wait_until_finished()
+
+        logger.log.assert_called_once_with(self.LOG_LEVEL, u"line")
+        logger.exception.assert_called_once()
+        self.assertTrue(multiplexed_pipe.pipe_out.closed)
+
+    def test_single_thread_is_shared(self):
+        self.assertIs(_pipe.get_log_multiplexer(), _pipe.get_log_multiplexer())
@@ -0,0 +1,133 @@
+"""Unit tests for buildscripts/resmokelib/logging/compressed.py and the 'logs' subcommand."""
+
+import gzip
+import io
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+from buildscripts.resmokelib import logs
+from buildscripts.resmokelib.logging import compressed
+from buildscripts.resmokelib.logging import handlers
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestCompressedFileHandler(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.filename = os.path.join(self.tmpdir, "tests.log.gz")
+
+        self.root = logging.Logger("tests")
+        self.handler = compressed.CompressedFileHandler(self.filename, buffer_bytes=64)
+        self.handler.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
+        self.root.addHandler(self.handler)
+
+    def _new_logger(self, name, **metadata):
+        logger = compressed.MetadataLogger(name, **metadata)
+        logger.parent = self.root
+        return logger
+
+    def _read(self, **criteria):
+        entries = [
+            entry for entry in compressed.read_index(self.filename)
+            if compressed.matches(entry, **criteria)
+        ]
+        return b"".join(compressed.extract(self.filename, entries)).decode("utf-8")
+
+    def test_frames_per_test_and_node(self):
+        test_logger = self._new_logger("js_test:a", job=0, test="a.js", test_id="id-a")
+        node_logger = self._new_logger("ReplicaSetFixture:job0:primary", job=0, node="primary")
+
+        test_logger.info("test line 1")
+        node_logger.info("node line 1")
+        test_logger.info("test line 2")
+        self.handler.close()
+
+        self.assertEqual("[js_test:a] test line 1\n[js_test:a] test line 2\n",
+                         self._read(test="a.js"))
+        self.assertEqual(self._read(test="a.js"), self._read(test="id-a"))
+        self.assertEqual("[ReplicaSetFixture:job0:primary] node line 1\n",
+                         self._read(node="primary"))
+        self.assertEqual("", self._read(job=1))
+
+    def test_buffer_full(self):
+        logger = self._new_logger("js_test:a", job=0, test="a.js", test_id="id-a")
+        logger.info("x" * 100)
+        self.assertEqual(1, len(compressed.read_index(self.filename)))
+        logger.info("short")
+        self.assertEqual(1, len(compressed.read_index(self.filename)))
+
+        self.handler.flush()
+        entries = compressed.read_index(self.filename)
+        self.assertEqual(2, len(entries))
+        self.assertEqual({"job": 0, "test": "a.js", "test_id": "id-a"}, {
+            field: entries[1][field]
+            for field in compressed.METADATA_FIELDS if field in entries[1]
+        })
+        self.assertEqual(1, entries[1]["num_lines"])
+        self.assertLessEqual(entries[1]["start"], entries[1]["end"])
+        self.handler.close()
+
+    def test_readable_as_gzip(self):
+        self._new_logger("js_test:a", job=0, test="a.js").info("line 1")
+        self.handler.flush()
+        self._new_logger("js_test:b", job=1, test="b.js").info("line 2")
+        self.handler.close()
+
+        with gzip.open(self.filename, "rt") as fh:
+            self.assertEqual("[js_test:a] line 1\n[js_test:b] line 2\n", fh.read())
+
+    def test_thread_logger_inherits_metadata(self):
+        test_logger = self._new_logger("js_test:a", job=0, test="a.js")
+        thread_logger = compressed.MetadataLogger("js_test:thread0",
+                                                  **compressed.get_metadata(test_logger))
+        thread_logger.parent = test_logger
+        thread_logger.info("from thread")
+        self.handler.close()
+
+        self.assertEqual("[js_test:thread0] from thread\n", self._read(test="a.js"))
+
+    def test_batched_records_have_metadata(self):
+        node_logger = self._new_logger("ReplicaSetFixture:job0:primary", job=0, node="primary")
+        self.assertEqual([], node_logger.filters)
+        self.assertIsNotNone(handlers._get_batch_handlers(node_logger, logging.INFO))
+
+        handlers.log_batch(node_logger, logging.INFO, ["line 1", "line 2"])
+        self.handler.close()
+
+        self.assertEqual(
+            "[ReplicaSetFixture:job0:primary] line 1\n[ReplicaSetFixture:job0:primary] line 2\n",
+            self._read(node="primary"))
+
+
+class TestLogsSubcommand(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.filename = os.path.join(self.tmpdir, "fixture.log.gz")
+
+        handler = compressed.CompressedFileHandler(self.filename)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        for (node, message) in [("primary", "p1"), ("secondary", "s1"), ("primary", "p2")]:
+            logger = compressed.MetadataLogger("fixture", job=0, node=node)
+            logger.addHandler(handler)
+            logger.info(message)
+            handler.flush()
+        handler.close()
+
+    def test_extract_node(self):
+        output = io.BytesIO()
+        logs.Logs(self.filename, node="primary", output=output).execute()
+        self.assertEqual(b"p1\np2\n", output.getvalue())
+
+    def test_list(self):
+        output = io.BytesIO()
+        logs.Logs(self.filename, list_entries=True, output=output).execute()
+        lines = output.getvalue().decode("utf-8").splitlines()
+        self.assertEqual(2, len(lines))
+        self.assertTrue(lines[0].startswith("job=0 node=primary start="))
+        self.assertTrue(lines[0].endswith("lines=2"))
@@ -2,6 +2,7 @@
 
 import unittest
 
+from buildscripts.resmokelib import config
 from buildscripts.resmokelib.parser import parse, parse_command_line
 from buildscripts.resmokelib.run import to_local_args
 
@@ -351,3 +352,32 @@ class TestParseCommandLine(unittest.TestCase):
     def test_run(self):
         subcommand_obj = parse_command_line(['run', '--suite=my_suite', 'my_test.js'])
         self.assertTrue(hasattr(subcommand_obj, 'execute'))
+
+    def test_shuffle_with_runtime_ordering(self):
+        with self.assertRaises(SystemExit):
+            parse_command_line([
+                'run', '--suite=my_suite', '--shuffle', '--runtimeHistoryFile=history.jsonl',
+                '--orderByRuntimeHistory', 'my_test.js'
+            ])
+
+    def test_runtime_ordering_disables_auto_shuffle(self):
+        parse_command_line([
+            'run', '--suite=my_suite', '--jobs=2', '--runtimeHistoryFile=history.jsonl',
+            '--orderByRuntimeHistory', 'my_test.js'
+        ])
+        self.assertFalse(config.SHUFFLE)
+
+        parse_command_line(['run', '--suite=my_suite', '--jobs=2', 'my_test.js'])
+        self.assertTrue(config.SHUFFLE)
+
+    def test_auto_jobs_leaves_shuffle_to_suite(self):
+        parse_command_line(['run', '--suite=my_suite', '--jobs=auto', 'my_test.js'])
+        self.assertTrue(config.AUTO_JOBS)
+        self.assertIsNone(config.SHUFFLE)
+
+        parse_command_line(['run', '--suite=my_suite', '--jobs=auto', '--shuffle', 'my_test.js'])
+        self.assertTrue(config.SHUFFLE)
+
+    def test_order_by_runtime_history_without_file(self):
+        with self.assertRaises(SystemExit):
+            parse_command_line(['run', '--suite=my_suite', '--orderByRuntimeHistory', 'my_test.js'])
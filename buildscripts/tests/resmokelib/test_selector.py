@@ -86,6 +86,21 @@ class TestExpressions(unittest.TestCase):
         self.assertFalse(expression(tags_nomatch_5))
         self.assertFalse(expression([]))
 
+    def test_compiled_expression_matches_tree(self):
+        tags = ["tag1", "tag2", "tag3", "tag4"]
+        conf = {
+            "$allOf": [
+                {"$anyOf": ["tag1", {"$not": "tag2"}]},
+                {"$not": {"$anyOf": ["tag3", "unused_tag"]}},
+                {"$anyOf": [{"$allOf": ["tag1", "tag4"]}, "tag2"]},
+            ]
+        }
+        expression = selector.make_expression(conf)
+        compiled = selector._CompiledExpression(expression)
+        for num in range(1 << len(tags)):
+            file_tags = [tag for (i, tag) in enumerate(tags) if num & (1 << i)] + ["other_tag"]
+            self.assertEqual(expression(file_tags), compiled(file_tags), file_tags)
+
     def test_invalid_expression(self):
         with self.assertRaises(ValueError):
             selector.make_expression({"invalid": ["tag1", "tag2"]})
@@ -161,6 +176,9 @@ class MockTestFileExplorer(object):
     def jstest_tags(self, file_path):
         return self.tags.get(file_path, [])
 
+    def jstest_tags_for_files(self, file_paths):
+        return {file_path: self.jstest_tags(file_path) for file_path in file_paths}
+
     def read_root_file(self, root_file_path):  # pylint: disable=no-self-use,unused-argument
         return ["build/testA", "build/testB"]
 
@@ -0,0 +1,103 @@
+"""Unit tests for the resmokelib.testing.fixtures.readiness module."""
+import logging
+import threading
+import time
+import unittest
+
+import mock
+import pymongo
+import pymongo.errors
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing.fixtures import readiness
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestReadinessWaiter(unittest.TestCase):
+    def setUp(self):
+        self.client_factory = mock.Mock()
+        self.waiter = readiness.ReadinessWaiter(
+            logging.getLogger("readiness_unittests"), self.client_factory)
+
+    def test_client_is_reused(self):
+        first = self.waiter.client()
+        second = self.waiter.client()
+        self.assertIs(first, second)
+        self.client_factory.assert_called_once_with(pymongo.ReadPreference.PRIMARY)
+
+    def test_client_per_read_preference(self):
+        self.client_factory.side_effect = lambda read_preference: mock.Mock()
+        primary = self.waiter.client()
+        secondary = self.waiter.client(pymongo.ReadPreference.SECONDARY)
+        self.assertIsNot(primary, secondary)
+
+    def test_close_discards_clients(self):
+        client = self.waiter.client()
+        self.waiter.close()
+        client.close.assert_called_once_with()
+        self.waiter.client()
+        self.assertEqual(2, self.client_factory.call_count)
+
+    def test_returns_predicate_result(self):
+        predicate = mock.Mock(side_effect=[False, None, "done"])
+        self.assertEqual("done", self.waiter.wait_until("testing", predicate, timeout_secs=10))
+        self.assertEqual(3, predicate.call_count)
+
+    def test_retries_on_given_exceptions(self):
+        predicate = mock.Mock(side_effect=[pymongo.errors.AutoReconnect(), True])
+        self.assertTrue(
+            self.waiter.wait_until("testing", predicate, timeout_secs=10,
+                                   retry_on=(pymongo.errors.ConnectionFailure, )))
+
+    def test_other_exceptions_are_raised(self):
+        predicate = mock.Mock(side_effect=ValueError("unexpected"))
+        with self.assertRaises(ValueError):
+            self.waiter.wait_until("testing", predicate, timeout_secs=10)
+
+    def test_timeout(self):
+        with self.assertRaises(errors.ServerFailure):
+            self.waiter.wait_until("testing", lambda: False, timeout_secs=0.05)
+
+    def test_log_line_wakes_waiter(self):
+        ready = threading.Event()
+
+        def wake_up():
+            time.sleep(0.1)
+            ready.set()
+            self.waiter.on_output_line(
+                '{"t":{"$date":"2021-01-01T00:00:00.000Z"},"s":"I","c":"NETWORK","id":23016,'
+                '"ctx":"listener","msg":"Waiting for connections"}')
+
+        # Back off for a long time to ensure that the notification is what ends the wait.
+        with mock.patch.object(readiness.ReadinessWaiter, "INITIAL_DELAY_SECS", 60):
+            thread = threading.Thread(target=wake_up)
+            thread.start()
+            start = time.time()
+            self.waiter.wait_until("testing", ready.is_set, timeout_secs=120)
+            thread.join()
+
+        self.assertLess(time.time() - start, 30)
+
+    def test_unrelated_log_line_does_not_notify(self):
+        with mock.patch.object(self.waiter, "notify") as notify:
+            self.waiter.on_output_line('{"s":"I","c":"STORAGE","id":22430,"msg":"Checkpoint"}')
+            notify.assert_not_called()
+
+
+class TestAwaitAcceptingConnections(unittest.TestCase):
+    def test_process_exited(self):
+        waiter = readiness.ReadinessWaiter(logging.getLogger("readiness_unittests"), mock.Mock())
+        process = mock.Mock()
+        process.poll.return_value = 1
+        with self.assertRaisesRegex(errors.ServerFailure, "ended unexpectedly with code 1"):
+            readiness.await_accepting_connections(waiter, process, 20000, "mongod", 10)
+
+    @mock.patch.object(readiness, "is_port_open", side_effect=[False, True])
+    def test_pings_once_port_is_open(self, _):
+        client_factory = mock.Mock()
+        waiter = readiness.ReadinessWaiter(logging.getLogger("readiness_unittests"), client_factory)
+        process = mock.Mock()
+        process.poll.return_value = None
+        readiness.await_accepting_connections(waiter, process, 20000, "mongod", 10)
+        client_factory.return_value.admin.command.assert_called_once_with("ping")
@@ -0,0 +1,107 @@
+"""Unit tests for the resmokelib.testing.fixtures.replicaset module."""
+import logging
+import unittest
+
+import mock
+import pymongo.errors
+
+from buildscripts.resmokelib import config
+from buildscripts.resmokelib.testing.fixtures import readiness
+from buildscripts.resmokelib.testing.fixtures import replicaset
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def _make_node(port):
+    node = mock.Mock()
+    node.port = port
+    node.mongod_options = {"set_parameters": {}}
+    node.get_internal_connection_string.return_value = "localhost:{}".format(port)
+    node.mongo_client.return_value.local.system.replset.count.return_value = 0
+    return node
+
+
+class TestReplicaSetFastInitiate(unittest.TestCase):
+    def setUp(self):
+        self.fixture = replicaset.ReplicaSetFixture(
+            logging.getLogger("replicaset_unittests"), 0, num_nodes=3, fast_initiate=True,
+            write_concern_majority_journal_default=True)
+        self.fixture.nodes = [_make_node(20000 + i) for i in range(3)]
+
+        # The first node is asked to run for election until it reports that it's primary.
+        self.step_up_failures = []
+        self.client = self.fixture.nodes[0].mongo_client.return_value
+        self.client.admin.command.side_effect = self._command
+        self.fixture.nodes[0].readiness = readiness.ReadinessWaiter(
+            self.fixture.logger, lambda read_preference: self.client)
+        self.is_primary = False
+
+        self.initiate = self._patch("_initiate_repl_set")
+        self.add_node = self._patch("_add_node_to_repl_set")
+        self._patch("_await_primary")
+        self._patch("_await_secondaries")
+        self._patch("_await_newly_added_removals")
+
+    def _command(self, cmd):
+        if cmd == {"replSetStepUp": 1}:
+            if self.step_up_failures:
+                raise self.step_up_failures.pop(0)
+            self.is_primary = True
+            return {"ok": 1}
+        if cmd == "isMaster":
+            return {"ismaster": self.is_primary}
+        return {"ok": 1}
+
+    def _patch(self, method):
+        patcher = mock.patch.object(replicaset.ReplicaSetFixture, method)
+        self.addCleanup(patcher.stop)
+        return patcher.start()
+
+    def test_initiates_with_all_members(self):
+        self.fixture.setup()
+
+        for node in self.fixture.nodes:
+            node.setup.assert_called_once_with()
+            node.await_ready.assert_called_once_with()
+
+        self.initiate.assert_called_once()
+        repl_config = self.initiate.call_args[0][1]
+        self.assertEqual([0, 1, 2], [member["_id"] for member in repl_config["members"]])
+        self.add_node.assert_not_called()
+        self.client.admin.command.assert_any_call({"replSetStepUp": 1})
+        self.assertTrue(self.is_primary)
+
+    def test_retries_step_up_until_primary(self):
+        self.step_up_failures = [
+            pymongo.errors.OperationFailure("not electable"),
+            pymongo.errors.OperationFailure("not electable"),
+        ]
+        self.fixture.setup()
+
+        step_up_calls = [
+            call for call in self.client.admin.command.call_args_list
+            if call == mock.call({"replSetStepUp": 1})
+        ]
+        self.assertEqual(3, len(step_up_calls))
+        self.assertTrue(self.is_primary)
+
+    def test_records_phase_timings(self):
+        self.fixture.setup()
+        self.assertEqual([
+            "start_nodes", "await_nodes_ready", "initiate", "await_secondaries",
+            "await_newly_added_removals"
+        ], list(self.fixture._phase_timings))
+
+    def test_disabled_for_mixed_bin_versions(self):
+        self.fixture.mixed_bin_versions = ["new", "old", "new"]
+        self.assertFalse(self.fixture._use_fast_initiate())
+
+    def test_disabled_by_default(self):
+        fixture = replicaset.ReplicaSetFixture(logging.getLogger("replicaset_unittests"), 0)
+        self.assertEqual(bool(config.FAST_REPLSET_INITIATE), fixture._use_fast_initiate())
+
+    def test_node_failure_is_raised(self):
+        self.fixture.nodes[1].await_ready.side_effect = RuntimeError("node 1 failed")
+        with self.assertRaisesRegex(RuntimeError, "node 1 failed"):
+            self.fixture.setup()
+        self.initiate.assert_not_called()
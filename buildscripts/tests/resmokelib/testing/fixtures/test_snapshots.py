@@ -0,0 +1,105 @@
+"""Unit tests for buildscripts/resmokelib/testing/fixtures/snapshots.py."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing.fixtures import snapshots
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def _write_file(path, contents):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as fh:
+        fh.write(contents)
+
+
+def _read_file(path):
+    with open(path) as fh:
+        return fh.read()
+
+
+class TestCopyDBPath(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.src = os.path.join(self.tmpdir, "src")
+        self.dst = os.path.join(self.tmpdir, "dst")
+
+        _write_file(os.path.join(self.src, "WiredTiger.wt"), "wt")
+        _write_file(os.path.join(self.src, "journal", "WiredTigerLog.1"), "log")
+        _write_file(os.path.join(self.src, "mongod.lock"), "1234")
+        _write_file(os.path.join(self.src, "diagnostic.data", "metrics.1"), "ftdc")
+
+    def test_copies_data_files(self):
+        snapshots.copy_dbpath(self.src, self.dst)
+        self.assertEqual("wt", _read_file(os.path.join(self.dst, "WiredTiger.wt")))
+        self.assertEqual("log", _read_file(os.path.join(self.dst, "journal", "WiredTigerLog.1")))
+        self.assertEqual(["WiredTiger.wt", "journal"], sorted(os.listdir(self.dst)))
+
+    def test_replaces_existing_dbpath(self):
+        _write_file(os.path.join(self.dst, "collection-0.wt"), "stale")
+        snapshots.copy_dbpath(self.src, self.dst)
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "collection-0.wt")))
+
+    def test_copy_is_independent(self):
+        snapshots.copy_dbpath(self.src, self.dst)
+        _write_file(os.path.join(self.dst, "WiredTiger.wt"), "modified")
+        self.assertEqual("wt", _read_file(os.path.join(self.src, "WiredTiger.wt")))
+
+    @mock.patch.object(snapshots, "fcntl")
+    def test_falls_back_to_copying(self, fcntl):
+        fcntl.ioctl.side_effect = OSError("not supported")
+        snapshots.copy_dbpath(self.src, self.dst)
+        self.assertEqual("wt", _read_file(os.path.join(self.dst, "WiredTiger.wt")))
+
+
+class TestDBPathSnapshots(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.snapshot_dir = os.path.join(self.tmpdir, "snapshots")
+        os.makedirs(self.snapshot_dir)
+        self.snapshots = snapshots.DBPathSnapshots(self.snapshot_dir)
+
+        self.dbpaths = {}
+        for name in ("node0", "node1"):
+            self.dbpaths[name] = os.path.join(self.tmpdir, name)
+            _write_file(os.path.join(self.dbpaths[name], "WiredTiger.wt"), name)
+
+    def test_save_and_find(self):
+        self.assertIsNone(self.snapshots.find("key"))
+        self.snapshots.save("key", self.dbpaths)
+
+        path = self.snapshots.find("key")
+        self.assertEqual(os.path.join(self.snapshot_dir, "key"), path)
+        self.assertEqual("node1", _read_file(os.path.join(path, "node1", "WiredTiger.wt")))
+        self.assertEqual(["key"], os.listdir(self.snapshot_dir))
+
+    def test_save_existing_snapshot(self):
+        self.snapshots.save("key", self.dbpaths)
+        _write_file(os.path.join(self.dbpaths["node0"], "WiredTiger.wt"), "modified")
+        self.snapshots.save("key", self.dbpaths)
+        self.assertEqual(
+            "node0", _read_file(os.path.join(self.snapshot_dir, "key", "node0", "WiredTiger.wt")))
+
+    def test_failed_save_leaves_no_snapshot(self):
+        with mock.patch.object(snapshots, "_clone_file", side_effect=OSError("disk full")):
+            self.assertRaises(OSError, self.snapshots.save, "key", self.dbpaths)
+        self.assertIsNone(self.snapshots.find("key"))
+        self.assertEqual([], os.listdir(self.snapshot_dir))
+
+
+class TestMakeKey(unittest.TestCase):
+    def test_stable_across_ordering(self):
+        self.assertEqual(
+            snapshots.make_key({"a": 1, "b": {"c": [1, 2]}}),
+            snapshots.make_key({"b": {"c": [1, 2]}, "a": 1}))
+
+    def test_differs_by_options(self):
+        self.assertNotEqual(
+            snapshots.make_key({"port": 20000}), snapshots.make_key({"port": 20001}))
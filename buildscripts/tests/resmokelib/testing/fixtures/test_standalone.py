@@ -0,0 +1,43 @@
+"""Unit tests for the resmokelib.testing.fixtures.standalone module."""
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing.fixtures import standalone
+
+# pylint: disable=missing-docstring
+
+
+class TestMongoDFixtureSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.dbpath = os.path.join(self.tmp_dir, "node0")
+        self.snapshot = os.path.join(self.tmp_dir, "snapshot", "node0")
+
+        patchers = [
+            mock.patch.object(standalone, "core"),
+            mock.patch.object(standalone.snapshots, "copy_dbpath"),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.fixture = standalone.MongoDFixture(
+            logging.getLogger("standalone_unittests"), 0, mongod_options={"dbpath": self.dbpath},
+            preserve_dbpath=True)
+
+    def test_restart_after_restore_keeps_data(self):
+        self.fixture.dbpath_snapshot = self.snapshot
+        self.fixture.setup()
+        standalone.snapshots.copy_dbpath.assert_called_once_with(self.snapshot, self.dbpath)
+
+        # A hook restarting the node with preserve_dbpath=True keeps the data written since.
+        standalone.snapshots.copy_dbpath.reset_mock()
+        self.fixture.setup()
+        standalone.snapshots.copy_dbpath.assert_not_called()
+        self.assertTrue(os.path.isdir(self.dbpath))
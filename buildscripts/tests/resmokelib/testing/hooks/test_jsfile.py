@@ -0,0 +1,76 @@
+"""Unit tests for the run policies of buildscripts/resmokelib/testing/hooks/jsfile.py."""
+
+import logging
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing.hooks import jsfile
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestDataConsistencyHookRunPolicy(unittest.TestCase):
+    def _make_hook(self, run_policy, n=jsfile.DataConsistencyHook.DEFAULT_N):
+        with mock.patch.object(jsfile.write_watermark, "WriteWatermark") as watermark_class:
+            hook = jsfile.DataConsistencyHook(
+                logging.getLogger("jsfile_unittest"), mock.Mock(), "hook.js", "Check",
+                run_policy=run_policy, n=n)
+        hook._run_check = mock.Mock()
+        self.write_watermark = watermark_class.return_value
+        return hook
+
+    @staticmethod
+    def _run_tests(hook, num_tests):
+        for _ in range(num_tests):
+            hook.before_test(mock.Mock(), mock.Mock())
+            hook.after_test(mock.Mock(), mock.Mock())
+        hook.after_suite(mock.Mock())
+
+    def test_invalid_run_policy(self):
+        self.assertRaises(ValueError, self._make_hook, "sometimes")
+        self.assertRaises(ValueError, self._make_hook, "every_n_tests", n=0)
+
+    def test_always(self):
+        hook = self._make_hook("always")
+        self._run_tests(hook, 3)
+        self.assertEqual(3, hook._run_check.call_count)
+        self.assertEqual((3, 0), (hook.num_ran, hook.num_skipped))
+
+    def test_on_write(self):
+        hook = self._make_hook("on_write")
+        self.write_watermark.has_writes_since.side_effect = [True, False, True]
+        self._run_tests(hook, 3)
+        self.assertEqual(2, hook._run_check.call_count)
+        self.assertEqual((2, 1), (hook.num_ran, hook.num_skipped))
+        self.assertEqual(3, self.write_watermark.capture.call_count)
+        self.write_watermark.close.assert_called_once_with()
+
+    def test_every_n_tests(self):
+        hook = self._make_hook("every_n_tests", n=2)
+        self._run_tests(hook, 5)
+        # The check runs after the 2nd and 4th tests, and at the end of the suite for the 5th.
+        self.assertEqual(3, hook._run_check.call_count)
+        self.assertEqual((3, 3), (hook.num_ran, hook.num_skipped))
+
+    def test_every_n_tests_nothing_pending(self):
+        hook = self._make_hook("every_n_tests", n=2)
+        self._run_tests(hook, 4)
+        self.assertEqual(2, hook._run_check.call_count)
+
+    def test_end_of_suite(self):
+        hook = self._make_hook("end_of_suite")
+        self._run_tests(hook, 3)
+        self.assertEqual(1, hook._run_check.call_count)
+        self.assertEqual((1, 3), (hook.num_ran, hook.num_skipped))
+
+    def test_end_of_suite_no_tests(self):
+        hook = self._make_hook("end_of_suite")
+        self._run_tests(hook, 0)
+        hook._run_check.assert_not_called()
+
+    def test_failure_is_server_failure(self):
+        hook = self._make_hook("always")
+        hook._run_check.side_effect = errors.TestFailure("dbhash mismatch")
+        self.assertRaises(errors.ServerFailure, hook.after_test, mock.Mock(), mock.Mock())
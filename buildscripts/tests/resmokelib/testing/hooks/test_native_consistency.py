@@ -0,0 +1,215 @@
+"""Unit tests for buildscripts/resmokelib/testing/hooks/native_consistency.py."""
+
+import logging
+import unittest
+
+import mock
+import pymongo.errors
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing.hooks import native_consistency
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestGetTestData(unittest.TestCase):
+    def test_no_shell_options(self):
+        self.assertEqual({}, native_consistency.get_test_data(None))
+
+    def test_supported_options(self):
+        shell_options = {"global_vars": {"TestData": {"excludedDBsFromDBHash": ["test"]}}}
+        self.assertEqual({"excludedDBsFromDBHash": ["test"]},
+                         native_consistency.get_test_data(shell_options))
+
+    def test_unsupported_options(self):
+        shell_options = {"global_vars": {"TestData": {"checkCollectionCounts": True}}}
+        self.assertRaises(ValueError, native_consistency.get_test_data, shell_options)
+
+
+class TestCompareDBHashes(unittest.TestCase):
+    def setUp(self):
+        self.checker = native_consistency.DBHashChecker(mock.Mock(), mock.Mock())
+        self.checker.logger = logging.getLogger("native_consistency_unittest")
+        self.checker._dump_collection_diff = mock.Mock()
+
+    @staticmethod
+    def _db_hash(md5, collections, uuids=None, capped=()):
+        return {"md5": md5, "collections": collections, "uuids": uuids or {}, "capped": capped}
+
+    def _compare(self, primary_hash, secondary_hash):
+        return self.checker._compare_db_hashes("test", mock.Mock(), primary_hash, mock.Mock(),
+                                               secondary_hash)
+
+    def test_matching_hashes(self):
+        db_hash = self._db_hash("a", {"coll": "a"})
+        self.assertEqual([], self._compare(db_hash, db_hash))
+        self.checker._dump_collection_diff.assert_not_called()
+
+    def test_collection_hash_mismatch(self):
+        failures = self._compare(
+            self._db_hash("a", {"coll": "a", "same": "c"}),
+            self._db_hash("b", {"coll": "b", "same": "c"}))
+        self.assertEqual(1, len(failures))
+        self.assertIn("test.coll has a different hash", failures[0])
+        self.checker._dump_collection_diff.assert_called_once_with("test", "coll", mock.ANY,
+                                                                   mock.ANY)
+
+    def test_missing_collection(self):
+        failures = self._compare(self._db_hash("a", {"coll": "a"}), self._db_hash("b", {}))
+        self.assertEqual(["test.coll only exists on the primary"], failures)
+
+    def test_missing_database(self):
+        failures = self._compare(None, self._db_hash("b", {"coll": "b"}))
+        self.assertEqual(["test.coll only exists on the secondary"], failures)
+
+    def test_capped_collections_ignored(self):
+        failures = self._compare(
+            self._db_hash("a", {"capped": "a"}, capped=["capped"]),
+            self._db_hash("b", {"capped": "b"}, capped=["capped"]))
+        self.assertEqual([], failures)
+
+    def test_uuid_mismatch(self):
+        failures = self._compare(
+            self._db_hash("a", {"coll": "a"}, uuids={"coll": 1}),
+            self._db_hash("b", {"coll": "a"}, uuids={"coll": 2}))
+        self.assertEqual(1, len(failures))
+        self.assertIn("test.coll has a different UUID", failures[0])
+
+
+class TestCompareCollections(unittest.TestCase):
+    def setUp(self):
+        self.checker = native_consistency.DBHashChecker(mock.Mock(), mock.Mock())
+        self.checker.logger = logging.getLogger("native_consistency_unittest")
+
+    @staticmethod
+    def _db_data(info=None, nindexes=2):
+        info = info or {"name": "coll", "type": "collection", "options": {}}
+        stats = {"capped": False, "ns": "test.coll", "nindexes": nindexes, "indexBuilds": None}
+        return {
+            "hash": None,
+            "infos": {"coll": native_consistency._normalize_coll_info(info)},
+            "stats": {"coll": stats},
+        }
+
+    def _compare(self, primary_db, secondary_db, secondary_has_indexes=True):
+        return self.checker._compare_collections("test", mock.Mock(), primary_db, mock.Mock(),
+                                                 secondary_db, secondary_has_indexes)
+
+    def test_matching_collections(self):
+        self.assertEqual([], self._compare(self._db_data(), self._db_data()))
+
+    def test_different_options(self):
+        capped_info = {"name": "coll", "type": "collection", "options": {"capped": True}}
+        failures = self._compare(self._db_data(), self._db_data(info=capped_info))
+        self.assertEqual(1, len(failures))
+        self.assertIn("test.coll has different attributes", failures[0])
+
+    def test_removed_fields_ignored(self):
+        old_info = {
+            "name": "coll", "type": "collection", "options": {"flags": 1},
+            "idIndex": {"key": {"_id": 1}, "name": "_id_", "ns": "test.coll"}
+        }
+        new_info = {
+            "name": "coll", "type": "collection", "options": {},
+            "idIndex": {"key": {"_id": 1}, "name": "_id_"}
+        }
+        self.assertEqual([],
+                         self._compare(self._db_data(info=old_info), self._db_data(info=new_info)))
+
+    def test_different_number_of_indexes(self):
+        failures = self._compare(self._db_data(nindexes=2), self._db_data(nindexes=1))
+        self.assertEqual(1, len(failures))
+        self.assertIn("test.coll has a different state", failures[0])
+        self.assertIn("nindexes", failures[0])
+
+    def test_secondary_without_indexes(self):
+        self.assertEqual([],
+                         self._compare(
+                             self._db_data(nindexes=2), self._db_data(nindexes=1),
+                             secondary_has_indexes=False))
+
+
+class TestCheckReplicaSet(unittest.TestCase):
+    def setUp(self):
+        self.clients = {}
+        node_clients = mock.Mock()
+        node_clients.get.side_effect = self._get_client
+        self.checker = native_consistency.DBHashChecker(mock.Mock(), node_clients)
+        self.checker.logger = logging.getLogger("native_consistency_unittest")
+
+        self.repl_set = mock.Mock()
+        self.repl_set.nodes = [mock.Mock(port=port) for port in (20000, 20001, 20002)]
+        self.repl_set.get_primary.return_value = self.repl_set.nodes[0]
+
+        patcher = mock.patch.object(native_consistency, "_is_arbiter", return_value=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get_client(self, node):
+        return self.clients.setdefault(node.port, mock.Mock())
+
+    def _commands(self, port):
+        return [call[0][0] for call in self.clients[port].admin.command.call_args_list]
+
+    def test_freezes_and_locks(self):
+        self.checker._compare_replica_set = mock.Mock(return_value=[])
+        self.assertEqual([], self.checker._check_replica_set(self.repl_set))
+
+        self.assertEqual([{"fsync": 1, "lock": 1, "allowFsyncFailure": True}, {"fsyncUnlock": 1}],
+                         self._commands(20000))
+        for port in (20001, 20002):
+            commands = self._commands(port)
+            self.assertIn({"replSetFreeze": native_consistency._FOREVER_SECS}, commands)
+            self.assertEqual({"replSetFreeze": 0}, commands[-1])
+
+    def test_unlocks_after_error(self):
+        self.repl_set.await_last_op_committed.side_effect = errors.ServerFailure("timed out")
+        self.assertRaises(errors.ServerFailure, self.checker._check_replica_set, self.repl_set)
+
+        self.assertEqual({"fsyncUnlock": 1}, self._commands(20000)[-1])
+        for port in (20001, 20002):
+            self.assertEqual({"replSetFreeze": 0}, self._commands(port)[-1])
+
+    def test_unfreezes_if_lock_fails(self):
+        self._get_client(self.repl_set.nodes[0]).admin.command.side_effect = (
+            pymongo.errors.OperationFailure("fsync failed"))
+        self.assertRaises(pymongo.errors.OperationFailure, self.checker._check_replica_set,
+                          self.repl_set)
+
+        self.assertNotIn({"fsyncUnlock": 1}, self._commands(20000))
+        for port in (20001, 20002):
+            self.assertEqual({"replSetFreeze": 0}, self._commands(port)[-1])
+
+
+class TestCollectionValidator(unittest.TestCase):
+    def setUp(self):
+        self.validator = native_consistency.CollectionValidator(mock.Mock(), mock.Mock())
+        self.validator.logger = logging.getLogger("native_consistency_unittest")
+
+    def _validate(self, command):
+        database = mock.Mock()
+        database.name = "test"
+        database.command = command
+        return self.validator._validate_collection(mock.MagicMock(), database, "coll")
+
+    def test_valid(self):
+        self.assertIsNone(self._validate(mock.Mock(return_value={"ok": 1, "valid": True})))
+
+    def test_invalid(self):
+        failure = self._validate(
+            mock.Mock(return_value={"ok": 1, "valid": False, "errors": ["bad index"]}))
+        self.assertIn("test.coll", failure)
+        self.assertIn("bad index", failure)
+
+    def test_namespace_not_found(self):
+        command = mock.Mock(
+            side_effect=pymongo.errors.OperationFailure("ns not found", code=26,
+                                                        details={"ok": 0, "code": 26}))
+        self.assertIsNotNone(self._validate(command))
+        self.validator._skip_namespace_not_found = True
+        self.assertIsNone(self._validate(command))
+
+    def test_check_raises_test_failure(self):
+        self.validator._clients.run_on_nodes.return_value = [[], ["test.coll on node1: bad"]]
+        with mock.patch.object(native_consistency, "get_mongod_nodes", return_value=[1, 2]):
+            self.assertRaises(errors.TestFailure, self.validator.check, self.validator.logger)
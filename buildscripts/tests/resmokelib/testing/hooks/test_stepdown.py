@@ -2,6 +2,11 @@
 
 import logging
 import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
 import unittest
 
 import mock
@@ -177,3 +182,55 @@ class TestFileBasedStepdownLifecycle(unittest.TestCase):
 
         self.assertFalse(lifecycle.wait_for_stepdown_permitted())
         self.assertTrue(cond.wait.called)
+
+
+class TestFileBasedStepdownLifecycleNotifications(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.stepdown_files = _stepdown.StepdownFiles._make(
+            [os.path.join(self.tmpdir, field) for field in _stepdown.StepdownFiles._fields])
+        self.lifecycle = _stepdown.FileBasedStepdownLifecycle(self.stepdown_files)
+        self.addCleanup(self.lifecycle.stop_notifications)
+
+    def _create(self, path):
+        with open(path, "w"):
+            pass
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is only available on Linux")
+    @mock.patch.object(_stepdown.FileBasedStepdownLifecycle, "NOTIFIED_POLL_INTERVAL_SECS", 60)
+    def test_woken_up_when_permitted_file_created(self):
+        self.assertTrue(self.lifecycle.start_notifications())
+        timer = threading.Timer(0.1, self._create, args=[self.stepdown_files.permitted])
+        timer.start()
+        self.addCleanup(timer.join)
+
+        start = time.time()
+        self.assertTrue(self.lifecycle.wait_for_stepdown_permitted())
+        self.assertLess(time.time() - start, 30)
+
+    @mock.patch.object(_stepdown.file_notifier, "_load_inotify", return_value=None)
+    def test_falls_back_to_polling(self, _):
+        self.assertFalse(self.lifecycle.start_notifications())
+        timer = threading.Timer(0.1, self._create, args=[self.stepdown_files.permitted])
+        timer.start()
+        self.addCleanup(timer.join)
+        self.assertTrue(self.lifecycle.wait_for_stepdown_permitted())
+
+    def test_handshake_latencies(self):
+        self.assertIsNone(self.lifecycle.summarize_handshake_latencies())
+
+        self._create(self.stepdown_files.permitted)
+        self.assertTrue(self.lifecycle.wait_for_stepdown_permitted())
+        # The latency is only recorded the first time the "permitted" file is seen.
+        self.assertTrue(self.lifecycle.wait_for_stepdown_permitted())
+
+        self._create(self.stepdown_files.idle_request)
+        self.assertTrue(self.lifecycle.poll_for_idle_request())
+        self.lifecycle.send_idle_acknowledgement()
+        self.assertTrue(os.path.isfile(self.stepdown_files.idle_ack))
+
+        summary = self.lifecycle.summarize_handshake_latencies()
+        self.assertIn("permitted mean", summary)
+        self.assertIn("idle_request mean", summary)
+        self.assertIn("over 1 handshake(s)", summary)
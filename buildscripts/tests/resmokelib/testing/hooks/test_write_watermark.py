@@ -0,0 +1,107 @@
+"""Unit tests for buildscripts/resmokelib/testing/hooks/write_watermark.py."""
+
+import unittest
+
+import mock
+import pymongo.errors
+
+from buildscripts.resmokelib.testing.hooks import write_watermark
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def _make_node(port, repl_set):
+    node = mock.Mock()
+    node.port = port
+    node.mongod_options = {"replSet": "rs"} if repl_set else {}
+    return node
+
+
+class TestWriteWatermark(unittest.TestCase):
+    def setUp(self):
+        self.watermark = write_watermark.WriteWatermark(mock.Mock())
+        self.watermark._clients = mock.MagicMock()
+        self.client = self.watermark._clients.get.return_value
+
+    def _patch_nodes(self, nodes):
+        patcher = mock.patch.object(write_watermark.native_consistency, "get_mongod_nodes",
+                                    return_value=nodes)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_unsupported_fixture(self):
+        patcher = mock.patch.object(write_watermark.native_consistency, "get_mongod_nodes",
+                                    side_effect=ValueError("unsupported"))
+        with patcher:
+            self.assertIsNone(self.watermark.capture())
+            self.assertTrue(self.watermark.has_writes_since({}))
+
+    def test_no_watermark(self):
+        self.assertTrue(self.watermark.has_writes_since(None))
+
+    def _set_server_status(self, opcounters, cursor_calls):
+        cursor_stats = {
+            "cursor insert calls": cursor_calls[0], "cursor update calls": cursor_calls[1],
+            "cursor remove calls": cursor_calls[2], "cursor modify calls": cursor_calls[3],
+            "cursor search calls": 100
+        }
+        self.client.admin.command.return_value = {
+            "opcounters": dict(zip(("insert", "query", "update", "delete"), opcounters)),
+            "wiredTiger": {"cursor": cursor_stats}
+        }
+
+    def test_standalone(self):
+        self._patch_nodes([_make_node(20000, repl_set=False)])
+        self._set_server_status((1, 5, 2, 3), (10, 20, 30, 40))
+        watermark = self.watermark.capture()
+        self.assertEqual({20000: (1, 2, 3, 10, 20, 30, 40)}, watermark)
+
+        # Reads don't count as writes.
+        self._set_server_status((1, 9, 2, 3), (10, 20, 30, 40))
+        self.assertFalse(self.watermark.has_writes_since(watermark))
+
+        self._set_server_status((2, 9, 2, 3), (11, 20, 30, 40))
+        self.assertTrue(self.watermark.has_writes_since(watermark))
+
+    def test_standalone_ddl_only(self):
+        self._patch_nodes([_make_node(20000, repl_set=False)])
+        self._set_server_status((1, 5, 2, 3), (10, 20, 30, 40))
+        watermark = self.watermark.capture()
+
+        # Commands such as createIndexes and drop leave the opcounters for CRUD operations alone
+        # but write to the catalog.
+        self._set_server_status((1, 5, 2, 3), (12, 21, 30, 40))
+        self.assertTrue(self.watermark.has_writes_since(watermark))
+
+    def test_standalone_other_storage_engine(self):
+        self._patch_nodes([_make_node(20000, repl_set=False)])
+        self.client.admin.command.return_value = {
+            "opcounters": {"insert": 1, "query": 5, "update": 2, "delete": 3}
+        }
+        watermark = self.watermark.capture()
+        self.assertEqual({20000: None}, watermark)
+        self.assertTrue(self.watermark.has_writes_since(watermark))
+
+    def test_replica_set(self):
+        self._patch_nodes([_make_node(20000, repl_set=True)])
+        oplog = self.client.local.__getitem__.return_value
+        oplog.find_one.return_value = {"ts": 10}
+        watermark = self.watermark.capture()
+        self.assertEqual({20000: 10}, watermark)
+
+        oplog.find_one.return_value = None
+        self.assertFalse(self.watermark.has_writes_since(watermark))
+        oplog.find_one.assert_called_with({"op": {"$ne": "n"}, "ts": {"$gt": 10}})
+
+        oplog.find_one.return_value = {"op": "i"}
+        self.assertTrue(self.watermark.has_writes_since(watermark))
+
+    def test_node_set_changed(self):
+        self._patch_nodes([_make_node(20001, repl_set=True)])
+        self.assertTrue(self.watermark.has_writes_since({20000: 10}))
+
+    def test_unreachable_node(self):
+        self._patch_nodes([_make_node(20000, repl_set=False)])
+        self.client.admin.command.side_effect = pymongo.errors.AutoReconnect("down")
+        self.assertIsNone(self.watermark.capture())
+        self.assertTrue(self.watermark.has_writes_since({20000: (0, 0, 0, 0, 0, 0, 0)}))
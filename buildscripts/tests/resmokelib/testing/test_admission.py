@@ -0,0 +1,150 @@
+"""Unit tests for buildscripts/resmokelib/testing/admission.py."""
+
+import logging
+import threading
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing import admission
+
+# pylint: disable=missing-docstring,protected-access
+
+_GB = 1024**3
+
+
+class TestCountFixtureProcesses(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(admission._config, NUM_REPLSET_NODES=None, NUM_SHARDS=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_standalone(self):
+        self.assertEqual((1, 0), admission.count_fixture_processes({"class": "MongoDFixture"}))
+
+    def test_external(self):
+        self.assertEqual((0, 0), admission.count_fixture_processes({"class": "ExternalFixture"}))
+
+    def test_replica_set(self):
+        self.assertEqual((2, 0), admission.count_fixture_processes({"class": "ReplicaSetFixture"}))
+        self.assertEqual(
+            (4, 0),
+            admission.count_fixture_processes(
+                {"class": "ReplicaSetFixture", "num_nodes": 3, "start_initial_sync_node": True}))
+
+    def test_replica_set_num_nodes_option(self):
+        admission._config.NUM_REPLSET_NODES = 5
+        self.assertEqual((5, 0),
+                         admission.count_fixture_processes(
+                             {"class": "ReplicaSetFixture", "num_nodes": 3}))
+
+    def test_sharded_cluster(self):
+        self.assertEqual((7, 2),
+                         admission.count_fixture_processes({
+                             "class": "ShardedClusterFixture", "num_shards": 2,
+                             "num_rs_nodes_per_shard": 3, "num_mongos": 2
+                         }))
+
+
+class TestEstimateNumJobs(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(admission._config, NUM_REPLSET_NODES=None, NUM_SHARDS=None,
+                                      STORAGE_ENGINE_CACHE_SIZE=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cpu_bound(self):
+        # A 3-node replica set needs 2.5 CPUs per job.
+        (num_jobs, _) = admission.estimate_num_jobs({"class": "ReplicaSetFixture", "num_nodes": 3},
+                                                    num_cpus=16, available_memory_bytes=1024 * _GB)
+        self.assertEqual(6, num_jobs)
+
+    def test_memory_bound(self):
+        # Each mongod with a 1GB cache needs 1.25GB, and 80% of the 10GB available may be used.
+        (num_jobs, _) = admission.estimate_num_jobs(
+            {"class": "MongoDFixture", "mongod_options": {"wiredTigerCacheSizeGB": 1}}, num_cpus=64,
+            available_memory_bytes=10 * _GB)
+        self.assertEqual(6, num_jobs)
+
+    def test_at_least_one_job(self):
+        (num_jobs, _) = admission.estimate_num_jobs(
+            {"class": "ShardedClusterFixture", "num_shards": 4, "num_rs_nodes_per_shard": 3},
+            num_cpus=2, available_memory_bytes=1 * _GB)
+        self.assertEqual(1, num_jobs)
+
+
+class TestResolveNumJobs(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(admission._config, "SHELL_CONN_STRING", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def _mock_suite(test_kind, num_jobs):
+        suite = mock.Mock()
+        suite.test_kind = test_kind
+        suite.options.num_jobs = num_jobs
+        suite.get_executor_config.return_value = {"fixture": {"class": "ReplicaSetFixture"}}
+        return suite
+
+    @mock.patch.object(admission, "estimate_num_jobs", return_value=(3, "reason"))
+    def test_estimated(self, mock_estimate):
+        (num_jobs, _) = admission.resolve_num_jobs(self._mock_suite("js_test", 4))
+        self.assertEqual(3, num_jobs)
+        mock_estimate.assert_called_once_with({"class": "ReplicaSetFixture"})
+
+    @mock.patch.object(admission, "estimate_num_jobs", return_value=(16, "reason"))
+    def test_capped_by_num_jobs(self, _):
+        (num_jobs, _) = admission.resolve_num_jobs(self._mock_suite("js_test", 4))
+        self.assertEqual(4, num_jobs)
+
+    @mock.patch.object(admission, "estimate_num_jobs", return_value=(16, "reason"))
+    def test_benchmark(self, mock_estimate):
+        (num_jobs, _) = admission.resolve_num_jobs(self._mock_suite("benchmark_test", 4))
+        self.assertEqual(1, num_jobs)
+        mock_estimate.assert_not_called()
+
+
+class TestAdmissionController(unittest.TestCase):
+    def setUp(self):
+        self.controller = admission.AdmissionController(logging.getLogger("admission_unittest"))
+        self.interrupt_flag = threading.Event()
+
+    def test_admits_when_not_overloaded(self):
+        self.controller._get_overload_reason = mock.Mock(return_value=None)
+        self.assertTrue(self.controller.acquire(self.interrupt_flag))
+        self.assertTrue(self.controller.acquire(self.interrupt_flag))
+        self.assertEqual(2, self.controller._num_running)
+        self.controller.release()
+        self.assertEqual(1, self.controller._num_running)
+
+    def test_admits_first_test_when_overloaded(self):
+        self.controller._get_overload_reason = mock.Mock(return_value="overloaded")
+        self.assertTrue(self.controller.acquire(self.interrupt_flag))
+
+    @mock.patch.object(admission.AdmissionController, "POLL_INTERVAL_SECS", 0.01)
+    def test_waits_while_overloaded(self):
+        self.controller._get_overload_reason = mock.Mock(side_effect=["overloaded", None])
+        self.controller._num_running = 1
+        self.assertTrue(self.controller.acquire(self.interrupt_flag))
+        self.assertEqual(2, self.controller._get_overload_reason.call_count)
+
+    def test_interrupted(self):
+        self.controller._get_overload_reason = mock.Mock(return_value="overloaded")
+        self.controller._num_running = 1
+        self.interrupt_flag.set()
+        self.assertFalse(self.controller.acquire(self.interrupt_flag))
+
+    @mock.patch.object(admission.os, "getloadavg", return_value=(8.0, 0, 0))
+    def test_overloaded_by_load_average(self, _):
+        self.controller._num_cpus = 4
+        self.assertIn("load average", self.controller._get_overload_reason())
+
+    @mock.patch.object(admission.os, "getloadavg", return_value=(1.0, 0, 0))
+    @mock.patch.object(admission.psutil, "virtual_memory")
+    def test_overloaded_by_memory(self, virtual_memory, _):
+        self.controller._num_cpus = 4
+        virtual_memory.return_value = mock.Mock(available=1, total=100)
+        self.assertIn("memory", self.controller._get_overload_reason())
+        virtual_memory.return_value = mock.Mock(available=50, total=100)
+        self.assertIsNone(self.controller._get_overload_reason())
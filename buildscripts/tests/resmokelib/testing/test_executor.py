@@ -4,7 +4,9 @@ import unittest
 
 import mock
 
+from buildscripts.resmokelib.core import network
 from buildscripts.resmokelib.testing import executor
+from buildscripts.resmokelib.testing import fixture_pool
 from buildscripts.resmokelib.testing import queue_element
 
 # pylint: disable=missing-docstring,protected-access
@@ -90,6 +92,14 @@ class TestCreateJobs(unittest.TestCase):
         self.ut_executor._create_jobs(1)
         self.assertEqual(num_jobs, self.ut_executor._make_job.call_count)
 
+    def test_create_jobs_with_offset(self):
+        num_jobs = 3
+        self.ut_executor._num_jobs_to_start = lambda x, y: num_jobs
+        self.ut_executor._job_num_offset = 4
+        self.ut_executor._create_jobs(3)
+        self.assertEqual([mock.call(4), mock.call(5), mock.call(6)],
+                         self.ut_executor._make_job.call_args_list)
+
 
 class TestNumTimesToRepeatTests(unittest.TestCase):
     def test_default(self):
@@ -145,9 +155,103 @@ class TestMakeTestQueue(unittest.TestCase):
             self.assertIn(element, self.suite.tests)
 
 
+class TestMakeTestQueueLongestFirst(unittest.TestCase):
+    def setUp(self):
+        self.suite = mock_suite(3)
+        self.ut_executor = UnitTestExecutor(self.suite, None)
+        self.ut_executor._historic_runtimes = {
+            "jstests/core/and1.js": 10.0,
+            "jstests/core/and2.js": 30.0,
+        }
+        self.ut_executor._create_queue_elem_for_test_name = self._make_queue_elem
+
+    @staticmethod
+    def _make_queue_elem(test_name):
+        queue_elem = mock.Mock()
+        queue_elem.testcase.test_name = test_name
+        return queue_elem
+
+    @staticmethod
+    def _drain(test_queue):
+        test_names = []
+        while not test_queue.empty():
+            test_names.append(test_queue.get_for_job(0).testcase.test_name)
+        return test_names
+
+    @mock.patch(ns("_config.SCHEDULER_LOOKAHEAD"), 1)
+    def test_longest_first(self):
+        test_queue = self.ut_executor._make_test_queue()
+        self.assertIsInstance(test_queue, executor.WorkStealingQueue)
+        # and0.js has no history and is assumed to take the average runtime.
+        self.assertEqual(["jstests/core/and2.js", "jstests/core/and0.js", "jstests/core/and1.js"],
+                         self._drain(test_queue))
+
+    @mock.patch(ns("_config.SCHEDULER_LOOKAHEAD"), 1)
+    def test_repetitions_ordered_separately(self):
+        self.suite.options.num_repeat_tests = 2
+        test_queue = self.ut_executor._make_test_queue()
+        self.assertEqual(
+            ["jstests/core/and2.js", "jstests/core/and0.js", "jstests/core/and1.js"] * 2,
+            self._drain(test_queue))
+
+
+class TestLoadHistoricRuntimes(unittest.TestCase):
+    def setUp(self):
+        self.ut_executor = UnitTestExecutor(mock_suite(1), None)
+
+    @mock.patch(ns("_config.HISTORIC_RUNTIME_FILE"), None)
+    @mock.patch(ns("_config.RUNTIME_HISTORY_FILE"), "history.jsonl")
+    @mock.patch(ns("_config.ORDER_BY_RUNTIME_HISTORY"), False)
+    @mock.patch(ns("historyfile.read"))
+    def test_recording_doesnt_change_order(self, read_mock):
+        self.assertIsNone(self.ut_executor._load_historic_runtimes())
+        read_mock.assert_not_called()
+
+    @mock.patch(ns("_config.HISTORIC_RUNTIME_FILE"), None)
+    @mock.patch(ns("_config.RUNTIME_HISTORY_FILE"), "history.jsonl")
+    @mock.patch(ns("_config.ORDER_BY_RUNTIME_HISTORY"), True)
+    @mock.patch(ns("historyfile.read"))
+    def test_order_by_runtime_history(self, read_mock):
+        test_runtime = mock.Mock(test_name="jstests/core/and0.js", runtime=5.0)
+        read_mock.return_value.get_tests_runtimes.return_value = [test_runtime]
+        self.assertEqual({"jstests/core/and0.js": 5.0}, self.ut_executor._load_historic_runtimes())
+
+
+class TestResetPorts(unittest.TestCase):
+    def setUp(self):
+        self.ut_executor = UnitTestExecutor(mock_suite(1), None)
+        self.ut_executor.job_budget = None
+        self.ut_executor.fixture_pool = fixture_pool.FixturePool(mock.Mock())
+        self.ut_executor._reused_job_nums = set()
+
+        patchers = [
+            mock.patch.object(network.config, "DYNAMIC_PORTS", False),
+            mock.patch.dict(network.PortAllocator._NUM_USED_PORTS, {0: 3, 1: 3, 2: 3}, clear=True),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_reused_fixture_keeps_ports(self):
+        self.ut_executor._reused_job_nums.add(0)
+        self.ut_executor._reset_ports([0])
+        self.assertEqual({0: 3}, dict(network.PortAllocator._NUM_USED_PORTS))
+
+    def test_parked_fixture_keeps_ports(self):
+        # The fixture of job 2 stays parked for a later suite since this suite only runs job 0.
+        parked_fixture = mock.Mock()
+        parked_fixture.is_running.return_value = True
+        self.ut_executor.fixture_pool.release(2, "key", parked_fixture)
+
+        self.ut_executor._reset_ports([0])
+        self.assertEqual({2: 3}, dict(network.PortAllocator._NUM_USED_PORTS))
+
+
 class UnitTestExecutor(executor.TestSuiteExecutor):
     def __init__(self, suite, config):  # pylint: disable=super-init-not-called
         self._suite = suite
         self.test_queue_logger = logging.getLogger("executor_unittest")
         self.test_config = config
         self.logger = mock.MagicMock()
+        self._historic_runtimes = None
+        self._job_num_offset = 0
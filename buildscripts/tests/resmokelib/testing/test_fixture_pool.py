@@ -0,0 +1,99 @@
+"""Unit tests for the resmokelib.testing.fixture_pool module."""
+
+import logging
+import unittest
+
+import mock
+
+from buildscripts.resmokelib import errors
+from buildscripts.resmokelib.testing import fixture_pool
+
+# pylint: disable=missing-docstring,protected-access
+
+
+def mock_fixture(running=True):
+    fixture = mock.Mock()
+    fixture.is_running.return_value = running
+    return fixture
+
+
+class TestMakeFixtureKey(unittest.TestCase):
+    def test_key_ignores_key_order(self):
+        key_a = fixture_pool.make_fixture_key("ReplicaSetFixture", {"num_nodes": 3, "a": {"x": 1}})
+        key_b = fixture_pool.make_fixture_key("ReplicaSetFixture", {"a": {"x": 1}, "num_nodes": 3})
+        self.assertEqual(key_a, key_b)
+
+    def test_key_differs_by_config(self):
+        key_a = fixture_pool.make_fixture_key("ReplicaSetFixture", {"num_nodes": 3})
+        key_b = fixture_pool.make_fixture_key("ReplicaSetFixture", {"num_nodes": 2})
+        self.assertNotEqual(key_a, key_b)
+
+    def test_key_differs_by_class(self):
+        key_a = fixture_pool.make_fixture_key("ReplicaSetFixture", {})
+        key_b = fixture_pool.make_fixture_key("ShardedClusterFixture", {})
+        self.assertNotEqual(key_a, key_b)
+
+
+class TestFixturePool(unittest.TestCase):
+    def setUp(self):
+        self.pool = fixture_pool.FixturePool(logging.getLogger("fixture_pool_unittest"))
+
+    def test_acquire_empty_pool(self):
+        self.assertIsNone(self.pool.acquire(0, "key"))
+
+    def test_acquire_matching_key(self):
+        fixture = mock_fixture()
+        self.assertTrue(self.pool.release(0, "key", fixture))
+        self.assertIs(fixture, self.pool.acquire(0, "key"))
+        fixture.teardown.assert_not_called()
+        # A fixture can only be handed out once.
+        self.assertIsNone(self.pool.acquire(0, "key"))
+
+    def test_acquire_other_job(self):
+        fixture = mock_fixture()
+        self.pool.release(0, "key", fixture)
+        self.assertIsNone(self.pool.acquire(1, "key"))
+        self.assertEqual({0}, self.pool.parked_job_nums())
+
+    def test_acquire_different_key_tears_down(self):
+        fixture = mock_fixture()
+        self.pool.release(0, "key", fixture)
+        self.assertIsNone(self.pool.acquire(0, "other_key"))
+        fixture.teardown.assert_called_once_with(finished=True)
+        self.assertEqual(set(), self.pool.parked_job_nums())
+
+    def test_acquire_not_running_tears_down(self):
+        fixture = mock_fixture()
+        self.pool.release(0, "key", fixture)
+        fixture.is_running.return_value = False
+        self.assertIsNone(self.pool.acquire(0, "key"))
+        fixture.teardown.assert_called_once_with(finished=True)
+
+    def test_release_not_running(self):
+        fixture = mock_fixture(running=False)
+        self.assertFalse(self.pool.release(0, "key", fixture))
+        fixture.teardown.assert_called_once_with(finished=True)
+        self.assertEqual(set(), self.pool.parked_job_nums())
+
+    def test_release_replaces_parked_fixture(self):
+        old_fixture = mock_fixture()
+        new_fixture = mock_fixture()
+        self.pool.release(0, "key", old_fixture)
+        self.pool.release(0, "other_key", new_fixture)
+        old_fixture.teardown.assert_called_once_with(finished=True)
+        self.assertIs(new_fixture, self.pool.acquire(0, "other_key"))
+
+    def test_teardown_all(self):
+        fixtures = [mock_fixture() for _ in range(3)]
+        for (job_num, fixture) in enumerate(fixtures):
+            self.pool.release(job_num, "key", fixture)
+        self.assertTrue(self.pool.teardown_all())
+        for fixture in fixtures:
+            fixture.teardown.assert_called_once_with(finished=True)
+        self.assertEqual(set(), self.pool.parked_job_nums())
+
+    def test_teardown_all_failure(self):
+        fixture = mock_fixture()
+        fixture.teardown.side_effect = errors.ServerFailure("failed")
+        self.pool.release(0, "key", fixture)
+        self.assertFalse(self.pool.teardown_all())
@@ -289,3 +289,38 @@ class TestNoOpFixtureSetupAndTeardown(unittest.TestCase):
     def test_teardown_called_for_noop_fixture(self):
         self.assertTrue(self.__job_object.manager.teardown_fixture(self.logger))
         self.__noop_fixture.teardown.assert_called_once_with(finished=True)
+
+
+class TestReusedFixtureSetup(unittest.TestCase):
+    """Test cases for setup_fixture() with a fixture reused from a previous suite."""
+
+    def setUp(self):
+        self.logger = logging.getLogger("job_unittest")
+        self.__noop_fixture = _fixtures.NoOpFixture(logger=self.logger, job_num=0)
+        self.__noop_fixture.setup = mock.Mock()
+        self.__noop_fixture.reset_data = mock.Mock()
+        self.__noop_fixture.teardown = mock.Mock()
+
+        test_report = mock.Mock()
+        test_report.find_test_info().status = "pass"
+
+        self.__job_object = job.Job(job_num=0, logger=self.logger, fixture=self.__noop_fixture,
+                                    hooks=[], report=test_report, archival=None, suite_options=None,
+                                    test_queue_logger=self.logger, reuse_fixture=True)
+
+    def test_reset_instead_of_setup(self):
+        self.assertTrue(self.__job_object.manager.setup_fixture(self.logger))
+        self.__noop_fixture.reset_data.assert_called_once_with()
+        self.__noop_fixture.setup.assert_not_called()
+
+    def test_second_setup_restarts_fixture(self):
+        self.assertTrue(self.__job_object.manager.setup_fixture(self.logger))
+        self.assertTrue(self.__job_object.manager.setup_fixture(self.logger))
+        self.__noop_fixture.reset_data.assert_called_once_with()
+        self.__noop_fixture.setup.assert_called_once_with()
+
+    def test_failed_reset_restarts_fixture(self):
+        self.__noop_fixture.reset_data.side_effect = errors.ServerFailure("reset failed")
+        self.assertTrue(self.__job_object.manager.setup_fixture(self.logger))
+        self.__noop_fixture.teardown.assert_called_once_with()
+        self.__noop_fixture.setup.assert_called_once_with()
@@ -0,0 +1,72 @@
+"""Unit tests for the resmokelib.testing.job_budget module."""
+
+import threading
+import unittest
+
+from buildscripts.resmokelib.testing import job_budget
+
+# pylint: disable=missing-docstring
+
+
+class TestJobBudget(unittest.TestCase):
+    def setUp(self):
+        job_budget.JobBudget.POLL_INTERVAL_SECS = 0.01
+        self.addCleanup(setattr, job_budget.JobBudget, "POLL_INTERVAL_SECS", 1.0)
+        self.budget = job_budget.JobBudget(2)
+        self.interrupt_flag = threading.Event()
+
+    def test_invalid_num_slots(self):
+        self.assertRaises(ValueError, job_budget.JobBudget, 0)
+
+    def test_acquire_up_to_num_slots(self):
+        self.assertTrue(self.budget.acquire(self.interrupt_flag))
+        self.assertTrue(self.budget.acquire(self.interrupt_flag))
+        self.interrupt_flag.set()
+        self.assertFalse(self.budget.acquire(self.interrupt_flag))
+
+    def test_released_slot_is_reused(self):
+        self.assertTrue(self.budget.acquire(self.interrupt_flag))
+        self.assertTrue(self.budget.acquire(self.interrupt_flag))
+        acquired = []
+        waiter = threading.Thread(
+            target=lambda: acquired.append(self.budget.acquire(self.interrupt_flag)))
+        waiter.start()
+        self.budget.release()
+        waiter.join()
+        self.assertEqual([True], acquired)
+
+    def test_stop_wakes_waiters(self):
+        self.assertTrue(self.budget.acquire(self.interrupt_flag))
+        self.assertTrue(self.budget.acquire(self.interrupt_flag))
+        acquired = []
+        waiter = threading.Thread(
+            target=lambda: acquired.append(self.budget.acquire(self.interrupt_flag)))
+        waiter.start()
+        self.assertTrue(self.budget.stop())
+        waiter.join()
+        self.assertEqual([False], acquired)
+        self.assertTrue(self.budget.is_stopped())
+
+    def test_stop_only_once(self):
+        self.assertTrue(self.budget.stop())
+        self.assertFalse(self.budget.stop())
+
+    def test_release_too_many(self):
+        self.assertRaises(ValueError, self.budget.release)
+
+
+class TestShareJobs(unittest.TestCase):
+    def _share(self, num_slots, wanted_num_jobs):
+        return job_budget.JobBudget(num_slots).share_jobs(wanted_num_jobs)
+
+    def test_enough_slots(self):
+        self.assertEqual([2, 3], self._share(8, [2, 3]))
+
+    def test_slots_shared_evenly(self):
+        self.assertEqual([3, 3, 2], self._share(8, [8, 8, 8]))
+
+    def test_small_suite_leaves_slots_to_others(self):
+        self.assertEqual([1, 4, 3], self._share(8, [1, 8, 8]))
+
+    def test_more_suites_than_slots(self):
+        self.assertEqual([1, 1, 1], self._share(2, [4, 4, 4]))
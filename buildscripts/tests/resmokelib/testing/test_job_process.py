@@ -0,0 +1,200 @@
+"""Unit tests for buildscripts/resmokelib/testing/job_process.py."""
+
+import logging
+import os
+import queue
+import sys
+import threading
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.core import pipe as _pipe
+from buildscripts.resmokelib.core import process
+from buildscripts.resmokelib.testing import job_process
+from buildscripts.resmokelib.testing import report as _report
+from buildscripts.resmokelib.utils import queue as _queue
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class _FakeReport(object):
+    def __init__(self):
+        self.tests = []
+
+    def reset(self):
+        self.tests = []
+
+    def get_state(self):
+        return list(self.tests)
+
+    def set_state(self, state):
+        self.tests = state
+
+
+class _FakeJob(object):
+    def __init__(self, job_num, logger, fail_setup=False):
+        self.job_num = job_num
+        self.logger = logger
+        self.report = _FakeReport()
+        self.hooks = []
+        self.manager = mock.Mock()
+        self.manager.teardown_fixture.return_value = True
+        self.fail_setup = fail_setup
+
+    def __call__(self, test_queue, interrupt_flag, setup_flag=None, teardown_flag=None):
+        if setup_flag is not None and self.fail_setup:
+            setup_flag.set()
+            return
+        while not test_queue.empty() and not interrupt_flag.is_set():
+            test_name = test_queue.get_for_job(self.job_num)
+            self.logger.info("job %d ran %s in %d", self.job_num, test_name, os.getpid())
+            self.report.tests.append(test_name)
+            test_queue.task_done()
+
+
+class _ProcessJob(_FakeJob):
+    """A job which runs each test as a subprocess whose output is logged by the job's logger."""
+
+    START_TIMEOUT_SECS = 30
+
+    def __call__(self, test_queue, interrupt_flag, setup_flag=None, teardown_flag=None):
+        while not test_queue.empty() and not interrupt_flag.is_set():
+            test_name = test_queue.get_for_job(self.job_num)
+            proc = process.Process(self.logger, [sys.executable, "-c", "print('%s')" % test_name])
+            # Starting the process hangs if it waits on a LogMultiplexer thread that doesn't exist.
+            starter = threading.Thread(target=proc.start, daemon=True)
+            starter.start()
+            starter.join(self.START_TIMEOUT_SECS)
+            if starter.is_alive():
+                self.logger.error("timed out starting %s", test_name)
+            else:
+                proc.wait()
+                self.report.tests.append(test_name)
+            test_queue.task_done()
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@unittest.skipUnless(job_process.is_supported(), "os.fork() isn't available")
+class TestJobProcessPool(unittest.TestCase):
+    def setUp(self):
+        self.root_logger = logging.getLogger("executor_job_process_unittest")
+        self.root_logger.propagate = False
+        self.root_logger.setLevel(logging.DEBUG)
+        self.handler = _ListHandler()
+        self.root_logger.handlers = [self.handler]
+        self.addCleanup(setattr, self.root_logger, "handlers", [])
+
+        patcher = mock.patch.multiple(job_process._logging.loggers,
+                                      ROOT_EXECUTOR_LOGGER=self.root_logger,
+                                      ROOT_FIXTURE_LOGGER=None, ROOT_TESTS_LOGGER=None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _make_pool(self, jobs):
+        pool = job_process.JobProcessPool(self.root_logger, jobs, lambda name: name)
+        pool.POLL_INTERVAL_SECS = 0.1
+        pool.start()
+        return pool
+
+    def test_run_tests(self):
+        job_logger = self.root_logger.getChild("job")
+        jobs = [_FakeJob(job_num, job_logger) for job_num in range(2)]
+        pool = self._make_pool(jobs)
+        try:
+            test_names = ["test{}.js".format(i) for i in range(10)]
+            self.assertFalse(pool.run_tests(test_names, None, None))
+            # The tests run in the worker processes, and their reports are mirrored back.
+            self.assertEqual(test_names, sorted(jobs[0].report.tests + jobs[1].report.tests))
+            ran_messages = [msg for msg in self.handler.messages if " ran " in msg]
+            self.assertEqual(10, len(ran_messages))
+            self.assertNotIn(str(os.getpid()), " ".join(ran_messages))
+
+            # The workers run the tests of the next execution too.
+            self.assertFalse(pool.run_tests(["again.js"], None, None))
+            self.assertEqual(["again.js"], jobs[0].report.tests + jobs[1].report.tests)
+
+            self.assertTrue(pool.teardown_fixtures())
+        finally:
+            pool.stop()
+        for job in jobs:
+            self.assertFalse(pool._workers[job.job_num].process.is_alive())
+
+    @mock.patch.object(process._config, "LOG_MULTIPLEXER", True)
+    def test_log_multiplexer(self):
+        # The multiplexer started by resmoke.py before forking isn't running in the workers.
+        _pipe.get_log_multiplexer()
+        job_logger = self.root_logger.getChild("job")
+        jobs = [_ProcessJob(job_num, job_logger) for job_num in range(2)]
+        pool = self._make_pool(jobs)
+        try:
+            test_names = ["test{}.js".format(i) for i in range(4)]
+            self.assertFalse(pool.run_tests(test_names, None, None))
+            self.assertEqual(test_names, sorted(jobs[0].report.tests + jobs[1].report.tests))
+            for test_name in test_names:
+                self.assertIn(test_name, self.handler.messages)
+        finally:
+            pool.stop()
+
+    def test_setup_failure(self):
+        jobs = [_FakeJob(0, logging.Logger("job"), fail_setup=True)]
+        pool = self._make_pool(jobs)
+        try:
+            setup_flag = mock.Mock()
+            pool.run_tests(["test.js"], setup_flag, None)
+            setup_flag.set.assert_called_once_with()
+        finally:
+            pool.stop()
+
+
+class TestTestNameQueue(unittest.TestCase):
+    def setUp(self):
+        self.tests = queue.Queue()
+        self.on_task_done = mock.Mock()
+        self.test_queue = job_process._TestNameQueue(self.tests, lambda name: "elem:" + name,
+                                                     self.on_task_done)
+
+    def test_stops_at_sentinel(self):
+        for item in ["a.js", "b.js", None, "c.js"]:
+            self.tests.put(item)
+
+        self.assertFalse(self.test_queue.empty())
+        self.assertEqual("elem:a.js", self.test_queue.get_for_job(0))
+        self.assertEqual("b.js", self.test_queue.get_nowait())
+        self.assertTrue(self.test_queue.empty())
+        self.assertRaises(_queue.Empty, self.test_queue.get_nowait)
+        # The tests after this worker's sentinel are left for the other workers.
+        self.assertEqual("c.js", self.tests.get_nowait())
+
+    def test_task_done(self):
+        self.test_queue.task_done()
+        self.on_task_done.assert_called_once_with()
+
+
+class TestReportState(unittest.TestCase):
+    @mock.patch.object(_report._config.SuiteOptions, "ALL_INHERITED")
+    def test_set_state(self, _):
+        source = _report.TestReport(logging.getLogger("job"), mock.Mock())
+        for (test_file, status) in [("a.js", "pass"), ("b.js", "fail"), ("b.js:Hook", "error")]:
+            test_info = _report._TestInfo(test_file, test_file, ":" in test_file)
+            test_info.status = status
+            source.test_infos.append(test_info)
+        source.num_dynamic = 1
+
+        mirror = _report.TestReport(logging.getLogger("job"), mock.Mock())
+        mirror.set_state(source.get_state())
+        self.assertEqual(["a.js", "b.js", "b.js:Hook"],
+                         [test_info.test_file for test_info in mirror.test_infos])
+        self.assertEqual(
+            (1, 1, 1, 0),
+            (mirror.num_succeeded, mirror.num_failed, mirror.num_errored, mirror.num_interrupted))
+        self.assertEqual(1, mirror.num_dynamic)
+        self.assertFalse(mirror.wasSuccessful())
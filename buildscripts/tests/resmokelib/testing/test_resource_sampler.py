@@ -0,0 +1,137 @@
+"""Unit tests for buildscripts/resmokelib/testing/resource_sampler.py."""
+
+import logging
+import os
+import shutil
+import tempfile
+import unittest
+
+import mock
+import psutil
+
+from buildscripts.resmokelib.testing import resource_sampler
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestResourceSampler(unittest.TestCase):
+    def setUp(self):
+        self.proc_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.proc_dir)
+        self.sampler = resource_sampler.ResourceSampler(
+            logging.getLogger("resource_sampler_unittest"), 0.01, proc_dir=self.proc_dir)
+
+    def _write_proc(self, pid, cpu_ticks, rss_kb, write_bytes=None):
+        pid_dir = os.path.join(self.proc_dir, str(pid))
+        os.makedirs(pid_dir, exist_ok=True)
+        # The command name contains a space and a parenthesis to check they are skipped over.
+        stat_fields = ["S"] + ["0"] * 10 + [str(cpu_ticks), "0"] + ["0"] * 30
+        with open(os.path.join(pid_dir, "stat"), "w") as fh:
+            fh.write("%d (mongo d)) %s\n" % (pid, " ".join(stat_fields)))
+        with open(os.path.join(pid_dir, "status"), "w") as fh:
+            fh.write("Name:\tmongod\nVmPeak:\t999 kB\nVmRSS:\t%d kB\n" % (rss_kb))
+        if write_bytes is not None:
+            with open(os.path.join(pid_dir, "io"), "w") as fh:
+                fh.write("rchar: 10\nwrite_bytes: %d\n" % (write_bytes))
+
+    def test_read_proc(self):
+        self._write_proc(1, cpu_ticks=resource_sampler._CLOCK_TICKS_PER_SEC * 2, rss_kb=4,
+                         write_bytes=100)
+        self.assertEqual((2.0, 4096, 100), self.sampler._read_proc(1))
+
+    def test_read_proc_no_io(self):
+        self._write_proc(1, cpu_ticks=0, rss_kb=4)
+        self.assertEqual((0.0, 4096, None), self.sampler._read_proc(1))
+
+    def test_read_proc_exited(self):
+        self.assertIsNone(self.sampler._read_proc(1))
+
+    def test_usage_per_test(self):
+        self._write_proc(1, cpu_ticks=0, rss_kb=1, write_bytes=100)
+        self._write_proc(2, cpu_ticks=0, rss_kb=2, write_bytes=1000)
+
+        with mock.patch.object(resource_sampler.time, "time", side_effect=[10.0, 11.0]):
+            self.sampler.start_test("test", lambda: [1, 2])
+            self._write_proc(1, cpu_ticks=resource_sampler._CLOCK_TICKS_PER_SEC // 2, rss_kb=3,
+                             write_bytes=150)
+            self._write_proc(2, cpu_ticks=resource_sampler._CLOCK_TICKS_PER_SEC // 2, rss_kb=2,
+                             write_bytes=1000)
+            usage = self.sampler.stop_test("test")
+
+        self.assertEqual(2, usage["num_samples"])
+        self.assertEqual(5 * 1024, usage["rss_bytes_peak"])
+        self.assertEqual(4 * 1024, usage["rss_bytes_mean"])
+        self.assertEqual(100.0, usage["cpu_percent_peak"])
+        self.assertEqual(50, usage["bytes_written"])
+        self.assertIsNone(self.sampler.stop_test("test"))
+
+    def test_unsupported_platform(self):
+        self.assertFalse(self.sampler.is_supported())
+        os.makedirs(os.path.join(self.proc_dir, "self"))
+        self.assertTrue(self.sampler.is_supported())
+
+    def test_background_thread(self):
+        self._write_proc(1, cpu_ticks=0, rss_kb=1)
+        self.sampler.start_test("test", lambda: [1])
+        self.sampler.start()
+        try:
+            while self.sampler._usages["test"].num_samples < 3:
+                self.sampler._stop_event.wait(0.01)
+        finally:
+            self.sampler.stop()
+        self.assertGreaterEqual(self.sampler.stop_test("test")["num_samples"], 4)
+
+    def test_reset_after_fork(self):
+        self._write_proc(1, cpu_ticks=0, rss_kb=1)
+        self.sampler.start_test("parent test", lambda: [1])
+        # The lock is left held as though the parent's sampling thread held it at fork time.
+        self.sampler._lock.acquire()
+        self.sampler.reset_after_fork()
+
+        self.sampler.start_test("test", lambda: [1])
+        self.assertIsNone(self.sampler.stop_test("parent test"))
+        self.assertEqual(2, self.sampler.stop_test("test")["num_samples"])
+
+
+class TestGetTestPids(unittest.TestCase):
+    def setUp(self):
+        # Maps pids to the pids of their descendants. Pids which aren't in it have exited.
+        self.descendants = {}
+        patcher = mock.patch.object(resource_sampler.psutil, "Process", side_effect=self._process)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _process(self, pid):
+        if pid not in self.descendants:
+            raise psutil.NoSuchProcess(pid)
+        process = mock.Mock()
+        process.children.return_value = [mock.Mock(pid=child) for child in self.descendants[pid]]
+        return process
+
+    def test_test_and_fixture_pids(self):
+        self.descendants = {1: [], 2: [], 3: []}
+        test = mock.Mock()
+        test.pids.return_value = [1]
+        test.fixture.pids.return_value = [2, 3]
+        self.assertEqual([1, 2, 3], resource_sampler.get_test_pids(test))
+
+    def test_no_fixture(self):
+        test = mock.Mock(fixture=None)
+        test.pids.return_value = []
+        self.assertEqual([], resource_sampler.get_test_pids(test))
+
+    def test_descendants(self):
+        # The mongo shell running the test (1) started a mongod (4), which forked another process
+        # (5).
+        self.descendants = {1: [4, 5], 2: []}
+        test = mock.Mock()
+        test.pids.return_value = [1]
+        test.fixture.pids.return_value = [2]
+        self.assertEqual([1, 2, 4, 5], resource_sampler.get_test_pids(test))
+
+    def test_exited_process(self):
+        self.descendants = {2: [4]}
+        test = mock.Mock()
+        test.pids.return_value = [1]
+        test.fixture.pids.return_value = [2]
+        self.assertEqual([1, 2, 4], resource_sampler.get_test_pids(test))
@@ -0,0 +1,27 @@
+"""Unit tests for the buildscripts.resmokelib.testing.testcases.benchmark_test module."""
+import logging
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.testing.testcases import benchmark_test
+
+# pylint: disable=missing-docstring
+
+
+class TestValidateBenchmarkOptions(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(benchmark_test._config, REPEAT_SUITES=1, REPEAT_TESTS=1,
+                                      REPEAT_TESTS_SECS=None, JOBS=4, AUTO_JOBS=False)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.logger = logging.getLogger("benchmark_test")
+
+    def test_jobs(self):
+        with self.assertRaises(ValueError):
+            benchmark_test.BenchmarkTestCase(self.logger, "build/benchmarks/bm")
+
+    def test_auto_jobs(self):
+        # The suite is sized to a single job with --jobs=auto.
+        benchmark_test._config.AUTO_JOBS = True
+        benchmark_test.BenchmarkTestCase(self.logger, "build/benchmarks/bm")
@@ -4,9 +4,13 @@ import logging
 import os
 import random
 import shutil
+import tarfile
 import tempfile
+import threading
 import unittest
 
+import mock
+
 from buildscripts.resmokelib.utils import archival
 
 # pylint: disable=missing-docstring,protected-access
@@ -238,3 +242,130 @@ class ArchivalLimitTests(ArchivalTestCase):
         status, message = self.archive.archive_files_to_s3(display_name, temp_file, self.bucket,
                                                            s3_path)
         self.assertEqual(1, status, message)
+
+
+class ArchivalLocalDirTests(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("archival_unittests")
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir, ignore_errors=True)
+        self.local_dir = os.path.join(self.temp_dir, "archives")
+        self.archive = archival.Archival(
+            self.logger, archival_json_file=os.path.join(self.temp_dir, "archive.json"),
+            limit_files=4, local_dir=self.local_dir)
+        self.addCleanup(self.archive.exit)
+
+    def _make_dbpath(self, name, files):
+        dbpath = os.path.join(self.temp_dir, "data", name)
+        os.makedirs(dbpath)
+        for (file_name, contents) in files.items():
+            with open(os.path.join(dbpath, file_name), "wb") as fh:
+                fh.write(contents)
+        return dbpath
+
+    def _archive(self, input_files, s3_path):
+        status, message = self.archive.archive_files_to_s3("Unittest", input_files, _BUCKET,
+                                                           s3_path)
+        self.assertEqual(0, status, message)
+        # The upload worker copies the archive asynchronously.
+        self.archive._upload_queue.join()
+        return os.path.join(self.local_dir, _BUCKET, "unittest", os.path.basename(s3_path))
+
+    def test_archive_is_readable(self):
+        random_bytes = bytes(random.getrandbits(8) for _ in range(3 * 1024 * 1024))
+        dbpath = self._make_dbpath("node0", {"random.wt": random_bytes, "empty.wt": b""})
+        archive_file = self._archive(dbpath, "unittest/readable.tgz")
+
+        with tarfile.open(archive_file, "r:gz") as tar_handle:
+            names = tar_handle.getnames()
+            self.assertIn(dbpath.lstrip("/") + "/empty.wt", names)
+            extracted = tar_handle.extractfile(dbpath.lstrip("/") + "/random.wt").read()
+        self.assertEqual(random_bytes, extracted)
+
+    def test_identical_files_are_linked(self):
+        contents = b"WiredTiger" * archival._DEDUPE_MIN_BYTES
+        node0 = self._make_dbpath("node0", {"collection.wt": contents})
+        node1 = self._make_dbpath("node1", {"collection.wt": contents})
+        archive_file = self._archive([node0, node1], "unittest/deduped.tgz")
+
+        with tarfile.open(archive_file, "r:gz") as tar_handle:
+            member = tar_handle.getmember(node1.lstrip("/") + "/collection.wt")
+            self.assertTrue(member.islnk())
+            self.assertEqual(node0.lstrip("/") + "/collection.wt", member.linkname)
+            self.assertEqual(contents, tar_handle.extractfile(member).read())
+
+        # The duplicate file is compressed only once.
+        self.assertLess(os.path.getsize(archive_file), len(contents) // 100)
+
+    def test_unique_sizes_are_not_hashed_separately(self):
+        contents = b"WiredTiger" * archival._DEDUPE_MIN_BYTES
+        node0 = self._make_dbpath("node0", {"collection.wt": contents})
+        node1 = self._make_dbpath("node1", {"collection.wt": contents + b"more"})
+        with mock.patch.object(archival, "_file_digest", wraps=archival._file_digest) as digest:
+            archive_file = self._archive([node0, node1], "unittest/unique_sizes.tgz")
+        digest.assert_not_called()
+
+        with tarfile.open(archive_file, "r:gz") as tar_handle:
+            member = tar_handle.getmember(node1.lstrip("/") + "/collection.wt")
+            self.assertTrue(member.isreg())
+            self.assertEqual(contents + b"more", tar_handle.extractfile(member).read())
+
+    def test_concurrent_archives_respect_file_limit(self):
+        dbpath = self._make_dbpath("node0", {"collection.wt": b"data"})
+        results = []
+
+        def _archive(num):
+            results.append(
+                self.archive.archive_files_to_s3("Unittest", dbpath, _BUCKET,
+                                                 "unittest/concurrent{}.tgz".format(num))[0])
+
+        threads = [threading.Thread(target=_archive, args=(num, )) for num in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(4, results.count(0))
+        self.assertEqual(4, self.archive.files_archived_num())
+
+    def test_concurrent_archives_respect_size_limit(self):
+        self.archive.limit_size_mb = 3
+        random_bytes = bytes(random.getrandbits(8) for _ in range(3 * 1024 * 1024 // 2))
+        dbpath = self._make_dbpath("node0", {"random.wt": random_bytes})
+        results = []
+
+        def _archive(num):
+            results.append(
+                self.archive.archive_files_to_s3("Unittest", dbpath, _BUCKET,
+                                                 "unittest/concurrent_size{}.tgz".format(num))[0])
+
+        threads = [threading.Thread(target=_archive, args=(num, )) for num in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Each archive compresses to 2MB, so only the first two archives fit under the limit.
+        self.assertEqual(2, results.count(0))
+        self.assertEqual(4, self.archive.files_archived_size_mb())
+
+    def test_concurrent_archives_wait_for_reservations(self):
+        self.archive.limit_size_mb = 3
+        dbpath = self._make_dbpath("node0", {"zeros.wt": bytes(3 * 1024 * 1024 // 2)})
+        results = []
+
+        def _archive(num):
+            results.append(
+                self.archive.archive_files_to_s3("Unittest", dbpath, _BUCKET,
+                                                 "unittest/concurrent_wait{}.tgz".format(num))[0])
+
+        threads = [threading.Thread(target=_archive, args=(num, )) for num in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Each archive reserves 2MB while it's being created, but compresses to 1MB, so the third
+        # archive still fits under the limit once the others have finished.
+        self.assertEqual(3, results.count(0))
+        self.assertEqual(3, self.archive.files_archived_size_mb())
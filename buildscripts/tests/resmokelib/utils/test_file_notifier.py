@@ -0,0 +1,78 @@
+"""Unit tests for buildscripts/resmokelib/utils/file_notifier.py."""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.utils import file_notifier
+
+# pylint: disable=missing-docstring
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify is only available on Linux")
+class TestFileCreationNotifier(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir, ignore_errors=True)
+
+        self.notified = threading.Event()
+        self.notifier = file_notifier.FileCreationNotifier(self.tmpdir, ["permitted"],
+                                                           self.notified.set)
+        self.assertTrue(self.notifier.start())
+        self.addCleanup(self.notifier.stop)
+
+    def _create(self, filename):
+        with open(os.path.join(self.tmpdir, filename), "w"):
+            pass
+
+    def test_notifies_on_creation(self):
+        self._create("permitted")
+        self.assertTrue(self.notified.wait(10))
+
+    def test_ignores_other_files(self):
+        self._create("other")
+        self.assertFalse(self.notified.wait(0.2))
+
+    def test_directory_removed(self):
+        shutil.rmtree(self.tmpdir)
+        self.assertTrue(self.notified.wait(10))
+        self.notifier._thread.join(10)  # pylint: disable=protected-access
+        self.assertFalse(self.notifier.is_running())
+
+    def test_file_descriptors_above_fd_setsize(self):
+        import resource  # pylint: disable=import-outside-toplevel
+
+        # select.select() can't wait on file descriptors of 1024 or above.
+        if resource.getrlimit(resource.RLIMIT_NOFILE)[0] < 1100:
+            self.skipTest("requires being able to open more than 1024 files")
+        for _ in range(1024):
+            self.addCleanup(os.close, os.open(os.devnull, os.O_RDONLY))
+
+        notified = threading.Event()
+        notifier = file_notifier.FileCreationNotifier(self.tmpdir, ["high"], notified.set)
+        self.assertTrue(notifier.start())
+        self.addCleanup(notifier.stop)
+        self.assertGreaterEqual(notifier._inotify_fd, 1024)  # pylint: disable=protected-access
+
+        self._create("high")
+        self.assertTrue(notified.wait(10))
+
+
+class TestFileCreationNotifierUnsupported(unittest.TestCase):
+    @mock.patch.object(file_notifier, "_load_inotify", return_value=None)
+    def test_start_returns_false(self, _):
+        notifier = file_notifier.FileCreationNotifier("dir", ["permitted"], mock.Mock())
+        self.assertFalse(notifier.start())
+        self.assertFalse(notifier.is_running())
+        notifier.stop()
+
+    def test_missing_directory(self):
+        notifier = file_notifier.FileCreationNotifier(
+            os.path.join(tempfile.gettempdir(), "does-not-exist-file-notifier"), ["permitted"],
+            mock.Mock())
+        self.assertFalse(notifier.start())
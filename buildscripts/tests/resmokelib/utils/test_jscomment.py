@@ -0,0 +1,98 @@
+"""Unit tests for the resmokelib.utils.jscomment module."""
+import json
+import os
+import tempfile
+import unittest
+
+import mock
+
+from buildscripts.resmokelib.utils import jscomment
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestGetTags(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _write_test(self, contents, name="test.js"):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w") as fp:
+            fp.write(contents)
+        return path
+
+    def test_multiline_tags(self):
+        path = self._write_test("/**\n"
+                                " * @tags: [ \"tag1\",  # double quoted\n"
+                                " *          'tag2'\n"
+                                " *         , tag3\n"
+                                " *         ]\n"
+                                " */\n")
+        self.assertEqual(["tag1", "tag2", "tag3"], jscomment.get_tags(path))
+
+    def test_no_tags(self):
+        path = self._write_test("(function() {\n'use strict';\n})();\n")
+        self.assertEqual([], jscomment.get_tags(path))
+
+    def test_tags_after_code(self):
+        path = self._write_test("'use strict';\n\n/**\n * @tags: [requires_sharding]\n */\n")
+        self.assertEqual(["requires_sharding"], jscomment.get_tags(path))
+
+    def test_last_tags_are_used(self):
+        path = self._write_test("// @tags: [first]\n// @tags: [second]\n// @tags unrelated\n")
+        self.assertEqual(["second"], jscomment.get_tags(path))
+
+    def test_invalid_tags(self):
+        path = self._write_test("// @tags: [a, {]\n")
+        with self.assertRaises(ValueError):
+            jscomment.get_tags(path)
+
+
+class TestGetTagsForFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.cache_file = os.path.join(self.tmpdir.name, "cache.json")
+        self.test1 = self._write_test("test1.js", "// @tags: [tag1]\n")
+        self.test2 = self._write_test("test2.js", "print('no tags');\n")
+
+    def _write_test(self, name, contents):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, "w") as fp:
+            fp.write(contents)
+        return path
+
+    def test_without_cache(self):
+        self.assertEqual({self.test1: ["tag1"], self.test2: []},
+                         jscomment.get_tags_for_files([self.test1, self.test2, self.test1]))
+        self.assertFalse(os.path.exists(self.cache_file))
+
+    def test_unchanged_files_are_not_read_again(self):
+        expected = jscomment.get_tags_for_files([self.test1, self.test2], self.cache_file)
+        self.assertTrue(os.path.exists(self.cache_file))
+
+        with mock.patch.object(jscomment, "get_tags") as get_tags:
+            self.assertEqual(
+                expected, jscomment.get_tags_for_files([self.test1, self.test2], self.cache_file))
+            get_tags.assert_not_called()
+
+    def test_changed_files_are_read_again(self):
+        jscomment.get_tags_for_files([self.test1], self.cache_file)
+        self._write_test("test1.js", "// @tags: [tag1, tag2]\n")
+        self.assertEqual({self.test1: ["tag1", "tag2"]},
+                         jscomment.get_tags_for_files([self.test1], self.cache_file))
+
+    def test_corrupted_cache_is_ignored(self):
+        with open(self.cache_file, "w") as fp:
+            fp.write('{"version": 1, "entr')
+        self.assertEqual({self.test1: ["tag1"]},
+                         jscomment.get_tags_for_files([self.test1], self.cache_file))
+        with open(self.cache_file) as fp:
+            self.assertIn(self.test1, json.load(fp)["entries"])
+
+    def test_cache_not_written_without_directory(self):
+        cache_file = os.path.join(self.tmpdir.name, "missing", "cache.json")
+        self.assertEqual({self.test1: ["tag1"]},
+                         jscomment.get_tags_for_files([self.test1], cache_file))
+        self.assertFalse(os.path.exists(os.path.dirname(cache_file)))
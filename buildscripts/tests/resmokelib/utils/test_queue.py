@@ -0,0 +1,64 @@
+"""Unit tests for the resmokelib.utils.queue module."""
+import unittest
+
+from buildscripts.resmokelib.utils import queue as _queue
+
+# pylint: disable=missing-docstring,protected-access
+
+
+class TestWorkStealingQueue(unittest.TestCase):
+    @staticmethod
+    def _make_queue(items, lookahead):
+        queue = _queue.WorkStealingQueue(lookahead=lookahead)
+        for item in items:
+            queue.put(item)
+        return queue
+
+    def test_invalid_lookahead(self):
+        with self.assertRaises(ValueError):
+            _queue.WorkStealingQueue(lookahead=0)
+
+    def test_items_handed_out_in_order(self):
+        queue = self._make_queue(range(4), lookahead=1)
+        self.assertEqual([0, 1, 2, 3], [queue.get_for_job(job_num % 2) for job_num in range(4)])
+        self.assertTrue(queue.empty())
+
+    def test_window_claims_lookahead_items(self):
+        queue = self._make_queue(range(6), lookahead=3)
+        self.assertEqual(0, queue.get_for_job(0))
+        self.assertEqual(3, queue.get_for_job(1))
+        self.assertEqual(1, queue.get_for_job(0))
+        self.assertEqual(3, queue.qsize())
+
+    def test_idle_job_steals_from_largest_window(self):
+        queue = self._make_queue(range(5), lookahead=3)
+        self.assertEqual(0, queue.get_for_job(0))  # Job 0 claims 0, 1, 2.
+        self.assertEqual(3, queue.get_for_job(1))  # Job 1 claims 3, 4.
+        self.assertEqual(4, queue.get_for_job(1))
+        # Job 1's window is exhausted, so it steals the last item claimed by job 0.
+        self.assertEqual(2, queue.get_for_job(1))
+        self.assertEqual(1, queue.get_for_job(0))
+        with self.assertRaises(_queue.Empty):
+            queue.get_for_job(0)
+
+    def test_get_nowait_drains_windows(self):
+        queue = self._make_queue(range(3), lookahead=3)
+        queue.get_for_job(0)
+        self.assertEqual({1, 2}, {queue.get_nowait(), queue.get_nowait()})
+        self.assertTrue(queue.empty())
+
+    def test_join_after_task_done(self):
+        queue = self._make_queue(range(2), lookahead=2)
+        for _ in range(2):
+            queue.get_for_job(0)
+            queue.task_done()
+        self.assertTrue(queue.join(timeout=0))
+
+
+class TestQueue(unittest.TestCase):
+    def test_get_for_job(self):
+        queue = _queue.Queue()
+        queue.put("item")
+        self.assertEqual("item", queue.get_for_job(3))
+        with self.assertRaises(_queue.Empty):
+            queue.get_for_job(3)
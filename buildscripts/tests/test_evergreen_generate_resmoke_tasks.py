@@ -13,6 +13,7 @@ from mock import patch, MagicMock
 from shrub.v2 import BuildVariant, ShrubProject
 from shrub.variant import DisplayTaskDefinition
 
+from buildscripts.util.runtime_history import HistoryKey, RuntimeHistory, RuntimeRecord
 from buildscripts.util.teststats import TestRuntime
 
 from buildscripts import evergreen_generate_resmoke_tasks as under_test
@@ -850,6 +851,7 @@ class GenerateSubSuitesTest(unittest.TestCase):
         options.fallback_num_sub_suites = n_fallback
         options.max_tests_per_suite = None
         options.max_sub_suites = max_sub_suites
+        options.runtime_history_file = None
         return options
 
     @staticmethod
@@ -880,6 +882,36 @@ class GenerateSubSuitesTest(unittest.TestCase):
             for suite in suites:
                 self.assertEqual(10, len(suite.tests))
 
+    @patch(ns("read_suite_config"))
+    def test_calculate_suites_from_runtime_history(self, mock_read_suite_config):
+        mock_read_suite_config.return_value = {}
+        evg = MagicMock()
+        test_list = self.get_test_list(100)
+        config_options = self.get_mock_options()
+        config_options.max_sub_suites = 1000
+        config_options.selected_tests_to_run = None
+        config_options.suite = "suite"
+        config_options.variant = "variant"
+
+        with TemporaryDirectory() as tmpdir:
+            config_options.runtime_history_file = os.path.join(tmpdir, "history.jsonl")
+            RuntimeHistory(config_options.runtime_history_file).append([
+                RuntimeRecord(
+                    key=HistoryKey(variant="variant", suite="suite", test_file=test_file),
+                    duration=60, hook_durations={}, outcome="pass") for test_file in test_list
+            ])
+            gen_sub_suites = under_test.GenerateSubSuites(evg, config_options)
+
+            with patch("os.path.exists") as exists_mock, patch(
+                    ns("suitesconfig")) as suitesconfig_mock:
+                exists_mock.return_value = True
+                suitesconfig_mock.get_suite.return_value.tests = test_list
+                suites = gen_sub_suites.calculate_suites(_DATE, _DATE)
+
+        # There are 100 tests taking 1 minute, with a target of 10 min we expect 10 suites.
+        self.assertEqual(10, len(suites))
+        evg.test_stats_by_project.assert_not_called()
+
     def test_calculate_suites_fallback(self):
         n_tests = 100
         n_fallback = 2
@@ -0,0 +1,121 @@
+"""Unit tests for the util.runtime_history module."""
+
+import json
+import os
+import tempfile
+import unittest
+
+import buildscripts.util.runtime_history as under_test
+
+# pylint: disable=missing-docstring,protected-access
+
+_KEY = under_test.HistoryKey(variant="variant", suite="suite", test_file="dir/test1.js")
+
+
+def _record(duration, outcome="pass", hooks=None, key=_KEY):
+    return under_test.RuntimeRecord(key=key, duration=duration, hook_durations=hooks or {},
+                                    outcome=outcome)
+
+
+class TestRuntimeEstimate(unittest.TestCase):
+    def test_first_run_sets_average(self):
+        estimate = under_test.RuntimeEstimate()
+        estimate.add(_record(10, hooks={"ValidateCollections": 2}), alpha=0.5)
+        self.assertEqual(10, estimate.duration)
+        self.assertEqual({"ValidateCollections": 2}, estimate.hook_durations)
+        self.assertEqual(1, estimate.num_pass)
+
+    def test_moving_average(self):
+        estimate = under_test.RuntimeEstimate()
+        estimate.add(_record(10), alpha=0.5)
+        estimate.add(_record(20), alpha=0.5)
+        estimate.add(_record(40), alpha=0.5)
+        self.assertEqual(27.5, estimate.duration)
+
+    def test_failures_are_counted_but_not_averaged(self):
+        estimate = under_test.RuntimeEstimate()
+        estimate.add(_record(10), alpha=0.5)
+        estimate.add(_record(1, outcome="fail"), alpha=0.5)
+        self.assertEqual(10, estimate.duration)
+        self.assertEqual(1, estimate.num_fail)
+
+
+class TestRuntimeHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, "history.jsonl")
+        self.history = under_test.RuntimeHistory(self.path, alpha=0.5)
+
+    def _num_lines(self):
+        with open(self.path) as fh:
+            return len(fh.readlines())
+
+    def test_missing_file_is_empty(self):
+        self.assertEqual({}, self.history.estimates())
+
+    def test_append(self):
+        self.history.append([_record(10)])
+        self.history.append([_record(20)])
+        self.assertEqual(2, self._num_lines())
+        self.assertEqual(15, self.history.estimates()[_KEY].duration)
+
+    def test_compact_preserves_estimates(self):
+        self.history.append([_record(10), _record(20, hooks={"CheckReplDBHash": 4})])
+        before = self.history.estimates()
+        self.history.compact()
+        self.assertEqual(1, self._num_lines())
+        self.assertEqual(before, self.history.estimates())
+
+        self.history.append([_record(35)])
+        self.assertEqual(25, self.history.estimates()[_KEY].duration)
+
+    def test_append_compacts_large_history(self):
+        self.history.append([_record(10)] * (under_test.COMPACT_LINES_PER_TEST + 1))
+        self.assertEqual(1, self._num_lines())
+
+    def test_truncated_line_is_ignored(self):
+        self.history.append([_record(10)])
+        with open(self.path, "a") as fh:
+            fh.write('{"type": "run", "vari')
+        self.assertEqual(10, self.history.estimates()[_KEY].duration)
+
+    def test_to_historic_task_data(self):
+        other_suite = _KEY._replace(suite="other_suite")
+        self.history.append([
+            _record(10, hooks={"ValidateCollections": 5}),
+            _record(100, key=other_suite),
+        ])
+        task_data = self.history.to_historic_task_data("suite", "variant")
+        self.assertEqual(1, len(task_data))
+        self.assertEqual([("dir/test1.js", 15)],
+                         [tuple(runtime) for runtime in task_data.get_tests_runtimes()])
+
+
+class TestRecordsFromReport(unittest.TestCase):
+    @staticmethod
+    def _result(test_file, elapsed, status="pass"):
+        return {"test_file": test_file, "elapsed": elapsed, "status": status}
+
+    def test_hooks_attributed_to_latest_execution(self):
+        report = {
+            "results": [
+                self._result("job0_fixture_setup_0", 5),
+                self._result("dir/test1.js", 10),
+                self._result("test1:ValidateCollections", 1),
+                self._result("dir/test1.js", 12, status="fail"),
+                self._result("test1:ValidateCollections", 2),
+                self._result("test1:CheckReplDBHash", 3),
+            ]
+        }
+        records = under_test.records_from_report(report, "suite", "variant", ["dir/test1.js"])
+        self.assertEqual([
+            _record(10, hooks={"ValidateCollections": 1}),
+            _record(12, outcome="fail", hooks={"ValidateCollections": 2, "CheckReplDBHash": 3})
+        ], records)
+
+    def test_windows_paths_are_normalized(self):
+        report = {"results": [self._result("dir\\test1.js", 10)]}
+        records = under_test.records_from_report(report, "suite", "variant", ["dir\\test1.js"])
+        self.assertEqual("dir/test1.js", records[0].key.test_file)
+        self.assertEqual("dir/test1.js", json.loads(json.dumps(records[0].to_json()))["test_file"])
@@ -1,6 +1,9 @@
 """Unit tests for the util.teststats module."""
 
 import datetime
+import json
+import os
+import tempfile
 import unittest
 
 from mock import Mock
@@ -66,6 +69,24 @@ class TestHistoricTaskData(unittest.TestCase):
         ]
         self.assertEqual(expected_runtimes, test_stats.get_tests_runtimes())
 
+    def test_from_file(self):
+        stats = [
+            {"test_file": "dir/test1.js", "num_pass": 2, "avg_duration_pass": 20},
+            {"test_file": "dir/test2.js", "num_pass": 1, "avg_duration_pass": 30},
+            {"test_file": "test2:Validate", "num_pass": 1, "avg_duration_pass": 5},
+        ]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "stats.json")
+            with open(path, "w") as fh:
+                json.dump(stats, fh)
+            test_stats = under_test.HistoricTaskData.from_file(path)
+
+        expected_runtimes = [
+            under_test.TestRuntime(test_name="dir/test2.js", runtime=35),
+            under_test.TestRuntime(test_name="dir/test1.js", runtime=20),
+        ]
+        self.assertEqual(expected_runtimes, test_stats.get_tests_runtimes())
+
     def test_zero_runs(self):
         evg_results = [
             self._make_evg_result("dir/test1.js", 0, 0),
@@ -0,0 +1,286 @@
+"""Local store of historic test runtimes recorded by resmoke.py.
+
+The store is a file of JSON lines which new test executions are appended to. Each line is either
+the record of a single test execution or the roll-up of all executions of a test that preceded
+the last compaction of the file.
+Reading the file folds the lines in order into an exponentially weighted moving average (EWMA) of
+the runtime of each test, keyed by build variant, suite, and test file.
+"""
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from buildscripts.util.testname import get_short_name_from_test_file, is_resmoke_hook, \
+    split_test_hook_name
+from buildscripts.util.teststats import HistoricHookInfo, HistoricTaskData, HistoricTestInfo, \
+    normalize_test_name
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows doesn't support locking the history file.
+
+# Weight given to the most recent execution of a test in the moving averages.
+DEFAULT_ALPHA = 0.3
+# Compact the store once it holds this many lines per test it knows about.
+COMPACT_LINES_PER_TEST = 20
+
+PASS_OUTCOMES = {"pass"}
+RUN_LINE = "run"
+ROLLUP_LINE = "rollup"
+
+
+class HistoryKey(NamedTuple):
+    """Identifies the runtimes of a test in a suite on a build variant."""
+
+    variant: str
+    suite: str
+    test_file: str
+
+
+class RuntimeRecord(NamedTuple):
+    """
+    The outcome of a single execution of a test.
+
+    duration: Runtime of the test itself in seconds.
+    hook_durations: Runtime in seconds of each hook which ran after the test.
+    outcome: Evergreen status of the test.
+    """
+
+    key: HistoryKey
+    duration: float
+    hook_durations: Dict[str, float]
+    outcome: str
+
+    def to_json(self) -> Dict:
+        """Convert this record to a line of the history file."""
+        return {
+            "type": RUN_LINE,
+            "variant": self.key.variant,
+            "suite": self.key.suite,
+            "test_file": self.key.test_file,
+            "duration": self.duration,
+            "hooks": self.hook_durations,
+            "outcome": self.outcome,
+            "time": time.time(),
+        }
+
+
+def _ewma(average: Optional[float], value: float, alpha: float) -> float:
+    """Fold 'value' into the moving 'average', which is None if there were no values before."""
+    if average is None:
+        return value
+    return alpha * value + (1 - alpha) * average
+
+
+@dataclass
+class RuntimeEstimate:
+    """
+    Moving averages of the runtime of a test.
+
+    Only passing executions contribute to the averages, as failing tests may stop early.
+    """
+
+    duration: Optional[float] = None
+    hook_durations: Dict[str, float] = field(default_factory=dict)
+    num_pass: int = 0
+    num_fail: int = 0
+
+    def add(self, record: RuntimeRecord, alpha: float) -> None:
+        """
+        Fold the given execution into the estimate.
+
+        :param record: Execution to include.
+        :param alpha: Weight of the execution relative to the existing averages.
+        """
+        if record.outcome not in PASS_OUTCOMES:
+            self.num_fail += 1
+            return
+
+        self.num_pass += 1
+        self.duration = _ewma(self.duration, record.duration, alpha)
+        for (hook_name, duration) in record.hook_durations.items():
+            self.hook_durations[hook_name] = _ewma(
+                self.hook_durations.get(hook_name), duration, alpha)
+
+    def to_json(self, key: HistoryKey) -> Dict:
+        """Convert this estimate to a roll-up line of the history file."""
+        return {
+            "type": ROLLUP_LINE,
+            "variant": key.variant,
+            "suite": key.suite,
+            "test_file": key.test_file,
+            "duration": self.duration,
+            "hooks": self.hook_durations,
+            "num_pass": self.num_pass,
+            "num_fail": self.num_fail,
+        }
+
+    @classmethod
+    def from_json(cls, line: Dict) -> "RuntimeEstimate":
+        """Create an estimate from a roll-up line of the history file."""
+        return cls(duration=line["duration"], hook_durations=dict(line["hooks"]),
+                   num_pass=line["num_pass"], num_fail=line["num_fail"])
+
+
+class RuntimeHistory(object):
+    """Read and append to a local runtime history file."""
+
+    def __init__(self, path: str, alpha: float = DEFAULT_ALPHA) -> None:
+        """
+        Initialize the runtime history.
+
+        :param path: Path to the history file. It is created on the first append.
+        :param alpha: Weight of each execution relative to the executions before it.
+        """
+        self.path = path
+        self.alpha = alpha
+
+    def append(self, records: Iterable[RuntimeRecord]) -> None:
+        """
+        Append the given executions to the history file and compact it if it has grown too large.
+
+        :param records: Executions to append.
+        """
+        lines = "".join(json.dumps(record.to_json()) + "\n" for record in records)
+        if not lines:
+            return
+
+        with self._locked():
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(lines)
+
+            (estimates, num_lines) = self._read()
+            if num_lines > COMPACT_LINES_PER_TEST * max(len(estimates), 1):
+                self._write_rollups(estimates)
+
+    def compact(self) -> None:
+        """Replace every line of the history file with one roll-up line per test."""
+        with self._locked():
+            (estimates, _) = self._read()
+            self._write_rollups(estimates)
+
+    def estimates(self) -> Dict[HistoryKey, RuntimeEstimate]:
+        """Get the runtime estimates of every test in the history file."""
+        with self._locked():
+            return self._read()[0]
+
+    def to_historic_task_data(self, suite: str, variant: str) -> HistoricTaskData:
+        """
+        Get the runtimes of the tests which ran in the given suite and build variant.
+
+        :param suite: Name of the suite.
+        :param variant: Name of the build variant.
+        :return: Historic task data in the same form as is built from Evergreen's test stats.
+        """
+        historic_tests = []
+        for (key, estimate) in self.estimates().items():
+            if key.suite != suite or key.variant != variant or estimate.duration is None:
+                continue
+
+            short_name = get_short_name_from_test_file(key.test_file)
+            hooks = [
+                HistoricHookInfo(hook_id=f"{short_name}:{hook_name}", num_pass=estimate.num_pass,
+                                 avg_duration=duration)
+                for (hook_name, duration) in estimate.hook_durations.items()
+            ]
+            historic_tests.append(
+                HistoricTestInfo(test_name=key.test_file, num_pass=estimate.num_pass,
+                                 avg_duration=estimate.duration, hooks=hooks))
+
+        return HistoricTaskData(historic_tests)
+
+    def _read(self) -> Tuple[Dict[HistoryKey, RuntimeEstimate], int]:
+        """Fold the history file into runtime estimates and count the lines it contains."""
+        estimates: Dict[HistoryKey, RuntimeEstimate] = {}
+        num_lines = 0
+        for line in self._read_lines():
+            num_lines += 1
+            key = HistoryKey(variant=line["variant"], suite=line["suite"],
+                             test_file=normalize_test_name(line["test_file"]))
+            if line["type"] == ROLLUP_LINE:
+                estimates[key] = RuntimeEstimate.from_json(line)
+            else:
+                record = RuntimeRecord(key=key, duration=line["duration"],
+                                       hook_durations=line["hooks"], outcome=line["outcome"])
+                estimates.setdefault(key, RuntimeEstimate()).add(record, self.alpha)
+
+        return (estimates, num_lines)
+
+    def _read_lines(self) -> Iterator[Dict]:
+        """Yield each well-formed line of the history file."""
+        if not os.path.isfile(self.path):
+            return
+
+        with open(self.path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A line may have been cut short if an earlier writer was killed part way
+                    # through appending to the file.
+                    continue
+
+    def _write_rollups(self, estimates: Dict[HistoryKey, RuntimeEstimate]) -> None:
+        """Atomically replace the history file with roll-ups of the given estimates."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        (fd, tmp_path) = tempfile.mkstemp(dir=directory, prefix=".runtime_history")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            for (key, estimate) in sorted(estimates.items()):
+                fh.write(json.dumps(estimate.to_json(key)) + "\n")
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold an exclusive lock so concurrent resmoke.py invocations don't lose records."""
+        if fcntl is None:
+            yield
+            return
+
+        with open(self.path + ".lock", "a", encoding="utf-8") as lock_fh:
+            fcntl.flock(lock_fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_fh, fcntl.LOCK_UN)
+
+
+def records_from_report(report_dict: Dict, suite: str, variant: str,
+                        test_files: Iterable[str]) -> List[RuntimeRecord]:
+    """
+    Create runtime records from the results of a test report.
+
+    The results of dynamic tests, named "<test short name>:<hook name>", are attributed as hook
+    overhead to the most recent execution of the test they ran after. Results for anything other
+    than the given test files, such as fixture setup and teardown, are ignored.
+
+    :param report_dict: Report in the format of resmoke.py's report.json.
+    :param suite: Name of the suite the report is for.
+    :param variant: Name of the build variant the report is for.
+    :param test_files: Test files of the suite.
+    :return: A record for each execution of a test.
+    """
+    test_files = set(test_files)
+    records = []
+    # Maps the short name of a test to the index of its most recent record.
+    latest_records: Dict[str, int] = {}
+    for result in report_dict["results"]:
+        test_file = result["test_file"]
+        if test_file in test_files:
+            latest_records[get_short_name_from_test_file(test_file)] = len(records)
+            records.append(
+                RuntimeRecord(
+                    key=HistoryKey(variant=variant, suite=suite,
+                                   test_file=normalize_test_name(test_file)),
+                    duration=result["elapsed"], hook_durations={}, outcome=result["status"]))
+        elif is_resmoke_hook(test_file):
+            (short_name, hook_name) = split_test_hook_name(test_file)
+            if short_name in latest_records:
+                hook_durations = records[latest_records[short_name]].hook_durations
+                hook_durations[hook_name] = hook_durations.get(hook_name, 0.0) + result["elapsed"]
+
+    return records
@@ -1,4 +1,5 @@
 """Utility to support parsing a TestStat."""
+import json
 from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime
@@ -156,6 +157,19 @@ class HistoricTaskData(object):
 
         return cls.from_stats_list(historic_stats)
 
+    @classmethod
+    def from_file(cls, path: str) -> "HistoricTaskData":
+        """
+        Read historic task data from a local JSON file.
+
+        :param path: Path to a JSON list of test stats in the format returned by Evergreen.
+        :return: Test stats read from the file.
+        """
+        with open(path) as fh:
+            historic_stats = json.load(fh)
+
+        return cls.from_stats_list([TestStats(stats, None) for stats in historic_stats])
+
     @classmethod
     def from_stats_list(cls, historic_stats: List[TestStats]) -> "HistoricTaskData":
         """
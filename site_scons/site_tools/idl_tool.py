@@ -22,6 +22,8 @@
 
 """IDL Compiler Scons Tool."""
 
+import atexit
+import hashlib
 import os.path
 import subprocess
 import sys
@@ -31,8 +33,15 @@ import SCons
 # We lazily import this at generate time.
 idlc = None
 
+# The on-disk cache of parsed IDL files shared by the scanner and idlc, created at generate time.
+idl_parse_cache = None
+
 IDL_GLOBAL_DEPS = []
 
+# A Value node holding a digest of IDL_GLOBAL_DEPS, which the generated files depend on instead of
+# each of the IDL compiler sources.
+IDL_VERSION_STAMP = None
+
 
 def idlc_emitter(target, source, env):
     """For each input IDL file, the tool produces a .cpp and .h file."""
@@ -49,10 +58,42 @@ def idlc_emitter(target, source, env):
 
     env.Alias("generated-sources", [target_source, target_header])
 
+    # idlc leaves the generated files untouched when their contents don't change, which only helps
+    # if SCons doesn't remove them before running idlc.
+    env.Precious(target_source, target_header)
+
     return [target_source, target_header], source
 
 
-IDLCAction = SCons.Action.Action("$IDLCCOM", "$IDLCCOMSTR")
+def idlc_batch_enabled(env):
+    """Whether IDL files are compiled in batches, which is not supported when generating ninja."""
+    if env.get("GENERATING_NINJA", False):
+        return False
+    return str(env.get("IDLC_BATCH", "")).lower() in ["true", "1"]
+
+
+def idlc_batch_key(action, env, target, source):
+    """Compile the IDL files of a directory which use the same environment in one idlc process."""
+    if not idlc_batch_enabled(env):
+        return None
+    return (id(action), id(env), target[0].dir)
+
+
+def idlc_batch_args(sources, targets):
+    """Return the idlc --batch arguments to compile each source into its pair of targets."""
+    sources = list(sources)
+    targets = list(targets)
+
+    args = []
+    for i, source in enumerate(sources):
+        # The emitter makes the .cpp and .h the targets of each source, in that order.
+        args.extend(["--batch", str(source), str(targets[2 * i + 1]), str(targets[2 * i])])
+    return args
+
+
+# Only the targets of the out of date IDL files of a batch are rebuilt.
+IDLCAction = SCons.Action.Action("$IDLCCOM", "$IDLCCOMSTR", batch_key=idlc_batch_key,
+                                 targets="$CHANGED_TARGETS")
 
 
 def idl_scanner(node, env, path):
@@ -67,7 +108,7 @@ def idl_scanner(node, env, path):
     if nodes_deps_list is not None:
         return nodes_deps_list
 
-    nodes_deps_list = IDL_GLOBAL_DEPS[:]
+    nodes_deps_list = [IDL_VERSION_STAMP]
 
     # Compute the include paths to use based on the include flags in IDLCFLAGS
     flags = env["IDLCFLAGS"]
@@ -78,7 +119,8 @@ def idl_scanner(node, env, path):
 
     with open(str(node), encoding="utf-8") as file_stream:
         parsed_doc = idlc.parser.parse(
-            file_stream, str(node), idlc.CompilerImportResolver(include_paths)
+            file_stream, str(node), idlc.CompilerImportResolver(include_paths),
+            parse_cache=idl_parse_cache,
         )
 
     if not parsed_doc.errors and parsed_doc.spec.imports is not None:
@@ -111,6 +153,7 @@ def generate(env):
 
     sys.path.append(env.Dir("#buildscripts").get_abspath())
     import buildscripts.idl.idl.compiler as idlc_mod
+    import buildscripts.idl.idl.cache as idl_cache_mod
 
     global idlc
     idlc = idlc_mod
@@ -122,16 +165,43 @@ def generate(env):
         "--base_dir", base_dir,
         "--target_arch", "$TARGET_ARCH",
     ]
-    env["IDLCCOM"] = "$IDLC $IDLCFLAGS --header ${TARGETS[1]} --output ${TARGETS[0]} $SOURCES"
-    env["IDLCCOMSTR"] = ("Generating ${TARGETS[0]}"
+
+    # Parsed IDL files are cached on disk, keyed by their content and the IDL compiler version, so
+    # each file is only parsed once by the scanner and all of the idlc processes.
+    if "BUILD_ROOT" in env:
+        env.SetDefault(IDLC_PARSE_CACHE_DIR="$BUILD_ROOT/scons/idl_parse_cache")
+    parse_cache_dir = env.subst(env.get("IDLC_PARSE_CACHE_DIR", ""))
+    if parse_cache_dir:
+        global idl_parse_cache
+        if idl_parse_cache is None:
+            idl_parse_cache = idl_cache_mod.ParsedSpecCache(env.Dir(parse_cache_dir).get_abspath())
+            if env.get("VERBOSE", "").lower() in ['true', '1']:
+                atexit.register(lambda: print(idl_parse_cache.format_stats()))
+        env.Append(IDLCFLAGS=["--parse-cache-dir", "$IDLC_PARSE_CACHE_DIR"])
+
+    env["IDLCFILECOM"] = "$IDLC $IDLCFLAGS --header ${TARGETS[1]} --output ${TARGETS[0]} $SOURCES"
+
+    # With IDLC_BATCH, a single idlc process compiles all of the out of date IDL files of a batch,
+    # which saves starting the interpreter and parsing the files they import again for each file.
+    env["_IDLC_BATCH_ENABLED"] = idlc_batch_enabled
+    env["_IDLC_BATCH_ARGS"] = idlc_batch_args
+    env["IDLCBATCHCOM"] = "$IDLC $IDLCFLAGS ${_IDLC_BATCH_ARGS(CHANGED_SOURCES, CHANGED_TARGETS)}"
+    env["IDLCCOM"] = "${IDLCBATCHCOM if _IDLC_BATCH_ENABLED(__env__) else IDLCFILECOM}"
+    env["IDLCCOMSTR"] = ("Generating ${CHANGED_TARGETS[0]}"
         if not env.get("VERBOSE", "").lower() in ['true', '1']
         else None)
     env["IDLCSUFFIX"] = ".idl"
 
     global IDL_GLOBAL_DEPS
-    IDL_GLOBAL_DEPS = env.Glob("#buildscripts/idl/*.py") + env.Glob(
+    IDL_GLOBAL_DEPS = env.Glob("#buildscripts/idl/idlc.py") + env.Glob(
         "#buildscripts/idl/idl/*.py"
     )
+
+    global IDL_VERSION_STAMP
+    version = hashlib.sha256()
+    for dep in sorted(IDL_GLOBAL_DEPS, key=str):
+        version.update(dep.get_contents())
+    IDL_VERSION_STAMP = env.Value(version.hexdigest())
     env["IDL_HAS_INLINE_DEPENDENCIES"] = True
 
 
@@ -0,0 +1,91 @@
+/**
+ *    Copyright (C) 2021-present MongoDB, Inc.
+ *
+ *    This program is free software: you can redistribute it and/or modify
+ *    it under the terms of the Server Side Public License, version 1,
+ *    as published by MongoDB, Inc.
+ *
+ *    This program is distributed in the hope that it will be useful,
+ *    but WITHOUT ANY WARRANTY; without even the implied warranty of
+ *    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ *    Server Side Public License for more details.
+ *
+ *    You should have received a copy of the Server Side Public License
+ *    along with this program. If not, see
+ *    <http://www.mongodb.com/licensing/server-side-public-license>.
+ *
+ *    As a special exception, the copyright holders give permission to link the
+ *    code of portions of this program with the OpenSSL library under certain
+ *    conditions as described in each individual source file and distribute
+ *    linked combinations including the program with the OpenSSL library. You
+ *    must comply with the Server Side Public License in all respects for
+ *    all of the code used other than as permitted herein. If you modify file(s)
+ *    with this exception, you may extend this exception to your version of the
+ *    file(s), but you are not obligated to do so. If you do not wish to do so,
+ *    delete this exception statement from your version. If you delete this
+ *    exception statement from all source files in the program, then also delete
+ *    it in the license file.
+ */
+
+#include "mongo/platform/basic.h"
+
+#include <benchmark/benchmark.h>
+
+#include "mongo/bson/bsonobjbuilder.h"
+#include "mongo/idl/idl_parser_bm_gen.h"
+#include "mongo/rpc/op_msg.h"
+
+namespace mongo {
+namespace idl {
+namespace bm {
+namespace {
+
+// The fields of a typical find command, including the generic arguments the parser skips.
+BSONObj buildFindLikeFields(BSONObjBuilder&& builder) {
+    builder.append("filter", BSON("a" << 1 << "b" << BSON("$gt" << 5)));
+    builder.append("projection", BSON("a" << 1 << "_id" << 0));
+    builder.append("sort", BSON("b" << -1));
+    builder.append("limit", 10LL);
+    builder.append("batchSize", 101LL);
+    builder.append("singleBatch", false);
+    builder.append("maxTimeMS", 1000LL);
+    builder.append("readConcern", BSON("level"
+                                       << "majority"));
+    builder.append("allowDiskUse", true);
+    builder.append("lsid", BSON("id" << 1));
+    builder.append("$db", "test");
+    return builder.obj();
+}
+
+void BM_parseFindLikeCommand(benchmark::State& state) {
+    BSONObjBuilder builder;
+    builder.append(FindLikeCommand::kCommandName, "coll");
+    OpMsgRequest request;
+    request.body = buildFindLikeFields(std::move(builder));
+
+    IDLParserErrorContext ctxt("findLike");
+    for (auto _ : state) {
+        benchmark::DoNotOptimize(FindLikeCommand::parse(ctxt, request));
+    }
+    state.SetItemsProcessed(state.iterations());
+}
+
+void BM_parseFindLikeStruct(benchmark::State& state) {
+    // The struct isn't strict, so the generic arguments are tracked as extra fields.
+    auto obj = buildFindLikeFields(BSONObjBuilder());
+
+    IDLParserErrorContext ctxt("findLike");
+    for (auto _ : state) {
+        benchmark::DoNotOptimize(FindLikeStruct::parse(ctxt, obj));
+    }
+    state.SetItemsProcessed(state.iterations());
+}
+
+}  // namespace
+
+BENCHMARK(BM_parseFindLikeCommand);
+BENCHMARK(BM_parseFindLikeStruct);
+
+}  // namespace bm
+}  // namespace idl
+}  // namespace mongo
@@ -2227,6 +2227,117 @@ TEST(IDLEnum, TestStringEnumNegative) {
     }
 }
 
+/// Struct view tests:
+// Positive: the view of a struct returns the same values as the struct
+TEST(IDLStructViewTests, TestViewMatchesStruct) {
+    IDLParserErrorContext ctxt("root");
+
+    auto testDoc = BSON("field1"
+                        << "abc"
+                        << "field2"
+                        << "def"
+                        << "field3" << 7 << "field4" << BSON("a" << 1) << "field5"
+                        << BSON_ARRAY(1 << 2) << "field6"
+                        << BSON("value"
+                                << "ghi")
+                        << "field7"
+                        << "jkl"
+                        << "field8"
+                        << "two");
+    auto testStruct = View_struct::parse(ctxt, testDoc);
+    auto testView = View_structView::parse(ctxt, testDoc);
+
+    assert_same_types<decltype(testView.getField1()), StringData>();
+    assert_same_types<decltype(testView.getField2()), boost::optional<StringData>>();
+    assert_same_types<decltype(testView.getField3()), std::int32_t>();
+    assert_same_types<decltype(testView.getField4()), BSONObj>();
+    assert_same_types<decltype(testView.getField5()), BSONElement>();
+    assert_same_types<decltype(testView.getField6()), BSONElement>();
+    assert_same_types<decltype(testView.getField8()), BSONElement>();
+
+    ASSERT_EQUALS(testStruct.getField1(), testView.getField1());
+    ASSERT_EQUALS(testStruct.getField2().get(), testView.getField2().get());
+    ASSERT_EQUALS(testStruct.getField3(), testView.getField3());
+    ASSERT_BSONOBJ_EQ(testStruct.getField4(), testView.getField4());
+    ASSERT_EQUALS(testStruct.getField7(), testView.getField7());
+
+    // The fields the view can't decode without copying are returned as their BSONElement.
+    ASSERT_BSONELT_EQ(testDoc["field5"], testView.getField5());
+    ASSERT_BSONELT_EQ(testDoc["field6"], testView.getField6());
+    ASSERT_BSONELT_EQ(testDoc["field8"], testView.getField8());
+    ASSERT_TRUE(testStruct.getField8() == StringEnumEnum::s2);
+
+    // Strings and objects point into the parsed BSON.
+    ASSERT_EQUALS(testDoc["field1"].valueStringData().rawData(),
+                  testView.getField1().rawData());
+    ASSERT_EQUALS(testDoc["field4"].Obj().objdata(), testView.getField4().objdata());
+}
+
+// Positive: the view of a struct returns defaults and missing optional fields like the struct
+TEST(IDLStructViewTests, TestViewDefaults) {
+    IDLParserErrorContext ctxt("root");
+
+    auto testDoc = BSON("field1"
+                        << "abc"
+                        << "field4" << BSONObj() << "field3" << BSONNULL);
+    auto testStruct = View_struct::parse(ctxt, testDoc);
+    auto testView = View_structView::parse(ctxt, testDoc);
+
+    ASSERT_FALSE(testStruct.getField2().is_initialized());
+    ASSERT_FALSE(testView.getField2().is_initialized());
+    ASSERT_EQUALS(42, testStruct.getField3());
+    ASSERT_EQUALS(42, testView.getField3());
+    ASSERT_EQUALS("a default", testStruct.getField7());
+    ASSERT_EQUALS("a default", testView.getField7());
+    ASSERT_TRUE(testView.getField5().eoo());
+    ASSERT_TRUE(testView.getField6().eoo());
+    ASSERT_FALSE(testStruct.getField8().is_initialized());
+    ASSERT_TRUE(testView.getField8().eoo());
+}
+
+// Negative: the view of a struct rejects the same documents as the struct
+TEST(IDLStructViewTests, TestViewErrors) {
+    IDLParserErrorContext ctxt("root");
+
+    std::vector<BSONObj> testDocs{
+        // Missing required field
+        BSON("field1"
+             << "abc"),
+        // Wrong type
+        BSON("field1" << 1 << "field4" << BSONObj()),
+        BSON("field1"
+             << "abc"
+             << "field4" << BSONObj() << "field5" << 1),
+        // Duplicate field
+        BSON("field1"
+             << "abc"
+             << "field4" << BSONObj() << "field1"
+             << "def"),
+        // Extra field
+        BSON("field1"
+             << "abc"
+             << "field4" << BSONObj() << "field9" << 1),
+        // Wrong array element type
+        BSON("field1"
+             << "abc"
+             << "field4" << BSONObj() << "field5" << BSON_ARRAY("x")),
+        // Invalid nested struct
+        BSON("field1"
+             << "abc"
+             << "field4" << BSONObj() << "field6" << BSONObj()),
+        // Invalid enum value
+        BSON("field1"
+             << "abc"
+             << "field4" << BSONObj() << "field8"
+             << "bogus"),
+    };
+
+    for (const auto& testDoc : testDocs) {
+        ASSERT_THROWS(View_struct::parse(ctxt, testDoc), AssertionException);
+        ASSERT_THROWS(View_structView::parse(ctxt, testDoc), AssertionException);
+    }
+}
+
 OpMsgRequest makeOMR(BSONObj obj) {
     OpMsgRequest request;
     request.body = obj;